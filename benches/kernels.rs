@@ -0,0 +1,96 @@
+// Micro-benchmarks of word level kernels, run with `cargo bench --no-default-features`
+use criterion::{black_box, criterion_group, criterion_main, BenchmarkId, Criterion, Throughput};
+
+use bitvec::arithm::mul::mul_words;
+use bitvec::binary::{strided, BinaryBase, SignBehavior};
+use bitvec::utility::search::{self, Pattern};
+
+/// Deterministic pseudo random blocks (xorshift)
+fn random_blocks(count: usize, mut seed: u32) -> Vec<u32> {
+    (0..count).map(|_| {
+        seed ^= seed << 13;
+        seed ^= seed >> 17;
+        seed ^= seed << 5;
+        seed
+    }).collect()
+}
+
+const SIZES: [usize; 3] = [64, 4096, 262144]; // in blocks
+
+fn bench_extended_block(c: &mut Criterion) {
+    let mut group = c.benchmark_group("extended_block");
+
+    for blocks in SIZES {
+        let binary = BinaryBase::from_blocks(&random_blocks(blocks, 1), blocks * 32 - 5, SignBehavior::Signed);
+        let fill = binary.sign_extending_bit();
+
+        group.throughput(Throughput::Bytes(blocks as u64 * 4));
+        group.bench_with_input(BenchmarkId::from_parameter(blocks), &binary, |b, binary| {
+            b.iter(|| (0..blocks + 1).fold(0u32, |acc, i| acc ^ binary.extended_block(black_box(i), fill)))
+        });
+    }
+    group.finish();
+}
+
+fn bench_strided(c: &mut Criterion) {
+    let mut group = c.benchmark_group("strided");
+
+    for blocks in SIZES {
+        let data = random_blocks(blocks, 2);
+        let block = |i: usize| data.get(i).copied().unwrap_or(0);
+
+        for step in [1isize, 3, -5] {
+            let count = blocks * 32 / step.unsigned_abs();
+            let first = if step > 0 { 0 } else { blocks * 32 - 1 };
+            let values = random_blocks((count + 31) / 32, 3);
+
+            group.throughput(Throughput::Elements(count as u64));
+            group.bench_function(BenchmarkId::new(format!("gather/step={}", step), blocks), |b| {
+                b.iter(|| strided::gather(block, black_box(first), step, count))
+            });
+            group.bench_function(BenchmarkId::new(format!("scatter/step={}", step), blocks), |b| {
+                let mut out = data.clone();
+                b.iter(|| strided::scatter(&mut out, black_box(first), step, count, |i| values.get(i).copied().unwrap_or(0)))
+            });
+        }
+    }
+    group.finish();
+}
+
+fn bench_find_all(c: &mut Criterion) {
+    let mut group = c.benchmark_group("find_all");
+
+    for blocks in SIZES {
+        let text = random_blocks(blocks, 4);
+        let block = |i: usize| text.get(i).copied().unwrap_or(0);
+
+        // short pattern uses Shift-Or only, long periodic one exercises KMP skips
+        for (name, pattern) in [("short", Pattern::new(vec![0b1011_0110_1], 9)), ("periodic", Pattern::new(vec![0x5555_5555; 8], 250))] {
+            group.throughput(Throughput::Bytes(blocks as u64 * 4));
+            group.bench_function(BenchmarkId::new(name, blocks), |b| {
+                b.iter(|| search::find_all(&block, &pattern, 0, blocks * 32))
+            });
+        }
+    }
+    group.finish();
+}
+
+fn bench_mul(c: &mut Criterion) {
+    let mut group = c.benchmark_group("mul");
+
+    // below and above `KARATSUBA_THRESHOLD`
+    for blocks in [4, 16, 64, 1024, 8192] {
+        let (a, b) = (random_blocks(blocks, 5), random_blocks(blocks, 6));
+
+        group.bench_function(BenchmarkId::new("full", blocks), |bench| {
+            bench.iter(|| mul_words::full(black_box(&a), black_box(&b)))
+        });
+        group.bench_function(BenchmarkId::new("low", blocks), |bench| {
+            bench.iter(|| mul_words::low(black_box(&a), black_box(&b), blocks))
+        });
+    }
+    group.finish();
+}
+
+criterion_group!(benches, bench_extended_block, bench_strided, bench_find_all, bench_mul);
+criterion_main!(benches);
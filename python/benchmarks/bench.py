@@ -0,0 +1,311 @@
+"""
+Benchmarks of bitvec, results are stored in json file so runs of different versions can be compared.
+
+```
+python python/benchmarks/bench.py                              # run all benchmarks, results are saved under installed version
+python python/benchmarks/bench.py -k find -k iter             # run benchmarks that contain `find` or `iter` in the name
+python python/benchmarks/bench.py --compare 0.3.0             # compare with saved run, exits with 1 if something got slower
+python python/benchmarks/bench.py --label my-branch --save results.json
+```
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import runpy
+import sys
+import time
+import timeit
+
+from bitvec import Binary, arithm
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.json')
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    """
+    Registers `setup` function as benchmark. `setup` prepares data and returns function that is timed.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+rng = random.Random(0)
+
+SMALL = 64
+LARGE = 1_000_000
+
+small_int = rng.getrandbits(SMALL)
+large_int = rng.getrandbits(LARGE)
+small_str = bin(small_int)[2:].zfill(SMALL)
+large_str = bin(large_int)[2:].zfill(LARGE)
+large_bytes = large_int.to_bytes(LARGE // 8, 'little')
+large_bools = [bool(rng.getrandbits(1)) for _ in range(LARGE // 10)]
+
+#########################
+# construction
+#########################
+@benchmark('construct/str/small')
+def _():
+    return lambda: Binary(small_str)
+
+@benchmark('construct/str/large')
+def _():
+    return lambda: Binary(large_str)
+
+@benchmark('construct/int/small')
+def _():
+    return lambda: Binary(small_int, lenght=SMALL)
+
+@benchmark('construct/int/large')
+def _():
+    return lambda: Binary(large_int, lenght=LARGE)
+
+@benchmark('construct/bytes/large')
+def _():
+    return lambda: Binary(large_bytes)
+
+@benchmark('construct/iterable/bools')
+def _():
+    return lambda: Binary(large_bools)
+
+#########################
+# conversion
+#########################
+@benchmark('convert/int/small')
+def _():
+    value = Binary(small_int, lenght=SMALL)
+    return lambda: value.int()
+
+@benchmark('convert/int/large')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value.int()
+
+@benchmark('convert/hex/large')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value.hex()
+
+@benchmark('convert/bin/large')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value.bin()
+
+#########################
+# arithmetic
+#########################
+@benchmark('arithm/add/small')
+def _():
+    a, b = Binary(small_int, lenght=SMALL), Binary(small_int // 3, lenght=SMALL)
+    return lambda: a + b
+
+@benchmark('arithm/add/large')
+def _():
+    a, b = Binary(large_int, lenght=LARGE), Binary(large_int // 3, lenght=LARGE)
+    return lambda: a + b
+
+@benchmark('arithm/sub/large')
+def _():
+    a, b = Binary(large_int, lenght=LARGE), Binary(large_int // 3, lenght=LARGE)
+    return lambda: a - b
+
+@benchmark('arithm/mul/small')
+def _():
+    a, b = Binary(small_int, lenght=SMALL), Binary(small_int // 3, lenght=SMALL)
+    return lambda: arithm.multiply(a, b)
+
+@benchmark('arithm/mul/large')
+def _():
+    a, b = Binary(large_int, lenght=LARGE // 10), Binary(large_int // 3, lenght=LARGE // 10)
+    return lambda: arithm.multiply(a, b)
+
+@benchmark('arithm/lsh/large')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value << 12345
+
+@benchmark('arithm/rsh/large')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value >> 12345
+
+@benchmark('arithm/xor/large')
+def _():
+    a, b = Binary(large_int, lenght=LARGE), Binary(large_int // 3, lenght=LARGE)
+    return lambda: a ^ b
+
+@benchmark('arithm/bitwise_map/large')
+def _():
+    a, b, c = (Binary(large_int >> i, lenght=LARGE) for i in range(3))
+    return lambda: arithm.bitwise_map(a, b, c, map='1110 1000') # majority
+
+#########################
+# indexing
+#########################
+@benchmark('index/getitem/strided')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value[1::3]
+
+@benchmark('index/setitem/strided')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    def run():
+        value[1::3] = False
+    return run
+
+@benchmark('index/getitem/bits')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    def run():
+        for i in range(0, LARGE, 100):
+            value[i]
+    return run
+
+#########################
+# iteration & searching
+#########################
+@benchmark('iter/bits')
+def _():
+    value = Binary(large_int, lenght=LARGE // 10)
+    return lambda: sum(1 for _ in value.bits())
+
+@benchmark('iter/chunks/8')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: sum(1 for _ in value.iter(8))
+
+@benchmark('iter/chunks/8/int')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: sum(value.iter(8, as_int=True))
+
+@benchmark('search/find_all')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value.find_all('1011 0111')
+
+@benchmark('search/count_ones')
+def _():
+    value = Binary(large_int, lenght=LARGE)
+    return lambda: value.count_ones()
+
+#########################
+# examples
+#########################
+def example(name):
+    path = os.path.join(EXAMPLES, name)
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(path, run_name='__main__')
+    return run
+
+@benchmark('examples/sieve_of_eratosthenes')
+def _():
+    return example('sieve_of_eratosthenes.py')
+
+@benchmark('examples/bit_packing')
+def _():
+    return example('bit_packing.py')
+
+@benchmark('examples/emulate_cpu')
+def _():
+    try:
+        import numpy # noqa: F401 example depends on numpy
+    except ImportError:
+        return None
+    return example('emulate_cpu.py')
+
+
+def measure(function, min_time: float, repeat: int) -> float:
+    """
+    Returns the best time of single call (in seconds). Number of calls per measurement is chosen so it takes at least `min_time`
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('bitvec')
+    except Exception:
+        return 'unknown'
+
+def load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='bitvec benchmarks')
+    parser.add_argument('-k', dest='filters', action='append', default=[], help='run only benchmarks that contain given text (can be repeated)')
+    parser.add_argument('--label', default=None, help='name of the run in results file (default: installed version)')
+    parser.add_argument('--save', default=DEFAULT_RESULTS, help='results file (json)')
+    parser.add_argument('--no-save', action='store_true', help='do not write results')
+    parser.add_argument('--compare', default=None, help='label of saved run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown reported as regression (default 0.10)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimal time of one measurement in seconds')
+    parser.add_argument('--list', action='store_true', help='list benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filters or any(f in name for f in args.filters)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    label = args.label or version()
+    saved = load(args.save)
+    baseline = saved.get(args.compare, {}).get('results', {}) if args.compare else {}
+    if args.compare and not baseline:
+        print(f'No saved run named {args.compare!r} in {args.save}', file=sys.stderr)
+        return 2
+
+    results = {}
+    regressions = []
+    for name in names:
+        function = BENCHMARKS[name]()
+        if function is None:
+            print(f'{name:<40} skipped')
+            continue
+        results[name] = seconds = measure(function, args.min_time, args.repeat)
+
+        line = f'{name:<40} {seconds * 1e6:>14.2f} us'
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f'  {change:+8.1%}'
+            if change > args.threshold:
+                regressions.append((name, change))
+                line += '  REGRESSION'
+        print(line)
+
+    if not args.no_save:
+        saved[label] = {
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': {**saved.get(label, {}).get('results', {}), **results},
+        }
+        with open(args.save, 'w') as file:
+            json.dump(saved, file, indent=2, sort_keys=True)
+
+    if regressions:
+        print(f'\n{len(regressions)} benchmark(s) slower than {args.compare} by more than {args.threshold:.0%}:')
+        for name, change in regressions:
+            print(f'    {name} {change:+.1%}')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
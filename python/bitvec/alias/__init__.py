@@ -1,6 +1,7 @@
 from typing import Optional
 from ..bitvec import Binary
 from .. import bitvec 
+from ..bitvec import types
 
 def unsigned_bin(object: object = None, size: Optional[int] = None) -> Binary:
     """
@@ -8,167 +9,49 @@ def unsigned_bin(object: object = None, size: Optional[int] = None) -> Binary:
     """
     return Binary(object, lenght=size, sign_behavior='unsigned')
 
-def u0(object: object = None) -> Binary:
-    """
-    Returns unsigned 0 bit Binary value. Pads remaing bits with 0
-    It it 'holds' always 0. 
-    """
-    return unsigned_bin(object, 0)
-
-def u1(object: object = None) -> Binary:
-    """
-    Returns unsigned 1 bit Binary value. Pads remaing bits with 0
-    It includes integers 0 or 1
-    """
-    return unsigned_bin(object, 1)
-
-def u2(object: object = None) -> Binary:
-    """
-    Returns unsigned 2 bit Binary value. Pads remaing bits with 0
-    It includes integers from 0 to 3
-    """
-    return unsigned_bin(object, 2)
-def u3(object: object = None):
-    """
-    Returns unsigned 2 bit Binary value. Pads remaing bits with 0
-    It includes integers from 0 to 7
-    """
-    return unsigned_bin(object, 3)
-def u4(object: object = None):
-    """
-    Returns unsigned 4 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 4)
-def u5(object: object = None):
-    """
-    Returns unsigned 5 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 5)
-def u6(object: object = None):
-    """
-    Returns unsigned 6 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 6)
-def u7(object: object = None):
-    """
-    Returns unsigned 7 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 7)
-def u8(object: object = None):
-    """
-    Returns unsigned 8 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 8)
-def u16(object: object = None):
-    """
-    Returns unsigned 16 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 16)
-def u32(object: object = None):
-    """
-    Returns unsigned 32 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 32)
-def u64(object: object = None):
-    """
-    Returns unsigned 64 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 64)
-def u128(object: object = None):
-    """
-    Returns unsigned 128 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 128)
-def u1024(object: object = None):
-    """
-    Returns unsigned 1024 bit Binary value. Pads remaing bits with 0
-    """
-    return unsigned_bin(object, 1024)
-
-
-#####################
-#  Signed Integers  #
-#####################
-
 def signed_bin(object: object = None, size: Optional[int] = None, raise_on_big_value=False) -> Binary:
     """
     Returns `Binary` object with sign_behavior set to 'signed'
     """
     return Binary(object, lenght=size, sign_behavior='signed')
 
-def i0(object: object = None) -> Binary:
-    """
-    Returns signed 2 bit Binary value. Pads remaing bits with last bit (sign extended).
-    It 'holds' always 0.
-    """
-    return signed_bin(object, 0, True)
+#######################
+#  Unsigned Integers  #
+#######################
+# Native types from `bitvec.types`, calling them skips keyword argument parsing of `Binary`.
+# Remaining bits are padded with 0
+
+u0 = types.u0
+u1 = types.u1
+u2 = types.u2
+u3 = types.u3
+u4 = types.u4
+u5 = types.u5
+u6 = types.u6
+u7 = types.u7
+u8 = types.u8
+u16 = types.u16
+u32 = types.u32
+u64 = types.u64
+u128 = types.u128
+u1024 = types.u1024
 
-def i1(object: object = None) -> Binary:
-    """
-    Returns signed 2 bit Binary value. Pads remaing bits with last bit (sign extended).
-    It includes integers -1 and 0
-    """
-    return signed_bin(object, 1, True)
-
-def i2(object: object = None) -> Binary:
-    """
-    Returns signed 2 bit Binary value. Pads remaing bits with last bit (sign extended).
-    It includes integers from -2 to 1
-    """
-    return signed_bin(object, 2, True)
-def i3(object: object = None):
-    """
-    Returns signed 2 bit Binary value. Pads remaing bits with last bit (sign extended)
-    It includes integers from -4 to 3
-    """
-    return signed_bin(object, 3, True)
-def i4(object: object = None):
-    """
-    Returns signed 4 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 4, True)
-def i5(object: object = None):
-    """
-    Returns signed 5 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 5, True)
-def i6(object: object = None):
-    """
-    Returns signed 6 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 6, True)
-def i7(object: object = None):
-    """
-    Returns signed 7 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 7, True)
-def i8(object: object = None):
-    """
-    Returns signed 8 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 8, True)
-def i16(object: object = None):
-    """
-    Returns signed 16 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 16, True)
-def i32(object: object = None):
-    """
-    Returns signed 16 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 32, True)
-def i64(object: object = None):
-    """
-    Returns signed 16 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 64, True)
-def i128(object: object = None):
-    """
-    Returns signed 16 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 128, True)
-def i1024(object: object = None):
-    """
-    Returns signed 16 bit Binary value. Pads remaing bits with last bit (sign extended)
-    """
-    return signed_bin(object, 1024, True)
\ No newline at end of file
+#####################
+#  Signed Integers  #
+#####################
+# Remaining bits are padded with last bit (sign extended)
+
+i0 = types.i0
+i1 = types.i1
+i2 = types.i2
+i3 = types.i3
+i4 = types.i4
+i5 = types.i5
+i6 = types.i6
+i7 = types.i7
+i8 = types.i8
+i16 = types.i16
+i32 = types.i32
+i64 = types.i64
+i128 = types.i128
+i1024 = types.i1024
@@ -1,13 +1,13 @@
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
 from .. import Binary
 
 class Flags:
     overflow: bool
     zeroflag: bool
     signflag: bool
-    def __init__(self, of, zf, sf): ...
+    def __init__(self, of: bool = False, zf: bool = False, sf: bool = False): ...
 
-def flaged_add(a: Binary, b: Any) -> Tuple[Binary, Flags]:
+def flaged_add(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Tuple[Binary, Flags]:
     """
     ## flaged_add
     Returns sum of two numbers with flags (in object `Flag`)
@@ -21,7 +21,7 @@ def flaged_add(a: Binary, b: Any) -> Tuple[Binary, Flags]:
     ```
     """
     ...
-def overflowing_add(a: Binary, b: Any) -> Tuple[Binary, bool]:
+def overflowing_add(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Tuple[Binary, bool]:
     """
     ## overflowing_add
     Returns sum of two numbers with wrapping arithmetic and information if overflow occure
@@ -31,7 +31,7 @@ def overflowing_add(a: Binary, b: Any) -> Tuple[Binary, bool]:
     ('00000000', True)
     """
     ...
-def wrapping_add(a: Binary, b: Any) -> Binary:
+def wrapping_add(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## wrapping_add
     Returns sum of two numbers with wrapping arithmetic.
@@ -42,10 +42,16 @@ def wrapping_add(a: Binary, b: Any) -> Binary:
     >>> wrapping_add(u8(255), 1) # 11111111 + 1 overflows
     '00000000'
     ```
+
+    Functions that return `Binary` accept `out=` argument, result is written into memory of `out` and `out` is returned
+    (no new object is created, `out` can be one of the operands)
+    ```
+    >>> wrapping_add(r1, r2, out=r1) # same as r1 += r2
+    ```
     """
     ...
 
-def flaged_sub(a: Binary, b: Any) -> Tuple[Binary, Flags]:
+def flaged_sub(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Tuple[Binary, Flags]:
     """
     ## flaged_add
     Returns diffrance of two numbers with flags (in object `Flag`)
@@ -61,7 +67,7 @@ def flaged_sub(a: Binary, b: Any) -> Tuple[Binary, Flags]:
     It is equivalent of `flaged_add(a, arithmetic_neg(b))`
     """
     ...
-def overflowing_sub(a: Binary, b: Any) -> Tuple[Binary, bool]:
+def overflowing_sub(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Tuple[Binary, bool]:
     """
     ## overflowing_sub
     Returns diffrance of two numbers with wrapping arithmetic and information if carry was true
@@ -71,7 +77,7 @@ def overflowing_sub(a: Binary, b: Any) -> Tuple[Binary, bool]:
     ('11111111', True)
     """
     ...
-def wrapping_sub(a: Binary, b: Any) -> Binary:
+def wrapping_sub(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## overflowing_sub
     Returns diffrance of two numbers with wrapping arithmetic and information if carry was true
@@ -202,7 +208,7 @@ def pad_sign_extend(binary: Binary, size: int) -> Binary:
     """
     ...
 
-def arithmetic_neg(binary: Binary) -> Binary:
+def arithmetic_neg(binary: Binary, *, out: Optional[Binary] = None) -> Binary:
     """
     ## arithmetic_negate
     Negate binary number using two's complement arithmetic (~X + 1)
@@ -215,7 +221,7 @@ def arithmetic_neg(binary: Binary) -> Binary:
     ```
     """
     ...
-def bitwise_not(binary: Binary) -> Binary:
+def bitwise_not(binary: Binary, *, out: Optional[Binary] = None) -> Binary:
     """
     ## bitwise_negate
     Negate binary number using bitwise negation (~X)
@@ -228,7 +234,7 @@ def bitwise_not(binary: Binary) -> Binary:
     """
     ...
 
-def bitwise_or(binary: Binary, b: Any) -> Binary:
+def bitwise_or(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## bitwise_or
     Bitwise OR of binary numbers. If they differ in lenght. Smaller value will be sign-extended to match
@@ -238,7 +244,7 @@ def bitwise_or(binary: Binary, b: Any) -> Binary:
     ```
     """
     ...
-def bitwise_and(binary: Binary, b: Any) -> Binary:
+def bitwise_and(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## bitwise_and
     Bitwise AND of binary numbers. If they differ in lenght. Smaller value will be sign-extended to match
@@ -250,7 +256,7 @@ def bitwise_and(binary: Binary, b: Any) -> Binary:
     ```
     """
     ...
-def bitwise_xor(binary: Binary, b: Any) -> Binary:
+def bitwise_xor(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## bitwise_xor
     Bitwise XOR of binary numbers. If they differ in lenght. Smaller value will be sign-extended to match
@@ -262,7 +268,7 @@ def bitwise_xor(binary: Binary, b: Any) -> Binary:
     ```
     """
     ...
-def bitwise_xnor(binary: Binary, b: Any) -> Binary:
+def bitwise_xnor(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## bitwise_xnor
     Bitwise XNOR of binary numbers. If they differ in lenght. Smaller value will be sign-extended to match
@@ -274,7 +280,7 @@ def bitwise_xnor(binary: Binary, b: Any) -> Binary:
     ```
     """
     ...
-def bitwise_nand(binary: Binary, b: Any) -> Binary:
+def bitwise_nand(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## bitwise_nand
     Bitwise NAND of binary numbers. If they differ in lenght. Smaller value will be sign-extended to match
@@ -286,7 +292,7 @@ def bitwise_nand(binary: Binary, b: Any) -> Binary:
     ```
     """
     ...
-def bitwise_nor(binary: Binary, b: Any) -> Binary:
+def bitwise_nor(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## bitwise_noreset
     Bitwise NOR of binary numbers. If they differ in lenght. Smaller value will be sign-extended to match
@@ -306,7 +312,7 @@ def bitwise_map(*args: Any, map: Binary|str|int|dict[Binary|str|int, bool]) -> B
     It expects that `map` has atleast `2**len(args)` bits (all combinations of bits in `args`). And will pad `map` with zeros if it has less bits.
     `map` can be an `dict` that maps terms indexes to boolean values. At the end it will be converted to one binary number used in function.
 
-    Note: `bitwise_map` is quite slow compared to other functions (order of magnitute slower) and it scales badly with number of positive terms
+    Map is compiled on every call, use `BitwiseMap` to compile it once and apply it to many numbers.
 
     ### Example
     ```
@@ -344,7 +350,26 @@ def bitwise_map(*args: Any, map: Binary|str|int|dict[Binary|str|int, bool]) -> B
     """
     ...
 
-def multiply(binary: Binary, b: Any) -> Binary:
+class BitwiseMap:
+    """
+    ## BitwiseMap
+    Compiled version of `bitwise_map` map for given number of `inputs`. Map is reduced to decision diagram once,
+    calling the object computes result in single pass over blocks of arguments (shorter arguments are padded with zeros, also signed ones).
+    Maps given as `Binary`/`str`/`int` table can have up to 20 inputs, dict of true terms can have up to 64 inputs.
+    ```
+    >>> xor3 = BitwiseMap(3, map={1: True, 2: True, 4: True, 7: True})
+    >>> xor3('1010', '1100', '0110')
+    '0000'
+    >>> xor3.size # number of nodes in compiled diagram
+    5
+    ```
+    """
+    inputs: int
+    size: int
+    def __init__(self, inputs: int, map: Binary|str|int|dict[Binary|str|int, bool]): ...
+    def __call__(self, *args: Any, out: Optional[Binary] = None) -> Binary: ...
+
+def multiply(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## full_mul
     Performs multiplication of binary numbers
@@ -368,7 +393,7 @@ def overflowing_mul(binary: Binary, b: Any) -> Tuple[Binary, Binary]:
     ```
     """
     ...
-def wrapping_mul(binary: Binary, b: Any) -> Binary:
+def wrapping_mul(binary: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## wrapping_mul
     Performs multiplication of binary numbers and returns result modulo 2^n
@@ -395,7 +420,7 @@ def overflowing_lsh(a: Binary, b: Any) -> Tuple[Binary, Binary]:
     ```
     """
     ...
-def wrapping_lsh(a: Binary, b: Any) -> Binary:
+def wrapping_lsh(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## wrapping_lsh
     Left shift binary number by given amount of bits. Returns only shifted bits discarding overflow
@@ -424,7 +449,7 @@ def logical_underflowing_rsh(a: Binary, b: Any) -> Tuple[Binary, Binary]:
     ```
     """
     ...
-def logical_wrapping_rsh(a: Binary, b: Any) -> Binary:
+def logical_wrapping_rsh(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## logical_wrapping_rsh
     Logical right shift binary number by given amount of bits. Returns only shifted bits discarding underflow.
@@ -460,7 +485,7 @@ def arithmetic_underflowing_rsh(a: Binary, b: Any) -> Tuple[Binary, Binary]:
     ```
     """
     ...
-def arithmetic_wrapping_rsh(a: Binary, b: Any) -> Binary:
+def arithmetic_wrapping_rsh(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
     """
     ## arithmetic_wrapping_rsh
     Arithmetic right shift binary number by given amount of bits. Returns only shifted value (discards overflow)
@@ -480,6 +505,56 @@ def arithmetic_wrapping_rsh(a: Binary, b: Any) -> Binary:
     '11110010'
     ```
     """
+def rotate_left(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
+    """
+    ## rotate_left
+    Rotates binary number left by given amount of bits. Bits shifted out from the left are inserted on the right.
+    Amount is taken modulo `len(a)`
+    ```
+    >>> rotate_left(u8('1000 0110'), 1)
+    '00001101'
+    >>> rotate_left(u8('1000 0110'), 9)
+    '00001101'
+    ```
+    """
+    ...
+def rotate_right(a: Binary, b: Any, *, out: Optional[Binary] = None) -> Binary:
+    """
+    ## rotate_right
+    Rotates binary number right by given amount of bits. Bits shifted out from the right are inserted on the left.
+    Amount is taken modulo `len(a)`
+    ```
+    >>> rotate_right(u8('1000 0110'), 1)
+    '01000011'
+    ```
+    """
+    ...
+def funnel_lsh(a: Binary, source: Any, b: Any, *, out: Optional[Binary] = None) -> Binary:
+    """
+    ## funnel_lsh
+    Left shift binary number by given amount of bits. Freed bits are filled with the highest bits of `source`
+    (result is the high half of `concat(a, source) << b`)
+    ```
+    >>> funnel_lsh(u4('1010'), u4('0110'), 2)
+    '1001'
+    >>> funnel_lsh(u4('1010'), u4('0110'), 4)
+    '0110'
+    ```
+    """
+    ...
+def funnel_rsh(a: Binary, source: Any, b: Any, *, out: Optional[Binary] = None) -> Binary:
+    """
+    ## funnel_rsh
+    Right shift binary number by given amount of bits. Freed bits are filled with the lowest bits of `source`
+    (result is the low half of `concat(source, a) >> b`)
+    ```
+    >>> funnel_rsh(u4('1010'), u4('0110'), 2)
+    '1010'
+    >>> funnel_rsh(u4('1010'), u4('0111'), 1)
+    '1101'
+    ```
+    """
+    ...
 def concat(*args: Any) -> Binary:
     """
     ## concat
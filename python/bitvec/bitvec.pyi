@@ -1,8 +1,11 @@
-from typing import Any, Iterable, Literal, Optional, Tuple, overload
+import os
+from typing import Any, BinaryIO, Iterable, Iterator, Literal, Optional, Tuple, overload
 from . import arithm
+from . import types
 
 class Binary:
     raw_bytes: bytes
+    """Copy of the blocks as little endian bytes (padded with `sign_extending_bit`). Use `memoryview(binary)` for zero-copy access"""
     len: int
     sb: Literal['unsigned', 'signed']
 
@@ -15,7 +18,7 @@ class Binary:
             Including its representation as string, int, boolean, list of boolean-convertable values, byte-arrays, numpy arrays ect.
             * lenght - Target lenght of the number in bits. This number can be inferred from object based on its value, extra zeros ect
             * bytes_lenght - Target lenght of the number in bytes. Same as lenght but in bytes.
-            * sign_behavior - How number should implement sign.
+            * sign_behavior - How number should implement sign. `"unsigned"` or `"signed"`, other values raise `ValueError`.
             ## Examples
             
             >>> from pybytes import Binary
@@ -258,7 +261,7 @@ class Binary:
         """
         ...
     
-    def find(self, sub: bool|int|str|Binary) -> int|None:
+    def find(self, sub: bool|int|str|Binary, start: Optional[int] = None, end: Optional[int] = None) -> int|None:
         """
         ## find
         Returns index of first occurence of `sub` in the number. If `sub` is not found, returns `None`.
@@ -267,17 +270,32 @@ class Binary:
         >>> Binary("1111 0011").find("0000")
         None
 
-        This function is specially optimized for searching for single bit.
+        Optional `start` and `end` limit the search to `self[start:end]` (negative values count from the end, like in `str.find`). 
+        Returned index is still counted from the beginning of the number.
+        >>> Binary("0011 0011").find("11", 2)
+        4
+
+        Search compares whole words at once, patterns up to 64 bits are checked against 32 positions per word of the number.
         """
         ...
-    def find_all(self, sub: bool|int|str|Binary) -> list[int]:
+    def find_all(self, sub: bool|int|str|Binary, start: Optional[int] = None, end: Optional[int] = None) -> list[int]:
         """
         ## find_all
-        Returns list of indexes of subsequences in `self` that matches `sub`
+        Returns list of indexes of subsequences in `self` that matches `sub` (matches can overlap)
         >>> Binary("1011 1111").find_all("1111")
         [0, 1, 2]
         >>> Binary("1100 0111").find_all("11")
         [0, 1, 6]
+
+        `start` and `end` works the same as in `find`
+        """
+        ...
+    def count(self, sub: bool|int|str|Binary, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        """
+        ## count
+        Returns number of (possibly overlapping) occurences of `sub`. Equivalent to `len(self.find_all(sub, start, end))` without building the list.
+        >>> Binary("1011 1111").count("1111")
+        3
         """
         ...
     def find_zeros(self) -> list[int]:
@@ -303,6 +321,56 @@ class Binary:
         """
         ...
     
+    @staticmethod
+    def from_ints(values: Iterable[int|Binary], width: int, signed: bool = False) -> Binary:
+        """
+        ## from_ints
+        Creates number from `width` bit values (first value takes the lowest bits), inverse of `to_ints`. Values that do not fit raise `OverflowError` (`width` up to 64) or `TypeError`.
+        >>> Binary.from_ints([2, 15], 4)
+        '11110010'
+        >>> Binary.from_ints([2, -1], 4, signed=True)
+        '11110010'
+        """
+        ...
+    def to_ints(self, width: int, signed: bool = False) -> list[int]:
+        """
+        ## to_ints
+        Splits number into chunks of `width` bits (starting from the lowest bit) and returns their values as list.
+        Last chunk is padded with sign extending bit. Same as `list(self.iter(width, as_int=True))` but in one call.
+        >>> Binary("1111 0010").to_ints(4)
+        [2, 15]
+        >>> Binary("1111 0010").to_ints(4, signed=True)
+        [2, -1]
+        """
+        ...
+    def to_bools(self) -> list[bool]:
+        """
+        ## to_bools
+        Returns all bits as list of `bool` (starting from the lowest bit)
+        >>> Binary("110").to_bools()
+        [False, True, True]
+        """
+        ...
+    def iter_ones(self, chunk_size: Optional[int] = None) -> BitIndexIterator:
+        """
+        ## iter_ones
+        Lazy version of `find_ones`, indexes are found block by block as the iterator advances.
+        If `chunk_size` is set, iterator yields lists of up to `chunk_size` indexes instead of single indexes.
+        >>> list(Binary("0101 0101").iter_ones())
+        [0, 2, 4, 6]
+        >>> list(Binary("0101 0101").iter_ones(chunk_size=3))
+        [[0, 2, 4], [6]]
+        """
+        ...
+    def iter_zeros(self, chunk_size: Optional[int] = None) -> BitIndexIterator:
+        """
+        ## iter_zeros
+        Lazy version of `find_zeros`, works the same as `iter_ones`
+        >>> list(Binary("0101 0101").iter_zeros())
+        [1, 3, 5, 7]
+        """
+        ...
+    
     def count_zeros(self) -> int:
         """
         ## count_zeros
@@ -448,6 +516,19 @@ class Binary:
     def __hex__(self) -> str: ...
     def __bin__(self) -> str: ...
     def __int__(self) -> int: ...
+    def __index__(self) -> int:
+        """
+        Allows `Binary` to be used as index.
+        >>> [10, 11, 12, 13][Binary("10")]
+        12
+        """
+    def __reduce__(self) -> tuple[type[Binary], tuple[int], bytes]:
+        """
+        Pickles raw blocks with lenght and sign behavior, without converting to string.
+        >>> pickle.loads(pickle.dumps(Binary("0001", sign_behavior="signed")))
+        '0001'
+        """
+    def __setstate__(self, state: bytes) -> None: ...
     
     def low_byte(self) -> Binary:
         """
@@ -511,6 +592,50 @@ class Binary:
         """
         ...
     
+    def view(self, start: int, stop: Optional[int] = None, sign_behavior: Optional[Literal["unsigned", "signed"]] = None) -> BinaryView:
+        """
+        ## view
+        Returns view of bits `start..stop` that shares memory with the number (nothing is copied).
+        Writes through the view change the number. View is unsigned by default.
+        >>> x = Binary("1010 0000 1111")
+        >>> x.view(0, 4).int()
+        15
+        >>> x.view(4, 8).set(5)
+        >>> x
+        '101001011111'
+        """
+        ...
+    @staticmethod
+    def mmap(path: str|os.PathLike, length: Optional[int] = None, mode: Literal['r', 'r+', 'w+', 'c'] = 'r+', sign_behavior: Literal["unsigned", "signed"] = "unsigned") -> MappedBinary:
+        """
+        ## mmap
+        Maps file as storage of `length` bits (by default whole file). File holds blocks as 32 bit little endian words, so it needs `ceil(length/32)*4` bytes.
+        In `r` and `c` modes `ceil(length/8)` bytes are enough, last block of the file is then read as if it was padded with zeros.
+        * `r` - read-only
+        * `r+` - read-write, file is grown (with zeros) if it is too small
+        * `w+` - creates (or overwrites) file filled with zeros, `length` is required
+        * `c` - copy-on-write, changes are kept in memory and never written to the file
+        >>> bitmap = Binary.mmap('coverage.bin', 2**31, 'w+')
+        >>> bitmap[12345] = True
+        >>> bitmap.count_ones()
+        1
+        >>> bitmap.flush()
+        """
+        ...
+    
+    def build_rank_index(self) -> RankSelect:
+        """
+        ## build_rank_index
+        Builds rank/select index (`RankSelect`) of the number. Index answers "how many ones before `i`" and "where is `k`-th one" in constant time,
+        it takes about 3% of the number's memory. Index is rebuilt automatically on the next query after the number is modified.
+        >>> index = Binary("1011 0110").build_rank_index()
+        >>> index.rank1(4)
+        2
+        >>> index.select1(2)
+        4
+        """
+        ...
+    
     def split_at(self, index: int) -> Tuple[Binary, Binary]:
         """
         ## split_at
@@ -522,16 +647,20 @@ class Binary:
         """
         ...
 
-    def bits(self) -> BinaryIterator: 
+    def bits(self, as_bool: bool = False) -> BinaryIterator: 
         """
         ## bits
         Returns iterator that iterates over bits. It is alias for `__iter__` method
         >>> [i for i in Binary("101").bits()]
         [1, 0, 1]
         >>> b0, b1, b2 = Binary("101")
+
+        If `as_bool` is set, iterator yields plain `bool` values instead of 1 bit `Binary` objects (much faster)
+        >>> list(Binary("101").bits(as_bool=True))
+        [True, False, True]
         """
         ...
-    def bytes(self, extend: bool = True) -> BinaryIterator:
+    def bytes(self, extend: bool = True, as_int: bool = False) -> BinaryIterator:
         """
         ## bytes
         Returns iterator that iterates over bytes. additional bits will be padded with sign exteding bit. It is alias for `__iter__` method
@@ -546,13 +675,17 @@ class Binary:
         ['00000000', '00000000']
         """
         ...
-    def iter(self, block_size: int, extend: bool = True) -> BinaryIterator:
+    def iter(self, block_size: int, extend: bool = True, as_int: bool = False) -> BinaryIterator:
         """
         ## iter
         Returns iterator that iterates over blocks of size block_size. 
         
         Additional bits will be padded with sign exteding bit if extend is set to True.
         If extend is set to False last item will have lenght equal to `len(self)%block_size` (will not be padded)
+
+        If `as_int` is set, iterator yields unsigned values of the blocks as `int` instead of creating `Binary` for every block.
+        >>> list(Binary("0111 0010").iter(4, as_int=True))
+        [2, 7]
         
         Functions `bit` and `bytes` are aliases for this method with `block_size` set to 1 or 8
         >>> [i for i in Binary("101").iter(2)]
@@ -571,6 +704,13 @@ class Binary:
     def __repr__(self) -> str: ...
     def __str__(self) -> str: ...
     def __bool__(self) -> bool: ...
+    def __buffer__(self, flags: int) -> memoryview:
+        """
+        Exports blocks as writable buffer of `ceil(len/8)` little endian bytes without copying.
+        >>> bytes(memoryview(u16(0x0201)))
+        b'\\x01\\x02'
+        """
+        ...
 
     def __add__(self, other: Any) -> Binary:
         """
@@ -637,6 +777,45 @@ class Binary:
         '1111'
         """
         ...
+    def __iadd__(self, other: Any) -> Binary:
+        """
+        In-place wrapping addition. Result is written into existing memory, `a += b` gives the same value as `a = a + b`
+        >>> a = Binary("0001")
+        >>> a += 1
+        >>> a
+        '0010'
+        """
+        ...
+    def __isub__(self, other: Any) -> Binary:
+        """
+        In-place wrapping subtraction (see `__iadd__`)
+        """
+        ...
+    def __iand__(self, other: Any) -> Binary:
+        """
+        In-place bitwise and (see `__iadd__`)
+        """
+        ...
+    def __ior__(self, other: Any) -> Binary:
+        """
+        In-place bitwise or (see `__iadd__`)
+        """
+        ...
+    def __ixor__(self, other: Any) -> Binary:
+        """
+        In-place bitwise xor (see `__iadd__`)
+        """
+        ...
+    def __ilshift__(self, other: Any) -> Binary:
+        """
+        In-place wrapping left shift (see `__iadd__`)
+        """
+        ...
+    def __irshift__(self, other: Any) -> Binary:
+        """
+        In-place wrapping right shift (see `__iadd__`)
+        """
+        ...
 
     def __eq__(self, __o: object) -> bool: ...
     def __ne__(self, __o: object) -> bool: ...
@@ -695,6 +874,408 @@ class Binary:
         """
         ...
 
+class BinaryView:
+    """
+    Bits `start..stop` of `parent`, returned by `Binary.view`. Reading small views (up to 64 bits) does not copy anything,
+    `binary()` returns copy as `Binary`. View can be passed anywhere `Binary` is expected (it is copied then).
+    """
+    parent: Binary
+    start: int
+    stop: int
+    len: int
+    def sign_behavior(self) -> Literal['unsigned', 'signed']: ...
+    def int(self) -> int: ...
+    def binary(self) -> Binary: ...
+    def set(self, value: Any) -> None:
+        """
+        Overwrites bits of the view (and parent) with `value` converted to `Binary` of view's lenght.
+        """
+        ...
+    def __len__(self) -> int: ...
+    def __int__(self) -> int: ...
+    def __index__(self) -> int: ...
+    def __bool__(self) -> bool: ...
+    def __getitem__(self, index: Any) -> bool|Binary: ...
+    def __setitem__(self, index: Any, value: Any) -> None: ...
+    def __eq__(self, other: Any) -> bool: ...
+    def __lt__(self, other: Any) -> bool: ...
+    def __le__(self, other: Any) -> bool: ...
+    def __gt__(self, other: Any) -> bool: ...
+    def __ge__(self, other: Any) -> bool: ...
+
+class MappedBinary:
+    """
+    Bit vector stored in memory mapped file, returned by `Binary.mmap`. Operations work on the mapping directly,
+    so opening is instant and only touched pages are read from disk. Slices and results of `& | ^` are returned as `Binary` (as long as the mapping),
+    in-place operators (`&= |= ^=`) write into the mapping. Can be used as context manager (mapping is closed on exit).
+    """
+    len: int
+    mode: Literal['r', 'r+', 'w+', 'c']
+    closed: bool
+    def sign_behavior(self) -> Literal['unsigned', 'signed']: ...
+    def flush(self) -> None:
+        """
+        Writes changes to the file.
+        """
+        ...
+    def close(self) -> None:
+        """
+        Unmaps the file, any further operation raises `ValueError`.
+        """
+        ...
+    def binary(self) -> Binary:
+        """
+        Copies whole mapping into `Binary`.
+        """
+        ...
+    def count_ones(self) -> int: ...
+    def count_zeros(self) -> int: ...
+    def find_ones(self) -> list[int]: ...
+    def find_zeros(self) -> list[int]: ...
+    def find(self, sub: Any, start: Optional[int] = None, end: Optional[int] = None) -> Optional[int]: ...
+    def find_all(self, sub: Any, start: Optional[int] = None, end: Optional[int] = None) -> list[int]: ...
+    def count(self, sub: Any, start: Optional[int] = None, end: Optional[int] = None) -> int: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, index: int|slice) -> bool|Binary: ...
+    def __setitem__(self, index: int|slice, value: Any) -> None: ...
+    def __and__(self, other: Any) -> Binary: ...
+    def __or__(self, other: Any) -> Binary: ...
+    def __xor__(self, other: Any) -> Binary: ...
+    def __iand__(self, other: Any) -> MappedBinary: ...
+    def __ior__(self, other: Any) -> MappedBinary: ...
+    def __ixor__(self, other: Any) -> MappedBinary: ...
+    def __enter__(self) -> MappedBinary: ...
+    def __exit__(self, *args: Any) -> bool: ...
+
+class SparseBinary:
+    """
+    Compressed bitmap (unsigned). Bits are grouped into chunks of 2^16 bits, chunks with up to 4096 ones are stored as sorted arrays,
+    denser chunks as bitmaps and empty chunks are not stored at all. Memory and time of operations scale with the number of ones, not with the lenght.
+    >>> s = SparseBinary(10**9, [5, 10**8])
+    >>> s.count_ones()
+    2
+    >>> (s & SparseBinary(10**9, [5])).find_ones()
+    [5]
+    """
+    len: int
+    containers: Tuple[int, int]
+    def __init__(self, length: int, ones: Optional[Iterable[int]] = None): ...
+    @staticmethod
+    def from_binary(binary: Binary) -> SparseBinary:
+        """
+        Compresses `binary`.
+        """
+        ...
+    def binary(self) -> Binary:
+        """
+        Decompresses into `Binary`.
+        """
+        ...
+    def count_ones(self) -> int: ...
+    def count_zeros(self) -> int: ...
+    def find_ones(self) -> list[int]: ...
+    def trailing_zeros(self) -> int: ...
+    def leading_zeros(self) -> int: ...
+    def and_not(self, other: Any) -> SparseBinary:
+        """
+        Ones of `self` that are not set in `other`.
+        """
+        ...
+    def __len__(self) -> int: ...
+    def __bool__(self) -> bool: ...
+    def __getitem__(self, index: int|slice) -> bool|Binary: ...
+    def __setitem__(self, index: int, value: bool) -> None: ...
+    def __and__(self, other: Any) -> SparseBinary: ...
+    def __or__(self, other: Any) -> SparseBinary: ...
+    def __xor__(self, other: Any) -> SparseBinary: ...
+    def __eq__(self, other: Any) -> bool: ...
+    def __ne__(self, other: Any) -> bool: ...
+
+class RankSelect:
+    """
+    Rank/select index of `binary`, see `Binary.build_rank_index`. Changes of `binary` are detected and the index is rebuilt before the next query,
+    except writes through exported buffers (`memoryview`, numpy) - call `rebuild()` after them.
+    """
+    binary: Binary
+    def __init__(self, binary: Binary): ...
+    def rebuild(self) -> None: ...
+    def count_ones(self) -> int: ...
+    def count_zeros(self) -> int: ...
+    def rank1(self, index: int) -> int:
+        """
+        Number of ones in bits `0..index` (`index` can be equal to `len(binary)`).
+        """
+        ...
+    def rank0(self, index: int) -> int:
+        """
+        Number of zeros in bits `0..index`.
+        """
+        ...
+    def select1(self, rank: int) -> int:
+        """
+        Position of `rank`-th one (counted from 0), raises `IndexError` if there are not enough ones.
+        """
+        ...
+    def select0(self, rank: int) -> int:
+        """
+        Position of `rank`-th zero (counted from 0), raises `IndexError` if there are not enough zeros.
+        """
+        ...
+
+class RegisterFile:
+    width: int
+
+    def __init__(self, count: int, width: int, signed: bool = False):
+        """## RegisterFile
+            `count` registers of `width` bits (initialized with 0) stored in one contiguous buffer.
+            `add`, `sub` and `mov` work on register indices in place and return `arithm.Flags` of the result.
+
+            >>> regs = RegisterFile(8, 16)
+            >>> regs[1] = 0xffff
+            >>> regs[2, :8] = 1 # bits 0..8 of the register 2
+            >>> regs.add(1, 2)
+            Flags(of=true, zf=true, sf=false)
+            >>> regs.int(2)
+            1
+        """
+        ...
+    def sign_behavior(self) -> Literal['unsigned', 'signed']: ...
+    def int(self, index: int) -> int:
+        """
+        Value of register as int, faster than `regs[index].int()`.
+        """
+        ...
+    def add(self, dst: int, src: int) -> arithm.Flags:
+        """
+        `regs[dst] += regs[src]`, returns flags of the result.
+        """
+        ...
+    def sub(self, dst: int, src: int) -> arithm.Flags:
+        """
+        `regs[dst] -= regs[src]`, returns flags of the result (overflow is set the same way as in `arithm.flaged_sub`).
+        """
+        ...
+    def add_imm(self, dst: int, value: Any) -> arithm.Flags:
+        """
+        `regs[dst] += value`, `value` has to fit in the register.
+        """
+        ...
+    def sub_imm(self, dst: int, value: Any) -> arithm.Flags:
+        """
+        `regs[dst] -= value`, `value` has to fit in the register.
+        """
+        ...
+    def mov(self, dst: int, src: int) -> None:
+        """
+        `regs[dst] = regs[src]`
+        """
+        ...
+    def snapshot(self) -> bytes:
+        """
+        Copies all registers into bytes, see `restore`.
+        """
+        ...
+    def restore(self, snapshot: bytes|bytearray|memoryview) -> None:
+        """
+        Overwrites all registers with `snapshot` of register file with the same count and width.
+        """
+        ...
+
+    def __len__(self) -> int: ...
+    @overload
+    def __getitem__(self, key: int) -> Binary: ...
+    @overload
+    def __getitem__(self, key: Tuple[int, slice]) -> Binary: ...
+    @overload
+    def __setitem__(self, key: int, value: Any) -> None: ...
+    @overload
+    def __setitem__(self, key: Tuple[int, slice], value: Any) -> None: ...
+
 class BinaryIterator:
     def __iter__(self) -> BinaryIterator: ...
-    def __next__(self) -> Binary: ...
\ No newline at end of file
+    def __next__(self) -> Binary|int|bool: ...
+class BitIndexIterator:
+    def __iter__(self) -> BitIndexIterator: ...
+    def __next__(self) -> int|list[int]: ...
+class ArrayFlags:
+    """
+    Per-element flags of `BinaryArray.flaged_add`/`flaged_sub`. Each flag is unsigned `Binary` mask with one bit per element,
+    bit `i` belongs to element `i` (so string form reads from the last element). Index the mask to get `bool` of one element
+    or use `to_bools()` to get list of `bool` in element order.
+    >>> _, flags = BinaryArray([255, 0, 127], 8).flaged_add(1)
+    >>> flags.signflag
+    '100'
+    >>> flags.signflag[2], flags.signflag.to_bools()
+    (True, [False, False, True])
+    """
+    overflow: Binary
+    zeroflag: Binary
+    signflag: Binary
+
+class BinaryArray:
+    width: int
+    sb: Literal['unsigned', 'signed']
+
+    def __init__(self, values: Iterable[Any], width: int, sign_behavior: Optional[Literal["unsigned", "signed"]] = None):
+        """## BinaryArray
+            Column of binary numbers with the same `width` and `sign_behavior` stored in one contiguous buffer.
+            Every operation is applied to all elements in single call. Second operand can be another `BinaryArray`
+            of the same shape or a scalar (anything convertable to `Binary`) that is broadcasted to every element.
+            Flags are returned as `Binary` masks with one bit per element (bit `i` is flag of element `i`), not as lists of `bool`,
+            so they can be combined with bitwise operations and counted natively. `mask.to_bools()` gives list of `bool` in element order.
+
+            >>> a = BinaryArray([1, 2, 255], 8)
+            >>> a + 1
+            BinaryArray([00000010, 00000011, 00000000], width=8, sign_behavior='unsigned')
+            >>> a.overflowing_add(1)[1] # overflow of the third element
+            '100'
+            >>> (a << 4).tolist()
+            ['00010000', '00100000', '11110000']
+        """
+        ...
+    @staticmethod
+    def zeros(count: int, width: int, sign_behavior: Optional[Literal["unsigned", "signed"]] = None) -> BinaryArray: ...
+
+    def sign_behavior(self) -> Literal['unsigned', 'signed']: ...
+    def tolist(self) -> list[Binary]: ...
+
+    def overflowing_add(self, other: Any) -> Tuple[BinaryArray, Binary]: ...
+    def wrapping_add(self, other: Any) -> BinaryArray: ...
+    def flaged_add(self, other: Any) -> Tuple[BinaryArray, ArrayFlags]: ...
+    def overflowing_sub(self, other: Any) -> Tuple[BinaryArray, Binary]: ...
+    def wrapping_sub(self, other: Any) -> BinaryArray: ...
+    def flaged_sub(self, other: Any) -> Tuple[BinaryArray, ArrayFlags]: ...
+    def arithmetic_neg(self) -> BinaryArray: ...
+
+    def bitwise_and(self, other: Any) -> BinaryArray: ...
+    def bitwise_or(self, other: Any) -> BinaryArray: ...
+    def bitwise_xor(self, other: Any) -> BinaryArray: ...
+    def bitwise_nand(self, other: Any) -> BinaryArray: ...
+    def bitwise_nor(self, other: Any) -> BinaryArray: ...
+    def bitwise_xnor(self, other: Any) -> BinaryArray: ...
+    def bitwise_not(self) -> BinaryArray: ...
+
+    def wrapping_lsh(self, shift: int) -> BinaryArray: ...
+    def logical_wrapping_rsh(self, shift: int) -> BinaryArray: ...
+    def arithmetic_wrapping_rsh(self, shift: int) -> BinaryArray: ...
+
+    def cast(self, sign_behavior: Literal['unsigned', 'signed']) -> BinaryArray: ...
+    def convert(self, sign_behavior: Literal['unsigned', 'signed']) -> BinaryArray: ...
+
+    def __len__(self) -> int: ...
+    def __getitem__(self, index: int) -> Binary: ...
+    def __setitem__(self, index: int, value: Any) -> None: ...
+    def __iter__(self) -> Iterator[Binary]: ...
+    def __add__(self, other: Any) -> BinaryArray: ...
+    def __sub__(self, other: Any) -> BinaryArray: ...
+    def __and__(self, other: Any) -> BinaryArray: ...
+    def __or__(self, other: Any) -> BinaryArray: ...
+    def __xor__(self, other: Any) -> BinaryArray: ...
+    def __lshift__(self, shift: int) -> BinaryArray: ...
+    def __rshift__(self, shift: int) -> BinaryArray: ...
+    def __neg__(self) -> BinaryArray: ...
+    def __invert__(self) -> BinaryArray: ...
+
+def pack(values: Iterable[int|Binary], width: int, signed: bool = False) -> bytes:
+    """
+    ## pack
+    Packs `values` into consecutive `width` bit fields (first value takes the lowest bits of the first byte).
+    Last byte is padded with zeros. `width` must be in range 1..=64, values that do not fit raise `OverflowError`.
+    >>> pack([1, 2, 3], 4)
+    b'!\\x03'
+    """
+    ...
+def unpack(data: bytes|bytearray|memoryview|Binary, width: int, signed: bool = False) -> list[int]:
+    """
+    ## unpack
+    Inverse of `pack`. Splits `data` into `width` bit values, bits at the end that do not form full value are ignored.
+    >>> unpack(b'!\\x03', 4)
+    [1, 2, 3, 0]
+    """
+    ...
+
+class Packer:
+    """
+    Streaming version of `pack`. Bits that do not form full byte are kept until next `pack` call or `flush`.
+    >>> packer = Packer(12)
+    >>> packer.pack([1, 2, 3]) + packer.flush()
+    b'\\x01 \\x00\\x03\\x00'
+    """
+    pending: int
+    def __init__(self, width: int, signed: bool = False): ...
+    def pack(self, values: Iterable[int|Binary]) -> bytes: ...
+    def flush(self) -> bytes: ...
+
+class Unpacker:
+    """
+    Streaming version of `unpack`. Bits of incomplete value are kept between `feed` calls, so data can be fed in any chunks.
+    >>> unpacker = Unpacker(12)
+    >>> unpacker.feed(b'\\x01 ')
+    [1]
+    >>> unpacker.feed(b'\\x00\\x03\\x00')
+    [2, 3]
+    """
+    pending: int
+    def __init__(self, width: int, signed: bool = False): ...
+    def feed(self, data: bytes|bytearray|memoryview|Binary) -> list[int]: ...
+
+def set_num_threads(threads: int) -> None:
+    """
+    ## set_num_threads
+    Sets number of worker threads used by bitwise operations, `count_ones`/`count_zeros`, `hamming_distance`, `find_ones`/`find_zeros` and pattern searches on large numbers (millions of bits).
+    `0` restores the default (number of available cores), `1` disables threading. Operations on large numbers always release the GIL.
+    """
+    ...
+def get_num_threads() -> int:
+    """
+    ## get_num_threads
+    Returns number of worker threads used by large operations, see `set_num_threads`.
+    """
+    ...
+
+def format_all(values: Iterable[Any], radix: Literal['hex', 'bin'] = 'hex', prefix: bool = True) -> list[str]:
+    """
+    ## format_all
+    Formats every value as hex or bin string in one call (same as calling `hex()`/`bin()` on every `Binary`). Values that are not `Binary` are converted first.
+    >>> format_all([Binary('1010'), Binary('0xff')])
+    ['0xa', '0xff']
+    >>> format_all([Binary('1010'), 3], radix='bin', prefix=False)
+    ['1010', '11']
+    """
+    ...
+def parse_all(strings: Iterable[str], lenght: Optional[int] = None, sign_behavior: Optional[Literal["unsigned", "signed"]] = None) -> list[Binary]:
+    """
+    ## parse_all
+    Parses every string (hex or bin, same rules as `Binary` constructor) in one call. All values get the same `lenght` and `sign_behavior`.
+    >>> parse_all(['0xff', '1010'], lenght=8)
+    ['11111111', '00001010']
+    """
+    ...
+
+def dumps(values: Iterable[Any]) -> bytes:
+    """
+    ## dumps
+    Serializes values (`Binary` or anything `Binary` can be created from) into compact binary format.
+    Every value is stored as lenght in bits, sign behavior and raw little endian bytes, so lenght and sign behavior survive the round trip.
+    >>> loads(dumps([Binary('1010'), Binary('0xff', sign_behavior='signed')]))
+    ['1010', '11111111']
+    """
+    ...
+def dump(values: Iterable[Any], file: BinaryIO) -> None:
+    """
+    ## dump
+    Same as `dumps`, but writes the result into `file` opened in binary mode (with single `write` call).
+    """
+    ...
+def loads(data: bytes|bytearray|memoryview) -> list[Binary]:
+    """
+    ## loads
+    Inverse of `dumps`. Raises `ValueError` if `data` is truncated or was not created by `dumps`.
+    """
+    ...
+def load(file: BinaryIO) -> list[Binary]:
+    """
+    ## load
+    Inverse of `dump`, reads whole `file` (opened in binary mode).
+    """
+    ...
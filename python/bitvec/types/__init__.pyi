@@ -0,0 +1,50 @@
+from typing import Any, Literal
+from .. import Binary
+
+class BinaryType:
+    """
+    ## BinaryType
+    Type with fixed width and sign behavior. Calling it converts value to `Binary` of that type (like `Binary(value, lenght=width, sign_behavior=...)`),
+    but keyword arguments are not parsed on every call. Predefined types `u0`..`u8`, `u16`, `u32`, `u64`, `u128`, `u1024` and `i0`..`i1024` live in this module.
+    >>> u12 = BinaryType(12)
+    >>> u12(5)
+    '000000000101'
+    >>> i16(-1)
+    '1111111111111111'
+    """
+    width: int
+    sb: Literal['unsigned', 'signed']
+    name: str
+    def __init__(self, width: int, sign_behavior: Literal['unsigned', 'signed'] = 'unsigned'): ...
+    def sign_behavior(self) -> Literal['unsigned', 'signed']: ...
+    def __call__(self, object: Any = None) -> Binary: ...
+
+u0: BinaryType
+u1: BinaryType
+u2: BinaryType
+u3: BinaryType
+u4: BinaryType
+u5: BinaryType
+u6: BinaryType
+u7: BinaryType
+u8: BinaryType
+u16: BinaryType
+u32: BinaryType
+u64: BinaryType
+u128: BinaryType
+u1024: BinaryType
+
+i0: BinaryType
+i1: BinaryType
+i2: BinaryType
+i3: BinaryType
+i4: BinaryType
+i5: BinaryType
+i6: BinaryType
+i7: BinaryType
+i8: BinaryType
+i16: BinaryType
+i32: BinaryType
+i64: BinaryType
+i128: BinaryType
+i1024: BinaryType
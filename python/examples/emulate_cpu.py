@@ -1,5 +1,5 @@
 import numpy as np
-from bitvec import Binary
+from bitvec import Binary, RegisterFile
 from bitvec import arithm
 from bitvec.alias import u16, i16, u8, i6, u3, u4
 
@@ -8,8 +8,8 @@ class MyEmulator:
     FLAGS = 6
 
     def __init__(self):
-        # registers are 16 bit (initialized with 0)
-        self.registers = [u16() for _ in range(8)]
+        # eight 16 bit registers (initialized with 0) stored in one native buffer
+        self.registers = RegisterFile(8, 16)
         
         # memory for rom 
         self.rom = np.zeros((1024), dtype='uint16')
@@ -24,20 +24,20 @@ class MyEmulator:
         for i, instruction in enumerate(instructions):
             self.rom[i] = int(instruction)
     def set_flag(self, of: bool):
-        self.registers[self.FLAGS] = u16(1 if of else 0)
+        self.registers[self.FLAGS] = 1 if of else 0
     def execute(self):
-        instr = u16(self.rom[self.registers[self.PC].int()])
+        instr = u16(self.rom[self.registers.int(self.PC)])
         
         # 0000 000 000 000000
         # oooo r1  r2  
         
-        # slice instruction into arguments
-        opcode = instr[0:4]        # first 4 bit are opcode
-        reg1   = instr[4:7].int()  # next 3 bits are register 1
-        reg2   = instr[7:10].int() # next 3 bits are register 2
+        # slice instruction into arguments (views read bits of instr without copying)
+        opcode = instr.view(0, 4).int()  # first 4 bit are opcode
+        reg1   = instr.view(4, 7).int()  # next 3 bits are register 1
+        reg2   = instr.view(7, 10).int() # next 3 bits are register 2
 
         #print(instr)
-        #print(self.registers[self.PC].int(), opcode.hex(), [r.hex() for r in self.registers], sep='\t')
+        #print(self.registers.int(self.PC), hex(opcode), self.registers, sep='\t')
         
         if opcode == 1: 
             # take first byte as it is imm value
@@ -49,10 +49,10 @@ class MyEmulator:
             self.sub_regs(reg1, reg2)
         elif opcode == 4:
             # cast imm to signed and use it as offset
-            offset = arithm.cast(instr[10:16], 'signed').int()
+            offset = instr.view(10, 16, 'signed').int()
             self.jge(reg1, reg2, offset)
         elif opcode == 5:
-            offset = arithm.cast(instr[10:16], 'signed').int()
+            offset = instr.view(10, 16, 'signed').int()
             self.jne(reg1, reg2, offset)
         elif opcode == 6:
             self.print(reg1)
@@ -65,7 +65,7 @@ class MyEmulator:
         else:
             raise NotImplementedError # todo more commands
 
-        self.registers[self.PC] += 1
+        self.registers.add_imm(self.PC, 1)
 
         return self.should_run
     
@@ -73,33 +73,32 @@ class MyEmulator:
     # instructions 
     #########################
     def load_imm_low(self, reg: int, imm: Binary):
-        # [:8] sets only the first 8 bits of the register to imm
-        self.registers[reg][:8] = imm
+        # [reg, :8] sets only the first 8 bits of the register to imm
+        self.registers[reg, :8] = imm
     
     def mov(self, reg1, reg2):
-        # [:] ensuers that regiser size is not changed
-        self.registers[reg1][:] = self.registers[reg2]
+        self.registers.mov(reg1, reg2)
     
     def add_regs(self, reg1: int, reg2: int):
-        # overflowing add will return the result and a flag if overflow occured
-        self.registers[reg1][:], of = arithm.overflowing_add(self.registers[reg1], self.registers[reg2])
-        self.set_flag(of)
+        # add is done in place and returns flags of the result
+        flags = self.registers.add(reg1, reg2)
+        self.set_flag(flags.overflow)
     
     def sub_regs(self, reg1: int, reg2: int):
-        self.registers[reg1][:], of = arithm.overflowing_sub(self.registers[reg1], self.registers[reg2])
-        self.set_flag(of)
+        flags = self.registers.sub(reg1, reg2)
+        self.set_flag(flags.overflow)
     
     def jge(self, reg1: int, reg2: int, offset: int):
         # compare registers as unsigned values bsc we declared them as unsigned
-        if self.registers[reg1] >= self.registers[reg2]:
-            self.registers[self.PC][:] = self.registers[self.PC] + arithm.cast(i16(offset), 'unsigned')
+        if self.registers.int(reg1) >= self.registers.int(reg2):
+            self.registers.add_imm(self.PC, arithm.cast(i16(offset), 'unsigned'))
     
     def jne(self, reg1: int, reg2: int, offset: int):
-        if self.registers[reg1] != self.registers[reg2]:
-            self.registers[self.PC][:] = self.registers[self.PC] + arithm.cast(i16(offset), 'unsigned')
+        if self.registers.int(reg1) != self.registers.int(reg2):
+            self.registers.add_imm(self.PC, arithm.cast(i16(offset), 'unsigned'))
     
     def print(self, reg: int):
-        print(self.registers[reg].int())
+        print(self.registers.int(reg))
     def stop(self):
         self.should_run = False
     def nop(self):
@@ -1,3 +1,5 @@
+from itertools import islice
+
 from bitvec import Binary
 
 primes = Binary(-1, lenght=100000)
@@ -10,6 +12,10 @@ for i in range(2, int(len(primes)**0.5)+1):
 # If you need just prime count
 print(primes.count_ones())
 
-# If you need primes 
-primes = primes.find_ones() 
-print(f'Found: {len(primes)} primes, first 10 are: {primes[:10]}') 
+# If you need primes, iterate over them lazily (indexes are found block by block, no list of all primes is built)
+first = list(islice(primes.iter_ones(), 10))
+print(f'Found: {primes.count_ones()} primes, first 10 are: {first}')
+
+# or process them in chunks
+largest = max(max(chunk) for chunk in primes.iter_ones(chunk_size=1024))
+print(f'Largest prime below {len(primes)} is {largest}')
@@ -1,8 +1,8 @@
 import unittest
-from bitvec import Binary
+from bitvec import Binary, BinaryArray, SparseBinary, RankSelect, RegisterFile, Packer, Unpacker, pack, unpack, set_num_threads, get_num_threads, format_all, parse_all, dump, dumps, load, loads
 from bitvec import arithm
 from bitvec import alias
-from bitvec.alias import u0, u1, u4, i4, u7, u8, i8, i16, unsigned_bin
+from bitvec.alias import u0, u1, u4, i4, u7, u8, i8, u16, i16, unsigned_bin
 
 # python -m unittest python\tests\tests.py
 
@@ -120,6 +120,94 @@ class TestConstruct(unittest.TestCase):
         self.assertEqual(str(value), "")
         self.assertEqual(value.len, 0)
 
+    def test_from_big_int(self):
+        for value in [2**64, 2**100 + 12345, -(2**64), -(2**100) - 1, -(2**100), 2**200 - 1]:
+            binary = Binary(value)
+            self.assertEqual(binary.int(), value)
+            self.assertEqual(binary.len, value.bit_length() if value >= 0 else (value + 1).bit_length() + 1)
+            self.assertEqual(Binary(value, lenght=300).int(), value)
+        self.assertEqual(Binary(2**100, sign_behavior='signed').int(), 2**100)
+        self.assertEqual(Binary(2**100, sign_behavior='signed').len, 102)
+        with self.assertRaises(Exception):
+            Binary(2**100, lenght=64)
+        with self.assertRaises(Exception):
+            Binary(-(2**100), sign_behavior='unsigned')
+        # positive values need one more bit for the sign
+        self.assertEqual(Binary(2**63, lenght=65, sign_behavior='signed').int(), 2**63)
+        with self.assertRaises(TypeError):
+            Binary(2**63, lenght=64, sign_behavior='signed')
+        with self.assertRaises(TypeError):
+            Binary(2**100, lenght=101, sign_behavior='signed')
+
+    def test_inline_boundary(self):
+        # values up to 128 bits are stored inline, longer ones in blocks
+        for lenght in [3, 63, 64, 65, 127, 128, 129, 200]:
+            ones = Binary(-1, lenght=lenght, sign_behavior='signed')
+            self.assertEqual(ones.int(), -1)
+            self.assertEqual(ones.count_ones(), lenght)
+            self.assertEqual(Binary(5, lenght=lenght), Binary('101', lenght=lenght))
+            self.assertEqual(hash(Binary(5, lenght=lenght)), hash(Binary('101', lenght=lenght)))
+        value = Binary(2**127, lenght=128)
+        value.append(True)
+        self.assertEqual(value.int(), 2**128 + 2**127)
+        copy = Binary(value, lenght=128)
+        value[0] = True
+        self.assertEqual(copy.int(), 2**127)
+        self.assertEqual(value.int(), 2**128 + 2**127 + 1)
+
+    def test_from_iterable_large(self):
+        bits = [i % 3 == 0 for i in range(1000)]
+        value = Binary(bits)
+        self.assertEqual(value.len, 1000)
+        self.assertEqual(value.bin(prefix=False), ''.join('1' if bit else '0' for bit in bits))
+        self.assertEqual(Binary(iter(bits)), value)
+        self.assertEqual(Binary((1 for _ in range(40))), Binary('1' * 40))
+
+    def test_from_byte_items(self):
+        import array
+        self.assertEqual(Binary(array.array('B', [1, 0, 0, 5])), Binary('1001'))
+        try:
+            import numpy
+        except ImportError:
+            return
+        self.assertEqual(Binary(numpy.array([True, False, True, True])), Binary('1011'))
+        self.assertEqual(Binary(numpy.array([0, 2, 0], dtype='uint8')), Binary('010'))
+        self.assertEqual(Binary(numpy.array([True, False] * 50)), Binary([True, False] * 50))
+
+    def test_from_ints(self):
+        self.assertEqual(Binary.from_ints([2, 15], 4), Binary('1111 0010'))
+        self.assertEqual(Binary.from_ints([2, -1], 4, signed=True), Binary('1111 0010'))
+        self.assertEqual(Binary.from_ints([], 8), Binary(''))
+        import random
+        rng = random.Random(17)
+        for width in [1, 7, 32, 64, 65, 100]:
+            values = [rng.getrandbits(width) for _ in range(50)]
+            binary = Binary.from_ints(values, width)
+            self.assertEqual(binary.len, 50 * width)
+            self.assertEqual(binary.to_ints(width), values)
+            signed = [x - 2**width if x >> (width - 1) else x for x in values]
+            self.assertEqual(Binary.from_ints(signed, width, signed=True).to_ints(width, signed=True), signed)
+        with self.assertRaises(OverflowError):
+            Binary.from_ints([16], 4)
+        with self.assertRaises(ValueError):
+            Binary.from_ints([1], 0)
+
+    def test_int_conversion(self):
+        import operator
+        for width in [1, 31, 32, 33, 63, 64, 65, 100, 1000]:
+            for value in [0, 1, 2**(width - 1), 2**width - 1, (2**width - 1) // 3]:
+                self.assertEqual(Binary(value, lenght=width, sign_behavior='unsigned').int(), value)
+                signed = value - 2**width if value >> (width - 1) else value
+                self.assertEqual(Binary(value, lenght=width, sign_behavior='signed').int(), signed)
+                self.assertEqual(int(Binary(signed, lenght=width, sign_behavior='signed')), signed)
+        self.assertEqual(operator.index(Binary('0101')), 5)
+        self.assertEqual([10, 11, 12, 13][Binary('10')], 12)
+        self.assertEqual(list(range(10))[Binary('01'):Binary('11')], [1, 2])
+        self.assertEqual(bin(Binary('1011')), '0b1011')
+        # copy keeps lenght even though `Binary` can be used as int
+        self.assertEqual(Binary(Binary('0000 0001')).len, 8)
+        self.assertEqual(Binary(Binary('1111', sign_behavior='signed')).int(), -1)
+
     def test_rises(self):
         with self.assertRaises(Exception):
             Binary(0, byte_lenght=2, lenght=1)
@@ -183,6 +271,29 @@ class TestConversions(unittest.TestCase):
         value = Binary(-1, byte_lenght=2)
         self.assertEqual(value.int(), -1)
 
+    def test_to_ints(self):
+        import random
+        rng = random.Random(10)
+        value = rng.getrandbits(1000)
+        binary = Binary(value, lenght=1000)
+        for width in [1, 7, 8, 32, 63, 64, 65, 100]:
+            expected = [(value >> i) & (2**width - 1) for i in range(0, 1000, width)]
+            self.assertEqual(binary.to_ints(width), expected)
+            self.assertEqual(list(binary.iter(width, as_int=True)), expected)
+            self.assertEqual([x.int() for x in binary.iter(width)], expected)
+            signed = [x - 2**width if x >> (width - 1) else x for x in expected]
+            self.assertEqual(binary.to_ints(width, signed=True), signed)
+        self.assertEqual(Binary("000 0000 0101").to_ints(8), [5, 0])
+        self.assertEqual(list(Binary("000 0000 0101").bytes(extend=False, as_int=True)), [5, 0])
+        self.assertEqual(Binary(-1, lenght=12).to_ints(8), [255, 255])
+        with self.assertRaises(ValueError): Binary(5).to_ints(0)
+
+    def test_to_bools(self):
+        self.assertEqual(Binary("0110").to_bools(), [False, True, True, False])
+        self.assertEqual(list(Binary("0110").bits(as_bool=True)), [False, True, True, False])
+        self.assertEqual(Binary("").to_bools(), [])
+        self.assertEqual(Binary(2**40, lenght=41).to_bools(), [False] * 40 + [True])
+
     def test_as_hex(self):
         self.assertEqual(Binary(0).hex(), "0x")
         self.assertEqual(Binary(1).hex(), "0x1")
@@ -192,6 +303,36 @@ class TestConversions(unittest.TestCase):
         self.assertEqual(Binary(2**64 - 1).hex(), "0xffffffffffffffff")
         self.assertEqual(Binary(2**65).hex(), '0x20000000000000000')
 
+    def test_hex_roundtrip(self):
+        self.assertEqual(Binary(0x123456789abcdef0).hex(), "0x123456789abcdef0")
+        self.assertEqual(Binary('0x123456789ABCDEF0fedcba98').hex(prefix=False), "123456789abcdef0fedcba98")
+        self.assertEqual(Binary('0b1 0010 0011').bin(), "0b100100011")
+        import random
+        rng = random.Random(3)
+        for size in [1, 7, 31, 32, 33, 100, 1000]:
+            value = rng.getrandbits(size)
+            binary = Binary(value, lenght=size)
+            self.assertEqual(binary.hex(), '0x' + format(value, 'x').zfill((size + 3) // 4))
+            self.assertEqual(binary.bin(), '0b' + format(value, 'b').zfill(size))
+            self.assertEqual(Binary(binary.hex(), lenght=size), binary)
+            self.assertEqual(Binary(binary.bin()), binary)
+        with self.assertRaises(ValueError):
+            Binary('0b102')
+        with self.assertRaises(ValueError):
+            Binary('0xfg')
+
+    def test_bulk_strings(self):
+        values = [Binary('1010'), Binary('0xff'), Binary(0)]
+        self.assertEqual(format_all(values), ['0xa', '0xff', '0x'])
+        self.assertEqual(format_all(values, radix='bin', prefix=False), ['1010', '11111111', ''])
+        self.assertEqual(format_all([3]), ['0x3'])
+        self.assertEqual(parse_all(['0xff', '1010'], lenght=8), [Binary('11111111'), Binary('00001010')])
+        self.assertEqual(parse_all(format_all(values)), [Binary('1010'), Binary('0xff'), Binary('')])
+        with self.assertRaises(ValueError):
+            format_all(values, radix='oct')
+        with self.assertRaises(TypeError):
+            parse_all([1])
+
     def test_as_hex_sized(self):
         value = Binary(0, byte_lenght=2)
         self.assertEqual(value.hex(), "0x0000")
@@ -350,6 +491,30 @@ class TestAssigns(unittest.TestCase):
         x, y = gen()
         x[::3] = y    #            1--0--1
         self.assertEqual(str(x), "11000011")
+    def test_slice_step_large(self):
+        import random
+        rng = random.Random(18)
+        value = rng.getrandbits(1000)
+        bits = [bool(value >> i & 1) for i in range(1000)]
+        def from_bits(bits):
+            return sum(bit << i for i, bit in enumerate(bits))
+
+        for step in [1, 2, 3, 7, 31, 32, 33, 100]:
+            for start in [0, 1, 5, 31, 32, 63, 500]:
+                x = Binary(value, lenght=1000, sign_behavior='unsigned')
+                self.assertEqual(x[start::step].int(), from_bits(bits[start::step]))
+                self.assertEqual(x[start:900:-step].int(), from_bits(bits[start:900][::-step]))
+
+                expected = bits.copy()
+                expected[start::step] = [False] * len(expected[start::step])
+                x[start::step] = False
+                self.assertEqual(x.int(), from_bits(expected))
+
+                part = [bool(rng.getrandbits(1)) for _ in bits[start::step]]
+                expected[start::step] = part
+                x[start::step] = Binary(from_bits(part), lenght=len(bits[start:]), sign_behavior='unsigned')
+                self.assertEqual(x.int(), from_bits(expected))
+
     def test_split(self):
         self.assertEqual(u8('0000 1101').split_at(4), (u4('1101'), u4('0000')))
         self.assertEqual(u0('').split_at(0), (u0(''), u0('')))
@@ -422,11 +587,57 @@ class TestCompare(unittest.TestCase):
                 self.assertEqual(xx>=y, x>=y)
                 self.assertEqual(xx<y, x<y)
                 self.assertEqual(xx<=y, x<=y)
+    def test_mixed_cmps(self):
+        TESTDATA = [(0, 4, 'unsigned'), (15, 5, 'unsigned'), (-8, 4, 'signed'), (-1, 4, 'signed'), (7, 4, 'signed'),
+                    (255, 8, 'unsigned'), (-128, 8, 'signed'), (2**40, 48, 'unsigned'), (-2**40, 48, 'signed'),
+                    (2**100, 101, 'unsigned'), (-2**100-5, 102, 'signed'), (2**64-1, 64, 'unsigned'), (-2**63, 64, 'signed')]
+        for x, x_size, x_sign in TESTDATA:
+            for y, y_size, y_sign in TESTDATA:
+                xx = Binary(x, lenght=x_size, sign_behavior=x_sign)
+                yy = Binary(y, lenght=y_size, sign_behavior=y_sign)
+
+                self.assertEqual(xx<yy, x<y, f'{xx}<{yy}')
+                self.assertEqual(xx>yy, x>y, f'{xx}>{yy}')
+                self.assertEqual(xx<=yy, x<=y or (x==y and x_size==y_size), f'{xx}<={yy}')
+
+                if y >= 0 or x_sign == 'signed':
+                    self.assertEqual(xx<y, x<y, f'{xx}<{y}')
+                    self.assertEqual(xx>y, x>y, f'{xx}>{y}')
+                    self.assertEqual(xx==y, x==y, f'{xx}=={y}')
+    def test_int_cmps_follow_conversion(self):
+        # ints are compared as if converted to binary of the same lenght and sign behavior (or of minimal lenght if value does not fit)
+        def converted(x, value):
+            try:
+                return Binary(value, lenght=len(x), sign_behavior=x.sign_behavior())
+            except Exception:
+                return Binary(value, sign_behavior=x.sign_behavior())
+        BINARIES = [u0(), u4(15), u4(0), i4(-1), i4(7), i4(-8), u8(128), i8(-128), Binary(2**64 - 1, lenght=64),
+                    Binary(-2**63, lenght=64, sign_behavior='signed'), Binary(5, lenght=70, sign_behavior='signed')]
+        VALUES = [0, 1, -1, 7, 8, -8, -9, 15, 16, 127, 128, -128, 255, 2**63 - 1, 2**63, 2**64 - 1, -2**63]
+        for x in BINARIES:
+            for value in VALUES:
+                if value < 0 and x.sign_behavior() == 'unsigned':
+                    continue
+                other = converted(x, value)
+                self.assertEqual((x == value, x != value), (x == other, x != other), f'{x!r} == {value}')
+                self.assertEqual((x < value, x <= value, x > value, x >= value), (x < other, x <= other, x > other, x >= other), f'{x!r} < {value}')
+        self.assertFalse(i4(-1) == 15) # 15 needs 5 bits as signed number
+        self.assertTrue(i4(-1) == -1)
+        self.assertTrue(u4(15) == 15)
+    def test_sorted(self):
+        values = [5, -3, 100, 0, -128, 127, 2**70, -2**70]
+        self.assertEqual([x.int() for x in sorted(Binary(x, lenght=72, sign_behavior='signed') for x in values)], sorted(values))
 
 class BinaryFunctions(unittest.TestCase):
     def test_sign_behavior(self):
         self.assertEqual(u4('0000').sign_behavior(), 'unsigned')
         self.assertEqual(i4('0000').sign_behavior(), 'signed')
+        self.assertEqual(Binary(5, lenght=8, sign_behavior='signed').sign_behavior(), 'signed')
+        self.assertEqual(arithm.cast(u4('0101'), 'signed').sign_behavior(), 'signed')
+        with self.assertRaises(ValueError):
+            Binary(5, lenght=8, sign_behavior='unsinged')
+        with self.assertRaises(ValueError):
+            arithm.cast(u4('0101'), 'float')
     def test_sign_extending_bit(self):
         self.assertEqual(u4('0000').sign_extending_bit(), False)
         self.assertEqual(u4('1000').sign_extending_bit(), False)
@@ -566,11 +777,73 @@ class Operations(unittest.TestCase):
                 for funct, funct_name in TEST_FUNCTS:
                     self.assertEqual(arithm.bitwise_map(ii, jj, map=funct), funct_name(ii, jj), msg='{}({},{})'.format(funct_name.__name__, ii, jj))
 
+    def test_bitwise_map_compiled(self):
+        xor = arithm.BitwiseMap(2, '0110')
+        self.assertEqual(xor.inputs, 2)
+        self.assertEqual(xor(u4('1100'), u4('1010')), arithm.bitwise_map(u4('1100'), u4('1010'), map='0110'))
+        self.assertEqual(xor('1100', '10'), u4('1110'))
+        out = Binary('0000')
+        xor(u4('1100'), u4('1010'), out=out)
+        self.assertEqual(out, u4('0110'))
+        with self.assertRaises(ValueError):
+            xor(u4('1100'))
+
+        import random
+        rng = random.Random(5)
+        for inputs in [1, 3, 6]:
+            table = rng.getrandbits(2**inputs)
+            gate = arithm.BitwiseMap(inputs, Binary(table, lenght=2**inputs))
+            args = [rng.getrandbits(100) for _ in range(inputs)]
+            expected = sum(((table >> sum(((arg >> bit) & 1) << i for i, arg in enumerate(args))) & 1) << bit for bit in range(100))
+            self.assertEqual(gate(*[Binary(arg, lenght=100) for arg in args]).int(), expected)
+
+    def test_bitwise_map_zero_extends(self):
+        # shorter operands are padded with zeros regardless of their sign behavior
+        self.assertEqual(arithm.bitwise_map(u8('0000 0000'), i4('1010'), map='0110'), u8('0000 1010'))
+        self.assertEqual(arithm.bitwise_map(u8('0000 0000'), u4('1010'), map='0110'), u8('0000 1010'))
+        self.assertEqual(arithm.BitwiseMap(2, '1110')(i4('1000'), u8('0000 0001')), u8('0000 1001'))
+
+    def test_bitwise_map_many_inputs(self):
+        gate = arithm.BitwiseMap(40, {2**40 - 1: True})
+        ones = Binary('1' * 70)
+        args = [ones] * 39 + [Binary('01' * 35)]
+        self.assertEqual(gate(*args), Binary('01' * 35))
+        self.assertEqual(arithm.bitwise_map(*args, map={2**40 - 1: True}), Binary('01' * 35))
+        self.assertLessEqual(gate.size, 40)
+
     def test_mul_u4(self):
         self.assertEqual(arithm.multiply(u4('0001'), u4('0001')), u8('0000 0001'))
         self.assertEqual(arithm.multiply(u4('0010'), u4('0010')), u8('0000 0100'))
         self.assertEqual(arithm.multiply(u4('1111'), u4('0010')), u8('0001 1110'))
 
+    def test_mul_wide(self):
+        import random
+        rng = random.Random(0)
+
+        # covers schoolbook and karatsuba paths, unbalanced operands and mixed sign behavior
+        for size_a, size_b in [(7, 13), (64, 64), (100, 37), (1500, 1500), (3000, 1100), (5000, 70)]:
+            for sign_a, sign_b in [('unsigned', 'unsigned'), ('signed', 'unsigned'), ('unsigned', 'signed'), ('signed', 'signed')]:
+                a = rng.getrandbits(size_a) - (2**(size_a-1) if sign_a == 'signed' else 0)
+                b = rng.getrandbits(size_b) - (2**(size_b-1) if sign_b == 'signed' else 0)
+                aa = Binary(a, lenght=size_a, sign_behavior=sign_a)
+                bb = Binary(b, lenght=size_b, sign_behavior=sign_b)
+
+                result = arithm.multiply(aa, bb)
+                self.assertEqual(result.int(), a*b)
+                self.assertEqual(len(result), size_a+size_b)
+
+                low, high = arithm.overflowing_mul(aa, bb)
+                product = (a*b) % 2**(size_a+size_b)
+                self.assertEqual(low.int(), product % 2**size_a)
+                self.assertEqual(high.int(), product >> size_a)
+                self.assertEqual(arithm.wrapping_mul(aa, bb), low)
+
+    def test_wrapping_mul(self):
+        self.assertEqual(arithm.wrapping_mul(u8(16), u8(17)), u8(16))
+        self.assertEqual(arithm.wrapping_mul(i8(-1), i8(-1)), u8(1))
+        self.assertEqual(arithm.overflowing_mul(u8(255), u8(255)), (u8(1), u8(254)))
+        self.assertEqual(arithm.overflowing_mul(i8(-2), u4(3)), (u8(250), u4(15)))
+
 
     def test_hamming_distance(self):
         self.assertEqual(arithm.hamming_distance(u4('0000'), u4('0000')), 0)
@@ -584,6 +857,66 @@ class Operations(unittest.TestCase):
         # very long numbers
         self.assertEqual(arithm.hamming_distance(Binary('0'*1024), Binary('1'*1024)), 1024)
 
+    def test_shifts(self):
+        self.assertEqual(arithm.overflowing_lsh(u8('0100 1010'), 2), (u8('0010 1000'), Binary('01')))
+        self.assertEqual(arithm.logical_underflowing_rsh(u8('0100 1010'), 2), (u8('0001 0010'), Binary('10')))
+        self.assertEqual(arithm.arithmetic_underflowing_rsh(i8('1100 1010'), 2), (u8('1111 0010'), Binary('10')))
+        self.assertEqual(arithm.overflowing_lsh(u4('1011'), 6), (u4('0000'), Binary('101100')))
+        self.assertEqual(arithm.arithmetic_underflowing_rsh(i4('1011'), 6), (u4('1111'), Binary('111011')))
+
+    def test_shifts_wide(self):
+        import random
+        rng = random.Random(0)
+
+        for size in [31, 32, 33, 100, 1100]:
+            mask = 2**size - 1
+            value = rng.getrandbits(size)
+            signed = value - 2**size if value >> (size-1) else value
+            a, s = Binary(value, lenght=size), Binary(signed, lenght=size, sign_behavior='signed')
+
+            for shift in sorted({0, 1, 5, 31, 32, 33, size//2, size-1, size}):
+                result, carry = arithm.overflowing_lsh(a, shift)
+                self.assertEqual(result.int(), (value << shift) & mask)
+                self.assertEqual(carry.int(), value >> (size - shift))
+                self.assertEqual(len(carry), shift)
+                self.assertEqual(arithm.wrapping_lsh(a, shift), result)
+
+                result, carry = arithm.logical_underflowing_rsh(s, shift)
+                self.assertEqual(result.int(), (signed & mask) >> shift)
+                self.assertEqual(carry.int(), value & (2**shift - 1))
+                self.assertEqual(arithm.logical_wrapping_rsh(s, shift), result)
+
+                result, carry = arithm.arithmetic_underflowing_rsh(s, shift)
+                self.assertEqual(result.int(), (signed >> shift) & mask)
+                self.assertEqual(arithm.arithmetic_wrapping_rsh(s, shift), result)
+
+    def test_rotate(self):
+        self.assertEqual(arithm.rotate_left(u8('1000 0110'), 1), u8('0000 1101'))
+        self.assertEqual(arithm.rotate_right(u8('1000 0110'), 1), u8('0100 0011'))
+        self.assertEqual(arithm.rotate_left(u8('1000 0110'), 9), u8('0000 1101'))
+        self.assertEqual(arithm.rotate_right(u8('1000 0110'), 8), u8('1000 0110'))
+        self.assertEqual(arithm.rotate_left(u0(0), 3), u0(0))
+
+        value = 2**1023 + 2**700 + 5
+        for shift in [0, 1, 31, 32, 100, 1023, 1024, 2000]:
+            expected = ((value << (shift % 1024)) | (value >> (1024 - shift % 1024))) & (2**1024 - 1)
+            self.assertEqual(arithm.rotate_left(Binary(value, lenght=1024), shift).int(), expected)
+            self.assertEqual(arithm.rotate_right(Binary(expected, lenght=1024), shift).int(), value)
+
+    def test_funnel_shifts(self):
+        self.assertEqual(arithm.funnel_lsh(u4('1010'), u4('0110'), 2), u4('1001'))
+        self.assertEqual(arithm.funnel_rsh(u4('1010'), u4('0110'), 2), u4('1010'))
+        self.assertEqual(arithm.funnel_lsh(u4('1010'), u4('0110'), 0), u4('1010'))
+        self.assertEqual(arithm.funnel_lsh(u4('1010'), u4('0110'), 4), u4('0110'))
+        self.assertEqual(arithm.funnel_rsh(u4('1010'), u4('0110'), 4), u4('0110'))
+        self.assertEqual(arithm.funnel_lsh(u8('0000 0001'), u4('1100'), 3), u8('0000 1110'))
+
+        # wide values behave like high/low half of a shifted concatenation
+        a, b = 2**900 + 12345, 2**1000 - 3
+        for shift in [0, 1, 32, 77, 1000]:
+            self.assertEqual(arithm.funnel_lsh(Binary(a, lenght=1000), Binary(b, lenght=1000), shift).int(), (((a << 1000 | b) << shift) >> 1000) & (2**1000 - 1))
+            self.assertEqual(arithm.funnel_rsh(Binary(a, lenght=1000), Binary(b, lenght=1000), shift).int(), ((b << 1000 | a) >> shift) & (2**1000 - 1))
+
 class Utils(unittest.TestCase):
     def test_find(self):
         self.assertEqual(u8('0000 0010').find('1'), 1)
@@ -602,7 +935,43 @@ class Utils(unittest.TestCase):
     def test_find_all(self):
         self.assertEqual(u8('01 01 01 01').find_all('01'), [0,2,4,6])
         self.assertEqual(u8('0101 0101').find_all('0'), [1,3,5,7])
-    
+    def test_find_range(self):
+        self.assertEqual(u8('01 01 01 01').find_all('01', 1), [2,4,6])
+        self.assertEqual(u8('01 01 01 01').find_all('01', 0, 5), [0,2])
+        self.assertEqual(u8('01 01 01 01').find('01', -4), 4)
+        self.assertEqual(u8('01 01 01 01').find('01', 7), None)
+        self.assertEqual(u8('0000 0010').find(False, 1), 2)
+    def test_count(self):
+        self.assertEqual(u8('01 01 01 01').count('01'), 4)
+        self.assertEqual(u8('0101 0101').count('1', 0, 4), 2)
+        self.assertEqual(u8('1111 1111').count('11'), 7)
+        with self.assertRaises(Exception): u8('0000 0010').count('')
+    def test_find_wide(self):
+        import random
+        rng = random.Random(8)
+        for alphabet in ['01', '0001']:
+            text = ''.join(rng.choice(alphabet) for _ in range(3000))
+            bits = text[::-1]
+            binary = Binary(text)
+            for size in [1, 2, 31, 32, 33, 63, 64, 65, 100, 150]:
+                at = rng.randrange(0, len(bits) - size)
+                sub = bits[at:at + size]
+                expected = [i for i in range(len(bits) - size + 1) if bits[i:i + size] == sub]
+                self.assertEqual(binary.find_all(sub[::-1]), expected)
+                self.assertEqual(binary.count(sub[::-1]), len(expected))
+                self.assertEqual(binary.find(sub[::-1], at), at)
+    def test_find_periodic(self):
+        # long periodic patterns overlap with themselves, matches are found by shifting with the failure function
+        for period in ['01', '001', '0110']:
+            text = period * 700 + '1' + period * 300
+            binary = Binary(text)
+            for size in [65, 200, 1000]:
+                sub = (period * size)[:size]
+                bits = text[::-1]
+                expected = [i for i in range(len(bits) - size + 1) if bits[i:i + size] == sub[::-1]]
+                self.assertEqual(binary.find_all(sub), expected)
+                self.assertEqual(binary.count(sub, 100, 2000), len([i for i in expected if 100 <= i and i + size <= 2000]))
+
     def test_find_zeros(self):
         self.assertEqual(u8('0101 0101').find_zeros(), [1,3,5,7])
         self.assertEqual(u8('1111 1111').find_zeros(), [])
@@ -633,7 +1002,26 @@ class Utils(unittest.TestCase):
         self.assertEqual(u1(1).find_ones(), [0])
         self.assertEqual(u1(0).find_ones(), [])
         self.assertEqual(i1(-1).find_ones(), [0])
-    
+    def test_iter_ones(self):
+        import random
+        rng = random.Random(9)
+        for size in [0, 1, 31, 32, 33, 100, 1000]:
+            text = ''.join(rng.choice('0001') for _ in range(size))
+            binary = Binary(text, lenght=size)
+            ones = [i for i, bit in enumerate(reversed(text)) if bit == '1']
+            zeros = [i for i, bit in enumerate(reversed(text)) if bit == '0']
+            self.assertEqual(binary.find_ones(), ones)
+            self.assertEqual(binary.find_zeros(), zeros)
+            self.assertEqual(list(binary.iter_ones()), ones)
+            self.assertEqual(list(binary.iter_zeros()), zeros)
+            self.assertEqual(sum(binary.iter_ones(chunk_size=7), []), ones)
+            self.assertTrue(all(len(chunk) <= 7 for chunk in binary.iter_zeros(chunk_size=7)))
+            self.assertEqual(binary.leading_zeros(), size - 1 - ones[-1] if ones else size)
+            self.assertEqual(binary.leading_ones(), size - 1 - zeros[-1] if zeros else size)
+            self.assertEqual(binary.trailing_ones(), zeros[0] if zeros else size)
+        with self.assertRaises(ValueError): u8(0).iter_ones(chunk_size=0)
+
+
     def test_count_zeros(self):
         self.assertEqual(u8('0101 0101').count_zeros(), 4)
         self.assertEqual(u8('1111 1111').count_zeros(), 0)
@@ -731,3 +1119,585 @@ class TestConcat(unittest.TestCase):
         self.assertEqual(u0().join([]), Binary(""))
         self.assertEqual(Binary('1').join([]), Binary(""))
         self.assertEqual(Binary('1').join(["0"]), Binary("0"))
+
+class TestInplace(unittest.TestCase):
+    def test_inplace_keeps_object(self):
+        a = u8(250)
+        b = a
+        a += 10
+        self.assertIs(a, b)
+        self.assertEqual(a, u8(4))
+        a -= 5
+        self.assertEqual(a, u8(255))
+        a &= u8('0000 1111')
+        self.assertEqual(a, u8('0000 1111'))
+        a <<= 2
+        self.assertEqual(a, u8('0011 1100'))
+        a >>= 3
+        self.assertEqual(a, u8('0000 0111'))
+        self.assertIs(a, b)
+
+    def test_inplace_matches_operators(self):
+        import operator, random
+        rng = random.Random(0)
+        OPS = [(operator.add, operator.iadd), (operator.sub, operator.isub), (operator.and_, operator.iand),
+               (operator.or_, operator.ior), (operator.xor, operator.ixor), (operator.lshift, operator.ilshift), (operator.rshift, operator.irshift)]
+
+        def random_binary(size, sign):
+            return arithm.cast(Binary(rng.getrandbits(size), lenght=size), sign)
+
+        for size in [4, 32, 33, 100, 1100]:
+            for sign in ['unsigned', 'signed']:
+                for op, iop in OPS:
+                    for _ in range(3):
+                        x = random_binary(size, sign)
+                        if op in (operator.lshift, operator.rshift):
+                            operands = [0, 1, 3, size-1]
+                        else:
+                            operands = [random_binary(size, sign), 3, x]
+
+                        for y in operands:
+                            expected = op(x, y)
+                            result = arithm.cast(x, sign)
+                            result = iop(result, result if y is x else y)
+
+                            self.assertEqual(result, expected, f'{op.__name__}({x}, {y})')
+                            self.assertEqual(result.sign_behavior(), expected.sign_behavior())
+
+    def test_inplace_mixed_sizes(self):
+        a = u8(0b1111_0000)
+        a &= u4('1100')
+        self.assertEqual(a, u8('0000 0000'))
+        a = u4('1010')
+        a |= u8('1000 0000')
+        self.assertEqual(a, u8('1000 1010'))
+        a = u8(1)
+        a += u4(2)
+        self.assertEqual(a, u8(3))
+
+    def test_out(self):
+        r = u8(0)
+        result = arithm.wrapping_add(u8(3), u8(4), out=r)
+        self.assertIs(result, r)
+        self.assertEqual(r, u8(7))
+
+        a = u8(3)
+        self.assertIs(arithm.wrapping_add(a, a, out=a), a)
+        self.assertEqual(a, u8(6))
+
+        result, of = arithm.overflowing_add(a, 250, out=a)
+        self.assertIs(result, a)
+        self.assertEqual((a, of), (u8(0), True))
+
+        self.assertEqual(arithm.wrapping_sub(a, 1, out=a), u8(255))
+        self.assertEqual(arithm.bitwise_xor(a, u8('0000 1111'), out=a), u8('1111 0000'))
+        self.assertEqual(arithm.wrapping_lsh(a, 1, out=a), u8('1110 0000'))
+        self.assertEqual(arithm.rotate_left(a, 4, out=a), u8('0000 1110'))
+        self.assertEqual(arithm.bitwise_not(a, out=a), u8('1111 0001'))
+        self.assertEqual(arithm.wrapping_mul(a, u8(2), out=a), u8('1110 0010'))
+
+        # out can have different size
+        r = u4(0)
+        arithm.multiply(u8(255), u8(255), out=r)
+        self.assertEqual(r, Binary(255*255, lenght=16))
+
+    def test_inplace_exported(self):
+        a = u16(1)
+        view = memoryview(a)
+        a += 1
+        self.assertEqual(view[0], 2)
+        arithm.wrapping_add(a, 1, out=a)
+        self.assertEqual(view[0], 3)
+        with self.assertRaises(BufferError):
+            arithm.multiply(a, a, out=a)
+        view.release()
+
+class TestBinaryArray(unittest.TestCase):
+    def test_construct(self):
+        a = BinaryArray([1, 2, 255], 8)
+        self.assertEqual(len(a), 3)
+        self.assertEqual(a.width, 8)
+        self.assertEqual(a[0], u8(1))
+        self.assertEqual(a[-1], u8(255))
+        self.assertEqual(a.tolist(), [u8(1), u8(2), u8(255)])
+        with self.assertRaises(Exception):
+            BinaryArray([256], 8)
+    def test_add_sub(self):
+        VALUES = [0, 1, 2, 127, 128, 255]
+        a = BinaryArray(VALUES, 8)
+        for y in VALUES:
+            total, overflow = a.overflowing_add(y)
+            for i, x in enumerate(VALUES):
+                self.assertEqual((total[i], overflow[i]), arithm.overflowing_add(u8(x), u8(y)))
+            diff, overflow = a.overflowing_sub(u8(y))
+            for i, x in enumerate(VALUES):
+                self.assertEqual((diff[i], overflow[i]), arithm.overflowing_sub(u8(x), u8(y)))
+    def test_wide(self):
+        VALUES = [0, 1, 2**64 - 1, 2**64, 2**70 + 5]
+        a = BinaryArray(VALUES, 72)
+        b = BinaryArray(list(reversed(VALUES)), 72)
+        self.assertEqual((a + b).tolist(), [Binary(x, lenght=72) + Binary(y, lenght=72) for x, y in zip(VALUES, reversed(VALUES))])
+        self.assertEqual((a ^ b).tolist(), [Binary(x ^ y, lenght=72) for x, y in zip(VALUES, reversed(VALUES))])
+    def test_flags(self):
+        _, flags = BinaryArray([255, 0, 127], 8).flaged_add(1)
+        self.assertEqual(flags.overflow, Binary('001'))
+        self.assertEqual(flags.zeroflag, Binary('001'))
+        self.assertEqual(flags.signflag, Binary('100'))
+        self.assertEqual(flags.signflag.to_bools(), [False, False, True])
+        self.assertEqual([flags.overflow[i] for i in range(3)], [True, False, False])
+    def test_bitwise(self):
+        a = BinaryArray(range(16), 4)
+        for b in range(16):
+            self.assertEqual([x.int() for x in (a & b)], [x & b for x in range(16)])
+            self.assertEqual([x.int() for x in (a | b)], [x | b for x in range(16)])
+            self.assertEqual([x.int() for x in a.bitwise_nor(b)], [(x | b) ^ 0xf for x in range(16)])
+        self.assertEqual([x.int() for x in ~a], [x ^ 0xf for x in range(16)])
+    def test_shifts(self):
+        a = BinaryArray([-128, -1, 1, 64], 8, 'signed')
+        for shift in range(10):
+            self.assertEqual((a << shift).tolist(), [arithm.wrapping_lsh(x, shift) for x in a])
+            self.assertEqual((a >> shift).tolist(), [arithm.arithmetic_wrapping_rsh(x, shift) for x in a])
+            self.assertEqual(a.logical_wrapping_rsh(shift).tolist(), [arithm.logical_wrapping_rsh(x, shift) for x in a])
+    def test_convert(self):
+        a = BinaryArray([1, 255], 8)
+        self.assertEqual([x.int() for x in a.cast('signed')], [1, -1])
+        with self.assertRaises(OverflowError):
+            a.convert('signed')
+        self.assertEqual(BinaryArray([1, 2], 8).convert('signed').sign_behavior(), 'signed')
+
+class TestBuffer(unittest.TestCase):
+    def test_raw_bytes(self):
+        self.assertEqual(u4(5).raw_bytes, b'\x05')
+        self.assertEqual(i4(-1).raw_bytes, b'\xff')
+        self.assertEqual(u16(0x0201).raw_bytes, b'\x01\x02')
+        self.assertEqual(Binary(2**40 + 1).raw_bytes, b'\x01\x00\x00\x00\x00\x01')
+    def test_memoryview(self):
+        value = u16(0x0201)
+        view = memoryview(value)
+        self.assertEqual(view.nbytes, 2)
+        self.assertEqual(bytes(view), b'\x01\x02')
+        self.assertEqual(bytes(memoryview(Binary('1 00000001'))), b'\x01\x01')
+    def test_memoryview_write(self):
+        value = u16(0)
+        view = memoryview(value)
+        view[1] = 0xff
+        self.assertEqual(value, u16(0xff00))
+    def test_resize_while_exported(self):
+        value = u16(0)
+        view = memoryview(value)
+        with self.assertRaises(BufferError):
+            value.append(True)
+        view.release()
+        value.append(True)
+        self.assertEqual(len(value), 17)
+    def test_from_buffers(self):
+        import array
+        self.assertEqual(Binary(bytearray(b'\x01\x02')), Binary(b'\x01\x02'))
+        self.assertEqual(Binary(memoryview(b'\x01\x02\x03\x04\x05')), Binary(b'\x01\x02\x03\x04\x05'))
+        self.assertEqual(Binary(memoryview(array.array('H', [1, 2]))), Binary(b'\x01\x00\x02\x00'))
+        self.assertEqual(Binary(bytearray(b'\x0f'), lenght=4), u4(15))
+        self.assertEqual(len(Binary(bytearray())), 0)
+
+class TestTypes(unittest.TestCase):
+    def test_predefined(self):
+        from bitvec import types
+        self.assertEqual(types.u16(5), Binary(5, lenght=16, sign_behavior='unsigned'))
+        self.assertEqual(types.i8(-1), Binary(-1, lenght=8, sign_behavior='signed'))
+        self.assertEqual(types.i8(-1).sign_behavior(), 'signed')
+        self.assertEqual(types.u8().len, 8)
+        self.assertEqual(types.u8().int(), 0)
+        self.assertEqual(types.u1024(2**1000).int(), 2**1000)
+        self.assertEqual(types.u8("1010"), u8(10))
+        self.assertEqual(types.u16(types.u8(255)), u16(255))
+        self.assertEqual((types.u16.width, types.u16.sb, types.i64.name), (16, 'unsigned', 'i64'))
+        self.assertIs(alias.u16, types.u16)
+        with self.assertRaises(Exception):
+            types.u4(16)
+    def test_custom(self):
+        from bitvec import types
+        u12 = types.BinaryType(12)
+        self.assertEqual(u12(5), Binary(5, lenght=12))
+        self.assertEqual(u12.name, 'u12')
+        i3 = types.BinaryType(3, 'signed')
+        self.assertEqual(i3(-4).int(), -4)
+        with self.assertRaises(ValueError):
+            types.BinaryType(3, 'other')
+
+class TestViews(unittest.TestCase):
+    def test_read(self):
+        instr = Binary("0110 010 001 000011")
+        self.assertEqual(instr.view(0, 6).int(), 3)
+        self.assertEqual(instr.view(6, 9).int(), 1)
+        self.assertEqual(instr.view(12).int(), 6)
+        self.assertEqual(instr.view(-4, -2).int(), 2)
+        self.assertEqual(instr.view(12, 15, 'signed').int(), -2)
+        self.assertEqual(len(instr.view(4, 10)), 6)
+        self.assertTrue(instr.view(0, 6) == 3)
+        self.assertEqual(instr.view(0, 6).binary(), unsigned_bin('000011'))
+        self.assertEqual(str(instr.view(12)), '0110')
+        self.assertEqual([10, 11, 12, 13][instr.view(0, 2)], 13)
+        self.assertEqual(instr.view(0, 4)[0], True)
+        self.assertEqual(instr.view(0, 4)[3], False)
+        with self.assertRaises(IndexError):
+            instr.view(0, 17)
+        with self.assertRaises(IndexError):
+            instr.view(0, 4)[4]
+    def test_wide(self):
+        value = Binary(2**100 + 2**60 + 5, lenght=128)
+        self.assertEqual(value.view(60, 101).int(), 2**40 + 1)
+        self.assertEqual(value.view(0, 128).binary(), value)
+    def test_compare_wide_int(self):
+        instr = Binary("0110 010 001 000011")
+        self.assertFalse(instr.view(0, 6) == 2**200)
+        self.assertTrue(instr.view(0, 6) != 2**200)
+        self.assertTrue(instr.view(0, 6) < 2**200)
+        self.assertTrue(instr.view(12, 15, 'signed') > -2**200)
+        self.assertEqual(instr.view(0, 6) < 2**200, instr.view(0, 6).binary() < 2**200)
+    def test_write(self):
+        instr = Binary("0110 010 001 000011")
+        instr.view(6, 9).set(7)
+        self.assertEqual(instr, Binary("0110 010 111 000011"))
+        field = instr.view(0, 6)
+        field[5] = True
+        self.assertEqual(instr, Binary("0110 010 111 100011"))
+        field[0:2] = "10"
+        self.assertEqual(instr, Binary("0110 010 111 100010"))
+        with self.assertRaises(Exception):
+            instr.view(0, 3).set(8)
+    def test_as_argument(self):
+        value = u16(0x1234)
+        self.assertEqual(Binary(value.view(4, 12)), u8(0x23))
+        self.assertEqual(u8(1) + value.view(0, 8), u8(0x35))
+    def test_copy_on_write(self):
+        a = u16(0x00ff)
+        b = Binary(a)
+        a[0] = False
+        self.assertEqual(b, u16(0x00ff))
+        self.assertEqual(a, u16(0x00fe))
+        c = arithm.cast(b, 'signed')
+        c[15] = True
+        self.assertEqual(b, u16(0x00ff))
+    def test_copy_while_exported(self):
+        a = u16(0)
+        view = memoryview(a)
+        b = Binary(a)
+        view[0] = 0xff
+        self.assertEqual(a, u16(0xff))
+        self.assertEqual(b, u16(0))
+
+class TestMapped(unittest.TestCase):
+    def setUp(self):
+        import tempfile, os
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'bits.bin')
+    def tearDown(self):
+        self.dir.cleanup()
+    def test_create(self):
+        with Binary.mmap(self.path, 100, 'w+') as m:
+            self.assertEqual(len(m), 100)
+            self.assertEqual(m.count_ones(), 0)
+            m[3] = True
+            m[-1] = True
+            m[10:20] = Binary('1011001110')
+            m.flush()
+        with open(self.path, 'rb') as file:
+            self.assertEqual(len(file.read()), 16)
+        m = Binary.mmap(self.path, 100, 'r')
+        self.assertTrue(m[3])
+        self.assertTrue(m[99])
+        self.assertEqual(m[10:20], Binary('1011001110'))
+        self.assertEqual(m.find_ones(), [3, 11, 12, 13, 16, 17, 19, 99])
+        with self.assertRaises(TypeError): m[0] = True
+        m.close()
+        with self.assertRaises(ValueError): m.count_ones()
+    def test_same_as_binary(self):
+        import random
+        rng = random.Random(5)
+        value = Binary([rng.random() < 0.3 for _ in range(1000)])
+        with open(self.path, 'wb') as file:
+            file.write(value.raw_bytes)
+        m = Binary.mmap(self.path, len(value))
+        self.assertEqual(m.binary(), value)
+        self.assertEqual(m.count_ones(), value.count_ones())
+        self.assertEqual(m.find_zeros(), value.find_zeros())
+        self.assertEqual(m[5:900:7], value[5:900:7])
+        self.assertEqual(m[::-3], value[::-3])
+        self.assertEqual(m.find('101', 10), value.find('101', 10))
+        self.assertEqual(m.find_all(Binary('0110')), value.find_all(Binary('0110')))
+        other = Binary([rng.random() < 0.5 for _ in range(1000)])
+        self.assertEqual(m & other, value & other)
+        self.assertEqual(m ^ other, value ^ other)
+        m |= other
+        self.assertEqual(m.binary(), value | other)
+        m[100:200:3] = False
+        value = value | other
+        value[100:200:3] = False
+        self.assertEqual(m.binary(), value)
+        m.close()
+    def test_modes(self):
+        with self.assertRaises(ValueError): Binary.mmap(self.path, mode='w+')
+        with self.assertRaises(ValueError): Binary.mmap(self.path, 8, mode='x')
+        with open(self.path, 'wb') as file:
+            file.write(b'\x01\x00\x00\x00')
+        with Binary.mmap(self.path, mode='c') as m:
+            self.assertEqual(len(m), 32)
+            m[1] = True
+            self.assertEqual(m.count_ones(), 2)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), b'\x01\x00\x00\x00')
+        with self.assertRaises(ValueError): Binary.mmap(self.path, 64, mode='r')
+        with Binary.mmap(self.path, 64) as m:
+            self.assertEqual(m.find_ones(), [0])
+    def test_odd_size(self):
+        # file that does not end at 32 bit block boundary is mapped with zero padded last block
+        with open(self.path, 'wb') as file:
+            file.write(b'\xff\x00\x81\x00\x80')
+        for mode in ['r', 'c']:
+            with Binary.mmap(self.path, mode=mode) as m:
+                self.assertEqual(len(m), 40)
+                self.assertEqual(m.find_ones(), [0, 1, 2, 3, 4, 5, 6, 7, 16, 23, 39])
+                self.assertEqual(m[32:], Binary('1000 0000'))
+                self.assertEqual(m.binary().raw_bytes, b'\xff\x00\x81\x00\x80')
+        with Binary.mmap(self.path, 36, mode='r') as m:
+            self.assertEqual(m.count_ones(), 10)
+        # writes to copy-on-write mapping reach the partial last block, file is not changed
+        with Binary.mmap(self.path, mode='c') as m:
+            m[38] = True
+            m[0:8] = False
+            m ^= Binary(1, lenght=40)
+            self.assertEqual(m.find_ones(), [0, 16, 23, 38, 39])
+            self.assertEqual(m.binary().raw_bytes, b'\x01\x00\x81\x00\xc0')
+        with self.assertRaises(ValueError): Binary.mmap(self.path, 41, mode='r')
+        with open(self.path, 'rb') as file:
+            self.assertEqual(len(file.read()), 5)
+
+class TestSparse(unittest.TestCase):
+    def test_basic(self):
+        s = SparseBinary(10**10, [3, 2**40 % 10**10, -1])
+        self.assertEqual(len(s), 10**10)
+        self.assertEqual(s.count_ones(), 3)
+        self.assertEqual(s.find_ones(), [3, 2**40 % 10**10, 10**10 - 1])
+        self.assertTrue(s[3])
+        self.assertFalse(s[4])
+        s[3] = False
+        s[4] = True
+        self.assertEqual(s.trailing_zeros(), 4)
+        self.assertEqual(s.leading_zeros(), 0)
+        self.assertEqual(s.containers, (3, 0))
+        with self.assertRaises(IndexError): s[10**10]
+        with self.assertRaises(IndexError): SparseBinary(10, [10])
+    def test_binary_conversion(self):
+        import random
+        rng = random.Random(3)
+        for density in [0.001, 0.1, 0.9]:
+            value = Binary([rng.random() < density for _ in range(200000)])
+            s = SparseBinary.from_binary(value)
+            self.assertEqual(s.binary(), value)
+            self.assertEqual(s, value)
+            self.assertEqual(s.count_ones(), value.count_ones())
+            self.assertEqual(s.find_ones(), value.find_ones())
+            self.assertEqual(s[1000:5000:3], value[1000:5000:3])
+            self.assertEqual(s[5000:1000:-7], value[5000:1000:-7])
+        self.assertEqual(SparseBinary.from_binary(Binary('1' * 68000)).containers, (1, 1))
+    def test_set_operations(self):
+        import random
+        rng = random.Random(4)
+        for density in [0.001, 0.05, 0.5]:
+            a = Binary([rng.random() < density for _ in range(150000)])
+            b = Binary([rng.random() < density for _ in range(150000)])
+            sa, sb = SparseBinary.from_binary(a), SparseBinary.from_binary(b)
+            self.assertEqual((sa & sb).binary(), a & b)
+            self.assertEqual((sa | sb).binary(), a | b)
+            self.assertEqual((sa ^ sb).binary(), a ^ b)
+            self.assertEqual(sa.and_not(sb).binary(), a & ~b)
+            self.assertEqual((sa & b).binary(), a & b)
+            self.assertEqual(sa ^ sa, SparseBinary(150000))
+
+class TestRankSelect(unittest.TestCase):
+    def test_small(self):
+        index = Binary('1011 0110').build_rank_index()
+        self.assertEqual([index.rank1(i) for i in range(9)], [0, 0, 1, 2, 2, 3, 4, 4, 5])
+        self.assertEqual([index.rank0(i) for i in range(9)], [0, 1, 1, 1, 2, 2, 2, 3, 3])
+        self.assertEqual([index.select1(k) for k in range(5)], [1, 2, 4, 5, 7])
+        self.assertEqual([index.select0(k) for k in range(3)], [0, 3, 6])
+        self.assertEqual((index.count_ones(), index.count_zeros()), (5, 3))
+        with self.assertRaises(IndexError): index.rank1(9)
+        with self.assertRaises(IndexError): index.select1(5)
+        with self.assertRaises(IndexError): index.select0(3)
+    def test_random(self):
+        import random
+        rng = random.Random(6)
+        for density in [0.01, 0.5, 0.99]:
+            value = Binary([rng.random() < density for _ in range(150000)])
+            index = RankSelect(value)
+            ones, zeros = value.find_ones(), value.find_zeros()
+            for k in range(0, len(ones), 97):
+                self.assertEqual(index.select1(k), ones[k])
+                self.assertEqual(index.rank1(ones[k]), k)
+            for k in range(0, len(zeros), 97):
+                self.assertEqual(index.select0(k), zeros[k])
+            self.assertEqual(index.rank1(len(value)), len(ones))
+    def test_mutation(self):
+        value = Binary('0000 0000')
+        index = value.build_rank_index()
+        self.assertEqual(index.count_ones(), 0)
+        value[3] = True
+        self.assertEqual(index.select1(0), 3)
+        value[0:2] = '11'
+        self.assertEqual(index.rank1(3), 2)
+        value.append('1')
+        self.assertEqual(index.rank1(9), 4)
+        value.view(4, 8).set(15)
+        self.assertEqual(index.count_ones(), 8)
+        self.assertIs(index.binary, value)
+
+class TestRegisterFile(unittest.TestCase):
+    def test_access(self):
+        regs = RegisterFile(4, 16)
+        self.assertEqual(len(regs), 4)
+        regs[1] = 0x1234
+        regs[-1] = u16(7)
+        self.assertEqual(regs[1], u16(0x1234))
+        self.assertEqual((regs.int(1), regs.int(3), regs.int(0)), (0x1234, 7, 0))
+        regs[1, :8] = u8(0xff)
+        self.assertEqual(regs.int(1), 0x12ff)
+        self.assertEqual(regs[1, 8:], u8(0x12))
+        with self.assertRaises(IndexError): regs[4]
+        with self.assertRaises(ValueError): regs[0, ::2]
+        with self.assertRaises(Exception): regs[0] = 2**16
+    def test_arithm(self):
+        VALUES = [0, 1, 2, 127, 128, 255]
+        regs = RegisterFile(2, 8)
+        for x in VALUES:
+            for y in VALUES:
+                for op, expected in [(regs.add, arithm.flaged_add), (regs.sub, arithm.flaged_sub)]:
+                    regs[0], regs[1] = x, y
+                    flags = op(0, 1)
+                    result, expected_flags = expected(u8(x), u8(y))
+                    self.assertEqual(regs[0], result)
+                    self.assertEqual((flags.overflow, flags.zeroflag, flags.signflag), (expected_flags.overflow, expected_flags.zeroflag, expected_flags.signflag))
+        regs[0] = 3
+        regs.add(0, 0)
+        self.assertEqual(regs.int(0), 6)
+        regs.add_imm(0, 250)
+        self.assertEqual(regs.int(0), 0)
+        regs.mov(1, 0)
+        self.assertEqual(regs.int(1), 0)
+    def test_wide_signed(self):
+        regs = RegisterFile(2, 72, signed=True)
+        regs[0], regs[1] = -1, 2**70
+        self.assertEqual(regs.int(0), -1)
+        regs.add(1, 0)
+        self.assertEqual(regs.int(1), 2**70 - 1)
+        flags = regs.sub_imm(0, 1)
+        self.assertEqual((regs.int(0), flags.signflag), (-2, True))
+    def test_snapshot(self):
+        regs = RegisterFile(3, 12)
+        regs[0], regs[2] = 5, 4095
+        state = regs.snapshot()
+        regs.mov(0, 2)
+        regs.restore(state)
+        self.assertEqual([regs.int(i) for i in range(3)], [5, 0, 4095])
+        with self.assertRaises(ValueError): regs.restore(state[:-1])
+
+class TestPack(unittest.TestCase):
+    def test_pack(self):
+        self.assertEqual(pack([1, 2, 3], 4), b'\x21\x03')
+        self.assertEqual(pack([1, 2, 3], 12), b'\x01\x20\x00\x03\x00')
+        self.assertEqual(pack([-1, 1], 4, signed=True), b'\x1f')
+        self.assertEqual(pack([u4(5), 1], 4), b'\x15')
+        self.assertEqual(pack([], 10), b'')
+        with self.assertRaises(OverflowError): pack([16], 4)
+        with self.assertRaises(OverflowError): pack([-1], 4)
+        with self.assertRaises(OverflowError): pack([8], 4, signed=True)
+        with self.assertRaises(ValueError): pack([1], 0)
+        with self.assertRaises(ValueError): pack([1], 65)
+    def test_unpack(self):
+        self.assertEqual(unpack(b'\x21\x03', 4), [1, 2, 3, 0])
+        self.assertEqual(unpack(b'\x01\x20\x00\x03\x00', 12), [1, 2, 3])
+        self.assertEqual(unpack(bytearray(b'\x1f'), 4, signed=True), [-1, 1])
+        self.assertEqual(unpack(Binary('0011 0010 0001'), 4), [1, 2, 3])
+        self.assertEqual(unpack(Binary('11 0010 0001'), 4), [1, 2])
+    def test_roundtrip(self):
+        import random
+        rng = random.Random(11)
+        for width in [1, 3, 8, 10, 12, 31, 32, 33, 63, 64]:
+            values = [rng.getrandbits(width) for _ in range(300)]
+            self.assertEqual(unpack(pack(values, width), width)[:300], values)
+            signed = [x - 2**width if x >> (width - 1) else x for x in values]
+            self.assertEqual(unpack(pack(signed, width, signed=True), width, signed=True)[:300], signed)
+    def test_streaming(self):
+        import random
+        rng = random.Random(12)
+        for width in [1, 10, 12, 64]:
+            values = [rng.getrandbits(width) for _ in range(500)]
+            packer = Packer(width)
+            data = b''
+            for i in range(0, 500, 37):
+                data += packer.pack(values[i:i + 37])
+                self.assertLess(packer.pending, 8)
+            data += packer.flush()
+            self.assertEqual(packer.pending, 0)
+            self.assertEqual(data, pack(values, width))
+
+            unpacker = Unpacker(width)
+            decoded = []
+            for i in range(0, len(data), 5):
+                decoded += unpacker.feed(data[i:i + 5])
+                self.assertLess(unpacker.pending, width)
+            self.assertEqual(decoded[:500], values)
+
+class TestSerialize(unittest.TestCase):
+    def test_pickle(self):
+        import pickle
+        for value in [Binary(''), Binary('1'), Binary('0001'), Binary('0xff', sign_behavior='signed'), Binary('1' * 70, sign_behavior='signed'), Binary(2**100 + 5)]:
+            copy = pickle.loads(pickle.dumps(value))
+            self.assertEqual(copy.bin(), value.bin())
+            self.assertEqual(len(copy), len(value))
+            self.assertEqual(copy.sign_behavior(), value.sign_behavior())
+        flags = pickle.loads(pickle.dumps(arithm.Flags(True, False, True)))
+        self.assertEqual((flags.overflow, flags.zeroflag, flags.signflag), (True, False, True))
+    def test_dump_load(self):
+        import io
+        values = [Binary('1010'), Binary(''), Binary('0x1234', sign_behavior='signed'), Binary('1' * 33)]
+        file = io.BytesIO()
+        dump(values, file)
+        file.seek(0)
+        loaded = load(file)
+        self.assertEqual([x.bin() for x in loaded], [x.bin() for x in values])
+        self.assertEqual([x.sign_behavior() for x in loaded], [x.sign_behavior() for x in values])
+        self.assertEqual(file.getvalue(), dumps(values))
+        self.assertEqual([x.int() for x in loads(dumps([5, '0b11']))], [5, 3])
+        self.assertEqual(loads(dumps([])), [])
+    def test_invalid(self):
+        data = dumps([Binary('0x1234')])
+        with self.assertRaises(ValueError): loads(data[:-1])
+        with self.assertRaises(ValueError): loads(data + b'\x00')
+        with self.assertRaises(ValueError): loads(b'nope' + data[4:])
+
+class TestThreads(unittest.TestCase):
+    def tearDown(self):
+        set_num_threads(0)
+    def test_num_threads(self):
+        set_num_threads(3)
+        self.assertEqual(get_num_threads(), 3)
+        set_num_threads(0)
+        self.assertGreaterEqual(get_num_threads(), 1)
+    def test_large_operations(self):
+        import random
+        rng = random.Random(13)
+        size = 2**23 + 5
+        a = Binary(rng.getrandbits(size), lenght=size)
+        b = Binary(rng.getrandbits(size), lenght=size)
+        pattern = Binary('1011 0111')
+
+        def run():
+            return (a & b, a ^ b, ~a, a.count_ones(), arithm.hamming_distance(a, b),
+                    a.count(pattern), a.find_all(pattern)[-10:], a.find_zeros()[-10:])
+
+        set_num_threads(1)
+        expected = run()
+        set_num_threads(4)
+        self.assertEqual(run(), expected)
+        self.assertEqual(expected[0].int(), a.int() & b.int())
+        self.assertEqual(expected[3], bin(a.int()).count('1'))
@@ -48,12 +48,50 @@ pub mod add_base {
         
         result.truncate(len);
 
-        let result = BinaryBase::from_parts(result, a.sign_behavior.clone());
+        let result = BinaryBase::from_parts(result, a.sign_behavior);
         let flags = Flags::from_binary(overflow, &result);
 
         return Ok((result, flags));
     }
 
+    /// `a += b` (or `a -= b` if `subtract` is set) computed in memory of `a`. Returns same flags as `add_binary`
+    /// (b is zero extended for addition and sign extended for subtraction, just like in `add_binary` and `sub`).
+    pub fn add_assign(a: &mut BinaryBase, b: &BinaryBase, subtract: bool) -> PyResult<Flags>
+    {
+        if a.sign_behavior != b.sign_behavior {
+            return Err(PyValueError::new_err("Sign behavior mismatch, try casting one value"));
+        }
+        if b.len() > a.len() {
+            // result would be longer than `a`
+            let (result, flags) = if subtract { super::super::sub::base_sub_binary(a, b)? } else { add_binary(a, Some(b), false)? };
+            a.assign(&result);
+            return Ok(flags);
+        }
+
+        let len = a.len_usize();
+        let fill = subtract && b.sign_extending_bit();
+        let mut carry = subtract;
+        let mut overflow = carry;
+
+        for bi in 0..a.data.block_len()
+        {
+            let used = len - 32 * bi;
+            let mask = if used >= 32 { u32::MAX } else { (1 << used) - 1 };
+
+            let b_block = b.extended_block(bi, fill);
+            let b_block = if subtract { !b_block } else { b_block } & mask;
+
+            let (sum, cout) = carring_add(a.data.get_block(bi), b_block, carry);
+
+            carry = cout;
+            overflow = cout || (used < 32 && (sum >> used) & 1 == 1);
+
+            a.set_block_masked(bi, sum);
+        }
+
+        Ok(Flags::from_binary(overflow, a))
+    }
+
     pub fn arithmetic_neg(a: &BinaryBase) -> PyResult<BinaryBase> 
     {
         let negated = bitwise_base::bitwise_not(a);
@@ -63,58 +101,49 @@ pub mod add_base {
         return Ok(output);
     }
 
-    pub fn flaged_add(left: &crate::Binary, right: &crate::Binary, py: &Python) -> PyResult<(PyObject, Flags)>
-    {
-        let (sum, flags) = add_binary(&left.inner, Some(&right.inner), false)?;
-
-        crate::Binary::wrap_object_gil(Ok(sum), py).and_then(|x| Ok((x, flags)))
-    }
-
-
-    pub fn add(binary: PyRef<crate::Binary>, other: &PyAny, py: &Python) -> PyResult<(PyObject, Flags)> {
+    pub fn add(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<(BinaryBase, Flags)> {
         let _a = binary;
         
         if let Ok(_b) = other.extract::<PyRef<crate::Binary>>() {   
-            flaged_add(&_a, &_b, &py)
+            add_binary(&_a.inner, Some(&_b.inner), false)
         } else if let Ok(_b) = crate::Binary::from(other, Some(_a.len().try_into().unwrap()), Some(_a.sign_behavior())) {
-            flaged_add(&_a, &_b, &py)
+            add_binary(&_a.inner, Some(&_b.inner), false)
         } else {
             return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
         }
     }
 }
 
-#[pyfunction]
-pub fn flaged_add(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<(PyObject, PyObject)> {
-    Python::with_gil(|py| {
-        let (sum, flags) = add_base::add(binary, other, &py)?;
+#[pyfunction("*", out = "None")]
+pub fn flaged_add(binary: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<(PyObject, PyObject)> {
+    let (sum, flags) = add_base::add(binary, other)?;
 
-        Ok((sum, flags.into_py(py)))
+    Python::with_gil(|py| {
+        Ok((crate::Binary::wrap_out(Ok(sum), out)?, flags.into_py(py)))
     })
 }
 
 
-#[pyfunction]
-pub fn overflowing_add(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<(PyObject, PyObject)> {
-    Python::with_gil(|py| {
-        let (sum, flags) = add_base::add(binary, other, &py)?;
+#[pyfunction("*", out = "None")]
+pub fn overflowing_add(binary: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<(PyObject, PyObject)> {
+    let (sum, flags) = add_base::add(binary, other)?;
 
-        Ok((sum, flags.overflow.into_py(py)))
+    Python::with_gil(|py| {
+        Ok((crate::Binary::wrap_out(Ok(sum), out)?, flags.overflow.into_py(py)))
     })
 }
 
-#[pyfunction]
-pub fn wrapping_add(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<PyObject> {
-    let (sum, _) = overflowing_add(binary, other)?;
+#[pyfunction("*", out = "None")]
+pub fn wrapping_add(binary: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+    let (sum, _) = overflowing_add(binary, other, out)?;
 
     Ok(sum)
 }
 
-#[pyfunction]
-pub fn arithmetic_neg(binary: PyRef<crate::Binary>) -> PyResult<PyObject> {
-    Python::with_gil(|py| {
-        let negated = add_base::arithmetic_neg(&binary.inner)?;
+#[pyfunction("*", out = "None")]
+pub fn arithmetic_neg(binary: PyRef<crate::Binary>, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+    let negated = add_base::arithmetic_neg(&binary.inner);
+    drop(binary);
 
-        crate::Binary::wrap_object_gil(Ok(negated), &py)
-    })
-}
\ No newline at end of file
+    crate::Binary::wrap_out(negated, out)
+}
@@ -1,66 +1,98 @@
 use crate::binary::BinaryBase;
 use pyo3::{prelude::*, types::PySliceIndices};
 
-macro_rules! gen_bitwise_all { 
-    ($([$function:ident, $neg_function:ident, $bv_function:ident]),*) => {
+macro_rules! gen_bitwise_all {
+    ($([$function:ident, $neg_function:ident, $op:expr]),*) => {
         pub mod bitwise_base {
-            use crate::binary::BinaryBase;
-            use bv::{Bits, BitsExt};
+            use crate::binary::{BinaryBase, SignBehavior};
+            use crate::parallel;
+            use bv::Bits;
+
+            /// Computes result block by block (in parallel for large operands), result has length of the shorter operand
+            fn combine(a: &BinaryBase, b: &BinaryBase, op: impl Fn(u32, u32) -> u32 + Sync) -> BinaryBase {
+                let len = a.len_usize().min(b.len_usize());
+                let mut out = vec![0u32; (len + 31) / 32];
+
+                parallel::fill_blocks(&mut out, |offset, blocks| {
+                    for (i, block) in blocks.iter_mut().enumerate() {
+                        *block = op(a.data.get_block(offset + i), b.data.get_block(offset + i));
+                    }
+                });
+
+                BinaryBase::from_blocks(&out, len, a.sign_behavior)
+            }
 
             pub fn bitwise_not(binary: &BinaryBase) -> BinaryBase {
-                BinaryBase::from_parts(binary.data.bit_not().to_bit_vec(), binary.sign_behavior.clone())
+                combine(binary, binary, |a, _| !a)
+            }
+
+            /// `a = op(a, b)` computed in memory of `a`. Gives the same result as functions below (shorter operand is sign extended)
+            pub fn assign_with(a: &mut BinaryBase, b: &BinaryBase, op: impl Fn(u32, u32) -> u32) {
+                if b.len() > a.len() {
+                    let fill = a.sign_extending_bit();
+                    a.data.resize(b.len(), fill);
+                    a.sign_behavior = SignBehavior::Unsigned;
+                }
+
+                let fill = b.sign_extending_bit();
+                for i in 0..a.data.block_len() {
+                    let value = op(a.data.get_block(i), b.extended_block(i, fill));
+                    a.set_block_masked(i, value);
+                }
             }
 
             $(
                 pub fn $function(a: &BinaryBase, b: &BinaryBase) -> BinaryBase {
-                    let value = a.data.$bv_function(&b.data).to_bit_vec();
-                    BinaryBase::from_parts(value, a.sign_behavior.clone())
+                    combine(a, b, $op)
                 }
                 pub fn $neg_function(a: &BinaryBase, b: &BinaryBase) -> BinaryBase {
-                    let value = a.data.$bv_function(&b.data).bit_not().to_bit_vec();
-                    BinaryBase::from_parts(value, a.sign_behavior.clone())
+                    combine(a, b, |x, y| !($op)(x, y))
                 }
             )*
-    
+
         }
 
-        #[pyfunction]
-        pub fn bitwise_not(a: PyRef<crate::Binary>) -> PyResult<PyObject> {
-            crate::Binary::wrap_object(Ok(bitwise_base::bitwise_not(&a.inner)))
+        /// Applies `op` to operands extended to the same size
+        fn apply(a: &BinaryBase, b: &BinaryBase, op: fn(&BinaryBase, &BinaryBase) -> BinaryBase) -> PyResult<BinaryBase> {
+            if a.len() == b.len() {
+                Ok(op(a, b))
+            } else if a.len() > b.len() {
+                let slice = BinaryBase::from_data(b.get_slice(&PySliceIndices::new(0, a.len().try_into().unwrap(), 1))?);
+                Ok(op(a, &slice))
+            } else {
+                let slice = BinaryBase::from_data(a.get_slice(&PySliceIndices::new(0, b.len().try_into().unwrap(), 1))?);
+                Ok(op(&slice, b))
+            }
+        }
+
+        #[pyfunction("*", out = "None")]
+        pub fn bitwise_not(py: Python, a: PyRef<crate::Binary>, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+            let binary = &a.inner;
+            let result = crate::parallel::without_gil(py, binary.len_usize(), || bitwise_base::bitwise_not(binary));
+            drop(a);
+
+            crate::Binary::wrap_out(Ok(result), out)
         }
 
         $(
-            #[pyfunction]
-            pub fn $function(a: PyRef<crate::Binary>, b: PyRef<crate::Binary>) -> PyResult<PyObject> {
-                crate::Binary::wrap_object(
-                    if a.len() == b.len() {
-                        Ok(bitwise_base::$function(&a.inner, &b.inner))
-                    } else if a.len() > b.len() {
-                        let slice = BinaryBase::from_data(b.inner.get_slice(&PySliceIndices::new(0, a.len().try_into().unwrap(), 1))?);
-                        Ok(bitwise_base::$function(&a.inner, &slice))
-                    } else {
-                        let slice = BinaryBase::from_data(a.inner.get_slice(&PySliceIndices::new(0, b.len().try_into().unwrap(), 1))?);
-                        Ok(bitwise_base::$function(&slice, &b.inner))
-                    }
-                )
+            #[pyfunction("*", out = "None")]
+            pub fn $function(py: Python, a: PyRef<crate::Binary>, b: PyRef<crate::Binary>, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+                let (lhs, rhs) = (&a.inner, &b.inner);
+                let result = crate::parallel::without_gil(py, lhs.len_usize().max(rhs.len_usize()), || apply(lhs, rhs, bitwise_base::$function));
+                drop((a, b));
+
+                crate::Binary::wrap_out(result, out)
             }
-            #[pyfunction]
-            pub fn $neg_function(a: PyRef<crate::Binary>, b: PyRef<crate::Binary>) -> PyResult<PyObject> {
-                crate::Binary::wrap_object(
-                    if a.len() == b.len() {
-                        Ok(bitwise_base::$neg_function(&a.inner, &b.inner))
-                    } else if a.len() > b.len() {
-                        let slice = BinaryBase::from_data(b.inner.get_slice(&PySliceIndices::new(0, a.len().try_into().unwrap(), 1))?);
-                        Ok(bitwise_base::$neg_function(&a.inner, &slice))
-                    } else {
-                        let slice = BinaryBase::from_data(a.inner.get_slice(&PySliceIndices::new(0, b.len().try_into().unwrap(), 1))?);
-                        Ok(bitwise_base::$neg_function(&slice, &b.inner))
-                    }
-                )
+            #[pyfunction("*", out = "None")]
+            pub fn $neg_function(py: Python, a: PyRef<crate::Binary>, b: PyRef<crate::Binary>, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+                let (lhs, rhs) = (&a.inner, &b.inner);
+                let result = crate::parallel::without_gil(py, lhs.len_usize().max(rhs.len_usize()), || apply(lhs, rhs, bitwise_base::$neg_function));
+                drop((a, b));
+
+                crate::Binary::wrap_out(result, out)
             }
         )*
     }
 }
 
-gen_bitwise_all!([bitwise_or, bitwise_nor, bit_or], [bitwise_xor, bitwise_xnor, bit_xor], [bitwise_and, bitwise_nand, bit_and]);
-
+gen_bitwise_all!([bitwise_or, bitwise_nor, |a, b| a | b], [bitwise_xor, bitwise_xnor, |a, b| a ^ b], [bitwise_and, bitwise_nand, |a, b| a & b]);
@@ -1,111 +1,236 @@
 use pyo3::{prelude::*, types, exceptions};
-use bv::{self, BitsExt, Bits, BitsMut, BitsMutExt};
 
 use crate::binary::*;
+use crate::parallel;
 
+pub mod bitwise_map_base {
+    use std::collections::HashMap;
 
-#[pyfunction(args="*", kwargs="**")]
-pub fn bitwise_map(args: &types::PyTuple, kwargs: Option<&types::PyDict>) -> PyResult<PyObject> 
+    pub const FALSE: usize = 0;
+    pub const TRUE: usize = 1;
+
+    /// Node of decision diagram, its value is `hi` if `input` is set and `lo` otherwise
+    #[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
+    pub struct Node {
+        pub input: usize,
+        pub lo: usize,
+        pub hi: usize,
+    }
+
+    /// Truth table compiled to reduced ordered decision diagram. Ids `0` and `1` are constants, node `i` has id `i + 2`.
+    /// Children are always stored before their parents so nodes can be evaluated in order.
+    #[derive(Clone, Debug)]
+    pub struct Diagram {
+        inputs: usize,
+        nodes: Vec<Node>,
+        root: usize,
+    }
+
+    impl Diagram {
+        /// Diagram of function that is true for every term in `terms` (bit `i` of term is the value of `i`-th input).
+        /// Terms must be smaller than `2**inputs`
+        pub fn compile(inputs: usize, mut terms: Vec<u64>) -> Self {
+            terms.sort_unstable();
+            terms.dedup();
+
+            let mut builder = Builder { nodes: Vec::new(), unique: HashMap::new() };
+            let root = builder.build(inputs, &terms);
+
+            Self { inputs, nodes: builder.nodes, root }
+        }
+        pub fn inputs(&self) -> usize {
+            self.inputs
+        }
+        pub fn size(&self) -> usize {
+            self.nodes.len()
+        }
+        /// Computes 32 results at once from blocks of inputs, `values` is scratch space reused between calls
+        pub fn eval(&self, inputs: &[u32], values: &mut Vec<u32>) -> u32 {
+            values.clear();
+            values.push(0);
+            values.push(u32::MAX);
+
+            for node in &self.nodes {
+                let x = inputs[node.input];
+                values.push(x & values[node.hi] | !x & values[node.lo]);
+            }
+            values[self.root]
+        }
+    }
+
+    struct Builder {
+        nodes: Vec<Node>,
+        unique: HashMap<Node, usize>,
+    }
+
+    impl Builder {
+        /// Id of node for function of first `inputs` inputs that is true for sorted `terms`
+        fn build(&mut self, inputs: usize, terms: &[u64]) -> usize {
+            if terms.is_empty() {
+                return FALSE;
+            }
+            if inputs < 64 && terms.len() as u64 == 1 << inputs {
+                return TRUE;
+            }
+
+            // split on the last input, terms with this input set are greater than the others
+            let input = inputs - 1;
+            let split = terms.partition_point(|term| term >> input & 1 == 0);
+            let hi_terms: Vec<u64> = terms[split..].iter().map(|term| term & ((1 << input) - 1)).collect();
+
+            let lo = self.build(input, &terms[..split]);
+            let hi = self.build(input, &hi_terms);
+            if lo == hi {
+                return lo;
+            }
+
+            let node = Node { input, lo, hi };
+            if let Some(id) = self.unique.get(&node) {
+                return *id;
+            }
+            let id = self.nodes.len() + 2;
+            self.nodes.push(node);
+            self.unique.insert(node, id);
+            id
+        }
+    }
+}
+
+use bitwise_map_base::Diagram;
+
+/// Maps given as `Binary` hold all `2**inputs` terms, larger tables should be given as dict of true terms
+const MAX_TABLE_INPUTS: usize = 20;
+const MAX_INPUTS: usize = 64;
+
+/// Reads true terms of function of `inputs` inputs from `map` (dict of terms or `Binary` table)
+fn parse_terms(inputs: usize, map: &PyAny) -> PyResult<Vec<u64>>
 {
-    let map = kwargs.and_then(|kwargs| kwargs.get_item("map")).expect("Map is not provided, provide map by adding `map=\"..\"` to the function call");
-    let args = args.as_slice();
-    if args.len() >= 32 {
-        return Err(exceptions::PyValueError::new_err("This function can handle up to 31 arguments"));
+    if inputs > MAX_INPUTS {
+        return Err(exceptions::PyValueError::new_err(format!("Map can have up to {} inputs, but got {}", MAX_INPUTS, inputs)));
     }
+    let mask = if inputs >= 64 { u64::MAX } else { (1u64 << inputs) - 1 };
 
-    // get the mapping (32 bits)
-    let map = 
     if let Ok(map_dict) = map.extract::<&types::PyDict>() {
-        let mut bitvec = bv::BitVec::<u32>::new_fill(false, 32);
+        // keys up to 31 were always accepted, bits past the last input are ignored
+        let limit = (mask as u128 + 1).max(32);
+
+        let mut terms = Vec::new();
         for (key, value) in map_dict {
-            let key = 
-            match crate::Binary::from(key, None, None) {
-                Ok(key) => i64::from(&key.inner),
-                Err(_) => return Err(exceptions::PyValueError::new_err(format!("Key cannot be interpreted as Binary '{:?}'", key))),
+            let key: i128 =
+            if let Ok(key) = key.extract::<u64>() {
+                key.into()
+            } else {
+                match crate::Binary::from(key, None, None) {
+                    Ok(key) => i64::from(&key.inner).into(),
+                    Err(_) => return Err(exceptions::PyValueError::new_err(format!("Key cannot be interpreted as Binary '{:?}'", key))),
+                }
             };
 
-            if key < 0 || key > 31 {
-                return Err(exceptions::PyValueError::new_err("Map keys must be in range [0, 31]"));
+            if key < 0 || key as u128 >= limit {
+                return Err(exceptions::PyValueError::new_err(format!("Map keys must be in range [0, {}]", limit - 1)));
             }
 
-            let value = 
+            let value =
             match value.extract::<bool>() {
                 Ok(x) => x,
                 Err(_) => return Err(exceptions::PyValueError::new_err(format!("Dict Values should be booleans, but got '{:?}'", key))),
             };
 
-            bitvec.set(key.try_into().unwrap(), value);
+            if value {
+                terms.push(key as u64 & mask);
+            }
         }
-        bitvec
+        Ok(terms)
     } else {
-        match crate::Binary::from(map, Some(2_usize.pow(args.len().try_into().unwrap())), Some("unsigned".into())) {
-            Ok(x) => x.inner.data,
-            Err(err) => return Err(exceptions::PyValueError::new_err(format!("Map should be dict or Binary, but instead got: '{:?}' and it faild to convert: {:?}", map, err))),
+        if inputs > MAX_TABLE_INPUTS {
+            return Err(exceptions::PyValueError::new_err(format!("Map given as Binary can have up to {} inputs, use dict of true terms instead", MAX_TABLE_INPUTS)));
+        }
+        match crate::Binary::from(map, Some(1 << inputs), Some("unsigned")) {
+            Ok(table) => Ok(crate::utility::find_all_ones(map.py(), &table).into_iter().map(|term| term as u64).collect()),
+            Err(err) => Err(exceptions::PyValueError::new_err(format!("Map should be dict or Binary, but instead got: '{:?}' and it faild to convert: {:?}", map, err))),
         }
-    };
-    
-    if map.len() < args.len().try_into().unwrap() {
-        return Err(exceptions::PyValueError::new_err(format!("Map should have at least {} terms but it has {}", args.len(), map.len())));
-    }
-    if map.len() > 32 {
-        return Err(exceptions::PyValueError::new_err(format!("Map cannot exeed 32 terms, but it contains {} terms", map.len())));
     }
+}
 
-    // get all terms that should be tested
-    let positive_terms = 
-    (0..(map.len() as u32))
-    .filter(|i| map.get((*i).into()))
-    .map(bv::BitVec::<u32>::from_bits)
-    .map(|x| (0..32u64).map(|i| x.get(i)).collect::<Vec<_>>())
-    .collect::<Vec<_>>();
-
-    // get longest argumnet (TODO, use better metric)
-    let longest = args
-    .iter()
-    .map(|arg| arg.len().unwrap())
-    .max()
-    .unwrap_or(0);
-    
-    // get all arguments as BitVecs of the same length (longest)
-    let pos_args = 
-    args
-    .iter()
-    .map(|arg| crate::Binary::from(arg, Some(longest), Some("unsigned".into())).unwrap())
-    .map(|vec| vec.inner.data)
-    .collect::<Vec<_>>();
-    
-    // get negation of all arguments
-    let neg_args = pos_args
-    .iter()
-    .map(|arg| 
-        arg
-        .bit_not()
-        .to_bit_vec())
-    .collect::<Vec<_>>();
-
-    let mut result = bv::BitVec::<u32>::new_fill(false, longest.try_into().unwrap());
-    let mut itermid = bv::BitVec::<u32>::new_fill(true, longest.try_into().unwrap());
-    
-    // for each `1` term
-    for term in positive_terms
-    {
-        // set intermid to all ones
-        for i in 0..itermid.block_len() {
-            itermid.set_block(i, u32::MAX);
-        }
-        // for each argument
-        for (i, (pos, neg)) in pos_args.iter().zip(neg_args.iter()).enumerate()
-        {
-            // check if the term inverts the argument or not
-            if term[i] {
-                itermid.bit_and_assign(pos);
-            } else {
-                itermid.bit_and_assign(neg);
-            }
+/// Truth table compiled once and applied to any number of operands, see `bitwise_map`
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct BitwiseMap {
+    diagram: Diagram,
+}
+
+impl BitwiseMap {
+    pub fn compile(inputs: usize, map: &PyAny) -> PyResult<Self> {
+        Ok(Self { diagram: Diagram::compile(inputs, parse_terms(inputs, map)?) })
+    }
+    /// Applies map to corresponding bits of `args` (shorter operands are padded with zeros regardless of sign behavior, same as converting them with `Binary::from(arg, len, "unsigned")`), result is unsigned
+    pub fn apply(&self, py: Python, args: &types::PyTuple) -> PyResult<BinaryBase> {
+        if args.len() != self.diagram.inputs() {
+            return Err(exceptions::PyValueError::new_err(format!("Map expects {} arguments, but got {}", self.diagram.inputs(), args.len())));
         }
-        // or the result with the intermediate result
-        result.bit_or_assign(&itermid);
+
+        let args = args.iter().map(|arg| match arg.extract::<PyRef<crate::Binary>>() {
+            Ok(binary) => Ok(binary),
+            Err(_) => Ok(PyCell::new(py, crate::Binary::from(arg, None, None)?)?.borrow()),
+        }).collect::<PyResult<Vec<_>>>()?;
+
+        let operands: Vec<&BinaryBase> = args.iter().map(|arg| &arg.inner).collect();
+        let len = operands.iter().map(|operand| operand.len_usize()).max().unwrap_or(0);
+        let diagram = &self.diagram;
+
+        // every block of result is computed in one pass over blocks of operands
+        Ok(parallel::without_gil(py, len * operands.len(), || {
+            let mut out = vec![0u32; (len + 31) / 32];
+
+            parallel::fill_blocks(&mut out, |offset, blocks| {
+                let mut inputs = vec![0u32; operands.len()];
+                let mut values = Vec::with_capacity(diagram.size() + 2);
+
+                for (i, block) in blocks.iter_mut().enumerate() {
+                    for (input, operand) in inputs.iter_mut().zip(&operands) {
+                        *input = operand.extended_block(offset + i, false);
+                    }
+                    *block = diagram.eval(&inputs, &mut values);
+                }
+            });
+
+            BinaryBase::from_blocks(&out, len, SignBehavior::Unsigned)
+        }))
+    }
+}
+
+#[pymethods]
+impl BitwiseMap {
+    #[new]
+    fn py_new(inputs: usize, map: &PyAny) -> PyResult<Self> {
+        Self::compile(inputs, map)
+    }
+    #[getter]
+    pub fn inputs(&self) -> usize {
+        self.diagram.inputs()
     }
+    /// Number of nodes in compiled diagram (each costs few bitwise operations per 32 bits of result)
+    #[getter]
+    pub fn size(&self) -> usize {
+        self.diagram.size()
+    }
+    #[args(args = "*", out = "None")]
+    pub fn __call__(&self, py: Python, args: &types::PyTuple, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+        let result = self.apply(py, args);
+
+        crate::Binary::wrap_out(result, out)
+    }
+}
+
+#[pyfunction(args="*", kwargs="**")]
+pub fn bitwise_map(py: Python, args: &types::PyTuple, kwargs: Option<&types::PyDict>) -> PyResult<PyObject>
+{
+    let map = match kwargs.and_then(|kwargs| kwargs.get_item("map")) {
+        Some(map) => map,
+        None => return Err(exceptions::PyValueError::new_err("Map is not provided, provide map by adding `map=\"..\"` to the function call")),
+    };
+
+    let result = BitwiseMap::compile(args.len(), map)?.apply(py, args);
 
-    crate::Binary::wrap_object(Ok(BinaryBase::from_data(result)))
+    crate::Binary::wrap_object(result)
 }
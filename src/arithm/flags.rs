@@ -29,6 +29,14 @@ impl Flags {
 
 #[pymethods]
 impl Flags {
+    #[new]
+    #[args(of = "false", zf = "false", sf = "false")]
+    fn py_new(of: bool, zf: bool, sf: bool) -> Self {
+        Self::new(of, zf, sf)
+    }
+    pub fn __reduce__(&self, py: Python) -> (PyObject, (bool, bool, bool)) {
+        (py.get_type::<Self>().into(), (self.overflow, self.zeroflag, self.signflag))
+    }
     pub fn __repr__(&self) -> String {
         format!("Flags(of={}, zf={}, sf={})", self.overflow, self.zeroflag, self.signflag)
     }
@@ -3,12 +3,12 @@ use pyo3::{prelude::*};
 
 mod hamming_distance_base {
     use bv::Bits;
-    use pyo3::{exceptions::PyValueError, PyResult};
+    use pyo3::{exceptions::PyValueError, PyResult, Python};
 
     use crate::binary::BinaryBase;
 
 
-    pub fn hamming_distance(a: &BinaryBase, b: Option<&BinaryBase>) -> PyResult<usize> {
+    pub fn hamming_distance(py: Python, a: &BinaryBase, b: Option<&BinaryBase>) -> PyResult<usize> {
         let b_ref = BinaryBase::from_data(bv::BitVec::new());
         let b = b.unwrap_or(&b_ref);
 
@@ -20,19 +20,14 @@ mod hamming_distance_base {
         let a_data = &a.data;
         let b_data = &b.data;
 
-        let mut distance = 0;
-        
-        for bi in 0..a_data.block_len()
-        {
-            let a_block = if bi < a_data.block_len() { a_data.get_block(bi) } else { 0 }; 
-            let b_block = if bi < b_data.block_len() { b_data.get_block(bi) } else { 0 };
-
-            let mut xor = a_block ^ b_block;
-            while xor != 0 {
-                distance += 1;
-                xor &= xor - 1;
-            }
-        }
+        let distance = crate::parallel::without_gil(py, a.len_usize(), || {
+            crate::parallel::map_ranges(a_data.block_len(), |blocks| {
+                blocks.map(|bi| {
+                    let b_block = if bi < b_data.block_len() { b_data.get_block(bi) } else { 0 };
+                    (a_data.get_block(bi) ^ b_block).count_ones() as usize
+                }).sum::<usize>()
+            }).into_iter().sum()
+        });
 
         Ok(distance)
     }
@@ -40,8 +35,8 @@ mod hamming_distance_base {
 
 
 #[pyfunction]
-pub fn hamming_distance(a: &crate::Binary, b: &crate::Binary) -> PyResult<usize> {
-    let distance = hamming_distance_base::hamming_distance(&a.inner, Some(&b.inner))?;
+pub fn hamming_distance(py: Python, a: &crate::Binary, b: &crate::Binary) -> PyResult<usize> {
+    let distance = hamming_distance_base::hamming_distance(py, &a.inner, Some(&b.inner))?;
 
     Ok(distance) 
 }
\ No newline at end of file
@@ -15,6 +15,7 @@ pub fn register_arithm_module<'a>(_py: Python<'a>) -> PyResult<&'a PyModule> {
     let arithm = PyModule::new(_py, "arithm")?;
     
     arithm.add_class::<flags::Flags>()?;
+    arithm.add_class::<bitwise_map::BitwiseMap>()?;
 
     arithm.add_function(wrap_pyfunction!(add::overflowing_add, arithm)?)?;
     arithm.add_function(wrap_pyfunction!(add::wrapping_add, arithm)?)?;
@@ -46,6 +47,10 @@ pub fn register_arithm_module<'a>(_py: Python<'a>) -> PyResult<&'a PyModule> {
     arithm.add_function(wrap_pyfunction!(shifts::logical_wrapping_rsh, arithm)?)?;
     arithm.add_function(wrap_pyfunction!(shifts::arithmetic_underflowing_rsh, arithm)?)?;
     arithm.add_function(wrap_pyfunction!(shifts::arithmetic_wrapping_rsh, arithm)?)?;
+    arithm.add_function(wrap_pyfunction!(shifts::rotate_left, arithm)?)?;
+    arithm.add_function(wrap_pyfunction!(shifts::rotate_right, arithm)?)?;
+    arithm.add_function(wrap_pyfunction!(shifts::funnel_lsh, arithm)?)?;
+    arithm.add_function(wrap_pyfunction!(shifts::funnel_rsh, arithm)?)?;
 
     arithm.add_function(wrap_pyfunction!(mul::multiply, arithm)?)?;
     arithm.add_function(wrap_pyfunction!(mul::overflowing_mul, arithm)?)?;
@@ -1,62 +1,237 @@
 use pyo3::prelude::*;
 
+/// Multiplication engine working directly on `u32` blocks (lowest block first).
+/// Small operands are multiplied with schoolbook method, wide ones with Karatsuba.
+pub mod mul_words {
+    /// Below this number of blocks (in shorter operand) schoolbook method is faster than Karatsuba
+    pub const KARATSUBA_THRESHOLD: usize = 32;
+
+    /// `acc += x` (modulo `2^(32*acc.len())`), words of `x` that does not fit in `acc` are ignored
+    pub fn add_into(acc: &mut [u32], x: &[u32]) {
+        let mut carry = 0u64;
+        for i in 0..acc.len() {
+            if i >= x.len() && carry == 0 {
+                break;
+            }
+            let sum = acc[i] as u64 + *x.get(i).unwrap_or(&0) as u64 + carry;
+            acc[i] = sum as u32;
+            carry = sum >> 32;
+        }
+    }
+
+    /// `acc -= x` (modulo `2^(32*acc.len())`)
+    pub fn sub_into(acc: &mut [u32], x: &[u32]) {
+        let mut borrow = false;
+        for i in 0..acc.len() {
+            if i >= x.len() && !borrow {
+                break;
+            }
+            let (diff, b1) = acc[i].overflowing_sub(*x.get(i).unwrap_or(&0));
+            let (diff, b2) = diff.overflowing_sub(borrow as u32);
+            acc[i] = diff;
+            borrow = b1 || b2;
+        }
+    }
+
+    /// Returns `x << shift` truncated to `len` words
+    pub fn shl(x: &[u32], shift: usize, len: usize) -> Vec<u32> {
+        let (word_shift, bit_shift) = (shift / 32, (shift % 32) as u32);
+        let mut out = vec![0u32; len];
+
+        for i in word_shift..len {
+            let low = *x.get(i - word_shift).unwrap_or(&0);
+            let prev = if i > word_shift { *x.get(i - word_shift - 1).unwrap_or(&0) } else { 0 };
+            out[i] = if bit_shift == 0 { low } else { (low << bit_shift) | (prev >> (32 - bit_shift)) };
+        }
+        out
+    }
+
+    /// Returns `x >> shift` truncated to `len` words
+    pub fn shr(x: &[u32], shift: usize, len: usize) -> Vec<u32> {
+        let (word_shift, bit_shift) = (shift / 32, (shift % 32) as u32);
+
+        (0..len).map(|i| {
+            let low = *x.get(i + word_shift).unwrap_or(&0);
+            let high = *x.get(i + word_shift + 1).unwrap_or(&0);
+            if bit_shift == 0 { low } else { (low >> bit_shift) | (high << (32 - bit_shift)) }
+        }).collect()
+    }
+
+    /// `out += a*b` truncated to `out.len()` words
+    fn schoolbook_into(a: &[u32], b: &[u32], out: &mut [u32]) {
+        let n = out.len();
+        for (i, &x) in a.iter().enumerate().take(n) {
+            if x == 0 {
+                continue;
+            }
+            let mut carry = 0u64;
+            let end = b.len().min(n - i);
+            for j in 0..end {
+                let t = x as u64 * b[j] as u64 + out[i + j] as u64 + carry;
+                out[i + j] = t as u32;
+                carry = t >> 32;
+            }
+            add_into(&mut out[i + end..], &[carry as u32]);
+        }
+    }
+
+    /// Sum of two numbers, one word longer than longer operand
+    fn add_words(a: &[u32], b: &[u32]) -> Vec<u32> {
+        let mut out = vec![0u32; a.len().max(b.len()) + 1];
+        add_into(&mut out, a);
+        add_into(&mut out, b);
+        out
+    }
+
+    /// `out += a*b`, `out` has to be long enough to hold the sum
+    fn mul_into(a: &[u32], b: &[u32], out: &mut [u32]) {
+        let (a, b) = if a.len() >= b.len() { (a, b) } else { (b, a) };
+
+        if b.len() < KARATSUBA_THRESHOLD {
+            schoolbook_into(a, b, out);
+        } else if a.len() >= 2 * b.len() {
+            // unbalanced operands, longer one is split into chunks of shorter one's size
+            for (k, chunk) in a.chunks(b.len()).enumerate() {
+                add_into(&mut out[k * b.len()..], &full(chunk, b));
+            }
+        } else {
+            // (a1*B + a0)(b1*B + b0) = z2*B^2 + z1*B + z0
+            let h = a.len() / 2;
+            let (a0, a1) = a.split_at(h);
+            let (b0, b1) = b.split_at(h);
+
+            let z0 = full(a0, b0);
+            let z2 = full(a1, b1);
+            let mut z1 = full(&add_words(a0, a1), &add_words(b0, b1));
+            sub_into(&mut z1, &z0);
+            sub_into(&mut z1, &z2);
+
+            add_into(out, &z0);
+            add_into(&mut out[h..], &z1);
+            add_into(&mut out[2 * h..], &z2);
+        }
+    }
+
+    /// Full product, `a.len() + b.len()` words long
+    pub fn full(a: &[u32], b: &[u32]) -> Vec<u32> {
+        let mut out = vec![0u32; a.len() + b.len()];
+        mul_into(a, b, &mut out);
+        out
+    }
+
+    /// `out += a*b` truncated to `out.len()` words, high part of the product is never computed
+    fn low_into(a: &[u32], b: &[u32], out: &mut [u32]) {
+        let n = out.len();
+        let a = &a[..a.len().min(n)];
+        let b = &b[..b.len().min(n)];
+
+        if a.len().min(b.len()) < KARATSUBA_THRESHOLD {
+            schoolbook_into(a, b, out);
+        } else {
+            // (a1*B + a0)(b1*B + b0) mod B^2 = a0*b0 + (a0*b1 + a1*b0)*B
+            let h = (n + 1) / 2;
+            let (a0, a1) = a.split_at(h.min(a.len()));
+            let (b0, b1) = b.split_at(h.min(b.len()));
+
+            add_into(out, &full(a0, b0));
+            low_into(a0, b1, &mut out[h..]);
+            low_into(a1, b0, &mut out[h..]);
+        }
+    }
+
+    /// Low `len` words of the product
+    pub fn low(a: &[u32], b: &[u32], len: usize) -> Vec<u32> {
+        let mut out = vec![0u32; len];
+        low_into(a, b, &mut out);
+        out
+    }
+}
+
 pub mod base_mul {
-    use crate::binary::BinaryBase;
-    use pyo3::{types, prelude::*};
+    use crate::binary::{BinaryBase, SignBehavior};
+    use pyo3::prelude::*;
+    use super::mul_words;
 
-    pub fn multiply(a: &crate::Binary, b: &crate::Binary) -> PyResult<crate::Binary> {
-        // I'm lazy as fukx
-        // just convert to python int and multiply them
-        let a_py_int = a.int()?;
-        let b_py_int = b.int()?;
+    fn words(bits: usize) -> usize {
+        (bits + 31) / 32
+    }
+
+    /// Product of `a` and `b` as `a.len() + b.len()` bits two's complement number (blocks are not truncated to that size).
+    /// Raw bit patterns are multiplied as unsigned numbers and corrected for negative operands:
+    /// `A*B = Au*Bu - [A<0]*Bu*2^la - [B<0]*Au*2^lb (mod 2^(la+lb))`
+    fn product(a: &BinaryBase, b: &BinaryBase) -> Vec<u32> {
+        let (a_blocks, b_blocks) = (a.blocks(), b.blocks());
+        let len = words(a.len_usize() + b.len_usize());
+
+        let mut product = mul_words::full(&a_blocks, &b_blocks);
+        product.truncate(len);
+
+        if a.sign_extending_bit() {
+            mul_words::sub_into(&mut product, &mul_words::shl(&b_blocks, a.len_usize(), len));
+        }
+        if b.sign_extending_bit() {
+            mul_words::sub_into(&mut product, &mul_words::shl(&a_blocks, b.len_usize(), len));
+        }
+        product
+    }
 
+    pub fn multiply(a: &crate::Binary, b: &crate::Binary) -> PyResult<crate::Binary> {
         // best fitting size and sign beheavior for output
-        let (sign_behavior, size) = match (a.sign_behavior().as_str(), b.sign_behavior().as_str()) {
-            ("signed", _) | (_, "signed") => ("signed",   a.len() + b.len()),
-            _                             => ("unsigned", a.len() + b.len()),
+        let (sign_behavior, size) = match (a.inner.sign_behavior, b.inner.sign_behavior) {
+            (SignBehavior::Signed, _) | (_, SignBehavior::Signed) => (SignBehavior::Signed,   a.len() + b.len()),
+            _                                                     => (SignBehavior::Unsigned, a.len() + b.len()),
         };
 
-        Python::with_gil(|py| {
-            let result = a_py_int.call_method1(py, "__mul__", (b_py_int,))?;
-            let result = BinaryBase::parse_bitvec_from_long_integer(result.extract::<&types::PyLong>(py)?, Some(size), Some(sign_behavior));
+        let product = product(&a.inner, &b.inner);
 
-            crate::Binary::wrap(result)
-        })
+        crate::Binary::wrap(Ok(BinaryBase::from_blocks(&product, size, sign_behavior)))
     }
     /// same as multiply but returns splitted output as tuple of (result, carry) (splited at a.len())
     pub fn overflowing_mul(a: &crate::Binary, b: &crate::Binary) -> PyResult<(crate::Binary, crate::Binary)>{
-        let result = multiply(a, b)?;
-        
-        let low  = result.inner.get_slice(&types::PySliceIndices::new(0,                a.len()      as isize, 1))?;
-        let high = result.inner.get_slice(&types::PySliceIndices::new(a.len() as isize, result.len() as isize, 1))?;
-        
-        Ok((crate::Binary::from_parts(low, "unsigned".into()), crate::Binary::from_parts(high, "unsigned".into())))
+        let product = product(&a.inner, &b.inner);
+
+        let low  = mul_words::shr(&product, 0,       words(a.len()));
+        let high = mul_words::shr(&product, a.len(), words(b.len()));
+
+        Ok((BinaryBase::from_blocks(&low, a.len(), SignBehavior::Unsigned).into(), BinaryBase::from_blocks(&high, b.len(), SignBehavior::Unsigned).into()))
     }
     /// same as multiply but returns truncated to a.len()
     pub fn wrapping_mul(a: &crate::Binary, b: &crate::Binary) -> PyResult<crate::Binary> {
-        let (result, _) = overflowing_mul(a, b)?;
-        
-        Ok(result)
+        // only low half is computed, `Bu*2^la` correction does not affect it
+        let (a_blocks, b_blocks) = (a.inner.blocks(), b.inner.blocks());
+        let len = words(a.len());
+
+        let mut low = mul_words::low(&a_blocks, &b_blocks, len);
+
+        if b.sign_extending_bit() {
+            mul_words::sub_into(&mut low, &mul_words::shl(&a_blocks, b.len(), len));
+        }
+
+        Ok(BinaryBase::from_blocks(&low, a.len(), SignBehavior::Unsigned).into())
     }
 }
 
 
-#[pyfunction]
-pub fn multiply(a: &crate::Binary, b: &crate::Binary) -> PyResult<PyObject> {
-    Ok(base_mul::multiply(a, b)?.into())
+#[pyfunction("*", out = "None")]
+pub fn multiply(a: PyRef<crate::Binary>, b: PyRef<crate::Binary>, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+    let result = base_mul::multiply(&a, &b)?;
+    drop((a, b));
+
+    crate::Binary::wrap_out(Ok(result.inner), out)
 }
 
 #[pyfunction]
 pub fn overflowing_mul(a: &crate::Binary, b: &crate::Binary) -> PyResult<(PyObject, PyObject)> {
     let (low, high) = base_mul::overflowing_mul(a, b)?;
-    
+
     Ok((low.into(), high.into()))
 }
 
-#[pyfunction]
-pub fn wrapping_mul(a: &crate::Binary, b: &crate::Binary) -> PyResult<PyObject> {
-    let result = base_mul::wrapping_mul(a, b)?;
-    
-    Ok(result.into())
+#[pyfunction("*", out = "None")]
+pub fn wrapping_mul(a: PyRef<crate::Binary>, b: PyRef<crate::Binary>, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+    let result = base_mul::wrapping_mul(&a, &b)?;
+    drop((a, b));
+
+    crate::Binary::wrap_out(Ok(result.inner), out)
 }
 
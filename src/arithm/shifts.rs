@@ -1,14 +1,77 @@
 use pyo3::{prelude::*};
 use pyo3::exceptions::PyTypeError;
 
-mod shifts_base 
+use crate::binary;
+
+pub mod shifts_base 
 {
-    use std::convert::TryInto;
+    use pyo3::{exceptions::PyValueError, PyResult};
+
+    use crate::binary::{BinaryBase, SignBehavior};
+
+    /// Returns 32 bits of `a` starting at bit `pos`. Bits below zero are zeros, bits past the end are `fill`
+    #[inline(always)]
+    fn block_at(a: &BinaryBase, pos: i64, fill: bool) -> u32
+    {
+        if pos <= -32 {
+            0
+        } else if pos < 0 {
+            a.extended_block(0, fill) << (-pos)
+        } else {
+            let (block, offset) = ((pos / 32) as usize, (pos % 32) as u32);
+            let low = a.extended_block(block, fill);
+
+            if offset == 0 { low } else { (low >> offset) | (a.extended_block(block + 1, fill) << (32 - offset)) }
+        }
+    }
+
+    /// Returns `len` bits of `a` starting at bit `start` as blocks, neighboring blocks are stitched together
+    /// so it costs one step per output block. Bits below zero are zeros, bits past the end are `fill`
+    fn window(a: &BinaryBase, start: i64, len: usize, fill: bool) -> Vec<u32>
+    {
+        (0..(len + 31) / 32).map(|i| block_at(a, start + 32 * i as i64, fill)).collect()
+    }
 
-    use bv::Bits;
-    use pyo3::{exceptions::PyValueError, PyResult, types::PySliceIndices};
+    fn or_blocks(mut a: Vec<u32>, b: &[u32]) -> Vec<u32>
+    {
+        for (x, y) in a.iter_mut().zip(b) {
+            *x |= *y;
+        }
+        a
+    }
 
-    use crate::binary::BinaryBase;
+    pub fn shift_value(_b: &BinaryBase) -> PyResult<i64>
+    {
+        let shift: i64 = _b.into();
+
+        if shift < 0 {
+            Err(PyValueError::new_err("negative shift value"))
+        } else {
+            Ok(shift)
+        }
+    }
+
+    /// `a <<= shift` computed in memory of `a` (result is unsigned like `wrapping_lsh`).
+    /// Blocks are written from the highest one so source blocks are read before they are overwritten
+    pub fn lsh_assign(a: &mut BinaryBase, shift: i64)
+    {
+        for i in (0..a.data.block_len()).rev() {
+            let block = block_at(a, 32 * i as i64 - shift, false);
+            a.set_block_masked(i, block);
+        }
+        a.sign_behavior = SignBehavior::Unsigned;
+    }
+
+    /// `a >>= shift` computed in memory of `a`, freed bits are set to `fill` (result is unsigned like `*_wrapping_rsh`).
+    /// Blocks are written from the lowest one so source blocks are read before they are overwritten
+    pub fn rsh_assign(a: &mut BinaryBase, shift: i64, fill: bool)
+    {
+        for i in 0..a.data.block_len() {
+            let block = block_at(a, 32 * i as i64 + shift, fill);
+            a.set_block_masked(i, block);
+        }
+        a.sign_behavior = SignBehavior::Unsigned;
+    }
 
     pub fn overflowing_lsh(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<(BinaryBase, BinaryBase)>
     {
@@ -17,121 +80,108 @@ mod shifts_base
         //              10
         // 1010 << 2  ->  1000
 
-        let shift: i64 = _b.into();
-        
-        if shift < 0 
-        {
-            Err(PyValueError::new_err("negative shift value"))
-        } 
-        else 
-        {
-            let mut result = bv::BitVec::<u32>::with_capacity(_a.len());
-            let clamped_shift = shift.clamp(0, _a.len().try_into().unwrap());
-
-            for _ in 0..clamped_shift {
-                result.push(false);
-            }
-            let size = _a.len() as i64 - clamped_shift;
-
-            for i in 0..size {
-                result.push(_a.data.get_bit(i as u64));
-            }
-            let carry_start = _a.len() as i64 - shift;
-            let carry_end = carry_start + shift;
-            
-            let carry = if carry_start >= 0 {
-                _a.get_slice(&PySliceIndices::new(carry_start.try_into().unwrap(), carry_end.try_into().unwrap(), 1))?
-            } else {
-                let mut c = _a.clone();
-                c.prepend_slice(&bv::BitVec::new_fill(false, carry_start.abs().try_into().unwrap()));
-                c.data
-            };
-            Ok((BinaryBase::from_data(result), BinaryBase::from_data(carry)))
-        }
+        let shift = shift_value(_b)?;
+        let len = _a.len_usize();
+
+        let result = window(_a, -shift, len, false);
+        let carry = window(_a, len as i64 - shift, shift as usize, false);
+
+        Ok((BinaryBase::from_blocks(&result, len, SignBehavior::Unsigned), BinaryBase::from_blocks(&carry, shift as usize, SignBehavior::Unsigned)))
     }
 
     pub fn wrapping_lsh(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<BinaryBase>
     {
-        let (shift, _) = overflowing_lsh(_a, _b)?;
+        let shift = shift_value(_b)?;
+        let len = _a.len_usize();
 
-        Ok(shift)
+        Ok(BinaryBase::from_blocks(&window(_a, -shift, len, false), len, SignBehavior::Unsigned))
     }
 
-    pub fn logical_underflowing_rsh(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<(BinaryBase, BinaryBase)>
+    fn underflowing_rsh(_a: &BinaryBase, shift: i64, fill: bool) -> (BinaryBase, BinaryBase)
     {
-        let shift: i64 = _b.into();
+        let len = _a.len_usize();
 
-        if shift < 0 
-        {
-            Err(PyValueError::new_err("negative shift value"))
-        } 
-        else 
-        {
-            let mut result = bv::BitVec::<u32>::with_capacity(_a.len());
-            let clamped_shift = shift.clamp(0, _a.len().try_into().unwrap());
-            let len = _a.len() as i64;
-            
-            for i in clamped_shift..len {
-                result.push(_a.data.get_bit(i as u64));
-            }
-
-            for _ in 0..clamped_shift {
-                result.push(false);
-            }
-
-            let carry_start = 0;
-            let carry_end = shift;
-
-            let carry = _a.get_slice(&PySliceIndices::new(carry_start.try_into().unwrap(), carry_end.try_into().unwrap(), 1))?;
-        
-            Ok((BinaryBase::from_data(result), BinaryBase::from_data(carry)))
-        }
+        let result = window(_a, shift, len, fill);
+        let carry = window(_a, 0, shift as usize, _a.sign_extending_bit());
+
+        (BinaryBase::from_blocks(&result, len, SignBehavior::Unsigned), BinaryBase::from_blocks(&carry, shift as usize, SignBehavior::Unsigned))
+    }
+
+    pub fn logical_underflowing_rsh(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<(BinaryBase, BinaryBase)>
+    {
+        Ok(underflowing_rsh(_a, shift_value(_b)?, false))
     }
 
     pub fn logical_wrapping_rsh(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<BinaryBase>
     {
-        let (shift, _) = logical_underflowing_rsh(_a, _b)?;
+        let shift = shift_value(_b)?;
+        let len = _a.len_usize();
 
-        Ok(shift)
+        Ok(BinaryBase::from_blocks(&window(_a, shift, len, false), len, SignBehavior::Unsigned))
     }
 
     pub fn arithmetic_underflowing_rsh(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<(BinaryBase, BinaryBase)>
     {
-        let shift: i64 = _b.into();
-
-        if shift < 0 
-        {
-            Err(PyValueError::new_err("negative shift value"))
-        } 
-        else 
-        {
-            let mut result = bv::BitVec::<u32>::with_capacity(_a.len());
-            let clamped_shift = shift.clamp(0, _a.len().try_into().unwrap());
-            let len = _a.len() as i64;
-            
-            for i in clamped_shift..len {
-                result.push(_a.data.get_bit(i as u64));
-            }
-
-            let se = _a.sign_extending_bit();
-            for _ in 0..clamped_shift {
-                result.push(se);
-            }
-
-            let carry_start = 0;
-            let carry_end = shift;
-
-            let carry = _a.get_slice(&PySliceIndices::new(carry_start.try_into().unwrap(), carry_end.try_into().unwrap(), 1))?;
-        
-            Ok((BinaryBase::from_data(result), BinaryBase::from_data(carry)))
-        }
+        Ok(underflowing_rsh(_a, shift_value(_b)?, _a.sign_extending_bit()))
     }
 
     pub fn arithmetic_wrapping_rsh(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<BinaryBase>
     {
-        let (shift, _) = arithmetic_underflowing_rsh(_a, _b)?;
+        let shift = shift_value(_b)?;
+        let len = _a.len_usize();
+
+        Ok(BinaryBase::from_blocks(&window(_a, shift, len, _a.sign_extending_bit()), len, SignBehavior::Unsigned))
+    }
+
+    /// Shifts `_a` left and fills freed bits with the highest bits of `_hi`. (high half of `concat(_a, _hi) << shift`)
+    pub fn funnel_lsh(_a: &BinaryBase, _hi: &BinaryBase, shift: i64) -> BinaryBase
+    {
+        //                         0110
+        // 1010 << 2 (from 0110) -> 1001
+
+        let len = _a.len_usize();
+
+        let shifted = window(_a, -shift, len, false);
+        let shifted_in = window(_hi, _hi.len() as i64 - shift, len, false);
+
+        BinaryBase::from_blocks(&or_blocks(shifted, &shifted_in), len, SignBehavior::Unsigned)
+    }
+
+    /// Shifts `_a` right and fills freed bits with the lowest bits of `_lo`. (low half of `concat(_lo, _a) >> shift`)
+    pub fn funnel_rsh(_a: &BinaryBase, _lo: &BinaryBase, shift: i64) -> BinaryBase
+    {
+        //                         0110
+        // 1010 >> 2 (from 0110) -> 1010
 
-        Ok(shift)
+        let len = _a.len_usize();
+
+        let shifted = window(_a, shift, len, false);
+        let shifted_in = window(_lo, shift - len as i64, len, false);
+
+        BinaryBase::from_blocks(&or_blocks(shifted, &shifted_in), len, SignBehavior::Unsigned)
+    }
+
+    pub fn rotate_left(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<BinaryBase>
+    {
+        let shift = shift_value(_b)?;
+        let len = _a.len().max(1) as i64;
+
+        Ok(funnel_lsh(_a, _a, shift % len))
+    }
+
+    pub fn rotate_right(_a: &BinaryBase, _b: &BinaryBase) -> PyResult<BinaryBase>
+    {
+        let shift = shift_value(_b)?;
+        let len = _a.len().max(1) as i64;
+
+        Ok(funnel_rsh(_a, _a, shift % len))
+    }
+
+    pub fn funnel_shift(_a: &BinaryBase, _other: &BinaryBase, _b: &BinaryBase, left: bool) -> PyResult<BinaryBase>
+    {
+        let shift = shift_value(_b)?;
+
+        Ok(if left { funnel_lsh(_a, _other, shift) } else { funnel_rsh(_a, _other, shift) })
     }
 }
 
@@ -148,11 +198,11 @@ pub fn overflowing_lsh(_a: &crate::Binary, other: &PyAny) -> PyResult<(crate::Bi
         return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
     }?;
 
-    Ok((crate::Binary { inner: result }, crate::Binary { inner: carry } ))
+    Ok((result.into(), carry.into()))
 }
 
-#[pyfunction]
-pub fn wrapping_lsh(_a: &crate::Binary, other: &PyAny) -> PyResult<crate::Binary>
+#[pyfunction("*", out = "None")]
+pub fn wrapping_lsh(_a: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject>
 {
     let result = if let Ok(_b) = other.extract::<PyRef<crate::Binary>>() {   
         shifts_base::wrapping_lsh(&_a.inner, &_b.inner)
@@ -162,7 +212,9 @@ pub fn wrapping_lsh(_a: &crate::Binary, other: &PyAny) -> PyResult<crate::Binary
         return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
     }?;
 
-    Ok(crate::Binary { inner: result })
+    drop(_a);
+
+    crate::Binary::wrap_out(Ok(result), out)
 }
 
 #[pyfunction]
@@ -176,11 +228,11 @@ pub fn logical_underflowing_rsh(_a: &crate::Binary, other: &PyAny) -> PyResult<(
         return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
     }?;
 
-    Ok((crate::Binary { inner: result }, crate::Binary { inner: carry } ))
+    Ok((result.into(), carry.into()))
 }
 
-#[pyfunction]
-pub fn logical_wrapping_rsh(_a: &crate::Binary, other: &PyAny) -> PyResult<crate::Binary>
+#[pyfunction("*", out = "None")]
+pub fn logical_wrapping_rsh(_a: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject>
 {
     let result = if let Ok(_b) = other.extract::<PyRef<crate::Binary>>() {   
         shifts_base::logical_wrapping_rsh(&_a.inner, &_b.inner)
@@ -190,7 +242,9 @@ pub fn logical_wrapping_rsh(_a: &crate::Binary, other: &PyAny) -> PyResult<crate
         return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
     }?;
 
-    Ok(crate::Binary { inner: result })
+    drop(_a);
+
+    crate::Binary::wrap_out(Ok(result), out)
 }
 
 #[pyfunction]
@@ -204,11 +258,11 @@ pub fn arithmetic_underflowing_rsh(_a: &crate::Binary, other: &PyAny) -> PyResul
         return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
     }?;
 
-    Ok((crate::Binary { inner: result }, crate::Binary { inner: carry } ))
+    Ok((result.into(), carry.into()))
 }
 
-#[pyfunction]
-pub fn arithmetic_wrapping_rsh(_a: &crate::Binary, other: &PyAny) -> PyResult<crate::Binary>
+#[pyfunction("*", out = "None")]
+pub fn arithmetic_wrapping_rsh(_a: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject>
 {
     let result = if let Ok(_b) = other.extract::<PyRef<crate::Binary>>() {   
         shifts_base::arithmetic_wrapping_rsh(&_a.inner, &_b.inner)
@@ -218,5 +272,78 @@ pub fn arithmetic_wrapping_rsh(_a: &crate::Binary, other: &PyAny) -> PyResult<cr
         return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
     }?;
 
-    Ok(crate::Binary { inner: result })
+    drop(_a);
+
+    crate::Binary::wrap_out(Ok(result), out)
+}
+
+#[pyfunction("*", out = "None")]
+pub fn rotate_left(_a: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject>
+{
+    let result = if let Ok(_b) = other.extract::<PyRef<crate::Binary>>() {   
+        shifts_base::rotate_left(&_a.inner, &_b.inner)
+    } else if let Ok(_b) = crate::Binary::from(other, None, Some("unsigned")) {
+        shifts_base::rotate_left(&_a.inner, &_b.inner)
+    } else {
+        return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
+    }?;
+
+    drop(_a);
+
+    crate::Binary::wrap_out(Ok(result), out)
+}
+
+#[pyfunction("*", out = "None")]
+pub fn rotate_right(_a: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject>
+{
+    let result = if let Ok(_b) = other.extract::<PyRef<crate::Binary>>() {   
+        shifts_base::rotate_right(&_a.inner, &_b.inner)
+    } else if let Ok(_b) = crate::Binary::from(other, None, Some("unsigned")) {
+        shifts_base::rotate_right(&_a.inner, &_b.inner)
+    } else {
+        return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
+    }?;
+
+    drop(_a);
+
+    crate::Binary::wrap_out(Ok(result), out)
+}
+
+fn funnel_shift(_a: &crate::Binary, source: &PyAny, shift: &PyAny, left: bool) -> PyResult<binary::BinaryBase>
+{
+    let source = if let Ok(source) = source.extract::<PyRef<crate::Binary>>() {
+        source.inner.clone()
+    } else if let Ok(source) = crate::Binary::from(source, Some(_a.len()), Some(_a.sign_behavior())) {
+        source.inner
+    } else {
+        return Err(PyTypeError::new_err(format!("Invalid type {}", source)));
+    };
+
+    let result = if let Ok(_b) = shift.extract::<PyRef<crate::Binary>>() {   
+        shifts_base::funnel_shift(&_a.inner, &source, &_b.inner, left)
+    } else if let Ok(_b) = crate::Binary::from(shift, None, Some("unsigned")) {
+        shifts_base::funnel_shift(&_a.inner, &source, &_b.inner, left)
+    } else {
+        return Err(PyTypeError::new_err(format!("Invalid type {}", shift)));
+    }?;
+
+    Ok(result)
+}
+
+#[pyfunction("*", out = "None")]
+pub fn funnel_lsh(_a: PyRef<crate::Binary>, source: &PyAny, shift: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject>
+{
+    let result = funnel_shift(&_a, source, shift, true);
+    drop(_a);
+
+    crate::Binary::wrap_out(result, out)
+}
+
+#[pyfunction("*", out = "None")]
+pub fn funnel_rsh(_a: PyRef<crate::Binary>, source: &PyAny, shift: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject>
+{
+    let result = funnel_shift(&_a, source, shift, false);
+    drop(_a);
+
+    crate::Binary::wrap_out(result, out)
 }
@@ -7,7 +7,7 @@ use super::bitwise::bitwise_base;
 use super::flags::*;
 use super::utility::pad;
 
-fn base_sub_binary(a: &BinaryBase, b: &BinaryBase) -> PyResult<(BinaryBase, Flags)> 
+pub fn base_sub_binary(a: &BinaryBase, b: &BinaryBase) -> PyResult<(BinaryBase, Flags)> 
 {
     let len = Ord::max(a.len(), b.len());
     let a_signed = pad(a, len.try_into().unwrap(), a.sign_extending_bit());
@@ -16,46 +16,39 @@ fn base_sub_binary(a: &BinaryBase, b: &BinaryBase) -> PyResult<(BinaryBase, Flag
     add_binary(&a_signed, Some(&b_signed), true)
 }
 
-fn base_flaged_sub_binary(left: &crate::Binary, right: &crate::Binary, py: &Python) -> PyResult<(PyObject, Flags)>
-{
-    let (out, flags) = base_sub_binary(&left.inner, &right.inner)?;
-    
-    crate::Binary::wrap_object_gil(Ok(out), py).and_then(|x| Ok((x, flags)))
-}
-
-fn base_sub(binary: PyRef<crate::Binary>, other: &PyAny, py: &Python) -> PyResult<(PyObject, Flags)> {
+fn base_sub(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<(BinaryBase, Flags)> {
     let _a = binary;
     
     if let Ok(_b) = other.extract::<PyRef<crate::Binary>>() {   
-        base_flaged_sub_binary(&_a, &_b, &py)
+        base_sub_binary(&_a.inner, &_b.inner)
     } else if let Ok(_b) = crate::Binary::from(other, Some(_a.len().try_into().unwrap()), Some(_a.sign_behavior())) {
-        base_flaged_sub_binary(&_a, &_b, &py)
+        base_sub_binary(&_a.inner, &_b.inner)
     } else {
         return Err(PyTypeError::new_err(format!("Invalid type {}", other)));
     }
 }
 
-#[pyfunction]
-pub fn flaged_sub(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<(PyObject, PyObject)> {
-    Python::with_gil(|py| {
-        let (sum, flags) = base_sub(binary, other, &py)?;
+#[pyfunction("*", out = "None")]
+pub fn flaged_sub(binary: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<(PyObject, PyObject)> {
+    let (sum, flags) = base_sub(binary, other)?;
 
-        Ok((sum, flags.into_py(py)))
+    Python::with_gil(|py| {
+        Ok((crate::Binary::wrap_out(Ok(sum), out)?, flags.into_py(py)))
     })
 }
 
-#[pyfunction]
-pub fn overflowing_sub(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<(PyObject, PyObject)> {
-    Python::with_gil(|py| {
-        let (sum, flags) = base_sub(binary, other, &py)?;
+#[pyfunction("*", out = "None")]
+pub fn overflowing_sub(binary: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<(PyObject, PyObject)> {
+    let (sum, flags) = base_sub(binary, other)?;
 
-        Ok((sum, flags.overflow.into_py(py)))
+    Python::with_gil(|py| {
+        Ok((crate::Binary::wrap_out(Ok(sum), out)?, flags.overflow.into_py(py)))
     })
 }
 
-#[pyfunction]
-pub fn wrapping_sub(binary: PyRef<crate::Binary>, other: &PyAny) -> PyResult<PyObject> {
-    let (sum, _) = overflowing_sub(binary, other)?;
+#[pyfunction("*", out = "None")]
+pub fn wrapping_sub(binary: PyRef<crate::Binary>, other: &PyAny, out: Option<&PyCell<crate::Binary>>) -> PyResult<PyObject> {
+    let (sum, _) = overflowing_sub(binary, other, out)?;
 
     Ok(sum)
-}
\ No newline at end of file
+}
@@ -1,69 +1,66 @@
 use std::convert::TryInto;
 
 use bv::BitsPush;
-use pyo3::{prelude::*, exceptions::PyOverflowError, exceptions::PyValueError};
+use pyo3::{prelude::*, exceptions::PyOverflowError};
 use crate::Binary;
-use crate::binary::BinaryBase;
+use crate::binary::{BinaryBase, SignBehavior};
 
 
-pub fn cast_base(binary: &BinaryBase, sign_behavior: &str) -> BinaryBase
+pub fn cast_base(binary: &BinaryBase, sign_behavior: SignBehavior) -> BinaryBase
 {
-    BinaryBase::from_parts(binary.data.clone(), sign_behavior.to_string())
+    // storage is shared with `binary` until one of them is modified
+    BinaryBase { data: binary.data.clone(), sign_behavior }
 }
 
 
-pub fn convert_base(binary: &BinaryBase, sign_behavior: &str) -> PyResult<BinaryBase>
+pub fn convert_base(binary: &BinaryBase, sign_behavior: SignBehavior) -> PyResult<BinaryBase>
 {
     fn to_signed(binary: &BinaryBase) -> PyResult<BinaryBase> 
     {
-        match binary.sign_behavior.as_str() {
-            "unsigned" => {
+        match binary.sign_behavior {
+            SignBehavior::Unsigned => {
                 if binary.sign_bit() {
                     Err(PyOverflowError::new_err(format!("Converstion overflow: value {} is to big to represent as signed", binary.to_string_formatted_default())))
                 } else {
-                    Ok(cast_base(binary, "signed"))
+                    Ok(cast_base(binary, SignBehavior::Signed))
                 }
             },
-            "signed" => Ok(binary.clone()),
-            _ => Err(PyValueError::new_err("Invalid sign behavior"))
+            SignBehavior::Signed => Ok(binary.clone()),
         }
     }
     fn to_unsigned(binary: &BinaryBase) -> PyResult<BinaryBase> 
     {
-        match binary.sign_behavior.as_str() {
-            "unsigned" => Ok(binary.clone()),
-            "signed" => {
+        match binary.sign_behavior {
+            SignBehavior::Unsigned => Ok(binary.clone()),
+            SignBehavior::Signed => {
                 if binary.sign_bit() {
                     Err(PyOverflowError::new_err(format!("Converstion overflow: value {} is negative so it cant be represented as unsigned integer", binary.to_string_formatted_default())))
                 } else {
-                    Ok(cast_base(binary, "signed"))
+                    Ok(cast_base(binary, SignBehavior::Signed))
                 }
             }
-            _ => Err(PyValueError::new_err("Invalid sign behavior"))
         }
     }
 
     match sign_behavior {
-        "signed" => to_signed(binary),
-        "unsigned" => to_unsigned(binary),
-        _ => Err(PyValueError::new_err(format!("Invalid sign behavior: {}", sign_behavior)))
+        SignBehavior::Signed => to_signed(binary),
+        SignBehavior::Unsigned => to_unsigned(binary),
     }
 }
 pub fn extend_to_signed_base(binary: &BinaryBase) -> PyResult<BinaryBase>
 {
-    match binary.sign_behavior.as_str() {
-        "unsigned" => {
+    match binary.sign_behavior {
+        SignBehavior::Unsigned => {
             if binary.sign_bit() {
                 let mut cloned = binary.data.clone();
                 cloned.push_bit(false);
                 //BinaryBase::from_parts(cloned, "signed".into())
-                Ok(BinaryBase::from_parts(cloned, "signed".into()))
+                Ok(BinaryBase { data: cloned, sign_behavior: SignBehavior::Signed })
             } else {
-                Ok(cast_base(binary, "signed"))
+                Ok(cast_base(binary, SignBehavior::Signed))
             }
         },
-        "signed" => Ok(binary.clone()),
-        _ => Err(PyValueError::new_err("Invalid sign behavior"))
+        SignBehavior::Signed => Ok(binary.clone()),
     }
 }
 
@@ -73,20 +70,20 @@ pub fn pad(binary: &BinaryBase, length: usize, bit: bool) -> BinaryBase
     data.resize(length.try_into().unwrap(), bit);
     
     //BinaryBase::from_parts(data, binary.inner.sign_behavior.clone())
-    BinaryBase::from_parts(data, binary.sign_behavior.clone())
+    BinaryBase { data, sign_behavior: binary.sign_behavior }
 }
 
 
 #[pyfunction]
 pub fn cast(binary: &Binary, sign_behavior: &str) -> PyResult<PyObject>
 {
-    Binary::wrap_object(Ok(cast_base(&binary.inner, sign_behavior)))
+    Binary::wrap_object(Ok(cast_base(&binary.inner, SignBehavior::parse(sign_behavior)?)))
 }
 
 #[pyfunction]
 pub fn convert(binary: &Binary, sign_behavior: &str) -> PyResult<PyObject>
 {
-    Binary::wrap_object(convert_base(&binary.inner, sign_behavior))
+    Binary::wrap_object(convert_base(&binary.inner, SignBehavior::parse(sign_behavior)?))
 }
 
 #[pyfunction]
@@ -0,0 +1,498 @@
+use pyo3::{prelude::*, types, exceptions};
+use bv::Bits;
+
+use crate::binary::{BinaryBase, SignBehavior};
+
+/// Word-level kernels used by `BinaryArray`. Every element occupies `stride(width)` consecutive `u32` blocks,
+/// bits above `width` in the last block of the element are always kept at zero.
+pub mod array_base {
+    pub fn stride(width: usize) -> usize {
+        (width + 31) / 32
+    }
+
+    /// Mask of used bits in the last block of an element
+    pub fn top_mask(width: usize) -> u32 {
+        match width % 32 {
+            0 => u32::MAX,
+            rem => (1u32 << rem) - 1,
+        }
+    }
+
+    /// Returns `index`-th element of `data`, or the only element if `data` is broadcasted scalar
+    #[inline(always)]
+    fn element(data: &[u32], index: usize, stride: usize, broadcast: bool) -> &[u32] {
+        if broadcast {
+            &data[..stride]
+        } else {
+            &data[index * stride..(index + 1) * stride]
+        }
+    }
+
+    /// Adds `b` to `a` element by element. If `invert` is set `b` is negated bitwise before addition (so with `carry` it performs subtraction).
+    /// Returns sum and carry out of the `width` bit for every element
+    pub fn add(a: &[u32], b: &[u32], broadcast: bool, width: usize, count: usize, invert: bool, carry: bool) -> (Vec<u32>, Vec<bool>) {
+        let stride = stride(width);
+        let mask = top_mask(width);
+        let mut out = vec![0u32; stride * count];
+        let mut overflow = Vec::with_capacity(count);
+
+        for i in 0..count {
+            let a_elem = element(a, i, stride, false);
+            let b_elem = element(b, i, stride, broadcast);
+            let out_elem = &mut out[i * stride..(i + 1) * stride];
+
+            let mut carry = carry;
+            for w in 0..stride {
+                let mut b_block = if invert { !b_elem[w] } else { b_elem[w] };
+                if w + 1 == stride {
+                    b_block &= mask;
+                }
+                let (sum, c1) = a_elem[w].overflowing_add(b_block);
+                let (sum, c2) = sum.overflowing_add(carry as u32);
+                carry = c1 || c2;
+                out_elem[w] = sum;
+            }
+
+            if stride != 0 && mask != u32::MAX {
+                // partial block cannot carry out of u32, carry lands right above the mask
+                carry = out_elem[stride - 1] & !mask != 0;
+                out_elem[stride - 1] &= mask;
+            }
+            overflow.push(carry);
+        }
+
+        (out, overflow)
+    }
+
+    pub fn bitwise(a: &[u32], b: &[u32], broadcast: bool, width: usize, count: usize, op: impl Fn(u32, u32) -> u32) -> Vec<u32> {
+        let stride = stride(width);
+        let mask = top_mask(width);
+        let mut out = vec![0u32; stride * count];
+
+        for i in 0..count {
+            let a_elem = element(a, i, stride, false);
+            let b_elem = element(b, i, stride, broadcast);
+            let out_elem = &mut out[i * stride..(i + 1) * stride];
+
+            for w in 0..stride {
+                out_elem[w] = op(a_elem[w], b_elem[w]);
+            }
+            if stride != 0 {
+                out_elem[stride - 1] &= mask;
+            }
+        }
+        out
+    }
+
+    /// Returns `k`-th block of the element as if it was extended infinitely to the left with `fill`
+    #[inline(always)]
+    fn extended_block(elem: &[u32], k: usize, mask: u32, fill: bool) -> u32 {
+        let fill_block = if fill { u32::MAX } else { 0 };
+        if k + 1 < elem.len() {
+            elem[k]
+        } else if k + 1 == elem.len() {
+            elem[k] | (fill_block & !mask)
+        } else {
+            fill_block
+        }
+    }
+
+    /// Left shift of a single element, bits shifted out of `width` are discarded
+    pub fn shl_element(elem: &[u32], shift: usize, width: usize, out: &mut [u32]) {
+        let shift = shift.min(width);
+        let (word_shift, bit_shift) = (shift / 32, (shift % 32) as u32);
+
+        for i in (0..elem.len()).rev() {
+            let low = if i >= word_shift { elem[i - word_shift] } else { 0 };
+            let prev = if i >= word_shift + 1 { elem[i - word_shift - 1] } else { 0 };
+
+            out[i] = if bit_shift == 0 { low } else { (low << bit_shift) | (prev >> (32 - bit_shift)) };
+        }
+        if !out.is_empty() {
+            let last = out.len() - 1;
+            out[last] &= top_mask(width);
+        }
+    }
+
+    /// Right shift of a single element, bits from left are filled with `fill`
+    pub fn shr_element(elem: &[u32], shift: usize, width: usize, fill: bool, out: &mut [u32]) {
+        let mask = top_mask(width);
+        let shift = shift.min(width);
+        let (word_shift, bit_shift) = (shift / 32, (shift % 32) as u32);
+
+        for i in 0..elem.len() {
+            let low = extended_block(elem, i + word_shift, mask, fill);
+            let high = extended_block(elem, i + word_shift + 1, mask, fill);
+
+            out[i] = if bit_shift == 0 { low } else { (low >> bit_shift) | (high << (32 - bit_shift)) };
+        }
+        if !out.is_empty() {
+            let last = out.len() - 1;
+            out[last] &= mask;
+        }
+    }
+
+    /// Returns most significant bit of every element (`width-1`-th bit)
+    pub fn sign_bits(data: &[u32], width: usize, count: usize) -> Vec<bool> {
+        if width == 0 {
+            return vec![false; count];
+        }
+        let stride = stride(width);
+        let bit = (width - 1) % 32;
+        (0..count).map(|i| (data[i * stride + stride - 1] >> bit) & 1 == 1).collect()
+    }
+
+    pub fn zero_bits(data: &[u32], width: usize, count: usize) -> Vec<bool> {
+        let stride = stride(width);
+        (0..count).map(|i| data[i * stride..(i + 1) * stride].iter().all(|w| *w == 0)).collect()
+    }
+
+    /// Packs booleans into blocks (first boolean is the lowest bit of the first block)
+    pub fn pack_bools(bits: &[bool]) -> Vec<u32> {
+        let mut out = vec![0u32; (bits.len() + 31) / 32];
+        for (i, bit) in bits.iter().enumerate() {
+            if *bit {
+                out[i / 32] |= 1 << (i % 32);
+            }
+        }
+        out
+    }
+}
+
+/// Column of fixed-width binary numbers stored in one contiguous buffer.
+/// All operations are performed element by element in single native call.
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct BinaryArray
+{
+    data: Vec<u32>,
+    count: usize,
+    width: usize,
+    sign_behavior: SignBehavior,
+}
+
+/// Per-element flags of `BinaryArray` operations. Each flag is `Binary` mask with one bit per element.
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct ArrayFlags
+{
+    overflow: BinaryBase,
+    zeroflag: BinaryBase,
+    signflag: BinaryBase,
+}
+
+impl ArrayFlags {
+    fn from_array(overflow: &[bool], array: &BinaryArray) -> Self {
+        Self {
+            overflow: BinaryArray::mask(overflow),
+            zeroflag: BinaryArray::mask(&array_base::zero_bits(&array.data, array.width, array.count)),
+            signflag: BinaryArray::mask(&array_base::sign_bits(&array.data, array.width, array.count)),
+        }
+    }
+}
+
+#[pymethods]
+impl ArrayFlags {
+    pub fn __repr__(&self) -> String {
+        format!("ArrayFlags(of={}, zf={}, sf={})", self.overflow.to_string_bin(false), self.zeroflag.to_string_bin(false), self.signflag.to_string_bin(false))
+    }
+    #[getter]
+    pub fn overflow(&self) -> PyResult<PyObject> {
+        crate::Binary::wrap_object(Ok(self.overflow.clone()))
+    }
+    #[getter]
+    pub fn zeroflag(&self) -> PyResult<PyObject> {
+        crate::Binary::wrap_object(Ok(self.zeroflag.clone()))
+    }
+    #[getter]
+    pub fn signflag(&self) -> PyResult<PyObject> {
+        crate::Binary::wrap_object(Ok(self.signflag.clone()))
+    }
+}
+
+impl BinaryArray
+{
+    pub fn zeroed(count: usize, width: usize, sign_behavior: &str) -> PyResult<Self> {
+        Ok(Self {
+            data: vec![0u32; array_base::stride(width) * count],
+            count,
+            width,
+            sign_behavior: SignBehavior::parse(sign_behavior)?,
+        })
+    }
+
+    fn with_data(&self, data: Vec<u32>) -> Self {
+        Self { data, count: self.count, width: self.width, sign_behavior: self.sign_behavior }
+    }
+
+    fn stride(&self) -> usize {
+        array_base::stride(self.width)
+    }
+
+    fn mask(bits: &[bool]) -> BinaryBase {
+        BinaryBase::from_blocks(&array_base::pack_bools(bits), bits.len(), SignBehavior::Unsigned)
+    }
+
+    fn flatten_index(&self, index: isize) -> PyResult<usize> {
+        let flatten = if index < 0 { index + self.count as isize } else { index };
+
+        if flatten < 0 || flatten as usize >= self.count {
+            return Err(exceptions::PyIndexError::new_err(format!("Index out of range: {}", index)));
+        }
+        Ok(flatten as usize)
+    }
+
+    pub fn get(&self, index: usize) -> BinaryBase {
+        let stride = self.stride();
+        BinaryBase::from_blocks(&self.data[index * stride..(index + 1) * stride], self.width, self.sign_behavior)
+    }
+
+    /// Stores any Binary-convertable value at `index`. Value has to fit in `width` bits
+    pub fn set(&mut self, index: usize, value: &PyAny) -> PyResult<()> {
+        let stride = self.stride();
+        let value = crate::Binary::from(value, Some(self.width), Some(self.sign_behavior.as_str()))?;
+
+        for (k, block) in self.data[index * stride..(index + 1) * stride].iter_mut().enumerate() {
+            *block = value.inner.data.get_block(k);
+        }
+        Ok(())
+    }
+
+    /// Calls `f` with raw blocks of the operand and flag indicating if it should be broadcasted.
+    /// `other` can be `BinaryArray` with same lenght and width or anything that can be converted to the element.
+    fn with_operand<R>(&self, other: &PyAny, f: impl FnOnce(&[u32], bool) -> PyResult<R>) -> PyResult<R> {
+        if let Ok(other) = other.extract::<PyRef<BinaryArray>>() {
+            if other.count != self.count || other.width != self.width {
+                return Err(exceptions::PyValueError::new_err(format!("Shape mismatch: {}x{} and {}x{}", self.count, self.width, other.count, other.width)));
+            }
+            return f(&other.data, false);
+        }
+
+        let scalar = crate::Binary::from(other, Some(self.width), Some(self.sign_behavior.as_str()))?;
+        let blocks = (0..self.stride()).map(|k| scalar.inner.data.get_block(k)).collect::<Vec<_>>();
+
+        f(&blocks, true)
+    }
+
+    fn check_same_sign_behavior(&self, other: &PyAny) -> PyResult<()> {
+        if let Ok(other) = other.extract::<PyRef<BinaryArray>>() {
+            if other.sign_behavior != self.sign_behavior {
+                return Err(exceptions::PyValueError::new_err("Sign behavior mismatch, try casting one value"));
+            }
+        }
+        Ok(())
+    }
+
+    fn add_base(&self, other: &PyAny, invert: bool, carry: bool) -> PyResult<(Self, Vec<bool>)> {
+        self.check_same_sign_behavior(other)?;
+
+        let (data, overflow) = self.with_operand(other, |blocks, broadcast| {
+            Ok(array_base::add(&self.data, blocks, broadcast, self.width, self.count, invert, carry))
+        })?;
+
+        Ok((self.with_data(data), overflow))
+    }
+
+    fn bitwise_base(&self, other: &PyAny, op: impl Fn(u32, u32) -> u32) -> PyResult<Self> {
+        let data = self.with_operand(other, |blocks, broadcast| {
+            Ok(array_base::bitwise(&self.data, blocks, broadcast, self.width, self.count, op))
+        })?;
+
+        Ok(self.with_data(data))
+    }
+
+    fn shift_base(&self, shift: usize, left: bool, arithmetic: bool) -> Self {
+        let stride = self.stride();
+        let mut data = vec![0u32; self.data.len()];
+        let signs = if arithmetic && self.sign_behavior.is_signed() {
+            array_base::sign_bits(&self.data, self.width, self.count)
+        } else {
+            vec![false; self.count]
+        };
+
+        for i in 0..self.count {
+            let elem = &self.data[i * stride..(i + 1) * stride];
+            let out = &mut data[i * stride..(i + 1) * stride];
+
+            if left {
+                array_base::shl_element(elem, shift, self.width, out);
+            } else {
+                array_base::shr_element(elem, shift, self.width, signs[i], out);
+            }
+        }
+        self.with_data(data)
+    }
+}
+
+#[pymethods]
+impl BinaryArray
+{
+    #[new]
+    #[args(sign_behavior = "None")]
+    fn py_new(values: &PyAny, width: usize, sign_behavior: Option<&str>) -> PyResult<Self>
+    {
+        let values = values.iter()?.collect::<PyResult<Vec<_>>>()?;
+        let mut array = Self::zeroed(values.len(), width, sign_behavior.unwrap_or("unsigned"))?;
+
+        for (i, value) in values.into_iter().enumerate() {
+            array.set(i, value)?;
+        }
+        Ok(array)
+    }
+
+    /// Creates array of `count` zeros
+    #[staticmethod]
+    #[args(sign_behavior = "None")]
+    fn zeros(count: usize, width: usize, sign_behavior: Option<&str>) -> PyResult<Self> {
+        Self::zeroed(count, width, sign_behavior.unwrap_or("unsigned"))
+    }
+
+    #[getter]
+    pub fn width(&self) -> usize {
+        self.width
+    }
+    #[getter]
+    pub fn sb(&self) -> &'static str {
+        self.sign_behavior.as_str()
+    }
+    pub fn sign_behavior(&self) -> &'static str {
+        self.sign_behavior.as_str()
+    }
+
+    pub fn __len__(&self) -> usize {
+        self.count
+    }
+    pub fn __repr__(&self) -> String {
+        let items = (0..self.count).map(|i| self.get(i).to_string_formatted_default()).collect::<Vec<_>>();
+        format!("BinaryArray([{}], width={}, sign_behavior='{}')", items.join(", "), self.width, self.sign_behavior)
+    }
+    pub fn __getitem__(&self, index: isize) -> PyResult<PyObject> {
+        let index = self.flatten_index(index)?;
+        crate::Binary::wrap_object(Ok(self.get(index)))
+    }
+    pub fn __setitem__(&mut self, index: isize, value: &PyAny) -> PyResult<()> {
+        let index = self.flatten_index(index)?;
+        self.set(index, value)
+    }
+    pub fn __iter__(&self) -> PyResult<PyObject> {
+        Python::with_gil(|py| {
+            let list = types::PyList::new(py, self.tolist()?);
+            Ok(list.call_method0("__iter__")?.into_py(py))
+        })
+    }
+    /// Returns list of `Binary` values
+    pub fn tolist(&self) -> PyResult<Vec<PyObject>> {
+        (0..self.count).map(|i| crate::Binary::wrap_object(Ok(self.get(i)))).collect()
+    }
+
+    // arithmetic
+    pub fn overflowing_add(&self, other: &PyAny) -> PyResult<(Self, PyObject)> {
+        let (sum, overflow) = self.add_base(other, false, false)?;
+        Ok((sum, crate::Binary::wrap_object(Ok(Self::mask(&overflow)))?))
+    }
+    pub fn wrapping_add(&self, other: &PyAny) -> PyResult<Self> {
+        Ok(self.add_base(other, false, false)?.0)
+    }
+    pub fn flaged_add(&self, other: &PyAny) -> PyResult<(Self, ArrayFlags)> {
+        let (sum, overflow) = self.add_base(other, false, false)?;
+        let flags = ArrayFlags::from_array(&overflow, &sum);
+        Ok((sum, flags))
+    }
+    pub fn overflowing_sub(&self, other: &PyAny) -> PyResult<(Self, PyObject)> {
+        let (diff, overflow) = self.add_base(other, true, true)?;
+        Ok((diff, crate::Binary::wrap_object(Ok(Self::mask(&overflow)))?))
+    }
+    pub fn wrapping_sub(&self, other: &PyAny) -> PyResult<Self> {
+        Ok(self.add_base(other, true, true)?.0)
+    }
+    pub fn flaged_sub(&self, other: &PyAny) -> PyResult<(Self, ArrayFlags)> {
+        let (diff, overflow) = self.add_base(other, true, true)?;
+        let flags = ArrayFlags::from_array(&overflow, &diff);
+        Ok((diff, flags))
+    }
+    pub fn arithmetic_neg(&self) -> PyResult<Self> {
+        // ~X + 1
+        let zeros = vec![0u32; self.stride()];
+        let inverted = array_base::bitwise(&self.data, &zeros, true, self.width, self.count, |a, _| !a);
+        let (data, _) = array_base::add(&inverted, &zeros, true, self.width, self.count, false, true);
+        Ok(self.with_data(data))
+    }
+
+    // bitwise
+    pub fn bitwise_and(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_base(other, |a, b| a & b)
+    }
+    pub fn bitwise_or(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_base(other, |a, b| a | b)
+    }
+    pub fn bitwise_xor(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_base(other, |a, b| a ^ b)
+    }
+    pub fn bitwise_nand(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_base(other, |a, b| !(a & b))
+    }
+    pub fn bitwise_nor(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_base(other, |a, b| !(a | b))
+    }
+    pub fn bitwise_xnor(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_base(other, |a, b| !(a ^ b))
+    }
+    pub fn bitwise_not(&self) -> PyResult<Self> {
+        let zeros = vec![0u32; self.stride()];
+        let data = array_base::bitwise(&self.data, &zeros, true, self.width, self.count, |a, _| !a);
+        Ok(self.with_data(data))
+    }
+
+    // shifts
+    pub fn wrapping_lsh(&self, shift: usize) -> Self {
+        self.shift_base(shift, true, false)
+    }
+    pub fn logical_wrapping_rsh(&self, shift: usize) -> Self {
+        self.shift_base(shift, false, false)
+    }
+    pub fn arithmetic_wrapping_rsh(&self, shift: usize) -> Self {
+        self.shift_base(shift, false, true)
+    }
+
+    // conversions
+    pub fn cast(&self, sign_behavior: &str) -> PyResult<Self> {
+        Ok(Self { data: self.data.clone(), count: self.count, width: self.width, sign_behavior: SignBehavior::parse(sign_behavior)? })
+    }
+    pub fn convert(&self, sign_behavior: &str) -> PyResult<Self> {
+        if self.sign_behavior != SignBehavior::parse(sign_behavior)? {
+            if let Some(index) = array_base::sign_bits(&self.data, self.width, self.count).iter().position(|x| *x) {
+                return Err(exceptions::PyOverflowError::new_err(format!("Converstion overflow: value {} at index {} cannot be represented as {}", self.get(index).to_string_formatted_default(), index, sign_behavior)));
+            }
+        }
+        self.cast(sign_behavior)
+    }
+
+    // operators
+    pub fn __add__(&self, other: &PyAny) -> PyResult<Self> {
+        self.wrapping_add(other)
+    }
+    pub fn __sub__(&self, other: &PyAny) -> PyResult<Self> {
+        self.wrapping_sub(other)
+    }
+    pub fn __and__(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_and(other)
+    }
+    pub fn __or__(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_or(other)
+    }
+    pub fn __xor__(&self, other: &PyAny) -> PyResult<Self> {
+        self.bitwise_xor(other)
+    }
+    pub fn __lshift__(&self, shift: usize) -> Self {
+        self.wrapping_lsh(shift)
+    }
+    pub fn __rshift__(&self, shift: usize) -> Self {
+        self.arithmetic_wrapping_rsh(shift)
+    }
+    pub fn __neg__(&self) -> PyResult<Self> {
+        self.arithmetic_neg()
+    }
+    pub fn __invert__(&self) -> PyResult<Self> {
+        self.bitwise_not()
+    }
+}
@@ -1,20 +1,356 @@
 pub mod reduce;
 pub mod sliceunpack;
+pub mod strided;
+pub mod text;
 
 use std::mem::transmute;
-use std::ops::Range;
+use std::ops::{Deref, DerefMut, Range};
+use std::sync::{Arc, OnceLock};
+use std::sync::atomic::{AtomicU64, Ordering};
 
-use bv::{self, Bits, BitsPush, BitSliceable, BitsExt, BitSliceableMut, BitsMut };
+use bv::{self, Bits, BitsPush, BitSliceable, BitsExt, BitsMut };
 
 use pyo3::{prelude::*, PyResult, types, exceptions};
-use pyo3::types::{IntoPyDict, PySliceIndices};
+use pyo3::types::IntoPyDict;
 
 use reduce::ReduceOps;
 
+/// How the most significant bit is interpreted. Stored as one byte, python side still sees `'unsigned'`/`'signed'` strings
+#[derive(Clone, Copy, PartialEq, Eq, Hash, Debug)]
+#[repr(u8)]
+pub enum SignBehavior {
+    Unsigned,
+    Signed,
+}
+
+impl SignBehavior {
+    pub fn parse(sign_behavior: &str) -> PyResult<Self> {
+        match sign_behavior {
+            "unsigned" => Ok(SignBehavior::Unsigned),
+            "signed" => Ok(SignBehavior::Signed),
+            _ => Err(exceptions::PyValueError::new_err(format!("Invalid sign behavior: {}", sign_behavior))),
+        }
+    }
+    pub fn as_str(&self) -> &'static str {
+        match self {
+            SignBehavior::Unsigned => "unsigned",
+            SignBehavior::Signed => "signed",
+        }
+    }
+    pub fn is_signed(&self) -> bool {
+        *self == SignBehavior::Signed
+    }
+}
+
+impl std::fmt::Display for SignBehavior {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        f.write_str(self.as_str())
+    }
+}
+
 #[derive(Clone, PartialEq, Eq, Hash, Debug)]
 pub struct BinaryBase {
-    pub data: bv::BitVec::<u32>,
-    pub sign_behavior: String,
+    pub data: SharedBits,
+    pub sign_behavior: SignBehavior,
+}
+
+/// Source of `SharedBits::id`, every storage gets unique id when it is created or cloned
+static NEXT_ID: AtomicU64 = AtomicU64::new(0);
+
+/// Values up to this many bits are stored inline (without heap allocation)
+pub const INLINE_BITS: usize = 128;
+
+/// Mask of the lowest `len` bits
+fn low_mask(len: usize) -> u128 {
+    if len >= 128 { u128::MAX } else { (1u128 << len) - 1 }
+}
+
+/// Lowest `len` bits of `value` copied into new vector
+fn inline_to_bitvec(value: u128, len: usize) -> bv::BitVec<u32> {
+    let mut bits = bv::BitVec::<u32>::with_block_capacity((len + 31) / 32);
+    for i in 0..(len + 31) / 32 {
+        bits.push_block((value >> (32 * i)) as u32);
+    }
+    bits.truncate(len as u64);
+    bits
+}
+
+#[derive(Debug)]
+enum Storage {
+    /// At most `INLINE_BITS` bits, bits above `len` are zero. `bits` is built only when vector is borrowed through `Deref`
+    /// and it is dropped on the next write.
+    Inline { value: u128, len: u8, bits: OnceLock<bv::BitVec<u32>> },
+    /// Longer values (and values modified through `DerefMut`), shared between copies
+    Spilled(Arc<bv::BitVec<u32>>),
+}
+
+/// Bits of `BinaryBase`. Values up to `INLINE_BITS` bits are stored inline, longer ones in block storage shared between copies
+/// (storage is cloned on the first write to a shared copy, copy-on-write).
+/// Pinned storage (exported by buffer protocol) is never shared, clones copy it right away.
+///
+/// Reads (`len`, `block_len`, `get_block`, `get_bit`) and simple writes (`set`, `set_block`, `resize`, `truncate`, `push_bit`, `with_blocks_mut`)
+/// work on inline values in place. Other methods of `bv::BitVec` are reached through `Deref` (vector is built once and cached)
+/// and `DerefMut` (value is moved to block storage for good).
+#[derive(Debug)]
+pub struct SharedBits {
+    storage: Storage,
+    pinned: bool,
+    id: u64,
+    generation: u64,
+}
+
+impl SharedBits {
+    fn new(storage: Storage) -> Self {
+        Self { storage, pinned: false, id: NEXT_ID.fetch_add(1, Ordering::Relaxed), generation: 0 }
+    }
+    /// Lowest `len` (at most `INLINE_BITS`) bits of `value` stored inline
+    pub fn inline(value: u128, len: usize) -> Self {
+        assert!(len <= INLINE_BITS, "SharedBits::inline: {} bits do not fit inline", len);
+        Self::new(Storage::Inline { value: value & low_mask(len), len: len as u8, bits: OnceLock::new() })
+    }
+    /// `len` bits taken from raw blocks (first block holds the lowest bits, missing blocks are zero)
+    pub fn from_blocks(blocks: &[u32], len: usize) -> Self {
+        if len <= INLINE_BITS {
+            let value = blocks.iter().take(INLINE_BITS / 32).enumerate().fold(0u128, |value, (i, block)| value | (*block as u128) << (32 * i));
+            return Self::inline(value, len);
+        }
+        let mut data = bv::BitVec::<u32>::with_block_capacity(blocks.len());
+        for block in blocks {
+            data.push_block(*block);
+        }
+        data.resize(len as u64, false);
+
+        Self::new(Storage::Spilled(Arc::new(data)))
+    }
+    /// Changes on every mutable access, so equal stamps mean that bits were not modified in between
+    /// (writes through exported buffers are not tracked)
+    pub fn stamp(&self) -> (u64, u64) {
+        (self.id, self.generation)
+    }
+    /// Moves bits out (they are copied if storage is shared)
+    pub fn into_inner(self) -> bv::BitVec<u32> {
+        match self.storage {
+            Storage::Inline { value, len, bits } => bits.into_inner().unwrap_or_else(|| inline_to_bitvec(value, len as usize)),
+            Storage::Spilled(bits) => Arc::try_unwrap(bits).unwrap_or_else(|bits| (*bits).clone()),
+        }
+    }
+    /// Takes bits out leaving empty vector, unique storage is moved without reallocation
+    pub fn take(&mut self) -> bv::BitVec<u32> {
+        std::mem::replace(&mut **self, bv::BitVec::new())
+    }
+    pub fn set_pinned(&mut self, pinned: bool) {
+        self.pinned = pinned;
+    }
+    /// True if storage is used by other copies
+    pub fn is_shared(&self) -> bool {
+        match &self.storage {
+            Storage::Inline { .. } => false,
+            Storage::Spilled(bits) => Arc::strong_count(bits) > 1,
+        }
+    }
+    /// True if bits are stored inline
+    pub fn is_inline(&self) -> bool {
+        matches!(self.storage, Storage::Inline { .. })
+    }
+    /// Value and length of inline storage prepared for a write (cached vector is dropped), `None` for block storage
+    fn inline_mut(&mut self) -> Option<(&mut u128, &mut u8)> {
+        self.generation = self.generation.wrapping_add(1);
+        match &mut self.storage {
+            Storage::Inline { value, len, bits } => {
+                bits.take();
+                Some((value, len))
+            },
+            Storage::Spilled(_) => None,
+        }
+    }
+    /// `i`-th block with bits past the end cleared
+    fn masked_block(&self, i: usize) -> u32 {
+        self.get_block(i) & crate::utility::used_mask(self.len() as usize, i)
+    }
+
+    pub fn len(&self) -> u64 {
+        match &self.storage {
+            Storage::Inline { len, .. } => *len as u64,
+            Storage::Spilled(bits) => bits.len(),
+        }
+    }
+    pub fn bit_len(&self) -> u64 {
+        self.len()
+    }
+    pub fn block_len(&self) -> usize {
+        match &self.storage {
+            Storage::Inline { len, .. } => (*len as usize + 31) / 32,
+            Storage::Spilled(bits) => bits.block_len(),
+        }
+    }
+    pub fn get_block(&self, position: usize) -> u32 {
+        match &self.storage {
+            Storage::Inline { value, len, .. } => {
+                assert!(position < (*len as usize + 31) / 32, "SharedBits::get_block: out of bounds");
+                (*value >> (32 * position)) as u32
+            },
+            Storage::Spilled(bits) => bits.get_block(position),
+        }
+    }
+    pub fn get_bit(&self, position: u64) -> bool {
+        match &self.storage {
+            Storage::Inline { value, len, .. } => {
+                assert!(position < *len as u64, "SharedBits::get_bit: out of bounds");
+                (*value >> position) & 1 != 0
+            },
+            Storage::Spilled(bits) => bits.get_bit(position),
+        }
+    }
+    pub fn set(&mut self, position: u64, bit: bool) {
+        match self.inline_mut() {
+            Some((value, len)) => {
+                assert!(position < *len as u64, "SharedBits::set: out of bounds");
+                if bit { *value |= 1 << position } else { *value &= !(1 << position) }
+            },
+            None => (**self).set(position, bit),
+        }
+    }
+    /// Stores `block` at `position`, bits past the end are dropped in inline storage
+    pub fn set_block(&mut self, position: usize, block: u32) {
+        match self.inline_mut() {
+            Some((value, len)) => {
+                assert!(position < (*len as usize + 31) / 32, "SharedBits::set_block: out of bounds");
+                let shift = 32 * position;
+                *value = (*value & !((u32::MAX as u128) << shift) | (block as u128) << shift) & low_mask(*len as usize);
+            },
+            None => (**self).set_block(position, block),
+        }
+    }
+    pub fn push_bit(&mut self, bit: bool) {
+        if self.len() < INLINE_BITS as u64 {
+            if let Some((value, len)) = self.inline_mut() {
+                *value |= (bit as u128) << *len;
+                *len += 1;
+                return;
+            }
+        }
+        (**self).push_bit(bit)
+    }
+    /// Shortens to `new_len` bits (longer `new_len` has no effect)
+    pub fn truncate(&mut self, new_len: u64) {
+        if new_len >= self.len() {
+            return;
+        }
+        match self.inline_mut() {
+            Some((value, len)) => {
+                *value &= low_mask(new_len as usize);
+                *len = new_len as u8;
+            },
+            None => (**self).truncate(new_len),
+        }
+    }
+    /// Changes length to `new_len` bits, new bits are set to `fill`. Inline value stays inline if it fits.
+    pub fn resize(&mut self, new_len: u64, fill: bool) {
+        if new_len <= INLINE_BITS as u64 {
+            if let Some((value, len)) = self.inline_mut() {
+                let (old, new) = (*len as usize, new_len as usize);
+
+                *value &= low_mask(new);
+                if fill && new > old {
+                    *value |= low_mask(new) & !low_mask(old);
+                }
+                *len = new as u8;
+                return;
+            }
+        }
+        (**self).resize(new_len, fill)
+    }
+    /// Runs `f` on underlying blocks (bits past the end of the last block are unspecified) without reallocating them
+    pub fn with_blocks_mut<R>(&mut self, f: impl FnOnce(&mut [u32]) -> R) -> R {
+        if let Some((value, len)) = self.inline_mut() {
+            let mut blocks = [0u32; INLINE_BITS / 32];
+            for (i, block) in blocks.iter_mut().enumerate() {
+                *block = (*value >> (32 * i)) as u32;
+            }
+
+            let result = f(&mut blocks[..(*len as usize + 31) / 32]);
+
+            *value = blocks.iter().enumerate().fold(0u128, |value, (i, block)| value | (*block as u128) << (32 * i)) & low_mask(*len as usize);
+            return result;
+        }
+        let len = self.len();
+        let mut blocks = self.take().into_boxed_slice();
+
+        let result = f(&mut blocks);
+
+        **self = bv::BitVec::from(blocks);
+        (**self).truncate(len);
+
+        result
+    }
+}
+
+impl From<bv::BitVec<u32>> for SharedBits {
+    /// Short vectors are stored inline, the vector itself is kept as already built `Deref` target
+    fn from(bits: bv::BitVec<u32>) -> Self {
+        let len = bits.len() as usize;
+        if len > INLINE_BITS {
+            return Self::new(Storage::Spilled(Arc::new(bits)));
+        }
+        let value = (0..bits.block_len()).fold(0u128, |value, i| value | (bits.get_block(i) as u128) << (32 * i));
+
+        Self::new(Storage::Inline { value: value & low_mask(len), len: len as u8, bits: OnceLock::from(bits) })
+    }
+}
+
+impl Clone for SharedBits {
+    fn clone(&self) -> Self {
+        match &self.storage {
+            Storage::Inline { value, len, .. } => Self::new(Storage::Inline { value: *value, len: *len, bits: OnceLock::new() }),
+            Storage::Spilled(bits) if self.pinned => Self::from((**bits).clone()),
+            Storage::Spilled(bits) => Self::new(Storage::Spilled(Arc::clone(bits))),
+        }
+    }
+}
+
+impl Deref for SharedBits {
+    type Target = bv::BitVec<u32>;
+
+    fn deref(&self) -> &Self::Target {
+        match &self.storage {
+            Storage::Inline { value, len, bits } => bits.get_or_init(|| inline_to_bitvec(*value, *len as usize)),
+            Storage::Spilled(bits) => bits,
+        }
+    }
+}
+
+impl DerefMut for SharedBits {
+    fn deref_mut(&mut self) -> &mut Self::Target {
+        self.generation = self.generation.wrapping_add(1);
+        if let Storage::Inline { value, len, bits } = &mut self.storage {
+            let spilled = bits.take().unwrap_or_else(|| inline_to_bitvec(*value, *len as usize));
+            self.storage = Storage::Spilled(Arc::new(spilled));
+        }
+        match &mut self.storage {
+            Storage::Spilled(bits) => Arc::make_mut(bits),
+            Storage::Inline { .. } => unreachable!(),
+        }
+    }
+}
+
+impl PartialEq for SharedBits {
+    fn eq(&self, other: &Self) -> bool {
+        if let (Storage::Spilled(a), Storage::Spilled(b)) = (&self.storage, &other.storage) {
+            return Arc::ptr_eq(a, b) || a == b;
+        }
+        self.len() == other.len() && (0..self.block_len()).all(|i| self.masked_block(i) == other.masked_block(i))
+    }
+}
+
+impl Eq for SharedBits {}
+
+impl std::hash::Hash for SharedBits {
+    fn hash<H: std::hash::Hasher>(&self, state: &mut H) {
+        self.len().hash(state);
+        for i in 0..self.block_len() {
+            self.masked_block(i).hash(state);
+        }
+    }
 }
 
 /// ```txt
@@ -78,19 +414,73 @@ impl BinaryRange
     }
 }
 
+/// First bit and number of elements of slice with `step` over bits `start..end` (negative step goes from `end - 1` down)
+fn strided_elements(start: usize, end: usize, step: isize) -> (usize, usize)
+{
+    let count = (end - start + step.unsigned_abs() - 1) / step.unsigned_abs();
+
+    if step > 0 || count == 0 { (start, count) } else { (end - 1, count) }
+}
+
 impl BinaryBase {
-    pub fn from_parts(data: bv::BitVec::<u32>, sign_behavior: String) -> Self {
+    pub fn from_parts(data: bv::BitVec::<u32>, sign_behavior: SignBehavior) -> Self {
         Self {
-            data,
+            data: data.into(),
             sign_behavior,
         }
     }
     pub fn from_data(data: bv::BitVec::<u32>) -> Self {
         Self {
-            data,
-            sign_behavior: "unsigned".to_string(),
+            data: data.into(),
+            sign_behavior: SignBehavior::Unsigned,
+        }
+    }
+    /// Creates BinaryBase with `len` bits taken from raw blocks (first block holds the lowest bits)
+    pub fn from_blocks(blocks: &[u32], len: usize, sign_behavior: SignBehavior) -> Self {
+        Self {
+            data: SharedBits::from_blocks(blocks, len),
+            sign_behavior,
         }
     }
+    /// Returns copy of underlying blocks (first block holds the lowest bits, unused bits of the last block are zeroed)
+    pub fn blocks(&self) -> Vec<u32> {
+        (0..self.data.block_len()).map(|i| self.data.get_block(i)).collect()
+    }
+    /// Overwrites `self` with `other` reusing already allocated memory
+    pub fn assign(&mut self, other: &BinaryBase) {
+        self.data.resize(other.len(), false);
+        for i in 0..other.data.block_len() {
+            self.data.set_block(i, other.data.get_block(i));
+        }
+        self.sign_behavior = other.sign_behavior;
+    }
+    /// Stores `block` at `i`-th position, bits past the end of the vector are cleared
+    pub fn set_block_masked(&mut self, i: usize, block: u32) {
+        let used = self.len_usize() - 32 * i;
+
+        self.data.set_block(i, if used >= 32 { block } else { block & ((1 << used) - 1) });
+    }
+    /// Returns `i`-th block sign extended with `fill` bit (blocks past the end are filled entirely)
+    pub fn extended_block(&self, i: usize, fill: bool) -> u32 {
+        let fill_block = if fill { u32::MAX } else { 0 };
+
+        if i >= self.data.block_len() {
+            return fill_block;
+        }
+
+        let used = self.len_usize() - 32 * i;
+        let block = self.data.get_block(i);
+
+        if used >= 32 { block } else { block | (fill_block << used) }
+    }
+    /// `count` (at most 64) bits starting at `start` packed into integer, bits past the end are `fill`
+    pub fn get_bits_u64(&self, start: usize, count: usize, fill: bool) -> u64 {
+        let (index, offset) = (start / 32, start % 32);
+        let wide = (0..3).fold(0u128, |wide, i| wide | (self.extended_block(index + i, fill) as u128) << (32 * i));
+
+        let value = (wide >> offset) as u64;
+        if count >= 64 { value } else { value & ((1u64 << count) - 1) }
+    }
 }
 
 // TO_STRING
@@ -105,139 +495,24 @@ impl BinaryBase
     /// ```
     pub fn to_string_symbols(&self, high: u8, low: u8) -> String
     {
-        use reduce::*;
-
-        if self.data.is_empty() {
-            return String::new();
-        }
-        
-        let mut s = Vec::<u8>::with_capacity(self.data.len().try_into().unwrap());
-
-        for bit in IterableBitSlice::new(&self.data.as_slice()).into_iter().rev()
-        {
-            if bit {
-                s.push(high);
-            }
-            else {
-                s.push(low);
-            }
-        }
-        // safty: TODO: check if this is safe, bsc high and low are u8.
-        unsafe { String::from_utf8_unchecked(s) }
-    }
-    /// Returns a string representation of the binary but bits are in reversed order. And uses `high` and `low` as symbols for bit states
-    pub fn to_string_symbols_rev(&self, high: u8, low: u8) -> String
-    {
-        use reduce::*;
-
-        if self.data.is_empty() {
-            return String::new();
-        }
-        
-        let mut s = Vec::<u8>::with_capacity(self.data.len().try_into().unwrap());
-        for bit in IterableBitSlice::new(&self.data).into_iter()
-        {
-            if bit {
-                s.push(high);
-            }
-            else {
-                s.push(low);
-            }
-        }
-        // safty: TODO: check if this is safe, bsc high and low are u8.
-        unsafe { String::from_utf8_unchecked(s) }
+        self.to_string_formatted(&[], high, low, false)
     }
     /// Returns a string representation of the binary in hex. Pads ramaining bits with zeros. if `prefix` is true adds `0x`
     pub fn to_string_hex(&self, prefix: bool) -> String
     {
-        #[inline(always)]
-        fn to_hex(n: u32) -> [u8; 8]
-        {
-            let mut chars = [0 as u8; 8];
-            
-            for i in 0..8
-            {
-                let chunk = n.get_bits(4*i as u64, 4);
-                chars[i] = match chunk {
-                    0 => '0',
-                    1 => '1',
-                    2 => '2',
-                    3 => '3',
-                    4 => '4',
-                    5 => '5',
-                    6 => '6',
-                    7 => '7',
-                    8 => '8',
-                    9 => '9',
-                    10 => 'a',
-                    11 => 'b',
-                    12 => 'c',
-                    13 => 'd',
-                    14 => 'e',
-                    15 => 'f',
-                    _ => unreachable!("Invalid Chunk Value"),
-                } as u8;
-            }
-            chars
-        }
-
-        #[inline(always)]
-        fn push_n(str: &mut Vec<u8>, chars: [u8; 8], n: usize)
-        {
-            for i in (0..n).rev()
-            {
-                str.push(chars[i]);
-            }
-        }
-
-        #[inline(always)]
-        fn push_all(str: &mut Vec<u8>, chars: [u8; 8])
-        {
-            for ch in chars
-            {
-                str.push(ch);
-            }
-        }
-
-        fn div_ceil(a: usize, b: usize) -> usize
-        {
-            (a + b - 1) / b
-        }
-
-        let mut output = Vec::with_capacity(self.len_usize()/4);
-        let data = &self.data;
-        
-        if data.block_len() != 0 
-        {
-            let last_block = data.block_len()-1;
-            let bits_in_last_block = div_ceil(self.len_usize() % 32, 4);
-            let block = data.get_block(last_block);
-            
-            if bits_in_last_block != 0 {
-                push_n(&mut output, to_hex(block), bits_in_last_block);
-            } else {
-                push_all(&mut output, to_hex(block));
-            }
-
-            for i in (0..last_block).rev()
-            {
-                let block = data.get_raw_block(i);
-                push_all(&mut output, to_hex(block));
-            }
-        }
-
-        let output = unsafe{ String::from_utf8_unchecked(output) };
-        
+        let mut output = Vec::with_capacity(2 + (self.len_usize() + 3) / 4);
         if prefix {
-            format!("0x{}", &output)
-        } else {
-            output
+            output.extend_from_slice(b"0x");
         }
+        text::encode_hex(&self.data, self.len_usize(), &mut output);
+
+        // safty: output contains only ascii characters
+        unsafe { String::from_utf8_unchecked(output) }
     }
 
-    /// Returns a string representation of the binary in hex. Pads ramaining bits with zeros. if `prefix` is true adds `0x`
+    /// Returns a string representation of the binary using `high` and `low` (ascii) as symbols for bit states. if `prefix` is true adds `0b`
     /// Uses `format` to pad bits in specified pattern. 
-    /// Function while iterating over bits will add coresponding character from `format.1` to the output string after every `format.0` 
+    /// Function while iterating over bits (starting from the lowest one) will add coresponding character from `format.1` between every `format.0` 
     /// bits and for next chunk it will use next item in collection
     /// Example
     /// ```rs
@@ -246,39 +521,14 @@ impl BinaryBase
     /// With input string `1111000011110000` will produce `1111'0000 1111'0000`
     pub fn to_string_formatted(&self, format: &[(usize, char)], high: u8, low: u8, prefix: bool) -> String
     {
-        // format: "4'4 "
-        // output:
-        // 0000'0000 0000'0000 
-        let mut output = String::with_capacity(self.len_usize());
-        
-        if format.len() == 0 {
-            if prefix {
-                return format!("0b{}", &self.to_string_symbols(high, low))
-            } else {
-                return self.to_string_symbols(high, low)
-            }
-        }
-
-        let mut i = 0;
-        let mut index = 0;
-        for ch in self.to_string_symbols_rev(high, low).chars() {
-            output.push(ch);
-            i += 1;
-            if i == format[index].0 {
-                output.push(format[index].1);
-                i = 0;
-                index = (index+1)%format.len();
-            }
-        }
-
-        let output_trimed = output.trim_end_matches(format[index].1);
-
+        let mut output = Vec::with_capacity(2 + self.len_usize());
         if prefix {
-            format!("0b{}", &output_trimed.chars().rev().collect::<String>())
-        } else {
-            output_trimed.chars().rev().collect::<String>()
+            output.extend_from_slice(b"0b");
         }
+        text::encode_bin(&self.data, self.len_usize(), format, high, low, &mut output);
 
+        // safty: symbols are ascii and separators are encoded as utf8
+        unsafe { String::from_utf8_unchecked(output) }
     }
 
     /// Returns a string representation of the binary Using `1` to represend high state and `0` to represent low state, will not add any formatting
@@ -297,6 +547,48 @@ impl BinaryBase
 // UTILITY
 impl BinaryBase
 {
+    /// Writes blocks into `out` as little endian bytes. Bytes after the end of the vector are filled with `sign_extending_bit`
+    pub fn write_le_bytes(&self, out: &mut [u8])
+    {
+        let fill = if self.sign_extending_bit() { u32::MAX } else { 0 };
+        let rem = self.len_usize() % 32;
+        let blocks = self.data.block_len();
+
+        for (i, chunk) in out.chunks_mut(4).enumerate() {
+            let block = if i + 1 < blocks || (i + 1 == blocks && rem == 0) {
+                self.data.get_block(i)
+            } else if i + 1 == blocks {
+                self.data.get_block(i) | (fill << rem)
+            } else {
+                fill
+            };
+            chunk.copy_from_slice(&block.to_le_bytes()[..chunk.len()]);
+        }
+    }
+    /// Zeroes unused bits of the last block and returns pointer to the blocks. 
+    /// Pointer is valid until vector is resized.
+    pub fn export_blocks(&mut self) -> *mut u32
+    {
+        let len = self.len();
+        let used = self.data.block_len();
+        
+        let mut blocks = self.data.take().into_boxed_slice();
+        if len % 32 != 0 {
+            blocks[used - 1] &= (1u32 << (len % 32)) - 1;
+        }
+        let ptr = blocks.as_mut_ptr();
+
+        // boxed slice is moved back into vector without reallocation
+        *self.data = bv::BitVec::from(blocks);
+        self.data.truncate(len);
+
+        ptr
+    }
+    /// Runs `f` on underlying blocks (bits past the end of the last block are unspecified) without reallocating them
+    pub fn with_blocks_mut<R>(&mut self, f: impl FnOnce(&mut [u32]) -> R) -> R
+    {
+        self.data.with_blocks_mut(f)
+    }
     pub fn sign_bit(&self) -> bool
     {
         if self.data.len() == 0 {
@@ -307,10 +599,125 @@ impl BinaryBase
     }
     pub fn sign_extending_bit(&self) -> bool
     {
-        if self.sign_behavior == "signed" { self.sign_bit() } else { false }
+        if self.sign_behavior.is_signed() { self.sign_bit() } else { false }
+    }
+}
+
+/// Calls `f` with raw memory of any object that implements buffer protocol (C-contiguous, any format)
+pub fn with_buffer<R>(object: &PyAny, f: impl FnOnce(&[u8]) -> R) -> PyResult<R>
+{
+    use pyo3::{ffi, AsPyPointer};
+
+    let mut view = std::mem::MaybeUninit::<ffi::Py_buffer>::uninit();
+
+    // safty: PyBUF_SIMPLE requests contiguous memory without any format, buffer is released right after `f` returns
+    unsafe {
+        if ffi::PyObject_GetBuffer(object.as_ptr(), view.as_mut_ptr(), ffi::PyBUF_SIMPLE) == -1 {
+            return Err(PyErr::fetch(object.py()));
+        }
+        let mut view = view.assume_init();
+        
+        let bytes: &[u8] = if view.len == 0 || view.buf.is_null() {
+            &[]
+        } else {
+            std::slice::from_raw_parts(view.buf as *const u8, view.len as usize)
+        };
+        let result = f(bytes);
+
+        ffi::PyBuffer_Release(&mut view);
+
+        Ok(result)
+    }
+}
+
+/// Calls `f` with writable memory of any object that implements buffer protocol (fails for read-only buffers)
+pub fn with_buffer_mut<R>(object: &PyAny, f: impl FnOnce(&mut [u8]) -> R) -> PyResult<R>
+{
+    use pyo3::{ffi, AsPyPointer};
+
+    let mut view = std::mem::MaybeUninit::<ffi::Py_buffer>::uninit();
+
+    // safty: PyBUF_WRITABLE fails for read-only exporters, buffer is released right after `f` returns
+    unsafe {
+        if ffi::PyObject_GetBuffer(object.as_ptr(), view.as_mut_ptr(), ffi::PyBUF_WRITABLE) == -1 {
+            return Err(PyErr::fetch(object.py()));
+        }
+        let mut view = view.assume_init();
+
+        let bytes: &mut [u8] = if view.len == 0 || view.buf.is_null() {
+            &mut []
+        } else {
+            std::slice::from_raw_parts_mut(view.buf as *mut u8, view.len as usize)
+        };
+        let result = f(bytes);
+
+        ffi::PyBuffer_Release(&mut view);
+
+        Ok(result)
+    }
+}
+
+/// Calls `f` with items of 1-dimensional C-contiguous buffer of one byte items (numpy `bool`/`uint8`/`int8` arrays, `array.array('B')`).
+/// Returns `None` (without raising) for objects that do not export such buffer
+pub fn with_byte_items<R>(object: &PyAny, f: impl FnOnce(&[u8]) -> R) -> Option<R>
+{
+    use pyo3::{ffi, AsPyPointer};
+    use std::ffi::CStr;
+
+    let mut view = std::mem::MaybeUninit::<ffi::Py_buffer>::uninit();
+
+    // safty: buffer is released before returning, format is checked before items are read
+    unsafe {
+        if ffi::PyObject_CheckBuffer(object.as_ptr()) == 0 {
+            return None;
+        }
+        if ffi::PyObject_GetBuffer(object.as_ptr(), view.as_mut_ptr(), ffi::PyBUF_C_CONTIGUOUS | ffi::PyBUF_FORMAT) == -1 {
+            drop(PyErr::fetch(object.py()));
+            return None;
+        }
+        let mut view = view.assume_init();
+
+        let format = if view.format.is_null() { b"B".as_slice() } else { CStr::from_ptr(view.format).to_bytes() };
+        let result = if view.ndim == 1 && view.itemsize == 1 && matches!(format, b"?" | b"B" | b"b") {
+            let items: &[u8] = if view.len == 0 || view.buf.is_null() {
+                &[]
+            } else {
+                std::slice::from_raw_parts(view.buf as *const u8, view.len as usize)
+            };
+            Some(f(items))
+        } else {
+            None
+        };
+
+        ffi::PyBuffer_Release(&mut view);
+
+        result
     }
 }
 
+/// Builds vector from bits given from the most significant one (order of `Binary` created from iterable)
+fn bitvec_from_msb_first(bits: impl DoubleEndedIterator<Item = bool> + ExactSizeIterator) -> bv::BitVec<u32>
+{
+    let len = bits.len();
+    let mut data = bv::BitVec::<u32>::with_block_capacity((len + 31) / 32);
+
+    let (mut block, mut filled) = (0u32, 0);
+    for bit in bits.rev() {
+        block |= (bit as u32) << filled;
+        filled += 1;
+        if filled == 32 {
+            data.push_block(block);
+            block = 0;
+            filled = 0;
+        }
+    }
+    if filled != 0 {
+        data.push_block(block);
+    }
+    data.truncate(len as u64);
+    data
+}
+
 // Object Construction
 impl BinaryBase {
     fn check_for_size(&self, range: u64) -> PyResult<()>
@@ -338,8 +745,8 @@ impl BinaryBase {
         // 1
         if range <= self.data.len()
         {
-            if (self.sign_behavior == "unsigned" && check_unsigned(&self.data, range)) || 
-               (self.sign_behavior == "signed"   && check_signed(&self.data, range))
+            if (self.sign_behavior == SignBehavior::Unsigned && check_unsigned(&self.data, range)) || 
+               (self.sign_behavior == SignBehavior::Signed   && check_signed(&self.data, range))
             {
                 return Err(exceptions::PyTypeError::new_err(format!("Value {} cannot fit in {} bits", self.to_string_formatted_default(), range)));
             }
@@ -364,6 +771,10 @@ impl BinaryBase {
     fn resize_trunc(&mut self, new_size: usize)
     {
         let new_size = new_size as u64;
+        if new_size == self.len() {
+            // shared storage is not copied if nothing changes
+            return;
+        }
 
         self.data.truncate(new_size);
         self.data.resize(new_size, self.sign_extending_bit());
@@ -376,77 +787,24 @@ impl BinaryBase {
     /// It can fail if:
     /// * `bit_size` is provided and input value cannot fit in specified size
     /// * String has invalid characters or radix
-    pub fn parse_bitvec_from_str(object: &str, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self>
+    pub fn parse_bitvec_from_str(object: &str, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
     {
-        enum Prefix {
-            Bin,
-            Hex,
-        }
-
-        impl Prefix {
-            fn max_size_for_u32(&self) -> usize
-            {
-                match self {
-                    Prefix::Bin => 32/1,
-                    Prefix::Hex => 32/4,
-                }
-            }
-            fn radix(&self) -> u32 
-            {
-                match self {
-                    Prefix::Bin => 2,
-                    Prefix::Hex => 16,
-                }
-            }
-            fn calculate_size_from_str(&self, src: &String) -> usize
-            {
-                match self {
-                    Prefix::Bin => src.len()*1,
-                    Prefix::Hex => src.len()*4,
-                }
-            }
-        }
+        let (bits, digits) = text::split_radix(object);
 
-        fn get_radix_from_str(src: &str) -> PyResult<Prefix>
-        {
-            const HEX_CHARS: &str = "23456789abcdef";
-            
-            if src.to_ascii_lowercase().chars().map(|ch| ch).any(|ch| HEX_CHARS.find(ch).is_some()) {
-                Ok(Prefix::Hex)
-            } else  {
-                Ok(Prefix::Bin)
-            }
-        }
-
-        // get & strip prefix
-        let (radix, object) = match object {
-            _ if object.starts_with("0b") => (Prefix::Bin, object.trim_start_matches("0b")),
-            _ if object.starts_with("0x") => (Prefix::Hex, object.trim_start_matches("0x")),
-            _ => (get_radix_from_str(&object)?, object),
+        let (blocks, count) = match text::decode(digits, bits) {
+            Some(decoded) => decoded,
+            None => return Err(exceptions::PyValueError::new_err(format!("Invalid {} digit in '{}'", if bits == 1 { "binary" } else { "hex" }, object))),
         };
+        let size = bit_size.unwrap_or(count * bits as usize);
 
-        // remove all whitespaces & calculate actual size
-        let object = object.replace(" ", "").replace("\t", "").replace("\n", "");
-        let size = bit_size.unwrap_or(radix.calculate_size_from_str(&object));
-        
-
-        // collect characters into blocks
-        let chunks = object
-        .chars()
-        .rev()
-        .collect::<Vec<char>>()
-        .chunks(radix.max_size_for_u32())
-        .map(|chunk| u32::from_str_radix(&chunk.iter().rev().collect::<String>(), radix.radix()))
-        .collect::<Result<Vec<_>, _>>()?;
-        
         // create & fill vector
-        let mut bitvec = bv::BitVec::<u32>::with_block_capacity(chunks.len());
+        let mut bitvec = bv::BitVec::<u32>::with_block_capacity(blocks.len());
         
-        for chunk in chunks {
-            bitvec.push_block(chunk);
+        for block in blocks {
+            bitvec.push_block(block);
         }
 
-        let mut binary = Self { data: bitvec, sign_behavior: sign_behavior.unwrap_or("unsigned").to_string() };
+        let mut binary = Self { data: bitvec.into(), sign_behavior: sign_behavior.unwrap_or(SignBehavior::Unsigned) };
         
         binary.resize_constrained(size)?;
         
@@ -461,22 +819,27 @@ impl BinaryBase {
     /// 
     /// It can fail if:
     /// * `bit_size` is provided and input value cannot fit in specified size
-    pub fn parse_bitvec_from_isize(object: isize, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self>
+    pub fn parse_bitvec_from_isize(object: isize, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
     {
-        let sign_behevior = sign_behavior.unwrap_or(if object.is_negative() { "signed" } else { "unsigned"});
+        let sign_behevior = sign_behavior.unwrap_or(if object.is_negative() { SignBehavior::Signed } else { SignBehavior::Unsigned });
 
         // beautiful match                                  __ chad edge case handling
         let bit_size_from_obj = match object { //   /                                     ____________________ counting leading_zeros in unsigned values
                                         0 /*______________/           */ => 0,           //     /
                                         isize::MIN  /* __/            */ => isize::BITS, //    / 
-                                        (1..) if sign_behevior!="signed" => isize::BITS - object.leading_zeros(),
-                                        (1..) if sign_behevior=="signed" => isize::BITS - object.leading_zeros() + 1, // <---- extra space for sign bit
+                                        (1..) if !sign_behevior.is_signed() => isize::BITS - object.leading_zeros(),
+                                        (1..) if sign_behevior.is_signed() => isize::BITS - object.leading_zeros() + 1, // <---- extra space for sign bit
                                         _                                => isize::BITS - object.abs().leading_zeros() + if object.unsigned_abs().is_power_of_two() { 0 } else { 1 },
                                        }.try_into().unwrap();  //                                                        \
                                                                //                                                         \_______ correcion for negative values that can fit in less bits
                                                                //                                                                  negative powers of two requires less bits than others
         let bit_lenght = bit_size.unwrap_or(bit_size_from_obj);
- 
+
+        // value that fits is stored inline right away, `resize_constrained` would only sign (or zero) extend it
+        // (negative values with unsigned behavior take the long way, it rejects them)
+        if bit_lenght <= INLINE_BITS && bit_lenght >= bit_size_from_obj && (sign_behevior.is_signed() || !object.is_negative()) {
+            return Ok(Self { data: SharedBits::inline(object as i128 as u128, bit_lenght), sign_behavior: sign_behevior });
+        }
                 
         // safty: isize -> usize have same size and all values of usize are valid in isize
         let transmutated = unsafe { transmute::<_, usize>(object) };
@@ -485,7 +848,7 @@ impl BinaryBase {
         bitvec.push_block(transmutated as u32);         // lower half
         bitvec.push_block((transmutated >> 32) as u32); // higer half (if usize is 64 bits, otherwise 0 is pushed so it has no effect on the result)
 
-        let mut binary = Self { data: bitvec, sign_behavior: sign_behevior.to_string() };
+        let mut binary = Self { data: bitvec.into(), sign_behavior: sign_behevior };
         
         if bit_lenght < bit_size_from_obj{
             return Err(exceptions::PyTypeError::new_err(format!("Value {} cannot fit in {} bits", binary.to_string_formatted_default(), bit_lenght))); 
@@ -497,80 +860,72 @@ impl BinaryBase {
     }
     
     /// Crate a new BinaryBase object with specified size and sign behavior based on Python integer input. It behaves the same as `parse_bitvec_from_isize` but it accepts Arbitrary Sized Integers.
-    /// ```py
-    /// raw_bytes = object.to_bytes(size, "big", signed=True) # where size is the number of bytes in blocks that will be used (next multiple of 32) // 8) 
-    /// ```
+    /// Digits of the integer are copied directly into blocks (two's complement, little endian) without creating python `bytes`.
+    /// 
     /// It can fail if:
     /// * `bit_size` is provided and input value cannot fit in specified size
-    /// * If python fails to call `bit_lenght` or `to_bytes` functions on integer
-    /// * If pyo3 fails to convert python `bytes` to `&[u8]
-    /// * If python has diffrent alighment for bytes than rust (unlikely)
-    pub fn parse_bitvec_from_long_integer(object: &types::PyLong, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self>
+    /// * value is negative and `sign_behavior` is unsigned
+    pub fn parse_bitvec_from_long_integer(object: &types::PyLong, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
     {
-        fn checked_next_multiple_of(n: usize, multiple: usize) -> Option<usize> {
-            let rem = n % multiple;
-            if rem == 0 {
-                Some(n)
-            } else {
-                n.checked_add(multiple - rem)
-            }
-        }
-
-        let sign_behevior = sign_behavior.unwrap_or(if object.compare(0i64).and_then(|x| Ok(x.is_lt())).unwrap_or(false) { "signed" } else { "unsigned" });
+        use pyo3::{ffi, AsPyPointer};
 
-        let bit_lenght = bit_size.unwrap_or(object.call_method0("bit_length")?.extract::<usize>()?);
+        let negative = object.compare(0i64)?.is_lt();
+        let sign_behevior = sign_behavior.unwrap_or(if negative { SignBehavior::Signed } else { SignBehavior::Unsigned });
 
-        let mut bitvec = bv::BitVec::<u32>::with_capacity(bit_lenght.try_into().unwrap());
+        if negative && !sign_behevior.is_signed() {
+            return Err(exceptions::PyOverflowError::new_err("can't convert negative int to unsigned"));
+        }
 
-        let (bytes, bit_lenght) = Python::with_gil(|py| {
-            //try calling object.to_bytes(size, "big", signed=True) if it failes (for negative powers of two) call same function but add one bit.
-            if let Ok(bytes) = object.call_method(
-                                          "to_bytes", 
-                                          (checked_next_multiple_of(bit_lenght, 32).ok_or(exceptions::PyOverflowError::new_err("lenght overflowed"))?/8, "big"),
-                                        Some(vec![("signed", sign_behevior=="signed")].into_py_dict(py))) {
-                PyResult::Ok((bytes, bit_lenght))
-            } else {
-                let bytes = object.call_method(
-                                   "to_bytes", 
-                                   (checked_next_multiple_of(bit_lenght+1, 32).ok_or(exceptions::PyOverflowError::new_err("lenght overflowed"))?/8, "big"),     
-                                 Some(vec![("signed", sign_behevior=="signed")].into_py_dict(py)))?;
-                PyResult::Ok((bytes,  bit_lenght+1))
-            }
-        })?;
+        // number of bits of absolute value, one more bit is always enough for two's complement
+        let magnitude_bits = object.call_method0("bit_length")?.extract::<usize>()?;
 
-        
-        let bytes = bytes.extract::<&[u8]>()?;
+        let mut bytes = vec![0u8; (magnitude_bits + 1 + 31) / 32 * 4];
+        // safty: `bytes` has exactly `bytes.len()` writable bytes, value fits in them by construction
+        let result = unsafe {
+            ffi::_PyLong_AsByteArray(object.as_ptr() as *mut ffi::PyLongObject, bytes.as_mut_ptr(), bytes.len(), 1, sign_behevior.is_signed() as i32)
+        };
+        if result == -1 {
+            return Err(PyErr::fetch(object.py()));
+        }
 
-        // align and reverse bits in way that bv can handle safty: bytes.len() is multiple of 32/8=4 and transutating [u8; 4] to u32 is safe bsc all values of [u8; 4] are in range of u32 
-        let bytes = bytes.iter().map(|x| x.reverse_bits()).collect::<Vec<u8>>();
-        let (prefix, number, suffix) = unsafe { bytes.align_to::<u32>() };
-        if prefix.len() != 0 || suffix.len() != 0 {
-            return Err(exceptions::PyTypeError::new_err(format!("Unexpected aligment error for integer: {}", object)));
+        let mut bitvec = bv::BitVec::<u32>::with_block_capacity(bytes.len() / 4);
+        for chunk in bytes.chunks_exact(4) {
+            bitvec.push_block(u32::from_le_bytes(chunk.try_into().unwrap()));
         }
 
-        // push blocks in reverse order to get correct order in bitvec
-        for block in number.iter().rev() {
-            bitvec.push_block(block.reverse_bits());
+        // same rules as for `isize`: extra bit for sign, negative values need bits up to the highest zero and the sign bit
+        let bit_size_from_obj = match (sign_behevior.is_signed(), negative) {
+            (false, _) => magnitude_bits,
+            (true, false) => magnitude_bits + 1,
+            (true, true) => (0..bitvec.block_len()).rev()
+                .find(|i| bitvec.get_block(*i) != u32::MAX)
+                .map_or(1, |i| 32 * i + 31 - (!bitvec.get_block(i)).leading_zeros() as usize + 2),
+        };
+        let bit_lenght = bit_size.unwrap_or(bit_size_from_obj);
+
+        let mut binary = Self { data: bitvec.into(), sign_behavior: sign_behevior };
+
+        // `resize_constrained` alone would accept positive value with highest bit at the sign position (2**63 in 64 signed bits)
+        if bit_lenght < bit_size_from_obj {
+            return Err(exceptions::PyTypeError::new_err(format!("Value {} cannot fit in {} bits", binary.to_string_formatted_default(), bit_lenght)));
         }
-        let mut binary = Self { data: bitvec, sign_behavior: sign_behevior.to_string() };
-        
         binary.resize_constrained(bit_lenght)?;
 
         return Ok(binary);
     }
 
-    pub fn parse_bitvec_from_float(object: f64, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self>
+    pub fn parse_bitvec_from_float(object: f64, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
     {
         Self::parse_bitvec_from_isize(object as isize, bit_size, sign_behavior)
     }
 
     /// Copy constructor
-    pub fn parse_bitvec_from_copy(object: &BinaryBase, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self>
+    pub fn parse_bitvec_from_copy(object: &BinaryBase, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
     {
         let bit_size = bit_size.unwrap_or(object.len_usize());
-        let sign_behavior = sign_behavior.unwrap_or(&object.sign_behavior);
+        let sign_behavior = sign_behavior.unwrap_or(object.sign_behavior);
 
-        let mut binary = Self { data: object.data.clone(), sign_behavior: sign_behavior.to_string() };
+        let mut binary = Self { data: object.data.clone(), sign_behavior };
         
         binary.resize_trunc(bit_size);
         
@@ -579,56 +934,81 @@ impl BinaryBase {
 
     /// Takes raw bytes and uses them as bitvec data
     /// 
-    pub fn parse_bitvec_from_bytes(object: &types::PyBytes, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self>
+    pub fn parse_bitvec_from_bytes(object: &types::PyBytes, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
     {
-        let bit_size = bit_size.unwrap_or(object.len()?*8);
-        let sign_behavior = sign_behavior.unwrap_or("unsigned");
-        let mut data = bv::BitVec::<u32>::with_capacity(bit_size.try_into().unwrap());
+        Self::parse_bitvec_from_byte_slice(object.as_bytes(), bit_size, sign_behavior)
+    }
 
-        for byte in object.as_bytes().iter() {
-            for bit in 0..8 {
-                data.push((byte >> bit) & 1 == 1); // Mask bit & push to bitvec
-            }
-        }
+    /// Takes raw bytes from `object` that implements buffer protocol (bytearray, memoryview, array.array, numpy arrays ect.) and uses them as bitvec data
+    /// 
+    /// It can fail if:
+    /// * buffer is not C-contiguous
+    pub fn parse_bitvec_from_buffer(object: &PyAny, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
+    {
+        with_buffer(object, |bytes| Self::parse_bitvec_from_byte_slice(bytes, bit_size, sign_behavior))?
+    }
 
+    /// Copies bytes into blocks (4 bytes at once, little endian)
+    pub fn parse_bitvec_from_byte_slice(object: &[u8], bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
+    {
+        let bit_size = bit_size.unwrap_or(object.len()*8);
+        let sign_behavior = sign_behavior.unwrap_or(SignBehavior::Unsigned);
+        let mut data = bv::BitVec::<u32>::with_block_capacity((object.len() + 3) / 4);
+
+        let mut chunks = object.chunks_exact(4);
+        for chunk in &mut chunks {
+            data.push_block(u32::from_le_bytes(chunk.try_into().unwrap()));
+        }
+        let remainder = chunks.remainder();
+        if !remainder.is_empty() {
+            let mut block = [0u8; 4];
+            block[..remainder.len()].copy_from_slice(remainder);
+            data.push_block(u32::from_le_bytes(block));
+        }
+        data.truncate((object.len() * 8) as u64);
         
-        let mut binary = Self { data: data, sign_behavior: sign_behavior.to_string() };
+        let mut binary = Self { data: data.into(), sign_behavior };
         
         binary.resize_constrained(bit_size)?;
         
         return Ok(binary);
     }
 
-    /// Takes Python Iterator and uses it as bitvec data
-    /// 
-    pub fn parse_bitvec_from_iterable(mut object: &types::PyIterator, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self>
+    /// Takes Python Iterator and uses it as bitvec data, truthiness of every item is one bit (first item is the most significant bit).
+    /// `size_hint` is used to preallocate memory
+    pub fn parse_bitvec_from_iterable(object: &types::PyIterator, size_hint: usize, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
     {
-        let sign_behavior = sign_behavior.unwrap_or("unsigned");
-        
-        let mut bitvec = bv::BitVec::<u32>::with_block_capacity(1);
-        while let Some(next_item) = object.next() {
-            let item = next_item?.is_true().unwrap_or(false); // if it fails here it means that exeption was raised in iterator.next() other than StopIteration
-            bitvec.push_bit(item);
-        }
+        let sign_behavior = sign_behavior.unwrap_or(SignBehavior::Unsigned);
         
-        let mut bitvec_reverse = bv::BitVec::<u32>::with_block_capacity(bitvec.block_capacity());
-        while let Some(bit) = bitvec.pop_bit()
-        {
-            bitvec_reverse.push_bit(bit);
+        let mut bits = Vec::with_capacity(size_hint);
+        for next_item in object {
+            bits.push(next_item?.is_true().unwrap_or(false)); // if it fails here it means that exeption was raised in iterator.next() other than StopIteration
         }
         
-        let mut binary = Self { data: bitvec_reverse, sign_behavior: sign_behavior.to_string() };
+        let mut binary = Self { data: bitvec_from_msb_first(bits.into_iter()).into(), sign_behavior };
         
         binary.resize_constrained(bit_size.unwrap_or(binary.len_usize()))?;
 
         return Ok(binary);
     }
 
+    /// Same as `parse_bitvec_from_iterable` for raw one byte items (numpy `bool`/`uint8` arrays), non-zero item is `1`
+    pub fn parse_bitvec_from_byte_items(items: &[u8], bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self>
+    {
+        let sign_behavior = sign_behavior.unwrap_or(SignBehavior::Unsigned);
+
+        let mut binary = Self { data: bitvec_from_msb_first(items.iter().map(|item| *item != 0)).into(), sign_behavior };
+
+        binary.resize_constrained(bit_size.unwrap_or(binary.len_usize()))?;
+
+        return Ok(binary);
+    }
+
     /// Constructior that wraps raw `BitVec` inside `BinaryBase`
-    pub fn parse_bitvec_from_slice(object: bv::BitVec<u32>, bit_size: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Self> 
+    pub fn parse_bitvec_from_slice(object: bv::BitVec<u32>, bit_size: Option<usize>, sign_behavior: Option<SignBehavior>) -> PyResult<Self> 
     {
-        let sign_behavior = sign_behavior.unwrap_or("unsigned");
-        let mut binary = Self { data: object, sign_behavior: sign_behavior.to_string() };
+        let sign_behavior = sign_behavior.unwrap_or(SignBehavior::Unsigned);
+        let mut binary = Self { data: object.into(), sign_behavior };
         
         binary.resize_constrained(bit_size.unwrap_or(binary.len_usize()))?;
         
@@ -692,55 +1072,15 @@ impl BinaryBase
     }
     
     pub fn get_slice(&self, slice: &types::PySliceIndices) -> PyResult<bv::BitVec<u32>> {
-        use reduce::*;
-
         let range = self.slice_to_range(slice)?;
 
-        // get data from range
-        let slice = self.data.bit_slice(range.range());
+        // slice can reach past the end, these bits are read as sign extending bit
+        let (first, count) = strided_elements(range.get_start() as usize, range.get_real_end() as usize, range.get_step());
+        let fill = self.sign_extending_bit();
 
-        // get padding bits for slice outside t
-        let lenght = (range.len() as i64 - slice.len() as i64).max(0) as u64;
-        let padd = bv::BitVec::new_fill(self.sign_extending_bit(), lenght);
-        let concated = slice.bit_concat(padd);
-
-        let quick_reverse = |vec: bv::BitVec<u32>| {
-            let vector_lenght = vec.bit_len();
-            let blocks = vec.into_boxed_slice();
-            
-            let mut reversed = bv::BitVec::with_block_capacity(blocks.len());
-            for block in blocks.iter().rev() {
-                reversed.push_block(block.reverse_bits());
-            }
-            if vector_lenght % u32::BITS as u64 == 0 {
-                reversed
-            } else {
-                let rem_bits = u32::BITS as u64 - vector_lenght % u32::BITS as u64;
-                BinaryBase::from_data(reversed).get_slice(&PySliceIndices::new(rem_bits.try_into().unwrap(), isize::MAX, 1)).unwrap()
-            }
-        };
-    
-        let out = match range.step {
-            0   => Err(exceptions::PyIndexError::new_err(format!("Step cannot be zero"))),
-            1   => Ok(concated.to_bit_vec()), // specialization for most common case
-            -1  => Ok(quick_reverse(concated.to_bit_vec())), // specialization for common case (reversing with ::-1)
-            0.. => {
-                let mut out = bv::BitVec::<u32>::with_capacity(concated.bit_len()/range.step as u64);
-                for bit in IterableBitSlice::new(&concated).into_iter().step_by(range.step.try_into().unwrap()) {
-                    out.push(bit);
-                }
-                Ok(out)
-            },
-            _ => {
-                let mut out = bv::BitVec::<u32>::with_capacity(concated.bit_len()/range.step as u64);
-                for bit in IterableBitSlice::new(&concated).into_iter().rev().step_by(range.step.abs().try_into().unwrap()) {
-                    out.push(bit);
-                }
-                Ok(out)
-            }  
-        }?;
+        let blocks = strided::gather(|i| self.extended_block(i, fill), first, range.get_step(), count);
 
-        Ok(out)
+        Ok(BinaryBase::from_blocks(&blocks, count, SignBehavior::Unsigned).data.into_inner())
     }
 
     pub fn get_indices(&self, _slice: &types::PyIterator) -> PyResult<bv::BitVec<u32>> {
@@ -766,50 +1106,32 @@ impl BinaryBase
     }
     pub fn set_slice(&mut self, slice: &types::PySliceIndices, value: &BinaryBase) -> PyResult<()> {
         let range = self.slice_to_range(slice)?;
+        let wrapped = range.range();
 
-        let mut slice = self.data.as_mut_slice().bit_slice_mut(range.range());
-
-        if slice.len() > value.len() {
-            return Err(exceptions::PyValueError::new_err(format!("Value and slice are in diffrent lenghts: {} > {}", slice.len(), value.len())));
+        if wrapped.end - wrapped.start > value.len() {
+            return Err(exceptions::PyValueError::new_err(format!("Value and slice are in diffrent lenghts: {} > {}", wrapped.end - wrapped.start, value.len())));
         }
 
-        if range.step > 0 
-        {
-            for (index, i) in (0..slice.bit_len()).step_by(range.step as _).enumerate()
-            {
-                slice.set_bit(i, value.get_bit(index.try_into().unwrap())?);
-            }
-        } 
-        else 
-        {
-            for (index, i) in (0..slice.bit_len()).rev().step_by(range.step.abs() as _).enumerate()
-            {
-                slice.set_bit(i, value.get_bit(index.try_into().unwrap())?);   
-            }
-        }
+        let (first, count) = strided_elements(wrapped.start as usize, wrapped.end as usize, range.get_step());
+        let fill = value.sign_extending_bit();
+
+        self.with_blocks_mut(|blocks| strided::scatter(blocks, first, range.get_step(), count, |i| value.extended_block(i, fill)));
         Ok(())
-        
     }
     pub fn set_slice_bool(&mut self, slice: &types::PySliceIndices, value: bool) -> PyResult<()> {
         let range = self.slice_to_range(slice)?;
+        let wrapped = range.range();
 
-        let mut slice = self.data.as_mut_slice().bit_slice_mut(range.range());
-
-        if range.step > 0 
-        {
-            for i in (0..slice.bit_len()).step_by(range.step as _)
-            {
-                slice.set_bit(i, value);
-            }
-        } 
-        else 
-        {
-            for i in (0..slice.bit_len()).rev().step_by(range.step.abs() as _)
-            {
-                slice.set_bit(i, value);
-            }
+        let step = range.get_step().unsigned_abs();
+        let (first, count) = strided_elements(wrapped.start as usize, wrapped.end as usize, range.get_step());
+        if count == 0 {
+            return Ok(());
         }
 
+        // negative step sets the same bits as positive one starting at the lowest element
+        let lowest = if range.get_step() > 0 { first } else { first - (count - 1) * step };
+
+        self.with_blocks_mut(|blocks| strided::fill(blocks, lowest, step, count, value));
         Ok(())
     }
     pub fn set_indices_slice(&mut self, _slice: &types::PyIterator, value: &BinaryBase) -> PyResult<()> {
@@ -860,7 +1182,7 @@ impl BinaryBase
     }
     pub fn prepend_slice(&mut self, val: &bv::BitVec<u32>) 
     {
-        self.data = val.bit_concat(&self.data).to_bit_vec();
+        self.data = val.bit_concat(&*self.data).to_bit_vec().into();
     }
 
     pub fn join(&self, val: &PyAny) -> PyResult<BinaryBase> {
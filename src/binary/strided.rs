@@ -0,0 +1,139 @@
+// Word level kernels for strided slices. Element `k` of slice is bit `first + k * step`, bit `i` of vector is bit `i % 32` of block `i / 32`.
+
+/// 32 bits starting at bit `start`, blocks are read from `block` getter
+fn window(block: &impl Fn(usize) -> u32, start: usize) -> u32
+{
+    let (index, offset) = (start / 32, start % 32);
+
+    if offset == 0 {
+        block(index)
+    } else {
+        block(index) >> offset | block(index + 1) << (32 - offset)
+    }
+}
+
+/// Mask of `count` lowest bits (`count <= 32`)
+fn low_mask(count: usize) -> u32
+{
+    if count >= 32 { u32::MAX } else { (1u32 << count) - 1 }
+}
+
+/// Reads `count` elements of slice into blocks. Unit steps copy shifted words, other steps load every source word once
+pub fn gather(block: impl Fn(usize) -> u32, first: usize, step: isize, count: usize) -> Vec<u32>
+{
+    let mut out = vec![0u32; (count + 31) / 32];
+
+    match step {
+        1 => {
+            for (j, word) in out.iter_mut().enumerate() {
+                *word = window(&block, first + 32 * j);
+            }
+        },
+        -1 => {
+            for (j, word) in out.iter_mut().enumerate() {
+                // elements 32j..32j+32 are bits top, top-1, .., top-31
+                let top = first - 32 * j;
+                let bits = if top >= 31 { window(&block, top - 31) } else { window(&block, 0) << (31 - top) };
+
+                *word = bits.reverse_bits();
+            }
+        },
+        _ => {
+            let mut cached = (usize::MAX, 0u32);
+            let mut position = first as isize;
+
+            for k in 0..count {
+                let index = position as usize / 32;
+                if cached.0 != index {
+                    cached = (index, block(index));
+                }
+                out[k / 32] |= (cached.1 >> (position as usize % 32) & 1) << (k % 32);
+                position += step;
+            }
+        },
+    }
+
+    let tail = count % 32;
+    if tail != 0 {
+        out[count / 32] &= low_mask(tail);
+    }
+    out
+}
+
+/// Sets `count` elements of slice with positive `step` to `value`. Steps up to 32 are written as repeating mask, one word at a time
+pub fn fill(blocks: &mut [u32], first: usize, step: usize, count: usize, value: bool)
+{
+    if count == 0 {
+        return;
+    }
+    let last = first + (count - 1) * step;
+
+    if step > 32 {
+        for position in (first..=last).step_by(step) {
+            let bit = 1u32 << (position % 32);
+            if value { blocks[position / 32] |= bit } else { blocks[position / 32] &= !bit }
+        }
+        return;
+    }
+
+    // elements in word `w` are bits `phase`, `phase + step`, .. of that word
+    let pattern = (0..32).step_by(step).fold(0u32, |pattern, bit| pattern | 1 << bit);
+    let mut phase = first % 32;
+
+    for w in first / 32..=last / 32 {
+        let mut mask = pattern << phase;
+        if w == last / 32 {
+            mask &= low_mask(last % 32 + 1);
+        }
+        if value { blocks[w] |= mask } else { blocks[w] &= !mask }
+
+        phase = (phase as isize - 32).rem_euclid(step as isize) as usize;
+    }
+}
+
+/// Writes `count` bits read from `src` getter starting at bit `first`, every source word is stored into at most two blocks
+fn copy_shifted(blocks: &mut [u32], first: usize, count: usize, src: impl Fn(usize) -> u32)
+{
+    for j in 0..(count + 31) / 32 {
+        let mask = low_mask(count - 32 * j);
+        let bits = src(j) & mask;
+        let (index, offset) = ((first + 32 * j) / 32, (first + 32 * j) % 32);
+
+        blocks[index] = blocks[index] & !(mask << offset) | bits << offset;
+        if offset != 0 && (mask >> (32 - offset)) != 0 {
+            blocks[index + 1] = blocks[index + 1] & !(mask >> (32 - offset)) | bits >> (32 - offset);
+        }
+    }
+}
+
+/// Writes `count` bits read from `src` getter into elements of slice
+pub fn scatter(blocks: &mut [u32], first: usize, step: isize, count: usize, src: impl Fn(usize) -> u32)
+{
+    if count == 0 {
+        return;
+    }
+
+    match step {
+        1 => copy_shifted(blocks, first, count, src),
+        -1 => {
+            // same bits as unit step write of reversed source starting at the lowest element
+            let reversed = gather(src, count - 1, -1, count);
+            copy_shifted(blocks, first + 1 - count, count, |j| reversed[j]);
+        },
+        _ => {
+            let mut cached = (usize::MAX, 0u32);
+            let mut position = first as isize;
+
+            for k in 0..count {
+                if cached.0 != k / 32 {
+                    cached = (k / 32, src(k / 32));
+                }
+                let bit = 1u32 << (position as usize % 32);
+                let word = &mut blocks[position as usize / 32];
+
+                if cached.1 >> (k % 32) & 1 == 1 { *word |= bit } else { *word &= !bit }
+                position += step;
+            }
+        },
+    }
+}
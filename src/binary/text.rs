@@ -0,0 +1,151 @@
+use bv::Bits;
+
+const HEX_DIGITS: &[u8; 16] = b"0123456789abcdef";
+
+const INVALID: u8 = 0xFF;
+const SKIP: u8 = 0xFE;
+
+/// Value of every ascii character as a digit (bin and hex digits share the table). Whitespace that is ignored while parsing maps to `SKIP`
+static DIGIT_VALUES: [u8; 256] = {
+    let mut table = [INVALID; 256];
+    let mut i = 0;
+    while i < 10 {
+        table[b'0' as usize + i] = i as u8;
+        i += 1;
+    }
+    let mut i = 0;
+    while i < 6 {
+        table[b'a' as usize + i] = 10 + i as u8;
+        table[b'A' as usize + i] = 10 + i as u8;
+        i += 1;
+    }
+    table[b' ' as usize] = SKIP;
+    table[b'\t' as usize] = SKIP;
+    table[b'\n' as usize] = SKIP;
+    table
+};
+
+/// Strips `0b`/`0x` prefix and returns number of bits per digit. Without prefix string is hex if it contains any digit that is not `0` or `1`
+pub fn split_radix(src: &str) -> (u32, &str)
+{
+    if src.starts_with("0b") {
+        (1, src.trim_start_matches("0b"))
+    } else if src.starts_with("0x") {
+        (4, src.trim_start_matches("0x"))
+    } else if src.bytes().any(|ch| DIGIT_VALUES[ch as usize] > 1 && DIGIT_VALUES[ch as usize] < 16) {
+        (4, src)
+    } else {
+        (1, src)
+    }
+}
+
+/// Decodes `digits` (last digit holds the lowest bits) into blocks. Returns blocks and number of digits, or `None` if string contains invalid character
+pub fn decode(digits: &str, bits: u32) -> Option<(Vec<u32>, usize)>
+{
+    let mut blocks = Vec::with_capacity((digits.len() * bits as usize + 31) / 32);
+    let mut block = 0u32;
+    let mut filled = 0;
+    let mut count = 0;
+
+    for ch in digits.bytes().rev() {
+        let value = DIGIT_VALUES[ch as usize];
+        if value == SKIP {
+            continue;
+        }
+        if value >> bits != 0 {
+            return None;
+        }
+
+        block |= (value as u32) << filled;
+        filled += bits;
+        count += 1;
+
+        if filled == 32 {
+            blocks.push(block);
+            block = 0;
+            filled = 0;
+        }
+    }
+    if filled != 0 {
+        blocks.push(block);
+    }
+
+    Some((blocks, count))
+}
+
+/// Appends `len` bits of `data` as hex digits, most significant digit first. Last digit is padded with zeros
+pub fn encode_hex(data: &bv::BitVec<u32>, len: usize, out: &mut Vec<u8>)
+{
+    out.reserve((len + 3) / 4);
+
+    for i in (0..data.block_len()).rev() {
+        let block = data.get_block(i);
+        let digits = ((len - 32 * i + 3) / 4).min(8);
+
+        for digit in (0..digits).rev() {
+            out.push(HEX_DIGITS[(block >> (4 * digit)) as usize & 0xF]);
+        }
+    }
+}
+
+/// Appends bits `start..end` of `data` as `high`/`low` symbols, most significant bit first. Aligned nibbles are written from `table`
+fn push_bits(data: &bv::BitVec<u32>, start: usize, end: usize, table: &[[u8; 4]; 16], out: &mut Vec<u8>)
+{
+    let nibble = |pos: usize| (data.get_block(pos / 32) >> (pos % 32)) as usize & 0xF;
+
+    let mut pos = end;
+    while pos > start && pos % 4 != 0 {
+        pos -= 1;
+        out.push(table[nibble(pos) & 1][3]);
+    }
+    while pos >= start + 4 {
+        pos -= 4;
+        out.extend_from_slice(&table[nibble(pos)]);
+    }
+    while pos > start {
+        pos -= 1;
+        out.push(table[nibble(pos) & 1][3]);
+    }
+}
+
+/// Appends `len` bits of `data` as `high`/`low` symbols (ascii), most significant bit first.
+/// Bits are split into groups counted from the least significant bit, group sizes and separators are taken from `format` in cycle (see `to_string_formatted`)
+pub fn encode_bin(data: &bv::BitVec<u32>, len: usize, format: &[(usize, char)], high: u8, low: u8, out: &mut Vec<u8>)
+{
+    debug_assert!(high.is_ascii() && low.is_ascii());
+
+    let mut table = [[low; 4]; 16];
+    for (value, symbols) in table.iter_mut().enumerate() {
+        for bit in 0..4 {
+            if value >> (3 - bit) & 1 == 1 {
+                symbols[bit] = high;
+            }
+        }
+    }
+
+    // count groups and find where the last (most significant, possibly shorter) one starts
+    let mut groups = 1;
+    let mut last_start = 0;
+    while !format.is_empty() {
+        let size = format[(groups - 1) % format.len()].0;
+        if size == 0 || last_start + size >= len {
+            break;
+        }
+        last_start += size;
+        groups += 1;
+    }
+
+    out.reserve(len + (groups - 1) * 4);
+
+    let (mut start, mut end) = (last_start, len);
+    for group in (0..groups).rev() {
+        push_bits(data, start, end, &table, out);
+
+        if group > 0 {
+            let (size, separator) = format[(group - 1) % format.len()];
+            out.extend_from_slice(separator.encode_utf8(&mut [0; 4]).as_bytes());
+            end = start;
+            start -= size;
+        }
+    }
+}
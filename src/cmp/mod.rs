@@ -2,6 +2,48 @@ use std::cmp::Ordering;
 
 use pyo3::prelude::*;
 
+pub mod cmp_base {
+    use std::cmp::Ordering;
+    use crate::binary::BinaryBase;
+
+    /// Compares sign extended words from the most significant one, numbers with same sign
+    /// are ordered exactly as their infinitely sign extended bit patterns
+    fn cmp_extended(fill_a: bool, fill_b: bool, blocks: usize, a: impl Fn(usize) -> u32, b: impl Fn(usize) -> u32) -> Ordering {
+        if fill_a != fill_b {
+            return if fill_a { Ordering::Less } else { Ordering::Greater };
+        }
+
+        for i in (0..blocks).rev() {
+            match a(i).cmp(&b(i)) {
+                Ordering::Equal => continue,
+                ordering        => return ordering,
+            }
+        }
+        Ordering::Equal
+    }
+
+    /// Numerical comparison of two binaries, respects sign behavior of both operands
+    pub fn cmp_values(a: &BinaryBase, b: &BinaryBase) -> Ordering {
+        let (fill_a, fill_b) = (a.sign_extending_bit(), b.sign_extending_bit());
+        let blocks = a.data.block_len().max(b.data.block_len());
+
+        cmp_extended(fill_a, fill_b, blocks, |i| a.extended_block(i, fill_a), |i| b.extended_block(i, fill_b))
+    }
+
+    /// Numerical comparison of binary and 64 bit integer given as raw bits and sign (`negative` is only set for `i64` values)
+    pub fn cmp_int(a: &BinaryBase, bits: u64, negative: bool) -> Ordering {
+        let fill_a = a.sign_extending_bit();
+        let fill_b = if negative { u32::MAX } else { 0 };
+        let blocks = a.data.block_len().max(2);
+
+        cmp_extended(fill_a, negative, blocks, |i| a.extended_block(i, fill_a), |i| match i {
+            0 => bits as u32,
+            1 => (bits >> 32) as u32,
+            _ => fill_b,
+        })
+    }
+}
+
 pub fn equal_cmp(a: &crate::Binary, b: &crate::Binary) -> bool {
     if a.len() == b.len() {
         a.inner.data == b.inner.data
@@ -15,18 +57,40 @@ pub fn cmp(a: &crate::Binary, b: &crate::Binary) -> PyResult<Ordering> {
         return Ok(Ordering::Equal);
     }
 
-    let a_py_int = a.int()?;
-    let b_py_int = b.int()?;
+    // values of diffrent sizes are never equal
+    match cmp_base::cmp_values(&a.inner, &b.inner) {
+        Ordering::Less => Ok(Ordering::Less),
+        _              => Ok(Ordering::Greater),
+    }
+}
+
+/// Compares binary with python int that fits in 64 bits without creating temporary objects.
+/// Returns `None` if value does not fit or cannot be compared this way.
+///
+/// Result is the same as of the generic path, that converts `obj` with `Binary(obj, lenght=len(a), sign_behavior=a.sign_behavior())`
+/// and falls back to `Binary(obj, sign_behavior=a.sign_behavior())` when the value does not fit:
+/// * value that fits is converted exactly (int constructor rejects values that need more bits), both operands have the same
+///   lenght, so they are equal only if their bits are equal, which for exact conversion means equal values
+/// * value that does not fit is converted exactly to its minimal lenght, it cannot be equal to `a` and binaries are ordered by value
+///
+/// So in both cases operands are ordered by value. Negative values cannot be converted to unsigned binaries, they take the generic path.
+pub fn cmp_int(a: &crate::Binary, obj: &PyAny) -> Option<Ordering> {
+    if !matches!(obj.is_instance_of::<pyo3::types::PyLong>(), Ok(true)) {
+        return None;
+    }
 
-    Python::with_gil(|py| {
-        let lt = a_py_int
-            .call_method1(py, "__lt__", (b_py_int,))?
-            .is_true(py)?; // lazy
+    let (bits, negative) = if let Ok(value) = obj.extract::<i64>() {
+        (value as u64, value < 0)
+    } else if let Ok(value) = obj.extract::<u64>() {
+        (value, false)
+    } else {
+        return None;
+    };
 
-        if lt {
-            return Ok(Ordering::Less);
-        }
+    // negative values cannot be casted to unsigned binaries
+    if negative && !a.inner.sign_behavior.is_signed() {
+        return None;
+    }
 
-        return Ok(Ordering::Greater);
-    })
+    Some(cmp_base::cmp_int(&a.inner, bits, negative))
 }
@@ -1,22 +1,65 @@
 use std::cmp::Ordering;
 
 use pyo3::basic::CompareOp;
-use pyo3::{prelude::*, types, IntoPy};
+use pyo3::{prelude::*, types, IntoPy, AsPyPointer};
 use pyo3::exceptions;
-use pyo3::types::IntoPyDict;
 
 use bv::{self, Bits};
 
-mod binary;
-mod arithm;
+// kernels used by `benches` are public, they are not a part of the python API
+#[doc(hidden)]
+pub mod binary;
+#[doc(hidden)]
+pub mod arithm;
+mod array;
 mod cmp;
-mod utility;
+#[doc(hidden)]
+pub mod utility;
+mod pack;
+mod parallel;
+mod strings;
+mod typed;
+mod view;
+mod serialize;
+mod mapped;
+mod sparse;
+mod rank;
+mod registers;
 
 #[pyclass]
 #[derive(Clone, PartialEq, Eq, Hash, Debug)]
 pub struct Binary
 {
     inner: binary::BinaryBase,
+    exports: BufferExports,
+}
+
+/// Number of active buffer exports (`memoryview`, `numpy.frombuffer` ect.) of the `Binary`.
+/// While data is exported the vector cannot be resized. It is not a part of the value, so it is ignored by comparisons and is not cloned.
+#[derive(Debug, Default)]
+pub struct BufferExports(usize);
+
+impl Clone for BufferExports {
+    fn clone(&self) -> Self {
+        Self(0)
+    }
+}
+impl PartialEq for BufferExports {
+    fn eq(&self, _: &Self) -> bool {
+        true
+    }
+}
+impl Eq for BufferExports {}
+impl std::hash::Hash for BufferExports {
+    fn hash<H: std::hash::Hasher>(&self, _: &mut H) {}
+}
+
+/// What `BinaryIterator` yields for every chunk
+#[derive(Clone, Copy, Debug, PartialEq)]
+pub enum IterOutput {
+    Binary,
+    Bool,
+    Int,
 }
 
 #[pyclass]
@@ -27,6 +70,18 @@ pub struct BinaryIterator
     chunk_size: usize,
     index: usize,
     extend: bool,
+    output: IterOutput,
+}
+
+/// Lazily yields indexes of ones (or zeros), one by one or in lists of `chunk_size` indexes
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct BitIndexIterator
+{
+    inner: Py<Binary>,
+    index: usize,
+    ones: bool,
+    chunk_size: Option<usize>,
 }
 
 // Arg Parsing
@@ -100,7 +155,7 @@ impl Binary
 {
     pub fn wrap(inner: PyResult<binary::BinaryBase>) -> PyResult<Self>
     {
-        inner.and_then(|inner| Ok( Binary { inner }))
+        inner.and_then(|inner| Ok( Binary { inner, exports: BufferExports::default() }))
     }
     pub fn wrap_object(inner: PyResult<binary::BinaryBase>) -> PyResult<PyObject>
     {
@@ -110,6 +165,56 @@ impl Binary
     {
         Self::wrap(inner).and_then(|binary| Ok(binary.into_py(*py)))
     }
+    /// Writes result into `out` reusing its memory and returns `out`. If `out` is not provided new object is created
+    pub fn wrap_out(inner: PyResult<binary::BinaryBase>, out: Option<&PyCell<Binary>>) -> PyResult<PyObject>
+    {
+        match out {
+            Some(out) => {
+                out.try_borrow_mut()?.assign(&inner?)?;
+                let out: &PyAny = out.as_ref();
+                Ok(out.into())
+            }
+            None => Self::wrap_object(inner),
+        }
+    }
+    /// Runs in-place operator on `self`. Right hand side is converted like in the binary operators (`bit_size` is passed to `Binary::from`)
+    fn inplace<F>(&mut self, other: &PyAny, bit_size: Option<usize>, op: F) -> PyResult<()>
+    where F: FnOnce(&mut binary::BinaryBase, &binary::BinaryBase) -> PyResult<()>
+    {
+        if let Ok(cell) = other.downcast::<PyCell<Binary>>() {
+            if let Ok(other) = cell.try_borrow() {
+                return self.apply_inplace(&other.inner, op);
+            }
+            // `x += x`, right hand side is the object that is already borrowed by this operator
+            let copy = self.inner.clone();
+            return self.apply_inplace(&copy, op);
+        }
+
+        let other = Self::from(other, bit_size, Some(self.sign_behavior()))
+            .map_err(|_| exceptions::PyTypeError::new_err(format!("Invalid type {}", other)))?;
+
+        self.apply_inplace(&other.inner, op)
+    }
+    fn apply_inplace<F>(&mut self, other: &binary::BinaryBase, op: F) -> PyResult<()>
+    where F: FnOnce(&mut binary::BinaryBase, &binary::BinaryBase) -> PyResult<()>
+    {
+        if self.exports.0 != 0 {
+            // exported memory cannot be reallocated, result is copied into it (fails if size changes)
+            let mut result = self.inner.clone();
+            op(&mut result, other)?;
+            return self.assign(&result);
+        }
+        op(&mut self.inner, other)
+    }
+    /// Overwrites value in place, fails if size changes while memory is exported by buffer protocol
+    pub fn assign(&mut self, inner: &binary::BinaryBase) -> PyResult<()>
+    {
+        if inner.len() != self.inner.len() {
+            self.check_resizable()?;
+        }
+        self.inner.assign(inner);
+        Ok(())
+    }
     pub fn wrap_self(self) -> PyResult<PyObject> {
         Python::with_gil(|py| Ok(self.into_py(py)))
     }
@@ -117,9 +222,32 @@ impl Binary
     {
         &self.inner
     }
+    /// Fails if memory of the vector is exported by buffer protocol (and resizing could invalidate it)
+    fn check_resizable(&self) -> PyResult<()>
+    {
+        if self.exports.0 != 0 {
+            return Err(exceptions::PyBufferError::new_err("Existing exports of data: object cannot be re-sized"));
+        }
+        Ok(())
+    }
 
     pub fn from(object: &PyAny, bit_size: Option<usize>, sign_behavior: Option<&str>) ->  PyResult<Self>
     {
+        let sign_behavior = sign_behavior.map(binary::SignBehavior::parse).transpose()?;
+
+        Self::from_parsed(object, bit_size, sign_behavior)
+    }
+    /// Same as `from`, but sign behavior is already parsed
+    pub fn from_parsed(object: &PyAny, bit_size: Option<usize>, sign_behavior: Option<binary::SignBehavior>) ->  PyResult<Self>
+    {
+        // copy constructor (before ints, `Binary` implements `__index__`)
+        if let Ok(object) = object.extract::<PyRef<Binary>>() {
+            return Self::wrap(binary::BinaryBase::parse_bitvec_from_copy(object.unwrap(), bit_size, sign_behavior));
+        }
+        // copy of view
+        if let Ok(object) = object.extract::<PyRef<view::BinaryView>>() {
+            return Self::wrap(binary::BinaryBase::parse_bitvec_from_copy(&object.to_base(object.py())?, bit_size, sign_behavior));
+        }
         // from str
         if let Ok(object) = object.extract::<&str>() {
             return Self::wrap(binary::BinaryBase::parse_bitvec_from_str(object, bit_size, sign_behavior));
@@ -132,17 +260,28 @@ impl Binary
         if let Ok(true) = object.is_instance_of::<types::PyLong>() {
             return Self::wrap(binary::BinaryBase::parse_bitvec_from_long_integer(&object.downcast().unwrap(), bit_size, sign_behavior));
         }
-        // copy constructor
-        if let Ok(object) = object.extract::<PyRef<Binary>>() {
-            return Self::wrap(binary::BinaryBase::parse_bitvec_from_copy(object.unwrap(), bit_size, sign_behavior));
-        }
         // from bytes
         if let Ok(object) = object.extract::<&types::PyBytes>() {
             return Self::wrap(binary::BinaryBase::parse_bitvec_from_bytes(&object, bit_size, sign_behavior));
         }
+        // from bytearray & memoryview (raw memory of any C-contiguous buffer)
+        if let Ok(true) = object.is_instance_of::<types::PyByteArray>() {
+            return Self::wrap(binary::BinaryBase::parse_bitvec_from_buffer(object, bit_size, sign_behavior));
+        }
+        if unsafe { pyo3::ffi::PyMemoryView_Check(object.as_ptr()) } != 0 {
+            return Self::wrap(binary::BinaryBase::parse_bitvec_from_buffer(object, bit_size, sign_behavior));
+        }
+        // from numpy bool/uint8 arrays (same result as iterating over them)
+        if let Some(binary) = binary::with_byte_items(object, |items| binary::BinaryBase::parse_bitvec_from_byte_items(items, bit_size, sign_behavior)) {
+            return Self::wrap(binary);
+        }
         // from iterable
-        if let Ok(object) = object.iter() {
-            return Self::wrap(binary::BinaryBase::parse_bitvec_from_iterable(object, bit_size, sign_behavior));
+        if let Ok(iterator) = object.iter() {
+            return Self::wrap(binary::BinaryBase::parse_bitvec_from_iterable(iterator, object.len().unwrap_or(0), bit_size, sign_behavior));
+        }
+        // from other objects that implement buffer protocol
+        if unsafe { pyo3::ffi::PyObject_CheckBuffer(object.as_ptr()) } != 0 {
+            return Self::wrap(binary::BinaryBase::parse_bitvec_from_buffer(object, bit_size, sign_behavior));
         }
         // from float
         if let Ok(object) = object.extract::<f64>() {
@@ -162,9 +301,45 @@ impl Binary
         return Self::wrap_object(binary::BinaryBase::parse_bitvec_from_slice(slice, None, None));
     }
     #[allow(unused)]
-    fn from_parts(data: bv::BitVec::<u32>, sign: String) -> Self
+    fn from_parts(data: bv::BitVec::<u32>, sign: binary::SignBehavior) -> Self
+    {
+        Self::wrap(Ok(binary::BinaryBase {data: data.into(), sign_behavior: sign})).unwrap()
+    }
+    /// Value of `count` bits starting at `start` as python int (bits past the end are filled with sign extending bit)
+    fn chunk_int(&self, py: Python, start: usize, count: usize, signed: bool) -> PyResult<PyObject>
+    {
+        if count <= 64 {
+            let value = self.inner.get_bits_u64(start, count, self.sign_extending_bit());
+
+            if signed && count > 0 {
+                let shift = 64 - count;
+                Ok((((value << shift) as i64) >> shift).into_py(py))
+            } else {
+                Ok(value.into_py(py))
+            }
+        } else {
+            let slice = self.inner.get_slice(&types::PySliceIndices::new(start.try_into().unwrap(), (start + count).try_into().unwrap(), 1))?;
+            let sign = if signed { binary::SignBehavior::Signed } else { binary::SignBehavior::Unsigned };
+
+            Binary::wrap(Ok(binary::BinaryBase::from_parts(slice, sign)))?.int()
+        }
+    }
+    /// Converts `sub` argument of `find`, `find_all` and `count` (bools are single bit patterns)
+    fn search_pattern(&self, sub: &PyAny) -> PyResult<binary::BinaryBase>
     {
-        Self::wrap(Ok(binary::BinaryBase {data, sign_behavior: sign})).unwrap()
+        Self::parse_search_pattern(sub, self.sign_behavior())
+    }
+    pub fn parse_search_pattern(sub: &PyAny, sign_behavior: &str) -> PyResult<binary::BinaryBase>
+    {
+        if let Ok(sub) = sub.extract::<PyRef<Binary>>() { 
+            Ok(sub.inner.clone())
+        } else if let Ok(bit) = sub.extract::<bool>() { 
+            Ok(binary::BinaryBase::from_blocks(&[bit as u32], 1, binary::SignBehavior::Unsigned))
+        } else if let Ok(sub) = Self::from(sub, None, Some(sign_behavior)) {
+            Ok(sub.inner)
+        } else {
+            Err(exceptions::PyTypeError::new_err(format!("Unsupported type: {}", sub)))
+        }
     }
 }
 
@@ -176,7 +351,10 @@ impl Binary
         // 1 Casting to Binary
         // 2 Creating other with same Lenght as self
         // 3 Creating a new Binary without constrains
-        if let Ok(bin) = obj.extract::<PyRef<Binary>>() { 
+        // (python ints that fit in 64 bits are compared directly)
+        if let Some(ordering) = cmp::cmp_int(&self, obj) {
+            Ok(ordering)
+        } else if let Ok(bin) = obj.extract::<PyRef<Binary>>() { 
             cmp::cmp(&self, &bin)
         } else if let Ok( bin) = Self::from(obj, Some(self.len()), Some(self.sign_behavior())) {
             cmp::cmp(&self, &bin)
@@ -240,20 +418,85 @@ impl Binary
         data::<{u8::BITS}>(self)
     }
 
+    /// Pickles blocks with lenght and sign behavior (in the same format as `bitvec.dump` uses for single value)
+    pub fn __reduce__(&self, py: Python) -> PyResult<(PyObject, (usize,), PyObject)> {
+        let mut state = Vec::new();
+        serialize::serialize_base::encode(&mut state, &self.inner);
+
+        Ok((py.get_type::<Self>().into(), (0,), types::PyBytes::new(py, &state).into()))
+    }
+    pub fn __setstate__(&mut self, state: &PyAny) -> PyResult<()> {
+        self.check_resizable()?;
+        self.inner = binary::with_buffer(state, |bytes| serialize::serialize_base::decode(bytes, &mut 0))??;
+        Ok(())
+    }
+
+    /// Exports blocks of the vector as read-write buffer of bytes (little endian, `ceil(len/8)` bytes long) without copying.
+    /// Bits above `len` in the last byte are zeroed before export.
+    unsafe fn __getbuffer__(mut slf: PyRefMut<Self>, view: *mut pyo3::ffi::Py_buffer, flags: std::os::raw::c_int) -> PyResult<()> {
+        use pyo3::ffi;
+
+        if view.is_null() {
+            return Err(exceptions::PyBufferError::new_err("View is null"));
+        }
+        if cfg!(target_endian = "big") {
+            return Err(exceptions::PyBufferError::new_err("Buffer protocol is supported only on little endian platforms"));
+        }
+
+        let ptr = slf.inner.export_blocks();
+        let len = (slf.len() + 7) / 8;
+        slf.exports.0 += 1;
+        // exported memory must not be shared with copies
+        slf.inner.data.set_pinned(true);
+
+        ffi::Py_INCREF(slf.as_ptr());
+        (*view).obj = slf.as_ptr();
+        (*view).buf = ptr as *mut std::os::raw::c_void;
+        (*view).len = len as isize;
+        (*view).readonly = 0;
+        (*view).itemsize = 1;
+        (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+            b"B\0".as_ptr() as *mut std::os::raw::c_char
+        } else {
+            std::ptr::null_mut()
+        };
+        (*view).ndim = 1;
+        (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+            &mut (*view).len
+        } else {
+            std::ptr::null_mut()
+        };
+        (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES {
+            &mut (*view).itemsize
+        } else {
+            std::ptr::null_mut()
+        };
+        (*view).suboffsets = std::ptr::null_mut();
+        (*view).internal = std::ptr::null_mut();
+
+        Ok(())
+    }
+    unsafe fn __releasebuffer__(mut slf: PyRefMut<Self>, _view: *mut pyo3::ffi::Py_buffer) {
+        slf.exports.0 -= 1;
+        if slf.exports.0 == 0 {
+            slf.inner.data.set_pinned(false);
+        }
+    }
+
     #[getter]
     pub fn len(&self) -> usize {
         self.inner.len().try_into().unwrap()
     }
     #[getter]
-    pub fn sb(&self) -> &String {
-        &self.inner.sign_behavior
+    pub fn sb(&self) -> &'static str {
+        self.inner.sign_behavior.as_str()
     }
 
-    pub fn sign_behavior(&self) -> &String {
+    pub fn sign_behavior(&self) -> &'static str {
         self.sb()
     }
     pub fn is_negative(&self) -> bool {
-        if self.sign_behavior() == "unsigned" {
+        if !self.inner.sign_behavior.is_signed() {
             return false;
         }
         return self.inner.data.get_bit(self.inner.data.bit_len() - 1);
@@ -279,7 +522,7 @@ impl Binary
             let one: PyObject = 1.into_py(py);
             let len: PyObject = self.len().into_py(py);
             
-            if self.sign_behavior() == "unsigned" {
+            if !self.inner.sign_behavior.is_signed() {
                 // 1.__lshift__(len).__sub__(1)
                 Ok(one.call_method1(py, "__lshift__", (&len,))?.call_method1(py, "__sub__", (&one,))?)
             } else {
@@ -302,7 +545,7 @@ impl Binary
                 return Ok(0.into_py(py));
             }
             
-            if self.sign_behavior() == "unsigned" {
+            if !self.inner.sign_behavior.is_signed() {
                 Ok(0.into_py(py))
             } else {
                 let one: PyObject = 1.into_py(py);
@@ -338,11 +581,39 @@ impl Binary
         }
     }
 
+    /// Returns view of bits `start..stop` that reads and writes memory of `self` (nothing is copied).
+    /// Negative indices count from the end, `stop` defaults to the end. View is unsigned by default
+    #[args(stop = "None", sign_behavior = "None")]
+    pub fn view(slf: PyRef<Self>, start: isize, stop: Option<isize>, sign_behavior: Option<&str>) -> PyResult<view::BinaryView> {
+        let len = slf.len() as isize;
+        let flatten = |index: isize| if index < 0 { index + len } else { index };
+        let (start, stop) = (flatten(start), flatten(stop.unwrap_or(len)));
+
+        if start < 0 || stop > len || start > stop {
+            return Err(exceptions::PyIndexError::new_err(format!("View {}..{} is outside of the binary of lenght {}", start, stop, len)));
+        }
+        let sign_behavior = binary::SignBehavior::parse(sign_behavior.unwrap_or("unsigned"))?;
+
+        Ok(view::BinaryView::new(slf.into(), start as usize, stop as usize, sign_behavior))
+    }
+    /// Maps file at `path` as storage of `lenght` bits (whole file by default). Modes: `r` read-only, `r+` read-write (file is grown if needed),
+    /// `w+` new file filled with zeros, `c` copy-on-write (changes are not written to the file)
+    #[staticmethod]
+    #[args(length = "None", mode = "\"r+\"", sign_behavior = "\"unsigned\"")]
+    pub fn mmap(py: Python, path: &PyAny, length: Option<usize>, mode: &str, sign_behavior: &str) -> PyResult<mapped::MappedBinary> {
+        mapped::MappedBinary::open(py, path, length, mode, binary::SignBehavior::parse(sign_behavior)?)
+    }
+    /// Builds rank/select index over the number. It keeps reference to `self` and is rebuilt lazily after `self` is modified
+    pub fn build_rank_index(slf: PyRef<Self>) -> PyResult<rank::RankSelect> {
+        rank::RankSelect::new(slf.py(), slf.into())
+    }
+
     pub fn append(&mut self, obj: &PyAny) -> PyResult<()> {
         // prioritize:
         // 1 Casting to Binary
         // 2 Casting to bool
         // 3 Creating a new Binary
+        self.check_resizable()?;
 
         if let Ok(bin) = obj.extract::<PyRef<Binary>>() { 
             self.inner.append_slice(&bin.inner.data);
@@ -356,6 +627,7 @@ impl Binary
         Ok(())
     }
     pub fn prepend(&mut self, obj: &PyAny) -> PyResult<()> {
+        self.check_resizable()?;
         if let Ok(bin) = obj.extract::<PyRef<Binary>>() { 
             self.inner.prepend_slice(&bin.inner.data);
         } else if let Ok(bin) = obj.extract::<bool>() { 
@@ -389,13 +661,31 @@ impl Binary
         self.inner.to_string_bin(Self::parse_prefix_kwargs_args(args, kwargs))
     }
     /// Returns Python int
-    /// Translates raw bytes into Python int
+    /// Values up to 64 bits are converted from machine integer, wider ones are built straight from blocks
     pub fn int(&self) -> PyResult<PyObject> {
         Python::with_gil(|py| {
-            let python_int: PyObject = 0.into_py(py);
-            
-            python_int.call_method(py, "from_bytes", (data::<{u32::BITS}>(self), "little"), Some(vec![("signed", self.sign_behavior() == "signed")].into_py_dict(py)))
-        }) // from_bytes(self._data, "big", {"signed": self.sign_behavior() == "signed"})
+            let len = self.inner.len_usize();
+            let signed = self.inner.sign_behavior.is_signed();
+
+            if len == 0 {
+                return Ok(0.into_py(py));
+            }
+            if len <= 64 {
+                // bits past the end are filled with sign extending bit, so signed value is already extended to 64 bits
+                let value = self.inner.get_bits_u64(0, if signed { 64 } else { len }, self.inner.sign_extending_bit());
+
+                return Ok(if signed { (value as i64).into_py(py) } else { value.into_py(py) });
+            }
+
+            let mut bytes = vec![0u8; next_multiple_of(len, u32::BITS as usize) / 8];
+            self.inner.write_le_bytes(&mut bytes);
+
+            // safty: `bytes` is valid for `bytes.len()` bytes, result is new reference or null with exception set
+            unsafe {
+                let object = pyo3::ffi::_PyLong_FromByteArray(bytes.as_ptr(), bytes.len(), 1, signed as std::os::raw::c_int);
+                PyObject::from_owned_ptr_or_err(py, object)
+            }
+        })
     }
     
     // Aliases
@@ -403,6 +693,10 @@ impl Binary
     pub fn __int__(&self) -> PyResult<PyObject> {
         self.int()
     }
+    /// Allows `Binary` to be used as index (of lists, numpy arrays, in `range`, `bin` etc.)
+    pub fn __index__(&self) -> PyResult<PyObject> {
+        self.int()
+    }
     pub fn __hex__(&self) -> String {
         self.inner.to_string_hex(true)
     }
@@ -425,76 +719,112 @@ impl Binary
     }
 
     pub fn __add__(_self: PyRef<'_, Self>, other: &PyAny) -> PyResult<PyObject>{
-        arithm::add::wrapping_add(_self, other)
+        arithm::add::wrapping_add(_self, other, None)
     }
     pub fn __sub__(_self: PyRef<'_, Self>, other: &PyAny) -> PyResult<PyObject>{
-        arithm::sub::wrapping_sub(_self, other)
+        arithm::sub::wrapping_sub(_self, other, None)
     }
     pub fn __and__(_self: PyRef<'_, Self>, other: &PyAny) -> PyResult<PyObject>{
         // prioritize:
         // 1 Casting to Binary
         // 2 Creating new Binary
         if let Ok(other) = other.extract::<PyRef<Binary>>() {
-            arithm::bitwise::bitwise_and(_self, other)
+            arithm::bitwise::bitwise_and(_self, other, None)
         } else {
             Python::with_gil(|py| {
                 let binary = Binary::from(other, None, Some(_self.sign_behavior()))?.into_py(py);
                 let pyref = PyRef::extract(binary.as_ref(py))?;
             
-                arithm::bitwise::bitwise_and(_self, pyref)
+                arithm::bitwise::bitwise_and(_self, pyref, None)
             })
         }
     }
     pub fn __or__(_self: PyRef<'_, Self>, other: &PyAny) -> PyResult<PyObject>{
         if let Ok(other) = other.extract::<PyRef<Binary>>() {
-            arithm::bitwise::bitwise_or(_self, other)
+            arithm::bitwise::bitwise_or(_self, other, None)
         } else {
             Python::with_gil(|py| {
                 let binary = Binary::from(other, None, Some(_self.sign_behavior()))?.into_py(py);
                 let pyref = PyRef::extract(binary.as_ref(py))?;
             
-                arithm::bitwise::bitwise_or(_self, pyref)
+                arithm::bitwise::bitwise_or(_self, pyref, None)
             })
         }
     }
     pub fn __xor__(_self: PyRef<'_, Self>, other: &PyAny) -> PyResult<PyObject>{
         if let Ok(other) = other.extract::<PyRef<Binary>>() {
-            arithm::bitwise::bitwise_xor(_self, other)
+            arithm::bitwise::bitwise_xor(_self, other, None)
         } else {
             Python::with_gil(|py| {
                 let binary = Binary::from(other, None, Some(_self.sign_behavior()))?.into_py(py);
                 let pyref = PyRef::extract(binary.as_ref(py))?;
             
-                arithm::bitwise::bitwise_xor(_self, pyref)
+                arithm::bitwise::bitwise_xor(_self, pyref, None)
             })
         }
     }
     pub fn __rshift__(_self: PyRef<'_, Self>, other: &PyAny) -> PyResult<PyObject>{
-        arithm::shifts::arithmetic_wrapping_rsh(&_self, other)?.wrap_self()
+        arithm::shifts::arithmetic_wrapping_rsh(_self, other, None)
     }
     pub fn __lshift__(_self: PyRef<'_, Self>, other: &PyAny) -> PyResult<PyObject>{
-        arithm::shifts::wrapping_lsh(&_self, other)?.wrap_self()
+        arithm::shifts::wrapping_lsh(_self, other, None)
     }
     pub fn __neg__(_self: PyRef<'_, Self>) -> PyResult<PyObject>{
-        arithm::add::arithmetic_neg(_self)
+        arithm::add::arithmetic_neg(_self, None)
     }
     pub fn __invert__(_self: PyRef<'_, Self>) -> PyResult<PyObject>{
-        arithm::bitwise::bitwise_not(_self)
+        arithm::bitwise::bitwise_not(_self, None)
+    }
+
+    // in-place operators reuse memory of the left hand side, `a += b` gives the same result as `a = a + b`
+    pub fn __iadd__(&mut self, other: &PyAny) -> PyResult<()> {
+        let size = self.len();
+        self.inplace(other, Some(size), |a, b| arithm::add::add_base::add_assign(a, b, false).map(|_| ()))
+    }
+    pub fn __isub__(&mut self, other: &PyAny) -> PyResult<()> {
+        let size = self.len();
+        self.inplace(other, Some(size), |a, b| arithm::add::add_base::add_assign(a, b, true).map(|_| ()))
+    }
+    pub fn __iand__(&mut self, other: &PyAny) -> PyResult<()> {
+        self.inplace(other, None, |a, b| Ok(arithm::bitwise::bitwise_base::assign_with(a, b, |x, y| x & y)))
+    }
+    pub fn __ior__(&mut self, other: &PyAny) -> PyResult<()> {
+        self.inplace(other, None, |a, b| Ok(arithm::bitwise::bitwise_base::assign_with(a, b, |x, y| x | y)))
+    }
+    pub fn __ixor__(&mut self, other: &PyAny) -> PyResult<()> {
+        self.inplace(other, None, |a, b| Ok(arithm::bitwise::bitwise_base::assign_with(a, b, |x, y| x ^ y)))
+    }
+    pub fn __ilshift__(&mut self, other: &PyAny) -> PyResult<()> {
+        use arithm::shifts::shifts_base;
+        let size = self.len();
+        self.inplace(other, Some(size), |a, b| Ok(shifts_base::lsh_assign(a, shifts_base::shift_value(b)?)))
+    }
+    pub fn __irshift__(&mut self, other: &PyAny) -> PyResult<()> {
+        use arithm::shifts::shifts_base;
+        let size = self.len();
+        self.inplace(other, Some(size), |a, b| {
+            let fill = a.sign_extending_bit();
+            Ok(shifts_base::rsh_assign(a, shifts_base::shift_value(b)?, fill))
+        })
     }
 
     #[args(kwargs = "**")] 
     pub fn iter<'a>(self_: PyRef<'_, Self>, block_size: isize,  kwargs: Option<&types::PyDict>) -> PyResult<PyObject> 
     {
-        fn parse_kwargs(kwargs: Option<&types::PyDict>) -> bool {
+        fn parse_kwargs(kwargs: Option<&types::PyDict>) -> (bool, IterOutput) {
             if let Some(kwargs) = kwargs {
-                return kwargs.get_item("extend").and_then(|x| x.extract::<bool>().ok()).unwrap_or(true);
+                let extend = kwargs.get_item("extend").and_then(|x| x.extract::<bool>().ok()).unwrap_or(true);
+                let as_int = kwargs.get_item("as_int").and_then(|x| x.extract::<bool>().ok()).unwrap_or(false);
+                
+                return (extend, if as_int { IterOutput::Int } else { IterOutput::Binary });
             }
 
-            return true; // Default
+            return (true, IterOutput::Binary); // Default
         }
         Python::with_gil(|py| {
             let slf = unsafe { Py::from_borrowed_ptr(py, self_.into_ptr()) } ;
-            let iter = BinaryIterator::new(slf, block_size, parse_kwargs(kwargs))?;
+            let (extend, output) = parse_kwargs(kwargs);
+            let iter = BinaryIterator::new(slf, block_size, extend, output)?;
 
             Ok(iter.into_py(py))
         })
@@ -504,13 +834,76 @@ impl Binary
     {
         Self::iter(self_, 8, kwargs)
     }
-    pub fn bits<'a>(self_: PyRef<'_, Self>) -> PyResult<PyObject> 
+    #[args(as_bool = "false")]
+    pub fn bits<'a>(self_: PyRef<'_, Self>, as_bool: bool) -> PyResult<PyObject> 
     {
-        Self::iter(self_, 1, None)
+        if as_bool {
+            Python::with_gil(|py| {
+                Ok(BinaryIterator::new(self_.into(), 1, true, IterOutput::Bool)?.into_py(py))
+            })
+        } else {
+            Self::iter(self_, 1, None)
+        }
     }
     pub fn __iter__(self_: PyRef<'_, Self>) -> PyResult<PyObject> 
     {
-        Self::bits(self_)
+        Self::bits(self_, false)
+    }
+    /// All bits as list of bools
+    pub fn to_bools(&self) -> Vec<bool> {
+        use binary::reduce::IterableBitSlice;
+        
+        IterableBitSlice::new(&*self.inner.data).into_iter().collect()
+    }
+    #[args(signed = "false")]
+    pub fn to_ints(&self, width: usize, signed: bool) -> PyResult<Vec<PyObject>> {
+        if width == 0 {
+            return Err(exceptions::PyValueError::new_err("width must be positive"));
+        }
+        Python::with_gil(|py| {
+            (0..self.len()).step_by(width).map(|start| self.chunk_int(py, start, width, signed)).collect()
+        })
+    }
+    /// Concatenates `width` bit values (first value takes the lowest bits), inverse of `to_ints`
+    #[staticmethod]
+    #[args(signed = "false")]
+    pub fn from_ints(values: &PyAny, width: usize, signed: bool) -> PyResult<Self> {
+        if width == 0 {
+            return Err(exceptions::PyValueError::new_err("width must be positive"));
+        }
+        let mut stream = pack::pack_base::BitStream::default();
+        let mut bytes = Vec::new();
+        let mut count = 0;
+
+        if width <= 64 {
+            let values = pack::encode(values, width as u32, signed)?;
+            stream.write(&values, width as u32, &mut bytes);
+            count = values.len();
+        } else {
+            // wide values are written in 64 bit pieces
+            let sign_behavior = if signed { "signed" } else { "unsigned" };
+            for item in values.iter()? {
+                let value = Binary::from(item?, Some(width), Some(sign_behavior))?;
+                for start in (0..width).step_by(64) {
+                    let bits = (width - start).min(64);
+                    stream.write(&[value.inner.get_bits_u64(start, bits, false)], bits as u32, &mut bytes);
+                }
+                count += 1;
+            }
+        }
+        stream.flush(&mut bytes);
+
+        Self::wrap(binary::BinaryBase::parse_bitvec_from_byte_slice(&bytes, Some(count * width), None))
+    }
+    #[args(chunk_size = "None")]
+    pub fn iter_ones(self_: PyRef<'_, Self>, chunk_size: Option<usize>) -> PyResult<BitIndexIterator> 
+    {
+        BitIndexIterator::new(self_.into(), true, chunk_size)
+    }
+    #[args(chunk_size = "None")]
+    pub fn iter_zeros(self_: PyRef<'_, Self>, chunk_size: Option<usize>) -> PyResult<BitIndexIterator> 
+    {
+        BitIndexIterator::new(self_.into(), false, chunk_size)
     }
 
     // Function ideas
@@ -634,51 +1027,36 @@ impl Binary
     } 
 
     // Utility
-    pub fn find(&self, sub: &PyAny) -> PyResult<Option<usize>> {
-        if let Ok(sub) = sub.extract::<PyRef<Binary>>() { 
-            utility::find(&self, &sub)
-        } else if let Ok(bin) = sub.extract::<bool>() { 
-            if bin { 
-                Ok(utility::find_one(&self)) 
-            } else { 
-                Ok(utility::find_zero(&self)) 
-            }
-        } else if let Ok( sub) = Self::from(sub, None, Some(self.sign_behavior())) {
-            utility::find(&self, &sub)
-        } else {
-            Err(exceptions::PyTypeError::new_err(format!("Unsupported type: {}", sub)))
-        }
+    #[args(start = "None", end = "None")]
+    pub fn find(&self, py: Python, sub: &PyAny, start: Option<isize>, end: Option<isize>) -> PyResult<Option<usize>> {
+        let (start, end) = utility::search_range(&self, start, end);
+        utility::find(py, &self, &self.search_pattern(sub)?, start, end)
     } 
-    pub fn find_all(&self, sub: &PyAny) -> PyResult<Vec<usize>> {
-        if let Ok(sub) = sub.extract::<PyRef<Binary>>() { 
-            utility::find_all(&self, &sub)
-        } else if let Ok(bin) = sub.extract::<bool>() { 
-            if bin { 
-                Ok(utility::find_all_ones(&self))
-            } else { 
-                Ok(utility::find_all_zeros(&self))
-            }
-        } else if let Ok( sub) = Self::from(sub, None, Some(self.sign_behavior())) {
-            utility::find_all(&self, &sub)
-        } else {
-            Err(exceptions::PyTypeError::new_err(format!("Unsupported type: {}", sub)))
-        }
+    #[args(start = "None", end = "None")]
+    pub fn find_all(&self, py: Python, sub: &PyAny, start: Option<isize>, end: Option<isize>) -> PyResult<Vec<usize>> {
+        let (start, end) = utility::search_range(&self, start, end);
+        utility::find_all(py, &self, &self.search_pattern(sub)?, start, end)
     }
-    pub fn find_zeros(&self) -> PyResult<Vec<usize>>
+    #[args(start = "None", end = "None")]
+    pub fn count(&self, py: Python, sub: &PyAny, start: Option<isize>, end: Option<isize>) -> PyResult<usize> {
+        let (start, end) = utility::search_range(&self, start, end);
+        utility::count(py, &self, &self.search_pattern(sub)?, start, end)
+    }
+    pub fn find_zeros(&self, py: Python) -> PyResult<Vec<usize>>
     {
-        Ok(utility::find_all_zeros(&self))
+        Ok(utility::find_all_zeros(py, &self))
     }
-    pub fn find_ones(&self) -> PyResult<Vec<usize>>
+    pub fn find_ones(&self, py: Python) -> PyResult<Vec<usize>>
     {
-        Ok(utility::find_all_ones(&self))
+        Ok(utility::find_all_ones(py, &self))
     }
-    pub fn count_zeros(&self) -> PyResult<usize>
+    pub fn count_zeros(&self, py: Python) -> PyResult<usize>
     {
-        Ok(utility::count_zeros(&self))
+        Ok(utility::count_zeros(py, &self))
     }
-    pub fn count_ones(&self) -> PyResult<usize>
+    pub fn count_ones(&self, py: Python) -> PyResult<usize>
     {
-        Ok(utility::count_ones(&self))
+        Ok(utility::count_ones(py, &self))
     }
     pub fn leading_zeros(&self) -> PyResult<usize>
     {
@@ -709,21 +1087,25 @@ fn data<const SIZE: u32>(_self: &Binary) -> PyObject
 {
     // let size = _self.len().next_multiple_of(SIZE as usize);
     let size = next_multiple_of(_self.len(), SIZE as usize);
-    
-    let mut bytes  = _self.inner
-        .get_slice(
-            &types::PySliceIndices::new(0, 
-                                        size as isize,
-                                        1))
-        .unwrap()
-        .into_boxed_slice(); // for signed mask bitvec
-    
-        let (_, bytes, _) = unsafe { bytes.align_to_mut::<u8>() }; 
 
-        Python::with_gil(|py| types::PyBytes::new(py, &bytes[..size/8]).to_object(py))
+    // bytes are written straight from blocks, padding is filled with sign extending bit
+    Python::with_gil(|py| {
+        types::PyBytes::new_with(py, size/8, |bytes| {
+            _self.inner.write_le_bytes(bytes);
+            Ok(())
+        })
+        .unwrap()
+        .to_object(py)
+    })
 }
 
 
+impl From<binary::BinaryBase> for Binary {
+    fn from(inner: binary::BinaryBase) -> Binary {
+        Binary::wrap(Ok(inner)).unwrap()
+    }
+}
+
 impl From<Binary> for PyObject {
     fn from(binary: Binary) -> PyObject {
         Binary::wrap_object(Ok(binary.inner)).unwrap()
@@ -731,13 +1113,14 @@ impl From<Binary> for PyObject {
 }
 
 impl BinaryIterator {
-    pub fn new(binary: Py<Binary>, chunk_size: isize, extend: bool) -> PyResult<Self> 
+    pub fn new(binary: Py<Binary>, chunk_size: isize, extend: bool, output: IterOutput) -> PyResult<Self> 
     {
         return Ok(Self {
             inner: binary,
             index: 0,
             chunk_size: chunk_size.try_into().unwrap(),
             extend: extend,
+            output: output,
         });
     }
 }
@@ -751,6 +1134,7 @@ impl BinaryIterator {
                 inner: self.inner.clone(),
                 chunk_size: self.chunk_size,
                 extend: self.extend,
+                output: self.output,
             }.into_py(py))
         })
     }
@@ -762,30 +1146,93 @@ impl BinaryIterator {
                 return Ok(None);
             }  
 
-            let start = self.index.try_into().unwrap();
+            let start = self.index;
 
             let stop = if self.extend || self.index + self.chunk_size <= inner.len() {
-                (self.index + self.chunk_size).try_into().unwrap()
+                self.index + self.chunk_size
             } else {
-                inner.inner.len().try_into().unwrap()
+                inner.len()
             };
-
-            let slice = inner.slice(&types::PySliceIndices::new(start, stop, 1))?;
             self.index += self.chunk_size;
 
-            Ok(Some(slice))
+            // values are read straight from blocks, only `Binary` output needs a new object per chunk
+            match self.output {
+                IterOutput::Bool => Ok(Some(inner.inner.data.get_bit(start as u64).into_py(py))),
+                IterOutput::Int => Ok(Some(inner.chunk_int(py, start, stop - start, false)?)),
+                IterOutput::Binary => Ok(Some(inner.slice(&types::PySliceIndices::new(start.try_into().unwrap(), stop.try_into().unwrap(), 1))?)),
+            }
         })   
     }
 }
 
+impl BitIndexIterator {
+    pub fn new(binary: Py<Binary>, ones: bool, chunk_size: Option<usize>) -> PyResult<Self> 
+    {
+        if chunk_size == Some(0) {
+            return Err(exceptions::PyValueError::new_err("chunk_size must be positive"));
+        }
+        Ok(Self { inner: binary, index: 0, ones, chunk_size })
+    }
+}
+
+#[pymethods]
+impl BitIndexIterator {
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+    fn __next__(&mut self) -> PyResult<Option<PyObject>> {
+        Python::with_gil(|py| {
+            let binary = self.inner.borrow(py);
+            let (ones, index) = (self.ones, &mut self.index);
+
+            // bits are scanned block by block starting at the last returned index, so mutating the binary is safe
+            let mut next = || {
+                let found = utility::next_bit(&binary, *index, ones)?;
+                *index = found + 1;
+                Some(found)
+            };
+
+            match self.chunk_size {
+                None => Ok(next().map(|found| found.into_py(py))),
+                Some(chunk_size) => {
+                    let chunk: Vec<usize> = std::iter::from_fn(next).take(chunk_size).collect();
+                    Ok(if chunk.is_empty() { None } else { Some(chunk.into_py(py)) })
+                }
+            }
+        })
+    }
+}
+
 /// A Python module implemented in Rust.
 #[pymodule()]
 #[pyo3(name = "bitvec")]
 fn pybytes(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_class::<Binary>()?;
     m.add_class::<BinaryIterator>()?;
+    m.add_class::<BitIndexIterator>()?;
+    m.add_class::<array::BinaryArray>()?;
+    m.add_class::<array::ArrayFlags>()?;
+    m.add_class::<pack::Packer>()?;
+    m.add_class::<pack::Unpacker>()?;
+    m.add_class::<view::BinaryView>()?;
+    m.add_class::<mapped::MappedBinary>()?;
+    m.add_class::<sparse::SparseBinary>()?;
+    m.add_class::<rank::RankSelect>()?;
+    m.add_class::<registers::RegisterFile>()?;
+
+    m.add_function(wrap_pyfunction!(pack::pack, m)?)?;
+    m.add_function(wrap_pyfunction!(pack::unpack, m)?)?;
+    m.add_function(wrap_pyfunction!(parallel::set_num_threads, m)?)?;
+    m.add_function(wrap_pyfunction!(parallel::get_num_threads, m)?)?;
+    m.add_function(wrap_pyfunction!(strings::format_all, m)?)?;
+    m.add_function(wrap_pyfunction!(strings::parse_all, m)?)?;
+    m.add_function(wrap_pyfunction!(serialize::dump, m)?)?;
+    m.add_function(wrap_pyfunction!(serialize::dumps, m)?)?;
+    m.add_function(wrap_pyfunction!(serialize::load, m)?)?;
+    m.add_function(wrap_pyfunction!(serialize::loads, m)?)?;
 
     m.add_submodule(arithm::register_arithm_module(_py)?)?;
+    m.add_submodule(typed::register_types_module(_py)?)?;
 
     Ok(())
 }
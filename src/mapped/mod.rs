@@ -0,0 +1,372 @@
+use pyo3::{prelude::*, types, exceptions};
+use pyo3::types::IntoPyDict;
+
+use crate::binary::{self, strided, BinaryBase, SignBehavior};
+use crate::{parallel, utility, Binary};
+
+/// Blocks stored in mapped memory. Mapping starts at page boundary and holds whole blocks, except read-only and copy-on-write mappings
+/// of files that do not end at block boundary. Whole blocks are read in place, the last partial block is zero padded copy
+/// (memory past the end of the mapping is never accessed).
+#[derive(Clone, Copy)]
+struct Blocks<'a> {
+    whole: &'a [u32],
+    tail: Option<u32>,
+}
+
+impl<'a> Blocks<'a> {
+    fn new(bytes: &'a [u8]) -> Self {
+        assert!(bytes.as_ptr() as usize % 4 == 0, "Mapping is not aligned");
+        let (count, rest) = (bytes.len() / 4, bytes.len() % 4);
+        // safty: pointer is aligned, slice covers only whole blocks inside the mapping and every bit pattern is valid u32
+        let whole = unsafe { std::slice::from_raw_parts(bytes.as_ptr() as *const u32, count) };
+        let tail = (rest != 0).then(|| {
+            let mut block = [0u8; 4];
+            block[..rest].copy_from_slice(&bytes[4 * count..]);
+            u32::from_le_bytes(block)
+        });
+
+        Self { whole, tail }
+    }
+    fn len(&self) -> usize {
+        self.whole.len() + self.tail.is_some() as usize
+    }
+    fn get(&self, i: usize) -> Option<u32> {
+        self.whole.get(i).copied().or(if i == self.whole.len() { self.tail } else { None })
+    }
+}
+
+impl std::ops::Index<usize> for Blocks<'_> {
+    type Output = u32;
+
+    fn index(&self, i: usize) -> &u32 {
+        match (self.whole.get(i), &self.tail) {
+            (Some(block), _) => block,
+            (None, Some(tail)) if i == self.whole.len() => tail,
+            _ => panic!("Block index out of range: {}", i),
+        }
+    }
+}
+
+/// Calls `f` with mutable blocks of mapping. Blocks are modified in place, if the mapping ends with partial block
+/// (copy-on-write mapping of file that does not end at block boundary) they are modified in zero padded copy and written back.
+fn with_blocks_mut<R>(bytes: &mut [u8], f: impl FnOnce(&mut [u32]) -> R) -> R {
+    assert!(bytes.as_ptr() as usize % 4 == 0, "Mapping is not aligned");
+
+    if bytes.len() % 4 == 0 {
+        // safty: pointer is aligned, slice covers exactly the mapping and every bit pattern is valid u32
+        return f(unsafe { std::slice::from_raw_parts_mut(bytes.as_mut_ptr() as *mut u32, bytes.len() / 4) });
+    }
+    let blocks = Blocks::new(bytes);
+    let mut copy: Vec<u32> = (0..blocks.len()).map(|i| blocks[i]).collect();
+    let result = f(&mut copy);
+
+    for (chunk, block) in bytes.chunks_mut(4).zip(&copy) {
+        let len = chunk.len();
+        chunk.copy_from_slice(&block.to_le_bytes()[..len]);
+    }
+    result
+}
+
+/// Bit vector stored in memory mapped file (blocks are little endian 32 bit words, same layout as `Binary.raw_bytes`).
+/// Operations read and write the mapping directly, so only pages that are touched are loaded by the system.
+#[pyclass]
+pub struct MappedBinary {
+    mapping: Option<PyObject>,
+    len: usize,
+    sign_behavior: SignBehavior,
+    mode: &'static str,
+}
+
+impl MappedBinary {
+    /// Maps `path` in one of modes: `r` (read-only), `r+` (read-write), `w+` (create or overwrite) or `c` (copy-on-write, changes are not written to file)
+    pub fn open(py: Python, path: &PyAny, length: Option<usize>, mode: &str, sign_behavior: SignBehavior) -> PyResult<Self> {
+        if cfg!(target_endian = "big") {
+            return Err(exceptions::PyBufferError::new_err("Mapped binary is supported only on little endian platforms"));
+        }
+        let (mode, file_mode, access) = match mode {
+            "r" => ("r", "rb", "ACCESS_READ"),
+            "r+" => ("r+", "r+b", "ACCESS_WRITE"),
+            "w+" => ("w+", "w+b", "ACCESS_WRITE"),
+            "c" => ("c", "rb", "ACCESS_COPY"),
+            _ => return Err(exceptions::PyValueError::new_err(format!("Invalid mode: {} (expected 'r', 'r+', 'w+' or 'c')", mode))),
+        };
+        if mode == "w+" && length.is_none() {
+            return Err(exceptions::PyValueError::new_err("Lenght is required in 'w+' mode"));
+        }
+
+        let file = py.import("builtins")?.call_method1("open", (path, file_mode))?;
+        let mapping = Self::map_file(py, file, length, mode, access);
+        // mapping keeps its own handle to the file
+        file.call_method0("close")?;
+
+        let (mapping, len) = mapping?;
+        Ok(Self { mapping: Some(mapping), len, sign_behavior, mode })
+    }
+    fn map_file(py: Python, file: &PyAny, length: Option<usize>, mode: &str, access: &str) -> PyResult<(PyObject, usize)> {
+        let size: usize = file.call_method1("seek", (0, 2))?.extract()?;
+        let len = length.unwrap_or(size * 8);
+        let mut bytes = (len + 31) / 32 * 4;
+
+        if bytes == 0 {
+            return Err(exceptions::PyValueError::new_err("Cannot map empty vector"));
+        }
+        if size < bytes {
+            if mode == "r+" || mode == "w+" {
+                // grown part of the file is filled with zeros
+                file.call_method1("truncate", (bytes,))?;
+            } else if size < (len + 7) / 8 {
+                return Err(exceptions::PyValueError::new_err(format!("File is too small: {} bits need {} bytes, file has {}", len, (len + 7) / 8, size)));
+            } else {
+                // file cannot be grown, its last block is read zero padded (see `Blocks`)
+                bytes = size;
+            }
+        }
+
+        let mmap = py.import("mmap")?;
+        let kwargs = [("access", mmap.getattr(access)?)].into_py_dict(py);
+        let mapping = mmap.getattr("mmap")?.call((file.call_method0("fileno")?, bytes), Some(kwargs))?;
+
+        Ok((mapping.into(), len))
+    }
+    fn mapping<'py>(&self, py: Python<'py>) -> PyResult<&'py PyAny> {
+        match &self.mapping {
+            Some(mapping) => Ok(mapping.as_ref(py)),
+            None => Err(exceptions::PyValueError::new_err("Mapping is closed")),
+        }
+    }
+    fn with_blocks<R>(&self, py: Python, f: impl FnOnce(Blocks) -> R) -> PyResult<R> {
+        binary::with_buffer(self.mapping(py)?, |bytes| f(Blocks::new(bytes)))
+    }
+    fn with_blocks_mut<R>(&self, py: Python, f: impl FnOnce(&mut [u32]) -> R) -> PyResult<R> {
+        if self.mode == "r" {
+            return Err(exceptions::PyTypeError::new_err("Mapping is read-only"));
+        }
+        binary::with_buffer_mut(self.mapping(py)?, |bytes| with_blocks_mut(bytes, f))
+    }
+    /// `i`-th block with bits past the end cleared (blocks past the end are zero)
+    fn block(&self, blocks: Blocks, i: usize) -> u32 {
+        blocks.get(i).map_or(0, |block| block & utility::used_mask(self.len, i))
+    }
+    /// Sign extending bit of the vector
+    fn fill(&self, blocks: Blocks) -> bool {
+        self.sign_behavior.is_signed() && self.len > 0 && blocks[(self.len - 1) / 32] >> ((self.len - 1) % 32) & 1 == 1
+    }
+    fn flatten_index(&self, index: isize) -> PyResult<usize> {
+        let len = self.len as isize;
+        let flat = if index < 0 { index + len } else { index };
+
+        if flat < 0 || flat >= len {
+            return Err(exceptions::PyIndexError::new_err(format!("Index out of range: {}", index)));
+        }
+        Ok(flat as usize)
+    }
+    /// Calls `f` with block getter of `other`: blocks of other mapping are read in place, other values are converted to `Binary` first.
+    /// Shorter operand is sign extended, like in `Binary` operations
+    fn with_operand<R>(&self, other: &PyAny, f: impl FnOnce(&(dyn Fn(usize) -> u32 + Sync)) -> R) -> PyResult<R> {
+        let py = other.py();
+
+        if other.is_instance_of::<MappedBinary>()? {
+            let other = other.extract::<PyRef<MappedBinary>>()?;
+            return other.with_blocks(py, |blocks| {
+                let len = other.len;
+                let fill = if other.fill(blocks) { u32::MAX } else { 0 };
+
+                f(&|i| {
+                    if i < len / 32 {
+                        blocks[i]
+                    } else if i < blocks.len() {
+                        blocks[i] & utility::used_mask(len, i) | fill << (len % 32)
+                    } else {
+                        fill
+                    }
+                })
+            });
+        }
+        let other = Binary::from(other, None, Some(self.sign_behavior.as_str()))?;
+        let (inner, fill) = (&other.inner, other.inner.sign_extending_bit());
+
+        Ok(f(&|i| inner.extended_block(i, fill)))
+    }
+    /// New `Binary` (as long as the mapping) with blocks `op(self, other)`
+    fn combine(&self, other: &PyAny, op: impl Fn(u32, u32) -> u32 + Sync) -> PyResult<PyObject> {
+        let py = other.py();
+        let base = self.with_operand(other, |operand| {
+            self.with_blocks(py, |blocks| {
+                let mut out = vec![0u32; blocks.len()];
+
+                parallel::without_gil(py, self.len, || parallel::fill_blocks(&mut out, |offset, chunk| {
+                    for (i, block) in chunk.iter_mut().enumerate() {
+                        *block = op(self.block(blocks, offset + i), operand(offset + i));
+                    }
+                }));
+                BinaryBase::from_blocks(&out, self.len, self.sign_behavior)
+            })
+        })??;
+
+        Binary::wrap_object(Ok(base))
+    }
+    /// `self = op(self, other)` computed in the mapping
+    fn assign_with(&self, other: &PyAny, op: impl Fn(u32, u32) -> u32 + Sync) -> PyResult<()> {
+        let (py, len) = (other.py(), self.len);
+
+        self.with_operand(other, |operand| {
+            self.with_blocks_mut(py, |blocks| {
+                parallel::without_gil(py, len, || parallel::fill_blocks(blocks, |offset, chunk| {
+                    for (i, block) in chunk.iter_mut().enumerate() {
+                        *block = op(*block, operand(offset + i)) & utility::used_mask(len, offset + i);
+                    }
+                }))
+            })
+        })?
+    }
+}
+
+#[pymethods]
+impl MappedBinary {
+    #[getter]
+    pub fn len(&self) -> usize {
+        self.len
+    }
+    #[getter]
+    pub fn mode(&self) -> &'static str {
+        self.mode
+    }
+    #[getter]
+    pub fn closed(&self) -> bool {
+        self.mapping.is_none()
+    }
+    pub fn sign_behavior(&self) -> &'static str {
+        self.sign_behavior.as_str()
+    }
+    pub fn __len__(&self) -> usize {
+        self.len
+    }
+    /// Writes changes to the file
+    pub fn flush(&self, py: Python) -> PyResult<()> {
+        self.mapping(py)?.call_method0("flush")?;
+        Ok(())
+    }
+    /// Unmaps the file (changes are written by the system), any further operation raises `ValueError`
+    pub fn close(&mut self, py: Python) -> PyResult<()> {
+        if let Some(mapping) = &self.mapping {
+            mapping.call_method0(py, "close")?;
+        }
+        self.mapping = None;
+        Ok(())
+    }
+    pub fn __enter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+    pub fn __exit__(&mut self, py: Python, _exc_type: &PyAny, _exc_value: &PyAny, _traceback: &PyAny) -> PyResult<bool> {
+        self.close(py)?;
+        Ok(false)
+    }
+    /// Copies whole mapping into new `Binary`
+    pub fn binary(&self, py: Python) -> PyResult<PyObject> {
+        let base = self.with_blocks(py, |blocks| {
+            let blocks: Vec<u32> = (0..blocks.len()).map(|i| self.block(blocks, i)).collect();
+            BinaryBase::from_blocks(&blocks, self.len, self.sign_behavior)
+        })?;
+
+        Binary::wrap_object(Ok(base))
+    }
+    pub fn __getitem__(&self, py: Python, index: &PyAny) -> PyResult<PyObject> {
+        if let Ok(index) = index.extract::<isize>() {
+            let index = self.flatten_index(index)?;
+            return Ok(self.with_blocks(py, |blocks| blocks[index / 32] >> (index % 32) & 1 == 1)?.into_py(py));
+        }
+        if let Ok(slice) = index.extract::<&types::PySlice>() {
+            let slice = slice.indices(self.len as std::os::raw::c_long)?;
+            let count = slice.slicelength as usize;
+
+            let base = self.with_blocks(py, |blocks| {
+                let blocks = strided::gather(|i| self.block(blocks, i), slice.start as usize, slice.step, count);
+                BinaryBase::from_blocks(&blocks, count, SignBehavior::Unsigned)
+            })?;
+            return Binary::wrap_object(Ok(base));
+        }
+        Err(exceptions::PyTypeError::new_err(format!("Invalid index type {}", index)))
+    }
+    pub fn __setitem__(&mut self, py: Python, index: &PyAny, value: &PyAny) -> PyResult<()> {
+        if let Ok(index) = index.extract::<isize>() {
+            let index = self.flatten_index(index)?;
+            let bit = value.extract::<bool>()
+                .map_err(|_| exceptions::PyTypeError::new_err(format!("Value {} cannot be converted to bool", value)))?;
+            let mask = 1u32 << (index % 32);
+
+            return self.with_blocks_mut(py, |blocks| if bit { blocks[index / 32] |= mask } else { blocks[index / 32] &= !mask });
+        }
+        if let Ok(slice) = index.extract::<&types::PySlice>() {
+            let slice = slice.indices(self.len as std::os::raw::c_long)?;
+            let (first, step, count) = (slice.start as usize, slice.step, slice.slicelength as usize);
+
+            if let Ok(bit) = value.extract::<bool>() {
+                if count == 0 {
+                    return Ok(());
+                }
+                // negative step sets the same bits as positive one starting at the lowest element
+                let lowest = if step > 0 { first } else { first - (count - 1) * step.unsigned_abs() };
+                return self.with_blocks_mut(py, |blocks| strided::fill(blocks, lowest, step.unsigned_abs(), count, bit));
+            }
+            let value = Binary::from(value, Some(count), Some("unsigned"))?;
+            let fill = value.inner.sign_extending_bit();
+
+            return self.with_blocks_mut(py, |blocks| strided::scatter(blocks, first, step, count, |i| value.inner.extended_block(i, fill)));
+        }
+        Err(exceptions::PyTypeError::new_err(format!("Invalid index type {}", index)))
+    }
+    pub fn count_ones(&self, py: Python) -> PyResult<usize> {
+        self.with_blocks(py, |blocks| parallel::without_gil(py, self.len, || utility::count_bits_in(|i| blocks[i], blocks.len(), self.len, true)))
+    }
+    pub fn count_zeros(&self, py: Python) -> PyResult<usize> {
+        self.with_blocks(py, |blocks| parallel::without_gil(py, self.len, || utility::count_bits_in(|i| blocks[i], blocks.len(), self.len, false)))
+    }
+    pub fn find_ones(&self, py: Python) -> PyResult<Vec<usize>> {
+        self.with_blocks(py, |blocks| parallel::without_gil(py, self.len, || utility::all_bits_in(|i| blocks[i], blocks.len(), self.len, true)))
+    }
+    pub fn find_zeros(&self, py: Python) -> PyResult<Vec<usize>> {
+        self.with_blocks(py, |blocks| parallel::without_gil(py, self.len, || utility::all_bits_in(|i| blocks[i], blocks.len(), self.len, false)))
+    }
+    #[args(start = "None", end = "None")]
+    pub fn find(&self, py: Python, sub: &PyAny, start: Option<isize>, end: Option<isize>) -> PyResult<Option<usize>> {
+        let pattern = utility::pattern(&Binary::parse_search_pattern(sub, self.sign_behavior.as_str())?)?;
+        let (start, end) = utility::clamp_range(self.len, start, end);
+
+        self.with_blocks(py, |text| parallel::without_gil(py, end.saturating_sub(start), || utility::search::find(&|i: usize| text.get(i).unwrap_or(0), &pattern, start, end)))
+    }
+    #[args(start = "None", end = "None")]
+    pub fn find_all(&self, py: Python, sub: &PyAny, start: Option<isize>, end: Option<isize>) -> PyResult<Vec<usize>> {
+        let pattern = utility::pattern(&Binary::parse_search_pattern(sub, self.sign_behavior.as_str())?)?;
+        let (start, end) = utility::clamp_range(self.len, start, end);
+
+        self.with_blocks(py, |text| parallel::without_gil(py, end.saturating_sub(start), || utility::search::find_all(&|i: usize| text.get(i).unwrap_or(0), &pattern, start, end)))
+    }
+    #[args(start = "None", end = "None")]
+    pub fn count(&self, py: Python, sub: &PyAny, start: Option<isize>, end: Option<isize>) -> PyResult<usize> {
+        let pattern = utility::pattern(&Binary::parse_search_pattern(sub, self.sign_behavior.as_str())?)?;
+        let (start, end) = utility::clamp_range(self.len, start, end);
+
+        self.with_blocks(py, |text| parallel::without_gil(py, end.saturating_sub(start), || utility::search::count(&|i: usize| text.get(i).unwrap_or(0), &pattern, start, end)))
+    }
+    pub fn __and__(&self, other: &PyAny) -> PyResult<PyObject> {
+        self.combine(other, |a, b| a & b)
+    }
+    pub fn __or__(&self, other: &PyAny) -> PyResult<PyObject> {
+        self.combine(other, |a, b| a | b)
+    }
+    pub fn __xor__(&self, other: &PyAny) -> PyResult<PyObject> {
+        self.combine(other, |a, b| a ^ b)
+    }
+    pub fn __iand__(&mut self, other: &PyAny) -> PyResult<()> {
+        self.assign_with(other, |a, b| a & b)
+    }
+    pub fn __ior__(&mut self, other: &PyAny) -> PyResult<()> {
+        self.assign_with(other, |a, b| a | b)
+    }
+    pub fn __ixor__(&mut self, other: &PyAny) -> PyResult<()> {
+        self.assign_with(other, |a, b| a ^ b)
+    }
+    pub fn __repr__(&self) -> String {
+        format!("MappedBinary(len={}, mode='{}', sign_behavior='{}')", self.len, self.mode, self.sign_behavior)
+    }
+}
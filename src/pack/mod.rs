@@ -0,0 +1,222 @@
+use pyo3::{prelude::*, types, exceptions};
+
+use crate::binary;
+
+pub mod pack_base {
+    pub fn mask(width: u32) -> u64 {
+        if width >= 64 { u64::MAX } else { (1u64 << width) - 1 }
+    }
+
+    /// Bits that did not form full value (or full byte when packing) yet, lowest bit comes first.
+    /// Stream never holds more than 64 bits between calls so at least 64 bits can be pushed at once.
+    #[derive(Clone, Debug, Default)]
+    pub struct BitStream {
+        acc: u128,
+        len: u32,
+    }
+
+    impl BitStream {
+        pub fn pending(&self) -> u32 {
+            self.len
+        }
+        fn push(&mut self, value: u64, bits: u32) {
+            self.acc |= (value as u128) << self.len;
+            self.len += bits;
+        }
+        fn drain(&mut self, width: u32, out: &mut Vec<u64>) {
+            while self.len >= width {
+                out.push(self.acc as u64 & mask(width));
+                self.acc >>= width;
+                self.len -= width;
+            }
+        }
+        /// Decodes first `bits` bits of `bytes` into values of `width` bits. Bits of incomplete value stay in the stream
+        pub fn read(&mut self, bytes: &[u8], bits: usize, width: u32, out: &mut Vec<u64>) {
+            let full = bits / 8;
+
+            out.reserve((self.len as usize + bits) / width as usize);
+
+            let mut words = bytes[..full].chunks_exact(8);
+            for word in &mut words {
+                self.push(u64::from_le_bytes(word.try_into().unwrap()), 64);
+                self.drain(width, out);
+            }
+            for byte in words.remainder() {
+                self.push(*byte as u64, 8);
+                self.drain(width, out);
+            }
+            if bits % 8 != 0 {
+                self.push(bytes[full] as u64 & mask(bits as u32 % 8), bits as u32 % 8);
+                self.drain(width, out);
+            }
+        }
+        /// Appends `width` lowest bits of every value. Full bytes are moved to `out`
+        pub fn write(&mut self, values: &[u64], width: u32, out: &mut Vec<u8>) {
+            out.reserve((self.len as usize + values.len() * width as usize) / 8);
+
+            for value in values {
+                self.push(value & mask(width), width);
+                if self.len >= 64 {
+                    out.extend_from_slice(&(self.acc as u64).to_le_bytes());
+                    self.acc >>= 64;
+                    self.len -= 64;
+                }
+            }
+            while self.len >= 8 {
+                out.push(self.acc as u8);
+                self.acc >>= 8;
+                self.len -= 8;
+            }
+        }
+        /// Moves remaining bits to `out`, last byte is padded with zeros
+        pub fn flush(&mut self, out: &mut Vec<u8>) {
+            while self.len > 0 {
+                out.push(self.acc as u8);
+                self.acc >>= 8;
+                self.len = self.len.saturating_sub(8);
+            }
+            self.acc = 0;
+        }
+    }
+
+    pub fn sign_extend(value: u64, width: u32) -> i64 {
+        let shift = 64 - width;
+        ((value << shift) as i64) >> shift
+    }
+}
+
+use pack_base::BitStream;
+
+pub fn check_width(width: u32) -> PyResult<()> {
+    if width == 0 || width > 64 {
+        return Err(exceptions::PyValueError::new_err(format!("Width must be in range 1..=64, got {}", width)));
+    }
+    Ok(())
+}
+
+/// Converts python values (ints or `Binary`) to raw `width` bit values
+pub fn encode(values: &PyAny, width: u32, signed: bool) -> PyResult<Vec<u64>> {
+    let (min, max) = if signed {
+        (-(1i128 << (width - 1)), (1i128 << (width - 1)) - 1)
+    } else {
+        (0, pack_base::mask(width) as i128)
+    };
+
+    values.iter()?.map(|item| {
+        let item = item?;
+        let value: i128 = if let Ok(binary) = item.extract::<PyRef<crate::Binary>>() {
+            binary.int()?.extract(item.py())?
+        } else {
+            item.extract()?
+        };
+        if value < min || value > max {
+            return Err(exceptions::PyOverflowError::new_err(format!("Value {} cannot fit in {} bits", value, width)));
+        }
+        Ok(value as u64)
+    }).collect()
+}
+
+/// Decodes `data` (`Binary` or any object with buffer protocol) with `stream`
+fn decode(py: Python, stream: &mut BitStream, data: &PyAny, width: u32, signed: bool) -> PyResult<PyObject> {
+    let mut values = Vec::new();
+
+    if let Ok(source) = data.extract::<PyRef<crate::Binary>>() {
+        let mut bytes = vec![0u8; (source.len() + 7) / 8];
+        source.inner.write_le_bytes(&mut bytes);
+        stream.read(&bytes, source.len(), width, &mut values);
+    } else {
+        binary::with_buffer(data, |bytes| stream.read(bytes, bytes.len() * 8, width, &mut values))?;
+    }
+
+    if signed {
+        Ok(values.into_iter().map(|value| pack_base::sign_extend(value, width)).collect::<Vec<_>>().into_py(py))
+    } else {
+        Ok(values.into_py(py))
+    }
+}
+
+/// Packs `values` into `width` bit fields (first value takes the lowest bits) and returns them as bytes
+#[pyfunction(signed = "false")]
+pub fn pack(py: Python, values: &PyAny, width: u32, signed: bool) -> PyResult<PyObject> {
+    check_width(width)?;
+
+    let values = encode(values, width, signed)?;
+
+    let mut stream = BitStream::default();
+    let mut bytes = Vec::new();
+    stream.write(&values, width, &mut bytes);
+    stream.flush(&mut bytes);
+
+    Ok(types::PyBytes::new(py, &bytes).into())
+}
+
+/// Inverse of `pack`. Bits that do not form full value at the end of `data` are ignored
+#[pyfunction(signed = "false")]
+pub fn unpack(py: Python, data: &PyAny, width: u32, signed: bool) -> PyResult<PyObject> {
+    check_width(width)?;
+
+    decode(py, &mut BitStream::default(), data, width, signed)
+}
+
+/// Streaming version of `pack`, bits that do not form full byte are kept until next call (or `flush`)
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct Packer {
+    stream: BitStream,
+    width: u32,
+    signed: bool,
+}
+
+#[pymethods]
+impl Packer {
+    #[new]
+    #[args(signed = "false")]
+    fn py_new(width: u32, signed: bool) -> PyResult<Self> {
+        check_width(width)?;
+        Ok(Self { stream: BitStream::default(), width, signed })
+    }
+    pub fn pack(&mut self, py: Python, values: &PyAny) -> PyResult<PyObject> {
+        let values = encode(values, self.width, self.signed)?;
+
+        let mut bytes = Vec::new();
+        self.stream.write(&values, self.width, &mut bytes);
+
+        Ok(types::PyBytes::new(py, &bytes).into())
+    }
+    pub fn flush(&mut self, py: Python) -> PyObject {
+        let mut bytes = Vec::new();
+        self.stream.flush(&mut bytes);
+
+        types::PyBytes::new(py, &bytes).into()
+    }
+    #[getter]
+    pub fn pending(&self) -> u32 {
+        self.stream.pending()
+    }
+}
+
+/// Streaming version of `unpack`, bits of incomplete value are kept until next `feed`
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct Unpacker {
+    stream: BitStream,
+    width: u32,
+    signed: bool,
+}
+
+#[pymethods]
+impl Unpacker {
+    #[new]
+    #[args(signed = "false")]
+    fn py_new(width: u32, signed: bool) -> PyResult<Self> {
+        check_width(width)?;
+        Ok(Self { stream: BitStream::default(), width, signed })
+    }
+    pub fn feed(&mut self, py: Python, data: &PyAny) -> PyResult<PyObject> {
+        decode(py, &mut self.stream, data, self.width, self.signed)
+    }
+    #[getter]
+    pub fn pending(&self) -> u32 {
+        self.stream.pending()
+    }
+}
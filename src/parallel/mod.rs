@@ -0,0 +1,82 @@
+use std::ops::Range;
+use std::sync::atomic::{AtomicUsize, Ordering};
+
+use pyo3::{prelude::*, exceptions};
+
+/// Operations on at least that many bits are computed without holding the GIL
+pub const GIL_THRESHOLD: usize = 1 << 16;
+/// Operations on at least that many bits are split between worker threads
+pub const PARALLEL_THRESHOLD: usize = 1 << 22;
+
+/// Number of worker threads, 0 means number of available cores
+static NUM_THREADS: AtomicUsize = AtomicUsize::new(0);
+
+pub fn num_threads() -> usize {
+    match NUM_THREADS.load(Ordering::Relaxed) {
+        0 => std::thread::available_parallelism().map(|n| n.get()).unwrap_or(1),
+        n => n,
+    }
+}
+
+/// Runs `f` with released GIL if operation touches at least `GIL_THRESHOLD` bits.
+/// Called once by the outermost operation (kernels below never touch the GIL), `f` must not acquire the GIL again.
+pub fn without_gil<T: Send>(py: Python, bits: usize, f: impl FnOnce() -> T + Send) -> T {
+    if bits < GIL_THRESHOLD {
+        f()
+    } else {
+        py.allow_threads(f)
+    }
+}
+
+/// Splits `0..len` blocks into one range per worker thread and maps ranges with `f`. Results are returned in order of ranges.
+/// Small inputs (below `PARALLEL_THRESHOLD` bits) are mapped as a single range on the calling thread.
+pub fn map_ranges<T: Send>(len: usize, f: impl Fn(Range<usize>) -> T + Sync) -> Vec<T> {
+    let threads = if len * 32 < PARALLEL_THRESHOLD { 1 } else { num_threads().min(len) };
+    if threads <= 1 {
+        return vec![f(0..len)];
+    }
+
+    let chunk = (len + threads - 1) / threads;
+    let f = &f;
+
+    std::thread::scope(|scope| {
+        let workers: Vec<_> = (0..len).step_by(chunk)
+            .map(|start| scope.spawn(move || f(start..(start + chunk).min(len))))
+            .collect();
+
+        workers.into_iter().map(|worker| worker.join().unwrap()).collect()
+    })
+}
+
+/// Fills `out` by calling `f(offset, chunk)` on disjoint chunks of `out`, in parallel if `out` is large enough
+pub fn fill_blocks(out: &mut [u32], f: impl Fn(usize, &mut [u32]) + Sync) {
+    let len = out.len();
+    let threads = if len * 32 < PARALLEL_THRESHOLD { 1 } else { num_threads().min(len) };
+    if threads <= 1 {
+        return f(0, out);
+    }
+
+    let chunk = (len + threads - 1) / threads;
+    let f = &f;
+
+    std::thread::scope(|scope| {
+        for (i, blocks) in out.chunks_mut(chunk).enumerate() {
+            scope.spawn(move || f(i * chunk, blocks));
+        }
+    });
+}
+
+/// Sets number of threads used by large bitwise operations, popcounts and searches. 0 restores default (number of cores)
+#[pyfunction]
+pub fn set_num_threads(threads: usize) -> PyResult<()> {
+    if threads > 1024 {
+        return Err(exceptions::PyValueError::new_err(format!("Too many threads: {}", threads)));
+    }
+    NUM_THREADS.store(threads, Ordering::Relaxed);
+    Ok(())
+}
+
+#[pyfunction]
+pub fn get_num_threads() -> usize {
+    num_threads()
+}
@@ -0,0 +1,270 @@
+use std::os::raw::c_long;
+
+use pyo3::{prelude::*, types, exceptions};
+use bv::Bits;
+
+use crate::arithm::flags::Flags;
+use crate::array::array_base::{stride, top_mask};
+use crate::binary::{self, strided, BinaryBase, SignBehavior};
+use crate::Binary;
+
+/// Kernels of `RegisterFile`. Every register occupies `stride(width)` consecutive `u32` blocks,
+/// bits above `width` in the last block of the register are always kept at zero.
+pub mod registers_base {
+    use crate::array::array_base::top_mask;
+
+    /// `dst += src` (or `dst += !src + carry` if `invert` is set) in place, returns carry out of the `width` bit
+    pub fn add_assign(dst: &mut [u32], src: &[u32], width: usize, invert: bool, mut carry: bool) -> bool {
+        let mask = top_mask(width);
+
+        for (w, (a, b)) in dst.iter_mut().zip(src).enumerate() {
+            let mut b = if invert { !*b } else { *b };
+            if w + 1 == src.len() {
+                b &= mask;
+            }
+            let (sum, c1) = a.overflowing_add(b);
+            let (sum, c2) = sum.overflowing_add(carry as u32);
+            carry = c1 || c2;
+            *a = sum;
+        }
+
+        if let Some(last) = dst.last_mut() {
+            if mask != u32::MAX {
+                // partial block cannot carry out of u32, carry lands right above the mask
+                carry = *last & !mask != 0;
+                *last &= mask;
+            }
+        }
+        carry
+    }
+
+    /// Value of register with at most 64 bits, sign extended if `signed` is set
+    pub fn to_i128(register: &[u32], width: usize, signed: bool) -> i128 {
+        let value = register.iter().rev().fold(0u64, |value, block| value << 32 | *block as u64);
+
+        if signed && width > 0 {
+            crate::pack::pack_base::sign_extend(value, width as u32) as i128
+        } else {
+            value as i128
+        }
+    }
+
+    /// Blocks of `value` truncated to `width` bits (`width <= 64`)
+    pub fn from_i128(value: i128, width: usize) -> Vec<u32> {
+        let value = if width >= 64 { value as u64 } else { value as u64 & ((1u64 << width) - 1) };
+
+        [value as u32, (value >> 32) as u32][..super::stride(width)].to_vec()
+    }
+}
+
+/// Registers of the same width stored in one contiguous buffer.
+/// Arithmetic between registers is performed in place, without creating intermediate `Binary` objects.
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct RegisterFile
+{
+    data: Vec<u32>,
+    count: usize,
+    width: usize,
+    sign_behavior: SignBehavior,
+}
+
+impl RegisterFile
+{
+    fn stride(&self) -> usize {
+        stride(self.width)
+    }
+
+    fn flatten_index(&self, index: isize) -> PyResult<usize> {
+        let flatten = if index < 0 { index + self.count as isize } else { index };
+
+        if flatten < 0 || flatten as usize >= self.count {
+            return Err(exceptions::PyIndexError::new_err(format!("Register index out of range: {}", index)));
+        }
+        Ok(flatten as usize)
+    }
+
+    fn register(&self, index: usize) -> &[u32] {
+        let stride = self.stride();
+        &self.data[index * stride..(index + 1) * stride]
+    }
+
+    fn register_mut(&mut self, index: usize) -> &mut [u32] {
+        let stride = self.stride();
+        &mut self.data[index * stride..(index + 1) * stride]
+    }
+
+    fn get(&self, index: usize) -> BinaryBase {
+        BinaryBase::from_blocks(self.register(index), self.width, self.sign_behavior)
+    }
+
+    /// Converts any Binary-convertable value to blocks of a register. Value has to fit in `width` bits
+    fn to_blocks(&self, value: &PyAny) -> PyResult<Vec<u32>> {
+        let signed = self.sign_behavior.is_signed();
+
+        // ints that fit are stored without creating `Binary`
+        if self.width <= 64 && self.width > 0 {
+            if let Ok(int) = value.extract::<i128>() {
+                let (min, max) = if signed { (-(1i128 << (self.width - 1)), (1i128 << (self.width - 1)) - 1) } else { (0, (1i128 << self.width) - 1) };
+                if min <= int && int <= max {
+                    return Ok(registers_base::from_i128(int, self.width));
+                }
+            }
+        }
+
+        let value = Binary::from_parsed(value, Some(self.width), Some(self.sign_behavior))?;
+        let mut blocks = (0..self.stride()).map(|k| value.inner.data.get_block(k)).collect::<Vec<_>>();
+        if let Some(last) = blocks.last_mut() {
+            *last &= top_mask(self.width);
+        }
+        Ok(blocks)
+    }
+
+    /// Bits `start..stop` of register selected with `(index, slice)` key, slices have to be contiguous
+    fn field(&self, index: isize, slice: &types::PySlice) -> PyResult<(usize, usize, usize)> {
+        let index = self.flatten_index(index)?;
+        let indices = slice.indices(self.width as c_long)?;
+
+        if indices.step != 1 {
+            return Err(exceptions::PyValueError::new_err("Register fields have to be contiguous (step 1)"));
+        }
+        Ok((index, indices.start as usize, indices.slicelength as usize))
+    }
+
+    fn flags(&self, index: usize, overflow: bool) -> Flags {
+        let register = self.register(index);
+        let zeroflag = register.iter().all(|block| *block == 0);
+        let signflag = self.width > 0 && (register[register.len() - 1] >> ((self.width - 1) % 32)) & 1 == 1;
+
+        Flags::new(overflow, zeroflag, signflag)
+    }
+
+    fn add_base(&mut self, dst: isize, src: &[u32], invert: bool) -> PyResult<Flags> {
+        let dst = self.flatten_index(dst)?;
+        let width = self.width;
+
+        let overflow = registers_base::add_assign(self.register_mut(dst), src, width, invert, invert);
+        Ok(self.flags(dst, overflow))
+    }
+}
+
+#[pymethods]
+impl RegisterFile
+{
+    #[new]
+    #[args(signed = "false")]
+    fn py_new(count: usize, width: usize, signed: bool) -> Self {
+        Self {
+            data: vec![0u32; stride(width) * count],
+            count,
+            width,
+            sign_behavior: if signed { SignBehavior::Signed } else { SignBehavior::Unsigned },
+        }
+    }
+
+    #[getter]
+    pub fn width(&self) -> usize {
+        self.width
+    }
+    pub fn sign_behavior(&self) -> &'static str {
+        self.sign_behavior.as_str()
+    }
+
+    pub fn __len__(&self) -> usize {
+        self.count
+    }
+    pub fn __repr__(&self) -> String {
+        let items = (0..self.count).map(|i| self.get(i).to_string_formatted_default()).collect::<Vec<_>>();
+        format!("RegisterFile([{}], width={}, signed={})", items.join(", "), self.width, if self.sign_behavior.is_signed() { "True" } else { "False" })
+    }
+    /// `registers[i]` copies whole register, `registers[i, start:stop]` copies bit field of the register (as unsigned value)
+    pub fn __getitem__(&self, key: &PyAny) -> PyResult<PyObject> {
+        if let Ok((index, slice)) = key.extract::<(isize, &types::PySlice)>() {
+            let (index, start, len) = self.field(index, slice)?;
+            let register = self.register(index);
+            let blocks = strided::gather(|i| register.get(i).copied().unwrap_or(0), start, 1, len);
+
+            return Binary::wrap_object(Ok(BinaryBase::from_blocks(&blocks, len, SignBehavior::Unsigned)));
+        }
+        let index = self.flatten_index(key.extract()?)?;
+        Binary::wrap_object(Ok(self.get(index)))
+    }
+    /// `registers[i] = value` overwrites whole register, `registers[i, start:stop] = value` overwrites only the bit field
+    pub fn __setitem__(&mut self, key: &PyAny, value: &PyAny) -> PyResult<()> {
+        if let Ok((index, slice)) = key.extract::<(isize, &types::PySlice)>() {
+            let (index, start, len) = self.field(index, slice)?;
+            let value = Binary::from(value, Some(len), Some("unsigned"))?;
+            let fill = value.inner.sign_extending_bit();
+
+            strided::scatter(self.register_mut(index), start, 1, len, |i| value.inner.extended_block(i, fill));
+            return Ok(());
+        }
+        let index = self.flatten_index(key.extract()?)?;
+        let blocks = self.to_blocks(value)?;
+
+        self.register_mut(index).copy_from_slice(&blocks);
+        Ok(())
+    }
+    /// Value of register as Python int, registers up to 64 bits are converted without creating `Binary`
+    pub fn int(&self, py: Python, index: isize) -> PyResult<PyObject> {
+        let index = self.flatten_index(index)?;
+
+        if self.width <= 64 {
+            return Ok(registers_base::to_i128(self.register(index), self.width, self.sign_behavior.is_signed()).into_py(py));
+        }
+        Binary::wrap(Ok(self.get(index)))?.int()
+    }
+
+    /// `registers[dst] += registers[src]`, returns flags of the result
+    pub fn add(&mut self, dst: isize, src: isize) -> PyResult<Flags> {
+        let src = self.register(self.flatten_index(src)?).to_vec();
+        self.add_base(dst, &src, false)
+    }
+    /// `registers[dst] -= registers[src]`, returns flags of the result (overflow is carry out of the `width` bit, same as in `arithm.flaged_sub`)
+    pub fn sub(&mut self, dst: isize, src: isize) -> PyResult<Flags> {
+        let src = self.register(self.flatten_index(src)?).to_vec();
+        self.add_base(dst, &src, true)
+    }
+    /// `registers[dst] += value`, value has to fit in the register
+    pub fn add_imm(&mut self, dst: isize, value: &PyAny) -> PyResult<Flags> {
+        let value = self.to_blocks(value)?;
+        self.add_base(dst, &value, false)
+    }
+    /// `registers[dst] -= value`, value has to fit in the register
+    pub fn sub_imm(&mut self, dst: isize, value: &PyAny) -> PyResult<Flags> {
+        let value = self.to_blocks(value)?;
+        self.add_base(dst, &value, true)
+    }
+    /// `registers[dst] = registers[src]`
+    pub fn mov(&mut self, dst: isize, src: isize) -> PyResult<()> {
+        let (dst, src) = (self.flatten_index(dst)?, self.flatten_index(src)?);
+        let stride = self.stride();
+
+        self.data.copy_within(src * stride..(src + 1) * stride, dst * stride);
+        Ok(())
+    }
+
+    /// Copies all registers into bytes (little endian blocks, `stride * 4` bytes per register)
+    pub fn snapshot(&self, py: Python) -> PyObject {
+        let bytes = self.data.iter().flat_map(|block| block.to_le_bytes()).collect::<Vec<_>>();
+        types::PyBytes::new(py, &bytes).into()
+    }
+    /// Overwrites all registers with `snapshot` of register file with the same shape (any bytes-like object)
+    pub fn restore(&mut self, snapshot: &PyAny) -> PyResult<()> {
+        let expected = self.data.len() * 4;
+        let blocks = binary::with_buffer(snapshot, |bytes| {
+            (bytes.len() == expected).then(|| bytes.chunks(4).map(|chunk| u32::from_le_bytes(chunk.try_into().unwrap())).collect::<Vec<_>>())
+        })?;
+        let mut blocks = blocks.ok_or_else(|| exceptions::PyValueError::new_err(format!("Snapshot has to be {} bytes long", expected)))?;
+
+        // bits above the width are not part of registers
+        let stride = self.stride();
+        for register in blocks.chunks_mut(stride.max(1)) {
+            if let Some(last) = register.last_mut() {
+                *last &= top_mask(self.width);
+            }
+        }
+        self.data = blocks;
+        Ok(())
+    }
+}
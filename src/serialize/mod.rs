@@ -0,0 +1,151 @@
+use pyo3::{prelude::*, types, exceptions};
+
+use crate::binary::{self, BinaryBase};
+use crate::Binary;
+
+pub mod serialize_base {
+    use pyo3::{PyResult, exceptions};
+    use bv::Bits;
+    use crate::binary::{BinaryBase, SignBehavior};
+
+    /// Header of `dump` output, followed by number of values (u64, little endian)
+    pub const MAGIC: &[u8; 4] = b"BVC1";
+
+    fn invalid(message: &str) -> pyo3::PyErr {
+        exceptions::PyValueError::new_err(format!("Invalid serialized data: {}", message))
+    }
+
+    /// Reads `count` bytes starting at `pos` and moves `pos` past them
+    pub fn take<'a>(bytes: &'a [u8], pos: &mut usize, count: usize) -> PyResult<&'a [u8]> {
+        if bytes.len() - *pos < count {
+            return Err(invalid("unexpected end of data"));
+        }
+        let taken = &bytes[*pos..*pos + count];
+        *pos += count;
+
+        Ok(taken)
+    }
+
+    pub fn take_u64(bytes: &[u8], pos: &mut usize) -> PyResult<u64> {
+        Ok(u64::from_le_bytes(take(bytes, pos, 8)?.try_into().unwrap()))
+    }
+
+    /// Appends single value: lenght in bits (u64), sign behavior (u8, 1 if signed) and `ceil(len/8)` bytes of blocks (little endian)
+    pub fn encode(out: &mut Vec<u8>, binary: &BinaryBase) {
+        let len = binary.len_usize();
+
+        out.extend_from_slice(&(len as u64).to_le_bytes());
+        out.push(binary.sign_behavior.is_signed() as u8);
+
+        let end = out.len() + (len + 7) / 8;
+        for i in 0..binary.data.block_len() {
+            out.extend_from_slice(&binary.data.get_block(i).to_le_bytes());
+        }
+        out.truncate(end);
+    }
+
+    /// Inverse of `encode`, reads value starting at `pos` and moves `pos` past it
+    pub fn decode(bytes: &[u8], pos: &mut usize) -> PyResult<BinaryBase> {
+        let len = take_u64(bytes, pos)?;
+        let sign_behavior = match take(bytes, pos, 1)?[0] {
+            0 => SignBehavior::Unsigned,
+            1 => SignBehavior::Signed,
+            other => return Err(invalid(&format!("unknown sign behavior {}", other))),
+        };
+        // lenght is checked against remaining data before anything is allocated
+        let byte_len = usize::try_from((len + 7) / 8).map_err(|_| invalid("value is too long"))?;
+        let data = take(bytes, pos, byte_len)?;
+
+        let blocks: Vec<u32> = data.chunks(4).map(|chunk| {
+            let mut word = [0u8; 4];
+            word[..chunk.len()].copy_from_slice(chunk);
+            u32::from_le_bytes(word)
+        }).collect();
+
+        let mut binary = BinaryBase::from_blocks(&blocks, len as usize, sign_behavior);
+        if let Some(last) = blocks.len().checked_sub(1) {
+            // bits past the end of the value are not part of it
+            binary.set_block_masked(last, blocks[last]);
+        }
+        Ok(binary)
+    }
+
+    /// Reads whole `dump` output
+    pub fn decode_all(bytes: &[u8]) -> PyResult<Vec<BinaryBase>> {
+        let mut pos = 0;
+
+        if take(bytes, &mut pos, MAGIC.len())? != MAGIC {
+            return Err(invalid("missing header"));
+        }
+        let count = take_u64(bytes, &mut pos)?;
+
+        // every value takes at least 9 bytes, so the count can not be larger than the data
+        let mut values = Vec::with_capacity(count.min(bytes.len() as u64 / 9) as usize);
+        for _ in 0..count {
+            values.push(decode(bytes, &mut pos)?);
+        }
+        if pos != bytes.len() {
+            return Err(invalid("trailing data after the last value"));
+        }
+        Ok(values)
+    }
+}
+
+/// Encodes values (`Binary` or anything `Binary` can be created from) in `dump` format
+fn encode_all(values: &PyAny) -> PyResult<Vec<u8>> {
+    let mut out = Vec::new();
+    let mut count = 0u64;
+
+    out.extend_from_slice(serialize_base::MAGIC);
+    out.extend_from_slice(&count.to_le_bytes());
+
+    for value in values.iter()? {
+        let value = value?;
+        match value.extract::<PyRef<Binary>>() {
+            Ok(binary) => serialize_base::encode(&mut out, &binary.inner),
+            Err(_) => serialize_base::encode(&mut out, &Binary::from(value, None, None)?.inner),
+        }
+        count += 1;
+    }
+    out[serialize_base::MAGIC.len()..serialize_base::MAGIC.len() + 8].copy_from_slice(&count.to_le_bytes());
+
+    Ok(out)
+}
+
+fn decode_all(py: Python, data: &PyAny) -> PyResult<Vec<PyObject>> {
+    binary::with_buffer(data, |bytes| serialize_base::decode_all(bytes))??
+        .into_iter()
+        .map(|value| Binary::wrap_object_gil(Ok(value), &py))
+        .collect()
+}
+
+/// Serializes values into bytes: header, number of values and then lenght, sign behavior and raw bytes of every value
+#[pyfunction]
+pub fn dumps(py: Python, values: &PyAny) -> PyResult<PyObject> {
+    Ok(types::PyBytes::new(py, &encode_all(values)?).into())
+}
+
+/// Like `dumps`, but writes the bytes into `file` (opened in binary mode) with single `write` call
+#[pyfunction]
+pub fn dump(values: &PyAny, file: &PyAny) -> PyResult<()> {
+    let bytes = types::PyBytes::new(file.py(), &encode_all(values)?);
+    file.call_method1("write", (bytes,))?;
+
+    Ok(())
+}
+
+/// Inverse of `dumps`, accepts any bytes-like object
+#[pyfunction]
+pub fn loads(py: Python, data: &PyAny) -> PyResult<Vec<PyObject>> {
+    decode_all(py, data)
+}
+
+/// Inverse of `dump`, reads whole `file` with single `read` call
+#[pyfunction]
+pub fn load(py: Python, file: &PyAny) -> PyResult<Vec<PyObject>> {
+    let data = file.call_method0("read")?;
+    if !data.is_instance_of::<types::PyBytes>()? && !data.is_instance_of::<types::PyByteArray>()? {
+        return Err(exceptions::PyTypeError::new_err("File has to be opened in binary mode"));
+    }
+    decode_all(py, data)
+}
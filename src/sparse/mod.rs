@@ -0,0 +1,498 @@
+use pyo3::{prelude::*, types, exceptions};
+use pyo3::basic::CompareOp;
+use bv::Bits;
+
+use crate::binary::{BinaryBase, SignBehavior};
+use crate::{utility, Binary};
+
+use sparse_base::{Op, SparseBits};
+
+pub mod sparse_base {
+    /// Containers with at most that many ones are stored as sorted arrays, denser ones as bitmaps
+    pub const ARRAY_LIMIT: usize = 4096;
+    /// Bits covered by single container (low 16 bits of index)
+    pub const CONTAINER_BITS: usize = 1 << 16;
+    const WORDS: usize = CONTAINER_BITS / 64;
+
+    #[derive(Clone, Copy, Debug, PartialEq, Eq)]
+    pub enum Op {
+        And,
+        Or,
+        Xor,
+        AndNot,
+    }
+
+    impl Op {
+        fn apply(&self, a: u64, b: u64) -> u64 {
+            match self {
+                Op::And => a & b,
+                Op::Or => a | b,
+                Op::Xor => a ^ b,
+                Op::AndNot => a & !b,
+            }
+        }
+    }
+
+    /// Ones of 2^16 bit chunk. Each representation is used only in its range of counts (see `ARRAY_LIMIT`)
+    #[derive(Clone, Debug, PartialEq, Eq)]
+    pub enum Container {
+        Array(Vec<u16>),
+        Bitmap(Box<[u64; WORDS]>, usize),
+    }
+
+    impl Container {
+        pub fn len(&self) -> usize {
+            match self {
+                Container::Array(values) => values.len(),
+                Container::Bitmap(_, count) => *count,
+            }
+        }
+        pub fn contains(&self, low: u16) -> bool {
+            match self {
+                Container::Array(values) => values.binary_search(&low).is_ok(),
+                Container::Bitmap(words, _) => words[low as usize / 64] >> (low % 64) & 1 == 1,
+            }
+        }
+        fn words(&self) -> Box<[u64; WORDS]> {
+            match self {
+                Container::Array(values) => {
+                    let mut words = Box::new([0u64; WORDS]);
+                    for low in values {
+                        words[*low as usize / 64] |= 1 << (low % 64);
+                    }
+                    words
+                },
+                Container::Bitmap(words, _) => words.clone(),
+            }
+        }
+        /// Picks representation for `words`, `None` if there are no ones
+        fn from_words(words: Box<[u64; WORDS]>) -> Option<Container> {
+            let count = words.iter().map(|word| word.count_ones() as usize).sum();
+
+            match count {
+                0 => None,
+                count if count > ARRAY_LIMIT => Some(Container::Bitmap(words, count)),
+                _ => {
+                    let mut values = Vec::with_capacity(count);
+                    for_each_one(&words[..], |low| values.push(low as u16));
+                    Some(Container::Array(values))
+                },
+            }
+        }
+        fn from_values(values: Vec<u16>) -> Option<Container> {
+            match values.len() {
+                0 => None,
+                count if count > ARRAY_LIMIT => Container::from_words(Container::Array(values).words()),
+                _ => Some(Container::Array(values)),
+            }
+        }
+        /// Sets bit `low`, returns `true` if it was not set before
+        pub fn insert(&mut self, low: u16) -> bool {
+            match self {
+                Container::Array(values) => match values.binary_search(&low) {
+                    Ok(_) => false,
+                    Err(position) => {
+                        values.insert(position, low);
+                        if values.len() > ARRAY_LIMIT {
+                            *self = Container::Bitmap(self.words(), ARRAY_LIMIT + 1);
+                        }
+                        true
+                    },
+                },
+                Container::Bitmap(words, count) => {
+                    let (word, bit) = (&mut words[low as usize / 64], 1u64 << (low % 64));
+                    if *word & bit != 0 {
+                        return false;
+                    }
+                    *word |= bit;
+                    *count += 1;
+                    true
+                },
+            }
+        }
+        /// Clears bit `low`, returns `true` if it was set before
+        pub fn remove(&mut self, low: u16) -> bool {
+            match self {
+                Container::Array(values) => match values.binary_search(&low) {
+                    Ok(position) => {
+                        values.remove(position);
+                        true
+                    },
+                    Err(_) => false,
+                },
+                Container::Bitmap(words, count) => {
+                    let (word, bit) = (&mut words[low as usize / 64], 1u64 << (low % 64));
+                    if *word & bit == 0 {
+                        return false;
+                    }
+                    *word &= !bit;
+                    *count -= 1;
+                    if *count <= ARRAY_LIMIT {
+                        *self = Container::from_words(self.words()).unwrap();
+                    }
+                    true
+                },
+            }
+        }
+        /// Calls `f` with every one in increasing order
+        pub fn for_each(&self, mut f: impl FnMut(u16)) {
+            match self {
+                Container::Array(values) => values.iter().for_each(|low| f(*low)),
+                Container::Bitmap(words, _) => for_each_one(&words[..], |low| f(low as u16)),
+            }
+        }
+        /// `op(a, b)`, arrays are merged directly and bitmaps are combined word by word. `None` if result has no ones
+        pub fn combine(a: &Container, b: &Container, op: Op) -> Option<Container> {
+            match (a, b, op) {
+                (Container::Array(a), Container::Array(b), _) => Container::from_values(merge(a, b, op)),
+                // result is subset of the array, other side is only probed
+                (Container::Array(values), other, Op::And) | (other, Container::Array(values), Op::And) => {
+                    Container::from_values(values.iter().copied().filter(|low| other.contains(*low)).collect())
+                },
+                (Container::Array(values), other, Op::AndNot) => {
+                    Container::from_values(values.iter().copied().filter(|low| !other.contains(*low)).collect())
+                },
+                _ => {
+                    let mut words = a.words();
+                    let other = b.words();
+                    for (word, other) in words.iter_mut().zip(other.iter()) {
+                        *word = op.apply(*word, *other);
+                    }
+                    Container::from_words(words)
+                },
+            }
+        }
+    }
+
+    /// Calls `f` with positions of ones in `words`
+    fn for_each_one(words: &[u64], mut f: impl FnMut(usize)) {
+        for (i, word) in words.iter().enumerate() {
+            let mut word = *word;
+            while word != 0 {
+                f(i * 64 + word.trailing_zeros() as usize);
+                word &= word - 1;
+            }
+        }
+    }
+
+    /// Merges two sorted arrays
+    fn merge(a: &[u16], b: &[u16], op: Op) -> Vec<u16> {
+        let mut out = Vec::with_capacity(match op { Op::And => a.len().min(b.len()), Op::AndNot => a.len(), _ => a.len() + b.len() });
+        let (mut i, mut j) = (0, 0);
+
+        while i < a.len() && j < b.len() {
+            if a[i] < b[j] {
+                if op != Op::And { out.push(a[i]) }
+                i += 1;
+            } else if a[i] > b[j] {
+                if op == Op::Or || op == Op::Xor { out.push(b[j]) }
+                j += 1;
+            } else {
+                if op == Op::And || op == Op::Or { out.push(a[i]) }
+                i += 1;
+                j += 1;
+            }
+        }
+        if op != Op::And {
+            out.extend_from_slice(&a[i..]);
+        }
+        if op == Op::Or || op == Op::Xor {
+            out.extend_from_slice(&b[j..]);
+        }
+        out
+    }
+
+    /// Compressed bit vector of `len` bits. Ones are grouped by high bits of index into containers (sorted by key),
+    /// so memory and time of operations scale with the number of ones, not with the lenght
+    #[derive(Clone, Debug, Default, PartialEq, Eq)]
+    pub struct SparseBits {
+        pub len: usize,
+        containers: Vec<(usize, Container)>,
+    }
+
+    impl SparseBits {
+        pub fn new(len: usize) -> Self {
+            Self { len, containers: Vec::new() }
+        }
+        /// Builds vector from `blocks` (first block holds the lowest bits), bits past `len` are ignored
+        pub fn from_blocks(block: impl Fn(usize) -> u32, len: usize) -> Self {
+            let mut containers = Vec::new();
+            let blocks_per_container = CONTAINER_BITS / 32;
+
+            for key in 0..(len + CONTAINER_BITS - 1) / CONTAINER_BITS {
+                let mut words = Box::new([0u64; WORDS]);
+                let first = key * blocks_per_container;
+                let last = ((len + 31) / 32).min(first + blocks_per_container);
+
+                for i in first..last {
+                    words[(i - first) / 2] |= (block(i) as u64) << (32 * (i % 2));
+                }
+                if let Some(container) = Container::from_words(words) {
+                    containers.push((key, container));
+                }
+            }
+            Self { len, containers }
+        }
+        /// Writes ones into zeroed `blocks`
+        pub fn write_blocks(&self, blocks: &mut [u32]) {
+            for (key, container) in &self.containers {
+                let offset = key * CONTAINER_BITS;
+                container.for_each(|low| {
+                    let index = offset + low as usize;
+                    blocks[index / 32] |= 1 << (index % 32);
+                });
+            }
+        }
+        fn find(&self, key: usize) -> Result<usize, usize> {
+            self.containers.binary_search_by_key(&key, |(k, _)| *k)
+        }
+        pub fn get(&self, index: usize) -> bool {
+            match self.find(index / CONTAINER_BITS) {
+                Ok(position) => self.containers[position].1.contains((index % CONTAINER_BITS) as u16),
+                Err(_) => false,
+            }
+        }
+        pub fn set(&mut self, index: usize, value: bool) {
+            let (key, low) = (index / CONTAINER_BITS, (index % CONTAINER_BITS) as u16);
+
+            match (self.find(key), value) {
+                (Ok(position), true) => { self.containers[position].1.insert(low); },
+                (Ok(position), false) => {
+                    let container = &mut self.containers[position].1;
+                    container.remove(low);
+                    if container.len() == 0 {
+                        self.containers.remove(position);
+                    }
+                },
+                (Err(position), true) => self.containers.insert(position, (key, Container::Array(vec![low]))),
+                (Err(_), false) => {},
+            }
+        }
+        pub fn count_ones(&self) -> usize {
+            self.containers.iter().map(|(_, container)| container.len()).sum()
+        }
+        /// Calls `f` with every one in `start..end` in increasing order
+        pub fn for_each_in(&self, start: usize, end: usize, mut f: impl FnMut(usize)) {
+            if start >= end {
+                return;
+            }
+            let first = match self.find(start / CONTAINER_BITS) { Ok(position) | Err(position) => position };
+
+            for (key, container) in &self.containers[first..] {
+                let offset = key * CONTAINER_BITS;
+                if offset >= end {
+                    break;
+                }
+                container.for_each(|low| {
+                    let index = offset + low as usize;
+                    if index >= start && index < end {
+                        f(index);
+                    }
+                });
+            }
+        }
+        pub fn first(&self) -> Option<usize> {
+            let (key, container) = self.containers.first()?;
+            let mut first = None;
+            container.for_each(|low| if first.is_none() { first = Some(key * CONTAINER_BITS + low as usize) });
+            first
+        }
+        pub fn last(&self) -> Option<usize> {
+            let (key, container) = self.containers.last()?;
+            let mut last = None;
+            container.for_each(|low| last = Some(key * CONTAINER_BITS + low as usize));
+            last
+        }
+        /// `op(a, b)` computed container by container, result is as long as the longer operand
+        pub fn combine(a: &SparseBits, b: &SparseBits, op: Op) -> SparseBits {
+            let mut containers = Vec::new();
+            let (mut i, mut j) = (0, 0);
+            let (a_containers, b_containers) = (&a.containers, &b.containers);
+
+            while i < a_containers.len() || j < b_containers.len() {
+                let a_key = a_containers.get(i).map_or(usize::MAX, |(key, _)| *key);
+                let b_key = b_containers.get(j).map_or(usize::MAX, |(key, _)| *key);
+
+                if a_key < b_key {
+                    // container only in `a` stays for every op except `And`
+                    if op != Op::And { containers.push(a_containers[i].clone()) }
+                    i += 1;
+                } else if a_key > b_key {
+                    if op == Op::Or || op == Op::Xor { containers.push(b_containers[j].clone()) }
+                    j += 1;
+                } else {
+                    if let Some(container) = Container::combine(&a_containers[i].1, &b_containers[j].1, op) {
+                        containers.push((a_key, container));
+                    }
+                    i += 1;
+                    j += 1;
+                }
+            }
+            SparseBits { len: a.len.max(b.len), containers }
+        }
+        /// Number of containers in each representation `(arrays, bitmaps)`
+        pub fn containers(&self) -> (usize, usize) {
+            let arrays = self.containers.iter().filter(|(_, container)| matches!(container, Container::Array(_))).count();
+            (arrays, self.containers.len() - arrays)
+        }
+    }
+}
+
+/// Compressed bitmap, memory and operations scale with the number of ones. Always unsigned
+#[pyclass]
+#[derive(Clone, Debug)]
+pub struct SparseBinary {
+    pub inner: SparseBits,
+}
+
+impl SparseBinary {
+    pub fn from_base(binary: &BinaryBase) -> Self {
+        let len = binary.len_usize();
+        Self { inner: SparseBits::from_blocks(|i| binary.data.get_block(i) & utility::used_mask(len, i), len) }
+    }
+    pub fn to_base(&self) -> BinaryBase {
+        let mut blocks = vec![0u32; (self.inner.len + 31) / 32];
+        self.inner.write_blocks(&mut blocks);
+
+        BinaryBase::from_blocks(&blocks, self.inner.len, SignBehavior::Unsigned)
+    }
+    fn flatten_index(&self, index: isize) -> PyResult<usize> {
+        let len = self.inner.len as isize;
+        let flat = if index < 0 { index + len } else { index };
+
+        if flat < 0 || flat >= len {
+            return Err(exceptions::PyIndexError::new_err(format!("Index out of range: {}", index)));
+        }
+        Ok(flat as usize)
+    }
+    /// `op(self, other)`, `other` can be `SparseBinary` or anything `Binary` can be created from
+    fn apply(&self, other: &PyAny, op: Op) -> PyResult<Self> {
+        if let Ok(other) = other.extract::<PyRef<SparseBinary>>() {
+            return Ok(Self { inner: SparseBits::combine(&self.inner, &other.inner, op) });
+        }
+        let other = Self::from_base(&Binary::from(other, None, Some("unsigned"))?.inner);
+
+        Ok(Self { inner: SparseBits::combine(&self.inner, &other.inner, op) })
+    }
+}
+
+#[pymethods]
+impl SparseBinary {
+    /// Vector of `length` zeros, `ones` are indices of bits to set
+    #[new]
+    #[args(ones = "None")]
+    fn py_new(length: usize, ones: Option<&PyAny>) -> PyResult<Self> {
+        let mut sparse = Self { inner: SparseBits::new(length) };
+
+        if let Some(ones) = ones {
+            for index in ones.iter()? {
+                let index = sparse.flatten_index(index?.extract()?)?;
+                sparse.inner.set(index, true);
+            }
+        }
+        Ok(sparse)
+    }
+    /// Compresses `binary`, only blocks are scanned
+    #[staticmethod]
+    pub fn from_binary(binary: PyRef<Binary>) -> Self {
+        Self::from_base(&binary.inner)
+    }
+    /// Decompresses into `Binary`
+    pub fn binary(&self) -> PyResult<PyObject> {
+        Binary::wrap_object(Ok(self.to_base()))
+    }
+    #[getter]
+    pub fn len(&self) -> usize {
+        self.inner.len
+    }
+    /// Number of containers stored as sorted arrays and as bitmaps
+    #[getter]
+    pub fn containers(&self) -> (usize, usize) {
+        self.inner.containers()
+    }
+    pub fn __len__(&self) -> usize {
+        self.inner.len
+    }
+    pub fn __bool__(&self) -> bool {
+        self.inner.first().is_some()
+    }
+    pub fn count_ones(&self) -> usize {
+        self.inner.count_ones()
+    }
+    pub fn count_zeros(&self) -> usize {
+        self.inner.len - self.inner.count_ones()
+    }
+    pub fn find_ones(&self) -> Vec<usize> {
+        let mut ones = Vec::with_capacity(self.inner.count_ones());
+        self.inner.for_each_in(0, self.inner.len, |index| ones.push(index));
+        ones
+    }
+    pub fn trailing_zeros(&self) -> usize {
+        self.inner.first().unwrap_or(self.inner.len)
+    }
+    pub fn leading_zeros(&self) -> usize {
+        self.inner.last().map_or(self.inner.len, |last| self.inner.len - 1 - last)
+    }
+    pub fn __getitem__(&self, index: &PyAny) -> PyResult<PyObject> {
+        let py = index.py();
+
+        if let Ok(index) = index.extract::<isize>() {
+            return Ok(self.inner.get(self.flatten_index(index)?).into_py(py));
+        }
+        if let Ok(slice) = index.extract::<&types::PySlice>() {
+            let slice = slice.indices(self.inner.len as std::os::raw::c_long)?;
+            let (start, step, count) = (slice.start as usize, slice.step.unsigned_abs(), slice.slicelength as usize);
+            let mut blocks = vec![0u32; (count + 31) / 32];
+
+            if count > 0 {
+                // ones of the slice are taken from range of its elements, element `k` is bit `start ± k * step`
+                let (low, high) = if slice.step > 0 { (start, start + (count - 1) * step) } else { (start - (count - 1) * step, start) };
+                self.inner.for_each_in(low, high + 1, |index| {
+                    let distance = if slice.step > 0 { index - start } else { start - index };
+                    if distance % step == 0 {
+                        let k = distance / step;
+                        blocks[k / 32] |= 1 << (k % 32);
+                    }
+                });
+            }
+            return Binary::wrap_object(Ok(BinaryBase::from_blocks(&blocks, count, SignBehavior::Unsigned)));
+        }
+        Err(exceptions::PyTypeError::new_err(format!("Invalid index type {}", index)))
+    }
+    pub fn __setitem__(&mut self, index: isize, value: bool) -> PyResult<()> {
+        let index = self.flatten_index(index)?;
+        self.inner.set(index, value);
+
+        Ok(())
+    }
+    pub fn __and__(&self, other: &PyAny) -> PyResult<Self> {
+        self.apply(other, Op::And)
+    }
+    pub fn __or__(&self, other: &PyAny) -> PyResult<Self> {
+        self.apply(other, Op::Or)
+    }
+    pub fn __xor__(&self, other: &PyAny) -> PyResult<Self> {
+        self.apply(other, Op::Xor)
+    }
+    /// Ones of `self` that are not set in `other`
+    pub fn and_not(&self, other: &PyAny) -> PyResult<Self> {
+        self.apply(other, Op::AndNot)
+    }
+    pub fn __richcmp__(&self, other: &PyAny, op: CompareOp) -> PyResult<bool> {
+        let equal = match other.extract::<PyRef<SparseBinary>>() {
+            Ok(other) => self.inner == other.inner,
+            Err(_) => match other.extract::<PyRef<Binary>>() {
+                Ok(other) => other.len() == self.inner.len && Self::from_base(&other.inner).inner == self.inner,
+                Err(_) => false,
+            },
+        };
+        match op {
+            CompareOp::Eq => Ok(equal),
+            CompareOp::Ne => Ok(!equal),
+            _ => Err(exceptions::PyTypeError::new_err("SparseBinary supports only == and !=")),
+        }
+    }
+    pub fn __repr__(&self) -> String {
+        format!("SparseBinary(len={}, count_ones={})", self.inner.len, self.inner.count_ones())
+    }
+}
@@ -0,0 +1,39 @@
+use pyo3::{prelude::*, exceptions};
+
+use crate::binary;
+
+/// Formats every item of `values` (`Binary` or anything `Binary` can be created from) as hex or bin string
+#[pyfunction(radix = "\"hex\"", prefix = "true")]
+pub fn format_all(values: &PyAny, radix: &str, prefix: bool) -> PyResult<Vec<String>>
+{
+    let format: fn(&binary::BinaryBase, bool) -> String = match radix {
+        "hex" => |binary, prefix| binary.to_string_hex(prefix),
+        "bin" => |binary, prefix| binary.to_string_bin(prefix),
+        _ => return Err(exceptions::PyValueError::new_err(format!("Invalid radix: {}, expected 'hex' or 'bin'", radix))),
+    };
+
+    values.iter()?.map(|item| {
+        let item = item?;
+        if let Ok(value) = item.extract::<PyRef<crate::Binary>>() {
+            Ok(format(&value.inner, prefix))
+        } else {
+            Ok(format(&crate::Binary::from(item, None, None)?.inner, prefix))
+        }
+    }).collect()
+}
+
+/// Parses every string of `strings` (see `Binary` constructor), all values get the same `lenght` and `sign_behavior`
+#[pyfunction(lenght = "None", sign_behavior = "None")]
+pub fn parse_all(strings: &PyAny, lenght: Option<usize>, sign_behavior: Option<&str>) -> PyResult<Vec<crate::Binary>>
+{
+    let sign_behavior = sign_behavior.map(binary::SignBehavior::parse).transpose()?;
+
+    strings.iter()?.map(|item| {
+        let item = item?;
+        let string = match item.extract::<&str>() {
+            Ok(string) => string,
+            Err(_) => return Err(exceptions::PyTypeError::new_err(format!("Expected str, got {}", item.get_type().name()?))),
+        };
+        crate::Binary::wrap(binary::BinaryBase::parse_bitvec_from_str(string, lenght, sign_behavior))
+    }).collect()
+}
@@ -0,0 +1,77 @@
+use pyo3::{prelude::*, types};
+
+use crate::binary::{BinaryBase, SignBehavior};
+use crate::Binary;
+
+/// Fixed width and sign behavior. Calling it converts single value to `Binary` of that type without parsing any keyword arguments
+#[pyclass]
+#[derive(Clone, Copy, Debug)]
+pub struct BinaryType {
+    width: usize,
+    sign_behavior: SignBehavior,
+}
+
+impl BinaryType {
+    pub fn new(width: usize, sign_behavior: SignBehavior) -> Self {
+        Self { width, sign_behavior }
+    }
+}
+
+#[pymethods]
+impl BinaryType {
+    #[new]
+    #[args(sign_behavior = "\"unsigned\"")]
+    fn py_new(width: usize, sign_behavior: &str) -> PyResult<Self> {
+        Ok(Self::new(width, SignBehavior::parse(sign_behavior)?))
+    }
+    #[getter]
+    pub fn width(&self) -> usize {
+        self.width
+    }
+    #[getter]
+    pub fn sb(&self) -> &'static str {
+        self.sign_behavior.as_str()
+    }
+    /// Name of the type, like `u16` or `i8`
+    #[getter]
+    pub fn name(&self) -> String {
+        format!("{}{}", if self.sign_behavior.is_signed() { 'i' } else { 'u' }, self.width)
+    }
+    pub fn sign_behavior(&self) -> &'static str {
+        self.sb()
+    }
+    #[args(object = "None")]
+    pub fn __call__(&self, object: Option<&PyAny>) -> PyResult<Binary> {
+        let object = match object {
+            Some(object) => object,
+            None => return Binary::wrap(BinaryBase::parse_bitvec_from_isize(0, Some(self.width), Some(self.sign_behavior))),
+        };
+        // ints are the most common, they skip the other conversions
+        if let Ok(true) = object.is_instance_of::<types::PyLong>() {
+            if let Ok(value) = object.extract::<isize>() {
+                return Binary::wrap(BinaryBase::parse_bitvec_from_isize(value, Some(self.width), Some(self.sign_behavior)));
+            }
+        }
+        Binary::from_parsed(object, Some(self.width), Some(self.sign_behavior))
+    }
+    pub fn __repr__(&self) -> String {
+        format!("BinaryType({}, '{}')", self.width, self.sign_behavior)
+    }
+}
+
+const WIDTHS: [usize; 14] = [0, 1, 2, 3, 4, 5, 6, 7, 8, 16, 32, 64, 128, 1024];
+
+pub fn register_types_module<'a>(_py: Python<'a>) -> PyResult<&'a PyModule> {
+    let types = PyModule::new(_py, "types")?;
+
+    types.add_class::<BinaryType>()?;
+
+    for width in WIDTHS {
+        for sign_behavior in [SignBehavior::Unsigned, SignBehavior::Signed] {
+            let binary_type = BinaryType::new(width, sign_behavior);
+            types.add(&binary_type.name(), binary_type.into_py(_py))?;
+        }
+    }
+
+    return Ok(types);
+}
@@ -1,6 +1,10 @@
-use bv::BitSliceable;
 use pyo3::{prelude::*, exceptions};
 
+use crate::binary::BinaryBase;
+use crate::parallel;
+
+pub mod search;
+
 //trailing_zeros
 //leading_zeros
 //trailing_ones
@@ -9,6 +13,7 @@ use pyo3::{prelude::*, exceptions};
 //count_zeros   
 //find
 //find_all
+//count
 
 
 pub fn trailing_zeros(binary: &crate::Binary) -> usize
@@ -31,180 +36,199 @@ pub fn leading_ones(binary: &crate::Binary) -> usize
     find_zero_rev(binary).and_then(|count| Some(count)).unwrap_or(binary.len())
 }   
 
-pub fn count_ones(binary: &crate::Binary) -> usize
+pub fn count_ones(py: Python, binary: &crate::Binary) -> usize
 {
-    use bv::Bits;
+    count_bits(py, binary, true)
+}
 
-    let data = &binary.inner.data;
+pub fn count_zeros(py: Python, binary: &crate::Binary) -> usize
+{
+    count_bits(py, binary, false)
+}
 
-    if data.block_len() == 0 {
-        return 0;
-    }
+/// Number of ones (or zeros if `ones` is not set), large numbers are counted without GIL by worker threads
+fn count_bits(py: Python, binary: &crate::Binary, ones: bool) -> usize
+{
+    use bv::Bits;
 
-    let mut total = 0;
-    for block_id in 0..(data.block_len()-1) {
-        let block = data.get_block(block_id);
-        total += block.count_ones() as usize;
-    }
+    let (data, len) = (&binary.inner.data, binary.len());
+    parallel::without_gil(py, len, || count_bits_in(|block_id| data.get_block(block_id), data.block_len(), len, ones))
+}
 
-    let block = data.get_block(data.block_len()-1); 
-    let last_block_bits = data.len() as u32 % u32::BITS as u32;
+/// `count_bits` over `blocks` blocks of `len` bit vector read with `get_block` getter (split between worker threads, GIL is not released)
+pub fn count_bits_in(get_block: impl Fn(usize) -> u32 + Sync, blocks: usize, len: usize, ones: bool) -> usize
+{
+    let flip = if ones { 0 } else { u32::MAX };
 
-    if last_block_bits == 0 {
-        total + block.count_ones() as usize
-    } else {
-        // Crate mask with zeros on non used bits
-        let mask = (1u32 << last_block_bits) - 1;
-        // Mask bits in block (set all unused bits to 0) to make sure that only used bits are counted
-        total + (block & mask).count_ones() as usize 
-    }
+    parallel::map_ranges(blocks, |blocks| {
+        // Unused bits of the last block are masked out to make sure that only used bits are counted
+        blocks.map(|block_id| ((get_block(block_id) ^ flip) & used_mask(len, block_id)).count_ones() as usize).sum::<usize>()
+    }).into_iter().sum()
+}
 
+/// Mask of bits of `block_id`-th block that are inside the number
+pub fn used_mask(len: usize, block_id: usize) -> u32
+{
+    let used = len - 32 * block_id;
+    if used >= 32 { u32::MAX } else { (1u32 << used) - 1 }
 }
 
-pub fn count_zeros(binary: &crate::Binary) -> usize
+/// Index of the first one (or zero if `ones` is not set) at position `from` or later
+pub fn next_bit(binary: &crate::Binary, from: usize, ones: bool) -> Option<usize>
 {
     use bv::Bits;
 
     let data = &binary.inner.data;
-    
-    if data.block_len() == 0 {
-        return 0;
-    }
-    
-    let mut total = 0;
-    for block_id in 0..(data.block_len()-1) {
-        let block = data.get_block(block_id);
-        total += block.count_zeros() as usize;
+    let len = binary.len();
+    if from >= len {
+        return None;
     }
 
-    let block = data.get_block(data.block_len()-1); 
-    let last_block_bits = data.len() as u32 % u32::BITS as u32;
-    
-    if last_block_bits == 0 {
-        total + block.count_zeros() as usize
-    } else {
-        // Crate mask ones on non used bits
-        let mask = !((1u32 << last_block_bits) - 1);
-        // Mask bits in block (set all unused bits to 1) to make sure that only used bits are counted
-        total + (block | mask).count_zeros() as usize
+    let flip = if ones { 0 } else { u32::MAX };
+    let mut block_id = from / 32;
+    let mut block = (data.get_block(block_id) ^ flip) & (u32::MAX << (from % 32));
+
+    loop {
+        let block_masked = block & used_mask(len, block_id);
+        if block_masked != 0 {
+            return Some(block_id * 32 + block_masked.trailing_zeros() as usize);
+        }
+        block_id += 1;
+        if block_id >= data.block_len() {
+            return None;
+        }
+        block = data.get_block(block_id) ^ flip;
     }
 }
 
-struct Windows<'a> {
-    slice: bv::BitSlice<'a, u32>,
-    width: u64,
+/// Index of the last one (or zero if `ones` is not set)
+pub fn prev_bit(binary: &crate::Binary, ones: bool) -> Option<usize>
+{
+    use bv::Bits;
+
+    let data = &binary.inner.data;
+    let flip = if ones { 0 } else { u32::MAX };
+
+    (0..data.block_len()).rev().find_map(|block_id| {
+        let block = (data.get_block(block_id) ^ flip) & used_mask(binary.len(), block_id);
+        if block != 0 { Some(block_id * 32 + 31 - block.leading_zeros() as usize) } else { None }
+    })
 }
-impl<'a> std::iter::Iterator for Windows<'a> {
-    type Item = bv::BitSlice<'a, u32>;
 
-    fn next(&mut self) -> Option<Self::Item> {
-        if self.slice.len() < self.width {
-            return None;
+/// Indexes of all ones (or zeros if `ones` is not set)
+fn all_bits(py: Python, binary: &crate::Binary, ones: bool) -> Vec<usize>
+{
+    use bv::Bits;
+
+    let (data, len) = (&binary.inner.data, binary.len());
+    parallel::without_gil(py, len, || all_bits_in(|block_id| data.get_block(block_id), data.block_len(), len, ones))
+}
+
+/// `all_bits` over `blocks` blocks of `len` bit vector read with `get_block` getter (split between worker threads, GIL is not released)
+pub fn all_bits_in(get_block: impl Fn(usize) -> u32 + Sync, blocks: usize, len: usize, ones: bool) -> Vec<usize>
+{
+    let flip = if ones { 0 } else { u32::MAX };
+
+    parallel::map_ranges(blocks, |blocks| {
+        let mut indexes = Vec::new();
+        for block_id in blocks {
+            let mut block = (get_block(block_id) ^ flip) & used_mask(len, block_id);
+            while block != 0 {
+                indexes.push(block_id * 32 + block.trailing_zeros() as usize);
+                block &= block - 1;
+            }
         }
-        let slice = self.slice.bit_slice(..self.width);
-        self.slice = self.slice.bit_slice(1..);
-        Some(slice)
-    }
+        indexes
+    }).concat()
 }
 
 pub fn find_one_rev(binary: &crate::Binary) -> Option<usize> {
-    use super::binary::reduce::*;
-
-    IterableBitSlice::new(&binary.inner.data).into_iter().rev().position(|bit| bit)
+    prev_bit(binary, true).map(|index| binary.len() - 1 - index)
 }
 pub fn find_zero_rev(binary: &crate::Binary) -> Option<usize> {
-    use super::binary::reduce::*;
-
-    IterableBitSlice::new(&binary.inner.data).into_iter().rev().position(|bit| !bit)
+    prev_bit(binary, false).map(|index| binary.len() - 1 - index)
 }
 
-
 pub fn find_one(binary: &crate::Binary) -> Option<usize> {
-    use bv::Bits;
+    next_bit(binary, 0, true)
+}
+pub fn find_zero(binary: &crate::Binary) -> Option<usize> {
+    next_bit(binary, 0, false)
+}
 
-    let data = &binary.inner.data;
+pub fn find_all_ones(py: Python, binary: &crate::Binary) -> Vec<usize> {
+    all_bits(py, binary, true)
+}
+pub fn find_all_zeros(py: Python, binary: &crate::Binary) -> Vec<usize> {
+    all_bits(py, binary, false)
+}
 
-    for block_id in 0..data.block_len() {
-        let block = data.get_block(block_id);
-        if block != 0 {
-            let offset = block.trailing_zeros() as usize;
-            return Some(block_id * 32 + offset);
-        }
-    }
-    None
+/// Normalizes python style `start`/`end` (negative values count from the end) to range of valid bit indexes
+pub fn search_range(binary: &crate::Binary, start: Option<isize>, end: Option<isize>) -> (usize, usize)
+{
+    clamp_range(binary.len(), start, end)
 }
-pub fn find_zero(binary: &crate::Binary) -> Option<usize> {
-    use bv::Bits;
 
-    let data = &binary.inner.data;
+/// Same as `search_range` for vector of `len` bits
+pub fn clamp_range(len: usize, start: Option<isize>, end: Option<isize>) -> (usize, usize)
+{
+    let len = len as isize;
+    let clamp = |index: isize| (if index < 0 { index + len } else { index }).clamp(0, len) as usize;
 
-    for block_id in 0..data.block_len() {
-        let block = data.get_block(block_id);
-        if block != u32::MAX {
-            let offset = block.trailing_ones() as usize;
-            return Some(block_id * 32 + offset);
-        }
-    }
-    None
+    (start.map_or(0, clamp), end.map_or(len as usize, clamp))
 }
 
-pub fn find(binary: &crate::Binary, sub: &crate::Binary) -> PyResult<Option<usize>>
+pub fn pattern(sub: &BinaryBase) -> PyResult<search::Pattern>
 {
-    let slice = binary.inner.data.as_slice();
-    let sub = &sub.inner.data;
+    if sub.len() == 0 {
+        return Err(exceptions::PyValueError::new_err("Pattern is empty"));
+    }
+    Ok(search::Pattern::new(sub.blocks(), sub.len_usize()))
+}
 
-    match sub.len() {
-        0 => Err(exceptions::PyValueError::new_err("Pattern is empty")),
-        1 =>   // Specialization for single bit
-            if sub[0] {
-                Ok(find_one(binary))
-            } else {
-                Ok(find_zero(binary))
-            }
-        _ => {
-            Ok(
-                Windows { slice: slice, width: sub.len() }
-                .enumerate()
-                .filter(|(_, window)| window == sub)
-                .map(|(i, _)| i)
-                .next()
-            )
-        }
+/// Splits positions `start..end` into parts (one per worker thread for large ranges) and calls `f(text, part_start, part_end)` with every part.
+/// Parts are extended by `pattern.len() - 1` bits so every match is found in exactly one part. Blocks are read in place with `text` getter.
+/// GIL is not released here, callers release it once around the whole search.
+fn search_parts<T: Send, F: Fn(usize) -> u32 + Sync>(text: &F, pattern: &search::Pattern, start: usize, end: usize, f: impl Fn(&F, usize, usize) -> T + Sync) -> Vec<T>
+{
+    if end < start + pattern.len() {
+        return vec![f(text, start, end)];
     }
+    let positions = end - pattern.len() + 1;
+
+    parallel::map_ranges((positions - start + 31) / 32, |blocks| {
+        let part_start = start + blocks.start * 32;
+        let part_end = (start + blocks.end * 32).min(positions);
+
+        f(text, part_start, part_end + pattern.len() - 1)
+    })
 }
 
-pub fn find_all_ones(binary: &crate::Binary) -> Vec<usize> {
-    use super::binary::reduce::*;
+pub fn find(py: Python, binary: &crate::Binary, sub: &BinaryBase, start: usize, end: usize) -> PyResult<Option<usize>>
+{
+    let pattern = pattern(sub)?;
+    let bits = &binary.inner;
 
-    IterableBitSlice::new(&binary.inner.data).into_iter().enumerate().filter(|(_, x)| *x).map(|(i, _)| i).collect()
+    // first match usually comes early, so search is not split between threads
+    Ok(parallel::without_gil(py, end.saturating_sub(start), || search::find(&|i: usize| bits.extended_block(i, false), &pattern, start, end)))
 }
-pub fn find_all_zeros(binary: &crate::Binary) -> Vec<usize> {
-    use super::binary::reduce::*; 
 
-    IterableBitSlice::new(&binary.inner.data).into_iter().enumerate().filter(|(_, x)| !*x).map(|(i, _)| i).collect()
+pub fn find_all(py: Python, binary: &crate::Binary, sub: &BinaryBase, start: usize, end: usize) -> PyResult<Vec<usize>>
+{
+    let pattern = pattern(sub)?;
+    let bits = &binary.inner;
+
+    Ok(parallel::without_gil(py, end.saturating_sub(start), || {
+        search_parts(&|i: usize| bits.extended_block(i, false), &pattern, start, end, |text, start, end| search::find_all(text, &pattern, start, end)).concat()
+    }))
 }
 
-pub fn find_all(binary: &crate::Binary, sub: &crate::Binary) -> PyResult<Vec<usize>>
+pub fn count(py: Python, binary: &crate::Binary, sub: &BinaryBase, start: usize, end: usize) -> PyResult<usize>
 {
-    let slice = binary.inner.data.as_slice();
-    let sub = &sub.inner.data;
+    let pattern = pattern(sub)?;
+    let bits = &binary.inner;
 
-    match sub.len() {
-        0 => Err(exceptions::PyValueError::new_err("Pattern is empty")),
-        1 =>   // Specialization for single bit
-            if sub[0] {
-                Ok(find_all_ones(binary))
-            } else {
-                Ok(find_all_zeros(binary))
-            }
-        _ => {
-            Ok(
-                Windows { slice: slice, width: sub.len() }
-                .enumerate()
-                .filter(|(_, window)| window == sub)
-                .map(|(i, _)| i)
-                .collect()
-            )
-        }
-    }
-}
\ No newline at end of file
+    Ok(parallel::without_gil(py, end.saturating_sub(start), || {
+        search_parts(&|i: usize| bits.extended_block(i, false), &pattern, start, end, |text, start, end| search::count(text, &pattern, start, end)).into_iter().sum()
+    }))
+}
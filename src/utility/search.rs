@@ -0,0 +1,205 @@
+// Bit string search. Text is read with `block` getter: bit `i` is bit `i % 32` of block `i / 32`, getter has to return zero (or anything) past the end.
+
+/// Bits `pos..pos+64` read with `block` getter
+pub fn window64(block: &impl Fn(usize) -> u32, pos: usize) -> u64 {
+    let (index, offset) = (pos / 32, pos % 32);
+    let wide = block(index) as u128 | (block(index + 1) as u128) << 32 | (block(index + 2) as u128) << 64;
+
+    (wide >> offset) as u64
+}
+
+fn mask64(len: usize) -> u64 {
+    if len >= 64 { u64::MAX } else { (1u64 << len) - 1 }
+}
+
+/// Shift-Or automaton of up to 64 bits. Bit `i` of the state is clear if the first `i + 1` bits of pattern end at the last consumed bit.
+/// Text is consumed one block per step: 32 single bit steps `state = state << 1 | mismatch[bit]` are unrolled into `state << 32 | T(block)`,
+/// where `T` is combined from four lookups into table of bytes. Intermediate states are not lost, they are still present in bits above `len - 1`.
+struct ShiftOr {
+    len: usize,
+    table: Box<[u128; 256]>,
+}
+
+impl ShiftOr {
+    fn new(head: u64, len: usize) -> Self {
+        // bit `i` of `mismatch[c]` is set if `i`-th bit of the pattern is not `c`
+        let mismatch = [(head & mask64(len)) as u128, (!head & mask64(len)) as u128];
+        let mut table = Box::new([0u128; 256]);
+
+        for (byte, entry) in table.iter_mut().enumerate() {
+            *entry = (0..8).fold(0, |entry, k| entry | mismatch[byte >> k & 1] << (7 - k));
+        }
+        Self { len, table }
+    }
+    fn step(&self, state: u128, block: u32) -> u128 {
+        let t = |shift: u32| self.table[(block >> shift) as usize & 0xff];
+        state << 32 | t(0) << 24 | t(8) << 16 | t(16) << 8 | t(24)
+    }
+    /// Bit `k` is set if the pattern ends at bit `k` of the last consumed block
+    fn ends(&self, state: u128) -> u32 {
+        (!(state >> (self.len - 1)) as u32).reverse_bits()
+    }
+}
+
+/// Positions in `start..=last` where first `automaton.len` bits of pattern match, in increasing order
+struct Candidates<'a, F> {
+    text: &'a F,
+    automaton: &'a ShiftOr,
+    last: usize,
+    block: usize,
+    end_block: usize,
+    state: u128,
+    ends: u32,
+}
+
+impl<'a, F: Fn(usize) -> u32> Candidates<'a, F> {
+    fn new(text: &'a F, automaton: &'a ShiftOr, start: usize, last: usize) -> Self {
+        let end_block = (last + automaton.len - 1) / 32 + 1;
+        Self { text, automaton, last, block: start / 32, end_block, state: u128::MAX, ends: 0 }
+    }
+    /// First candidate at `from` or later
+    fn next_from(&mut self, from: usize) -> Option<usize> {
+        let len = self.automaton.len;
+
+        if from / 32 > self.block {
+            // nothing before `from` is needed, fresh state at the start of its block finds every match starting there
+            self.block = from / 32;
+            self.state = u128::MAX;
+            self.ends = 0;
+        }
+        loop {
+            while self.ends != 0 {
+                let end = (self.block - 1) * 32 + self.ends.trailing_zeros() as usize;
+                self.ends &= self.ends - 1;
+
+                if end + 1 < from + len {
+                    continue;
+                }
+                let pos = end + 1 - len;
+                return if pos <= self.last { Some(pos) } else { None };
+            }
+            if self.block >= self.end_block {
+                return None;
+            }
+            self.state = self.automaton.step(self.state, (self.text)(self.block));
+            self.ends = self.automaton.ends(self.state);
+            self.block += 1;
+        }
+    }
+}
+
+pub struct Pattern {
+    blocks: Vec<u32>,
+    len: usize,
+    head: ShiftOr,
+    /// KMP failure function (only for patterns longer than the head)
+    borders: Vec<u32>,
+}
+
+impl Pattern {
+    /// Pattern of `len` bits stored in `blocks` (first block holds the lowest bits)
+    pub fn new(blocks: Vec<u32>, len: usize) -> Self {
+        let block = |i: usize| blocks.get(i).copied().unwrap_or(0);
+        let head = ShiftOr::new(window64(&block, 0), len.min(64));
+        let borders = if len > 64 { Self::borders(|i| block(i / 32) >> (i % 32) & 1 == 1, len) } else { Vec::new() };
+
+        Self { blocks, len, head, borders }
+    }
+    pub fn len(&self) -> usize {
+        self.len
+    }
+    /// `borders[q]` is lenght of the longest proper prefix of first `q` bits that is also their suffix
+    fn borders(bit: impl Fn(usize) -> bool, len: usize) -> Vec<u32> {
+        let mut borders = vec![0u32; len + 1];
+        let mut k = 0;
+
+        for q in 1..len {
+            while k > 0 && bit(q) != bit(k) {
+                k = borders[k] as usize;
+            }
+            if bit(q) == bit(k) {
+                k += 1;
+            }
+            borders[q + 1] = k as u32;
+        }
+        borders
+    }
+    /// Number of leading bits of the pattern that match at `pos`, first `known` bits are known to match
+    fn matched(&self, text: &impl Fn(usize) -> u32, pos: usize, known: usize) -> usize {
+        let block = |i: usize| self.blocks.get(i).copied().unwrap_or(0);
+
+        for i in (known..self.len).step_by(64) {
+            let diff = (window64(text, pos + i) ^ window64(&block, i)) & mask64(self.len - i);
+            if diff != 0 {
+                return i + diff.trailing_zeros() as usize;
+            }
+        }
+        self.len
+    }
+}
+
+/// Calls `visit` with every (possibly overlapping) position in `start..end` where `pattern` fits entirely in `start..end`, in increasing order.
+/// Search stops when `visit` returns `false`. Empty pattern matches nowhere.
+///
+/// Patterns up to 64 bits are matched with Shift-Or automaton, 32 text bits per step. Longer patterns are aligned with KMP:
+/// the automaton finds alignments where the first 64 bits match, the rest is compared 64 bits at a time and after every
+/// mismatch (or match) the pattern is shifted by its failure function, so already matched bits are never compared again.
+pub fn search<F: Fn(usize) -> u32>(text: &F, pattern: &Pattern, start: usize, end: usize, mut visit: impl FnMut(usize) -> bool) {
+    if pattern.len == 0 || end < start || end - start < pattern.len {
+        return;
+    }
+    let last = end - pattern.len; // last valid position
+    let mut candidates = Candidates::new(text, &pattern.head, start, last);
+
+    if pattern.len <= 64 {
+        let mut from = start;
+        while let Some(pos) = candidates.next_from(from) {
+            if !visit(pos) {
+                return;
+            }
+            from = pos + 1;
+        }
+        return;
+    }
+
+    let (mut pos, mut known) = (start, 0);
+    loop {
+        if known < 64 {
+            match candidates.next_from(pos) {
+                Some(candidate) => {
+                    pos = candidate;
+                    known = 64;
+                },
+                None => return,
+            }
+        }
+        let matched = pattern.matched(text, pos, known);
+        if matched == pattern.len && !visit(pos) {
+            return;
+        }
+        known = pattern.borders[matched] as usize;
+        pos += matched - known;
+
+        if pos > last {
+            return;
+        }
+    }
+}
+
+pub fn find<F: Fn(usize) -> u32>(text: &F, pattern: &Pattern, start: usize, end: usize) -> Option<usize> {
+    let mut found = None;
+    search(text, pattern, start, end, |pos| { found = Some(pos); false });
+    found
+}
+
+pub fn find_all<F: Fn(usize) -> u32>(text: &F, pattern: &Pattern, start: usize, end: usize) -> Vec<usize> {
+    let mut found = Vec::new();
+    search(text, pattern, start, end, |pos| { found.push(pos); true });
+    found
+}
+
+pub fn count<F: Fn(usize) -> u32>(text: &F, pattern: &Pattern, start: usize, end: usize) -> usize {
+    let mut count = 0;
+    search(text, pattern, start, end, |_| { count += 1; true });
+    count
+}
@@ -0,0 +1,181 @@
+use pyo3::{prelude::*, types, exceptions};
+use pyo3::basic::CompareOp;
+use bv::Bits;
+
+use crate::binary::{strided, BinaryBase, SignBehavior};
+use crate::Binary;
+
+/// Bits `start..stop` of parent `Binary`. View does not own any bits, reads and writes go straight to the parent
+#[pyclass]
+pub struct BinaryView {
+    parent: Py<Binary>,
+    start: usize,
+    stop: usize,
+    sign_behavior: SignBehavior,
+}
+
+impl BinaryView {
+    pub fn new(parent: Py<Binary>, start: usize, stop: usize, sign_behavior: SignBehavior) -> Self {
+        Self { parent, start, stop, sign_behavior }
+    }
+    fn len_usize(&self) -> usize {
+        self.stop - self.start
+    }
+    /// Fails if view does not fit in parent anymore (parent was resized after view was created)
+    fn check_bounds(&self, parent: &BinaryBase) -> PyResult<()> {
+        if self.stop > parent.len_usize() {
+            return Err(exceptions::PyIndexError::new_err(format!("View {}..{} is outside of the parent of lenght {}", self.start, self.stop, parent.len_usize())));
+        }
+        Ok(())
+    }
+    fn with_parent<R>(&self, py: Python, f: impl FnOnce(&BinaryBase) -> R) -> PyResult<R> {
+        let parent = self.parent.as_ref(py).try_borrow()?;
+        self.check_bounds(parent.unwrap())?;
+
+        Ok(f(parent.unwrap()))
+    }
+    fn with_parent_mut<R>(&self, py: Python, f: impl FnOnce(&mut BinaryBase) -> R) -> PyResult<R> {
+        let mut parent = self.parent.as_ref(py).try_borrow_mut()?;
+        self.check_bounds(&parent.inner)?;
+
+        Ok(f(&mut parent.inner))
+    }
+    /// Value of the view if it fits in 64 bits (sign extended if view is signed)
+    fn small_value(&self, py: Python) -> PyResult<Option<i128>> {
+        let len = self.len_usize();
+        if len > 64 {
+            return Ok(None);
+        }
+        let value = self.with_parent(py, |parent| parent.get_bits_u64(self.start, len, false))?;
+
+        if self.sign_behavior.is_signed() && len > 0 {
+            Ok(Some(crate::pack::pack_base::sign_extend(value, len as u32) as i128))
+        } else {
+            Ok(Some(value as i128))
+        }
+    }
+    /// Copies bits of the view
+    pub fn to_base(&self, py: Python) -> PyResult<BinaryBase> {
+        self.with_parent(py, |parent| {
+            let blocks = strided::gather(|i| parent.extended_block(i, false), self.start, 1, self.len_usize());
+
+            BinaryBase::from_blocks(&blocks, self.len_usize(), self.sign_behavior)
+        })
+    }
+    /// Overwrites bits of the view with `value` (it has to be as long as the view)
+    fn write(&self, py: Python, value: &BinaryBase) -> PyResult<()> {
+        let fill = value.sign_extending_bit();
+
+        self.with_parent_mut(py, |parent| {
+            parent.with_blocks_mut(|blocks| strided::scatter(blocks, self.start, 1, self.len_usize(), |i| value.extended_block(i, fill)))
+        })
+    }
+    fn flatten_index(&self, index: isize) -> PyResult<usize> {
+        let len = self.len_usize() as isize;
+        let flat = if index < 0 { index + len } else { index };
+
+        if flat < 0 || flat >= len {
+            return Err(exceptions::PyIndexError::new_err(format!("Index out of range: {}", index)));
+        }
+        Ok(flat as usize)
+    }
+}
+
+#[pymethods]
+impl BinaryView {
+    #[getter]
+    pub fn parent(&self, py: Python) -> Py<Binary> {
+        self.parent.clone_ref(py)
+    }
+    #[getter]
+    pub fn start(&self) -> usize {
+        self.start
+    }
+    #[getter]
+    pub fn stop(&self) -> usize {
+        self.stop
+    }
+    #[getter]
+    pub fn len(&self) -> usize {
+        self.len_usize()
+    }
+    pub fn sign_behavior(&self) -> &'static str {
+        self.sign_behavior.as_str()
+    }
+    pub fn __len__(&self) -> usize {
+        self.len_usize()
+    }
+    /// Returns Python int, views up to 64 bits are read without copying
+    pub fn int(&self, py: Python) -> PyResult<PyObject> {
+        match self.small_value(py)? {
+            Some(value) => Ok(value.into_py(py)),
+            None => Binary::wrap(self.to_base(py))?.int(),
+        }
+    }
+    pub fn __int__(&self, py: Python) -> PyResult<PyObject> {
+        self.int(py)
+    }
+    pub fn __index__(&self, py: Python) -> PyResult<PyObject> {
+        self.int(py)
+    }
+    pub fn __bool__(&self, py: Python) -> PyResult<bool> {
+        match self.small_value(py)? {
+            Some(value) => Ok(value != 0),
+            None => Ok(self.to_base(py)?.blocks().iter().any(|block| *block != 0)),
+        }
+    }
+    /// Copies the view into new `Binary`
+    pub fn binary(&self, py: Python) -> PyResult<PyObject> {
+        Binary::wrap_object(self.to_base(py))
+    }
+    /// Overwrites bits of the view (and the parent) with `value`, it is converted like in `Binary(value, lenght=len(view))`
+    pub fn set(&self, py: Python, value: &PyAny) -> PyResult<()> {
+        let value = Binary::from(value, Some(self.len_usize()), Some(self.sign_behavior.as_str()))?;
+
+        self.write(py, &value.inner)
+    }
+    pub fn __getitem__(&self, py: Python, index: &PyAny) -> PyResult<PyObject> {
+        if let Ok(index) = index.extract::<isize>() {
+            let index = self.flatten_index(index)?;
+            return Ok(self.with_parent(py, |parent| parent.data.get_bit((self.start + index) as u64))?.into_py(py));
+        }
+        // slices and lists of indices are taken from the copy
+        Binary::wrap(self.to_base(py))?.__getitem__(index)
+    }
+    pub fn __setitem__(&self, py: Python, index: &PyAny, value: &PyAny) -> PyResult<()> {
+        if let (Ok(index), Ok(bit)) = (index.extract::<isize>(), value.extract::<bool>()) {
+            let index = self.flatten_index(index)?;
+            return self.with_parent_mut(py, |parent| parent.data.set((self.start + index) as u64, bit));
+        }
+        let mut copy = Binary::wrap(self.to_base(py))?;
+        copy.__setitem__(index, value)?;
+
+        self.write(py, &copy.inner)
+    }
+    pub fn __richcmp__(&self, py: Python, other: &PyAny, op: CompareOp) -> PyResult<bool> {
+        // small views are compared with ints directly, wider ints are compared with the copy
+        if let (Some(value), Ok(true)) = (self.small_value(py)?, other.is_instance_of::<types::PyLong>()) {
+            if let Ok(other) = other.extract::<i128>() {
+                if other >= 0 || self.sign_behavior.is_signed() {
+                    let cmp = value.cmp(&other);
+
+                    return Ok(match op {
+                        CompareOp::Eq => cmp.is_eq(),
+                        CompareOp::Ne => cmp.is_ne(),
+                        CompareOp::Lt => cmp.is_lt(),
+                        CompareOp::Le => cmp.is_le(),
+                        CompareOp::Gt => cmp.is_gt(),
+                        CompareOp::Ge => cmp.is_ge(),
+                    });
+                }
+            }
+        }
+        Binary::wrap(self.to_base(py))?.__richcmp__(other, op)
+    }
+    pub fn __repr__(&self, py: Python) -> PyResult<String> {
+        Ok(format!("BinaryView({}, start={}, stop={})", self.to_base(py)?.to_string_formatted_default(), self.start, self.stop))
+    }
+    pub fn __str__(&self, py: Python) -> PyResult<String> {
+        Ok(self.to_base(py)?.to_string_formatted_default())
+    }
+}